@@ -1,17 +1,24 @@
+import logging
+import math
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import schemas, models
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..services import auth_service
+from ..core.passwords import PasswordVerifierBusy
+from ..core.rate_limit import login_throttle
 from ..config import settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.post("/register", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
-async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
     """
     Crée un nouveau compte utilisateur.
     """
@@ -35,24 +42,44 @@ from ..schemas.token import TokenResponse  # Import spécifique pour éviter la
 @router.post("/token", response_model=TokenResponse, include_in_schema=False)
 @router.post("/login", response_model=TokenResponse)
 async def login_for_access_token(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Authentifie un utilisateur et renvoie un jeton d'accès.
     Accepte à la fois /login et /token pour la compatibilité.
+    Les tentatives sont limitées par IP et par compte (429 avant toute
+    vérification) ; la vérification du mot de passe (bcrypt) s'exécute
+    dans un pool borné.
     """
-    print(f"Tentative de connexion pour l'utilisateur: {form_data.username}")
+    client_ip = request.client.host if request.client else None
+    scope, retry_after = await login_throttle.check(client_ip, form_data.username)
+    if scope:
+        logger.info("Connexion limitée", extra={"scope": scope})
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Trop de tentatives de connexion, veuillez réessayer plus tard",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
     
     # Authentifier l'utilisateur avec email/username et mot de passe
-    user = auth_service.authenticate_user(
-        db, 
-        email=form_data.username,  # Peut être un email ou un nom d'utilisateur
-        password=form_data.password
-    )
+    try:
+        user = await auth_service.authenticate_user_async(
+            db, 
+            email=form_data.username,  # Peut être un email ou un nom d'utilisateur
+            password=form_data.password
+        )
+    except PasswordVerifierBusy:
+        logger.warning("Connexion refusée: file de vérification des mots de passe pleine")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service de connexion surchargé, veuillez réessayer",
+            headers={"Retry-After": "1"},
+        )
     
     if not user:
-        print(f"Échec de l'authentification pour l'utilisateur: {form_data.username}")
+        logger.info("Échec de l'authentification")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Identifiants incorrects",
@@ -62,16 +89,12 @@ async def login_for_access_token(
     # Crée un jeton d'accès avec plus d'informations
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth_service.create_access_token(
-        data={
-            "sub": str(user.id),   # Sujet du token (ID de l'utilisateur converti en chaîne)
-            "username": user.username,  # Nom d'utilisateur
-            "email": user.email,   # Email de l'utilisateur
-            "role": user.role,     # Rôle de l'utilisateur
-        },
+        data=auth_service.user_claims(user),
         expires_delta=access_token_expires
     )
     
-    print(f"Connexion réussie pour l'utilisateur: {user.username} (ID: {user.id})")
+    await login_throttle.login_succeeded(form_data.username)
+    logger.info("Connexion réussie", extra={"user_id": user.id})
     
     # Retourner le token et les informations de l'utilisateur
     return {
@@ -90,14 +113,16 @@ async def login_for_access_token(
     }
 
 @router.get("/me", response_model=schemas.User)
-async def read_users_me(
+def read_users_me(
+    db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_service.get_current_active_user)
 ):
     """
     Renvoie les informations de l'utilisateur actuellement connecté.
+    Relu en base : le jeton ne porte pas tout le profil (dates notamment).
     """
-    print(f"Récupération des informations pour l'utilisateur: {current_user.username} (ID: {current_user.id})")
-    
     # Convertir l'utilisateur SQLAlchemy en modèle Pydantic
-    user_schema = schemas.User.from_orm(current_user)
-    return user_schema
+    db_user = db.query(models.User).filter(models.User.id == current_user.id).first()
+    if not db_user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Utilisateur non trouvé")
+    return schemas.User.from_orm(db_user)
@@ -1,3 +1,4 @@
+import logging
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
@@ -6,6 +7,8 @@ from .. import schemas, models
 from ..database import get_db
 from ..services import course_service, auth_service
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Course])
@@ -21,9 +24,10 @@ def read_courses(
     """
     Récupère une liste de cours avec des filtres optionnels et la progression de l'utilisateur.
     """
-    print(f"\n=== APPEL API COURSES ===")
-    print(f"Utilisateur: {current_user.email} (ID: {current_user.id})")
-    print(f"Paramètres: skip={skip}, limit={limit}, level={level}, tag={tag}, search={search}")
+    logger.debug(
+        "Liste des cours: skip=%s limit=%s level=%s tag=%s search=%s",
+        skip, limit, level, tag, search, extra={"user_id": current_user.id}
+    )
     
     courses = course_service.CourseService.get_courses(
         db=db, 
@@ -35,14 +39,7 @@ def read_courses(
         user_id=current_user.id
     )
     
-    print(f"Nombre de cours trouvés: {len(courses) if courses else 0}")
-    if courses:
-        print(f"Premiers cours: {[{'id': c.id, 'title': c.title} for c in courses[:3]]}")
-    else:
-        print("Aucun cours trouvé dans la base de données")
-    
-    print(f"Type de retour: {type(courses)}")
-    print(f"=== FIN APPEL API COURSES ===\n")
+    logger.debug("Nombre de cours trouvés: %d", len(courses) if courses else 0)
     
     return courses
 
@@ -1,48 +1,45 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+import logging
+from typing import Optional
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from pydantic import ValidationError
 
 from app.config import settings
-from app.db.session import SessionLocal
+from app.database import get_db
 from app.models.user import User
 from app.schemas.token import TokenPayload
+from app.services.auth_service import get_principal
+
+logger = logging.getLogger(__name__)
 
 # Endpoint pour l'authentification OAuth2
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/token"
 )
 
-def get_db() -> Generator:
-    """
-    Dépendance pour obtenir une session de base de données.
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# `get_db` est réexporté depuis app.database : utiliser la même fonction
+# permet à FastAPI de ne créer qu'une session par requête, quel que soit
+# le module d'où la dépendance est importée.
 
 def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+    request: Request, db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
 ) -> User:
     """
     Dépendance pour obtenir l'utilisateur actuel à partir du token JWT.
+    L'utilisateur est lu dans le cache des principaux lorsque c'est possible,
+    et conservé dans `request.state.user` (suivi des pages vues).
     """
-    print(f"Tentative d'authentification avec token: {token[:15]}...")
-    
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        print(f"Token décodé avec succès: {payload}")
         token_data = TokenPayload(**payload)
         
         # Vérifier que le sujet du token est présent
         if token_data.sub is None:
-            print("Erreur: Le token ne contient pas d'ID utilisateur (sub)")
+            logger.info("Token sans ID utilisateur (sub)")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token invalide: ID utilisateur manquant",
@@ -50,7 +47,7 @@ def get_current_user(
             )
             
     except (JWTError, ValidationError) as e:
-        print(f"Erreur de décodage du token: {str(e)}")
+        logger.info("Erreur de décodage du token: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Impossible de valider les informations d'identification: {str(e)}",
@@ -60,9 +57,9 @@ def get_current_user(
     # Rechercher l'utilisateur par ID (convertir sub de chaîne en entier)
     try:
         user_id = int(token_data.sub)
-        user = db.query(User).filter(User.id == user_id).first()
+        user = get_principal(db, token, payload, user_id)
     except (ValueError, TypeError):
-        print(f"Erreur: Impossible de convertir l'ID utilisateur '{token_data.sub}' en entier")
+        logger.info("ID utilisateur du token non entier")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token invalide: ID utilisateur incorrect",
@@ -70,13 +67,14 @@ def get_current_user(
         )
     
     if not user:
-        print(f"Utilisateur avec ID {token_data.sub} non trouvé dans la base de données")
+        logger.info("Utilisateur du token non trouvé", extra={"user_id": token_data.sub})
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Utilisateur non trouvé"
         )
     
-    print(f"Utilisateur authentifié: {user.email} (ID: {user.id}, Rôle: {user.role})")
+    logger.debug("Utilisateur authentifié", extra={"user_id": user.id, "role": user.role})
+    request.state.user = user
     return user
 
 def get_current_active_user(
@@ -1,66 +1,157 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Request, Query, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Query, status
 from sqlalchemy.orm import Session
-from pydantic import HttpUrl
+from pydantic import HttpUrl, ValidationError
 
 from .. import models, schemas
+from ..config import settings
 from ..database import get_db
 from ..services import auth_service, interaction_service
-from ..schemas.interaction import EntityType, InteractionType, UserInteractionStats
+from ..db.keyset import decode_cursor, encode_cursor
+from ..schemas.interaction import CountMode, EntityType, InteractionType, UserInteractionStats
 
-router = APIRouter(prefix="/interactions", tags=["interactions"])
+router = APIRouter()
+
+# Tolérance sur les horloges client en avance
+CLIENT_CLOCK_SKEW = timedelta(minutes=5)
+
+def _request_metadata(request: Request) -> Dict[str, Any]:
+    """Métadonnées de la requête ajoutées à chaque interaction enregistrée"""
+    return {
+        'user_agent': request.headers.get('user-agent'),
+        'ip_address': request.client.host if request.client else None,
+        'referer': request.headers.get('referer')
+    }
 
 @router.post(
     "/track", 
-    response_model=schemas.UserInteraction,
-    status_code=status.HTTP_201_CREATED,
+    response_model=schemas.InteractionAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
     summary="Enregistrer une interaction utilisateur",
     description="""
     Enregistre une interaction utilisateur telle qu'une vue de page, un clic, 
-    une complétion, etc. avec des métadonnées optionnelles.
+    une complétion, etc. avec des métadonnées optionnelles. L'interaction est
+    écrite en base par lots, en tâche de fond (503 si le tampon est plein).
     """
 )
-async def track_interaction(
+def track_interaction(
     interaction: schemas.InteractionCreate,
     request: Request,
-    db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_service.get_current_active_user)
 ):
     """
     Enregistre une interaction utilisateur (vue, clic, complétion, etc.)
     """
-    service = interaction_service.InteractionService(db)
-    
     # Ajoute des métadonnées supplémentaires
     metadata = interaction.metadata or {}
-    metadata.update({
-        'user_agent': request.headers.get('user-agent'),
-        'ip_address': request.client.host if request.client else None,
-        'referer': request.headers.get('referer')
-    })
+    metadata.update(_request_metadata(request))
     
-    try:
-        # Enregistre l'interaction
-        interaction = service.log_interaction(
-            user_id=current_user.id,
-            entity_type=interaction.entity_type.value,
-            entity_id=interaction.entity_id,
-            interaction_type=interaction.interaction_type.value,
-            metadata=metadata
+    # Dépose l'interaction dans le tampon d'ingestion
+    accepted = interaction_service.InteractionService.queue_interaction(
+        user_id=current_user.id,
+        entity_type=interaction.entity_type.value,
+        entity_id=interaction.entity_id,
+        interaction_type=interaction.interaction_type.value,
+        metadata=metadata
+    )
+    if not accepted:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Trop d'interactions en attente, réessayez plus tard",
+            headers={"Retry-After": "1"}
+        )
+    return schemas.InteractionAccepted()
+
+@router.post(
+    "/track/batch",
+    response_model=schemas.InteractionBatchResult,
+    summary="Enregistrer un lot d'interactions utilisateur",
+    description="""
+    Enregistre en une requête les interactions accumulées par le client
+    (au plus INTERACTION_BATCH_MAX_EVENTS), avec leur horodatage client
+    optionnel. Les interactions invalides sont refusées une à une (position
+    et erreurs dans `errors`) ; les autres sont enregistrées en un seul INSERT.
+    """
+)
+def track_interactions_batch(
+    request: Request,
+    # List[Any] : un élément qui n'est pas un objet est refusé seul, dans `errors`,
+    # au lieu de faire échouer la validation du lot entier
+    events: List[Any] = Body(..., description="Interactions à enregistrer"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth_service.get_current_active_user)
+):
+    """
+    Enregistre un lot d'interactions avec rapport d'erreur par interaction
+    """
+    if len(events) > settings.INTERACTION_BATCH_MAX_EVENTS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Un lot ne peut pas dépasser {settings.INTERACTION_BATCH_MAX_EVENTS} interactions"
         )
-        return interaction
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Une erreur est survenue lors de l'enregistrement de l'interaction")
+    
+    received_at = datetime.utcnow()
+    oldest = received_at - timedelta(hours=settings.INTERACTION_CLIENT_MAX_AGE_HOURS)
+    request_metadata = _request_metadata(request)
+    rows = []
+    errors = []
+    
+    for index, event in enumerate(events):
+        if not isinstance(event, dict):
+            errors.append(schemas.InteractionBatchError(index=index, errors=["l'interaction doit être un objet JSON"]))
+            continue
+        try:
+            item = schemas.InteractionBatchItem.model_validate(event)
+        except ValidationError as e:
+            errors.append(schemas.InteractionBatchError(
+                index=index,
+                errors=[f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()]
+            ))
+            continue
+        
+        created_at = received_at
+        if item.client_timestamp is not None:
+            # Horodatages stockés en UTC sans fuseau, comme datetime.utcnow()
+            created_at = item.client_timestamp
+            if created_at.tzinfo is not None:
+                created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+            if created_at > received_at + CLIENT_CLOCK_SKEW:
+                errors.append(schemas.InteractionBatchError(index=index, errors=["client_timestamp: date dans le futur"]))
+                continue
+            if created_at < oldest:
+                errors.append(schemas.InteractionBatchError(index=index, errors=["client_timestamp: date trop ancienne"]))
+                continue
+        
+        metadata = item.metadata or {}
+        metadata.update(request_metadata)
+        rows.append({
+            'user_id': current_user.id,
+            'entity_type': item.entity_type.value,
+            'entity_id': item.entity_id,
+            'interaction_type': item.interaction_type.value,
+            'metadata': metadata,
+            'created_at': created_at
+        })
+    
+    service = interaction_service.InteractionService(db)
+    service.log_interactions(rows)
+    
+    return schemas.InteractionBatchResult(accepted=len(rows), rejected=len(errors), errors=errors)
 
 @router.get(
     "/user/recent", 
-    response_model=schemas.PaginatedResponse[schemas.UserInteraction],
-    summary="Récupérer les interactions récentes de l'utilisateur"
+    response_model=schemas.CursorPaginatedResponse[schemas.UserInteraction],
+    summary="Récupérer les interactions récentes de l'utilisateur",
+    description="""
+    Pagination par numéro de page (`page`) ou par curseur : chaque réponse
+    porte `next_cursor`, à renvoyer dans `cursor` pour lire la page suivante
+    sans OFFSET. Le nombre total est exact par défaut en pagination par page,
+    absent par défaut en pagination par curseur (`count` pour choisir :
+    exact, estimate ou none).
+    """
 )
-async def get_user_interactions(
+def get_user_interactions(
     entity_type: Optional[EntityType] = Query(
         None, 
         description="Filtrer par type d'entité (course, lesson, quiz, etc.)"
@@ -81,8 +172,14 @@ async def get_user_interactions(
         None,
         description="Date de fin pour le filtre (inclus)"
     ),
-    page: int = Query(1, ge=1, description="Numéro de page"),
+    page: int = Query(1, ge=1, description="Numéro de page (ignoré avec un curseur)"),
     limit: int = Query(20, ge=1, le=100, description="Nombre d'éléments par page"),
+    cursor: Optional[str] = Query(None, description="Curseur renvoyé par la page précédente (next_cursor)"),
+    count: Optional[CountMode] = Query(
+        None,
+        description="Nombre total : exact (défaut sans curseur), estimate, ou none (défaut avec curseur) ; "
+                    "exact et estimate sont calculés aussi avec un curseur"
+    ),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_service.get_current_active_user)
 ):
@@ -90,25 +187,49 @@ async def get_user_interactions(
     Récupère les interactions de l'utilisateur avec pagination et filtres optionnels
     """
     service = interaction_service.InteractionService(db)
-    offset = (page - 1) * limit
-    
-    interactions, total = service.get_user_interactions(
+    filters = dict(
         user_id=current_user.id,
         entity_type=entity_type,
         interaction_type=interaction_type,
         entity_id=entity_id,
         start_date=start_date,
-        end_date=end_date,
-        limit=limit,
-        offset=offset
+        end_date=end_date
     )
     
+    if cursor is not None:
+        try:
+            position = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        interactions, has_more = service.get_user_interactions_after(cursor=position, limit=limit, **filters)
+        page = 1
+        count = count or CountMode.NONE
+        total = service.count_user_interactions(**filters) if count == CountMode.EXACT else None
+    else:
+        count = count or CountMode.EXACT
+        # Un élément de plus pour savoir s'il existe une page suivante
+        interactions, total = service.get_user_interactions(
+            limit=limit + 1,
+            offset=(page - 1) * limit,
+            count_total=count == CountMode.EXACT,
+            **filters
+        )
+        has_more = len(interactions) > limit
+        interactions = interactions[:limit]
+    
+    total_is_estimate = False
+    if count == CountMode.ESTIMATE:
+        total, total_is_estimate = service.estimate_user_interactions(**filters)
+    
+    last = interactions[-1] if interactions else None
     return {
         "items": interactions,
         "total": total,
+        "total_is_estimate": total_is_estimate,
         "page": page,
         "limit": limit,
-        "pages": (total + limit - 1) // limit if total > 0 else 1
+        "pages": ((total + limit - 1) // limit if total > 0 else 1) if total is not None else None,
+        "next_cursor": encode_cursor(last.created_at, last.id) if has_more else None
     }
 
 @router.get(
@@ -116,7 +237,7 @@ async def get_user_interactions(
     response_model=UserInteractionStats,
     summary="Récupérer les statistiques d'interaction de l'utilisateur"
 )
-async def get_user_interaction_stats(
+def get_user_interaction_stats(
     days: int = Query(30, ge=1, le=365, description="Nombre de jours à inclure dans les statistiques"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_service.get_current_active_user)
@@ -132,7 +253,7 @@ async def get_user_interaction_stats(
     response_model=bool,
     summary="Vérifier si l'utilisateur a interagi avec une entité"
 )
-async def has_interacted_with(
+def has_interacted_with(
     entity_type: EntityType = Query(..., description="Type d'entité"),
     entity_id: int = Query(..., description="ID de l'entité"),
     interaction_type: Optional[InteractionType] = Query(
@@ -3,13 +3,13 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from .. import schemas, models
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..services import auth_service, recommendation_service, interaction_service
 
 router = APIRouter()
 
 @router.get("/content-based", response_model=List[Dict[str, Any]])
-async def get_content_based_recommendations(
+def get_content_based_recommendations(
     request: Request,
     limit: int = 5,
     db: Session = Depends(get_db),
@@ -19,8 +19,7 @@ async def get_content_based_recommendations(
     Récupère des recommandations basées sur le contenu des cours que l'utilisateur a déjà suivis.
     """
     # Enregistre l'accès à la page de recommandations
-    interaction_svc = interaction_service.InteractionService(db)
-    interaction_svc.log_interaction(
+    interaction_service.InteractionService.queue_interaction(
         user_id=current_user.id,
         entity_type='page',
         entity_id=0,
@@ -48,7 +47,7 @@ async def get_content_based_recommendations(
 @router.get("/collaborative", response_model=List[Dict[str, Any]])
 def get_collaborative_recommendations(
     limit: int = 5,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(auth_service.get_current_active_user)
 ):
     """
@@ -71,7 +70,7 @@ def get_collaborative_recommendations(
 def get_hybrid_recommendations(
     limit: int = 5,
     content_weight: float = 0.5,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(auth_service.get_current_active_user)
 ):
     """
@@ -106,7 +105,7 @@ def get_hybrid_recommendations(
 @router.get("/popular", response_model=List[Dict[str, Any]])
 def get_popular_courses(
     limit: int = 5,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(auth_service.get_current_active_user)
 ):
     """
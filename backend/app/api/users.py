@@ -30,12 +30,14 @@ def read_users(
 
 @router.get("/me", response_model=schemas.User)
 def read_user_me(
+    db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_service.get_current_active_user)
 ):
     """
     Récupère les informations de l'utilisateur actuellement connecté.
+    Relu en base : le jeton ne porte pas tout le profil (dates notamment).
     """
-    return current_user
+    return UserService.get_user(db, current_user.id)
 
 @router.get("/{user_id}", response_model=schemas.User)
 def read_user(
@@ -104,10 +106,13 @@ def update_user_status(
                 detail="Utilisateur non trouvé"
             )
             
-        # Mettre à jour le statut de l'utilisateur
+        # Mettre à jour le statut de l'utilisateur et révoquer les jetons
+        # émis, qui portent l'ancien statut
         db_user.is_active = status_update.active
+        UserService.revoke_tokens(db_user)
         db.commit()
         db.refresh(db_user)
+        UserService.tokens_revoked(db_user)
         
         return {
             "success": True,
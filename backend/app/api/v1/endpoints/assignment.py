@@ -152,7 +152,7 @@ demo_submissions = [
 # Endpoints pour les devoirs
 
 @router.get("/", response_model=List[AssignmentResponse])
-async def get_all_assignments(
+def get_all_assignments(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     course_id: Optional[int] = None
@@ -174,7 +174,7 @@ async def get_all_assignments(
     return assignments
 
 @router.post("/", response_model=AssignmentResponse, status_code=status.HTTP_201_CREATED)
-async def create_assignment(
+def create_assignment(
     assignment: AssignmentCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -202,7 +202,7 @@ async def create_assignment(
     return new_assignment
 
 @router.get("/{assignment_id}", response_model=AssignmentResponse)
-async def get_assignment(
+def get_assignment(
     assignment_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -231,7 +231,7 @@ async def get_assignment(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Accès non autorisé")
 
 @router.put("/{assignment_id}", response_model=AssignmentResponse)
-async def update_assignment(
+def update_assignment(
     assignment_id: int,
     assignment_update: AssignmentUpdate,
     db: Session = Depends(get_db),
@@ -261,7 +261,7 @@ async def update_assignment(
     return updated_assignment
 
 @router.delete("/{assignment_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_assignment(
+def delete_assignment(
     assignment_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -284,7 +284,7 @@ async def delete_assignment(
     return None
 
 @router.post("/{assignment_id}/submit", response_model=AssignmentSubmissionResponse)
-async def submit_assignment(
+def submit_assignment(
     assignment_id: int,
     submission: AssignmentSubmission,
     db: Session = Depends(get_db),
@@ -336,7 +336,7 @@ async def submit_assignment(
     return new_submission
 
 @router.post("/{assignment_id}/upload", response_model=Dict[str, str])
-async def upload_assignment_file(
+def upload_assignment_file(
     assignment_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
@@ -354,7 +354,7 @@ async def upload_assignment_file(
     return {"fileUrl": file_url}
 
 @router.get("/{assignment_id}/submissions", response_model=List[AssignmentSubmissionResponse])
-async def get_assignment_submissions(
+def get_assignment_submissions(
     assignment_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -373,7 +373,7 @@ async def get_assignment_submissions(
     return submissions
 
 @router.get("/{assignment_id}/submissions/{submission_id}", response_model=AssignmentSubmissionResponse)
-async def get_submission(
+def get_submission(
     assignment_id: int,
     submission_id: int,
     db: Session = Depends(get_db),
@@ -400,7 +400,7 @@ async def get_submission(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Accès non autorisé")
 
 @router.post("/{assignment_id}/submissions/{submission_id}/grade", response_model=AssignmentSubmissionResponse)
-async def grade_submission(
+def grade_submission(
     assignment_id: int,
     submission_id: int,
     grade_data: AssignmentGrade,
@@ -440,7 +440,7 @@ async def grade_submission(
     return demo_submissions[submission_index]
 
 @router.get("/student/assignments", response_model=List[Dict[str, Any]])
-async def get_student_assignments(
+def get_student_assignments(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     status: Optional[str] = None
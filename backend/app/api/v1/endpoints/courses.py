@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
 from typing import List, Dict, Any, Optional
@@ -10,10 +11,16 @@ from app.models.user import User
 from app.models.models import Course, Module, Lesson, Category, course_student
 from app.models.progress import UserProgress
 from app.services.auth_service import get_current_active_user
+from app.services.course_features import course_features
+from app.services.course_text_index import course_text_index
+from app.schemas.course import (
+    CourseDetail, CourseDetailModule, CourseDetailLesson,
+    CourseCategorySummary, CourseStudentSummary
+)
 
 router = APIRouter()
 @router.get("/admin/courses", response_model=List[Dict[str, Any]])
-async def get_all_courses_admin(
+def get_all_courses_admin(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
@@ -74,7 +81,7 @@ async def get_all_courses_admin(
     return result
 
 @router.get("/categories", response_model=List[Dict[str, Any]])
-async def get_categories(
+def get_categories(
     db: Session = Depends(get_db)
 ):
     """
@@ -92,7 +99,7 @@ async def get_categories(
     ]
 
 @router.get("/", response_model=List[Dict[str, Any]])
-async def get_teacher_courses(
+def get_teacher_courses(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -146,8 +153,8 @@ async def get_teacher_courses(
     
     return result
 
-@router.get("/{course_id}", response_model=Dict[str, Any])
-async def get_course_details(
+@router.get("/{course_id}", response_model=CourseDetail)
+def get_course_details(
     course_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -181,28 +188,19 @@ async def get_course_details(
     modules_data = []
     for module in modules:
         # Récupérer les leçons du module
-        lessons = db.query(Lesson).filter(Lesson.module_id == module.id).order_by(Lesson.order).all()
+        lessons = db.query(Lesson).filter(Lesson.module_id == module.id).order_by(Lesson.order_index).all()
         
-        lessons_data = [{
-            "id": lesson.id,
-            "title": lesson.title,
-            "description": lesson.description,
-            "content": lesson.content,
-            "type": lesson.type,
-            "duration_minutes": lesson.duration_minutes,
-            "is_free": lesson.is_free,
-            "order": lesson.order
-        } for lesson in lessons]
+        lessons_data = [CourseDetailLesson.model_validate(lesson) for lesson in lessons]
         
-        modules_data.append({
-            "id": module.id,
-            "title": module.title,
-            "description": module.description,
-            "order_index": module.order_index,  # Utiliser order_index au lieu de order
-            "order": module.order_index,  # Garder order pour compatibilité avec le frontend
-            "lessons": lessons_data,
-            "lesson_count": len(lessons_data)
-        })
+        modules_data.append(CourseDetailModule(
+            id=module.id,
+            title=module.title,
+            description=module.description,
+            order_index=module.order_index,  # Utiliser order_index au lieu de order
+            order=module.order_index,  # Garder order pour compatibilité avec le frontend
+            lessons=lessons_data,
+            lesson_count=len(lessons_data)
+        ))
     
     # Compter les étudiants inscrits
     student_count = db.query(func.count(User.id)).join(
@@ -210,36 +208,31 @@ async def get_course_details(
     ).filter(Course.id == course.id).scalar() or 0
     
     # Récupérer les étudiants
-    students = [{
-        "id": student.id,
-        "first_name": student.first_name,
-        "last_name": student.last_name,
-        "email": student.email
-    } for student in course.students]
-    
-    result = {
-        "id": course.id,
-        "title": course.title,
-        "description": course.description,
-        "short_description": course.short_description,
-        "status": course.status,
-        "price": course.price,
-        "thumbnail_url": course.thumbnail_url,
-        "image": course.thumbnail_url,  # Pour compatibilité
-        "category_id": course.category_id,
-        "category": {"id": category.id, "name": category.name} if category else None,
-        "modules": modules_data,
-        "module_count": len(modules_data),
-        "student_count": student_count,
-        "students": students,
-        "created_at": course.created_at.isoformat() if course.created_at else None,
-        "updated_at": course.updated_at.isoformat() if course.updated_at else None
-    }
-    
-    return result
+    students = [CourseStudentSummary.model_validate(student) for student in course.students]
+    
+    detail = CourseDetail(
+        id=course.id,
+        title=course.title,
+        description=course.description,
+        short_description=course.short_description,
+        status=course.status,
+        price=course.price,
+        thumbnail_url=course.thumbnail_url,
+        image=course.thumbnail_url,  # Pour compatibilité
+        category_id=course.category_id,
+        category=CourseCategorySummary.model_validate(category) if category else None,
+        modules=modules_data,
+        module_count=len(modules_data),
+        student_count=student_count,
+        students=students,
+        created_at=course.created_at.isoformat() if course.created_at else None,
+        updated_at=course.updated_at.isoformat() if course.updated_at else None
+    )
+    # Modèles construits ici : réponse renvoyée telle quelle, sans revalidation par le response_model
+    return ORJSONResponse(detail.model_dump(mode="json"))
 
 @router.post("/create", response_model=Dict[str, Any])
-async def create_course(
+def create_course(
     course_data: Dict[str, Any] = Body(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -285,6 +278,8 @@ async def create_course(
     db.add(new_course)
     db.commit()
     db.refresh(new_course)
+    course_text_index.reindex_course(new_course.id)
+    course_features.invalidate_course(new_course.id)
     
     return {
         "id": new_course.id,
@@ -293,7 +288,7 @@ async def create_course(
     }
 
 @router.post("/{course_id}/modules", response_model=Dict[str, Any])
-async def create_module(
+def create_module(
     course_id: int,
     module_data: Dict[str, Any] = Body(...),
     db: Session = Depends(get_db),
@@ -339,7 +334,7 @@ async def create_module(
     }
 
 @router.post("/{course_id}/modules/{module_id}/lessons", response_model=Dict[str, Any])
-async def create_lesson(
+def create_lesson(
     course_id: int,
     module_id: int,
     lesson_data: Dict[str, Any] = Body(...),
@@ -403,7 +398,7 @@ async def create_lesson(
     }
 
 @router.get("/student/enrolled", response_model=List[Dict[str, Any]])
-async def get_student_enrolled_courses(
+def get_student_enrolled_courses(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -1,15 +1,19 @@
 from typing import List, Dict, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Form, File, UploadFile, Request
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import func, and_
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.user import User
 from app.models.messaging import Discussion, Message, MessageRead, MessageAttachment
 from app.models.discussion_participants import discussion_participants
 from app.services.auth_service import get_current_active_user
 from pydantic import BaseModel, Field
 from datetime import datetime, timedelta, timezone
+import logging
 import os
 import uuid
 from pathlib import Path
@@ -25,6 +29,8 @@ DEMO_USER_SOPHIE = "Dr. Sophie Martin"
 DEMO_USER_MARIE = "Marie Martin"
 DEMO_USER_LUCAS = "Lucas Bernard"
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 # Schémas Pydantic pour les discussions
@@ -76,12 +82,54 @@ class DiscussionResponse(DiscussionBase):
     isArchived: bool = False
     messages: Optional[List[MessageResponse]] = None
 
+class DiscussionParticipantSummary(BaseModel):
+    id: int
+    name: str
+    role: str
+
+class DiscussionSummary(BaseModel):
+    id: int
+    title: str
+    createdAt: Optional[datetime] = None
+    updatedAt: Optional[datetime] = None
+    createdBy: int
+    creatorName: str
+    messageCount: int = 0
+    lastMessageAt: Optional[datetime] = None
+    lastMessageBy: str
+    participants: List[DiscussionParticipantSummary] = []
+    isArchived: bool = False
+    isGroup: bool = False
+    courseId: Optional[int] = None
+
 # Schémas de réponse pour les discussions et les messages
 
+async def _get_participant_discussion(db: AsyncSession, discussion_id: int, user_id: int) -> Optional[Discussion]:
+    """Récupère une discussion si l'utilisateur en est participant (session asynchrone)."""
+    return (await db.scalars(
+        select(Discussion).join(
+            discussion_participants,
+            Discussion.id == discussion_participants.c.discussion_id
+        ).where(
+            Discussion.id == discussion_id,
+            discussion_participants.c.user_id == user_id
+        ).limit(1)
+    )).first()
+
+def _attachment_to_dict(attachment: MessageAttachment) -> Dict[str, Any]:
+    """Formate une pièce jointe pour la réponse API."""
+    return {
+        "id": attachment.id,
+        "originalFilename": attachment.original_filename,
+        "fileSize": attachment.file_size,
+        "mimeType": attachment.mime_type,
+        "downloadUrl": f"/api/v1/discussions/attachments/{attachment.id}/download"
+    }
+
 # Endpoints pour les discussions
 
-@router.get("/", response_model=List[Dict[str, Any]])
-async def get_all_discussions(
+@router.get("/", response_model=List[DiscussionSummary])
+def get_all_discussions(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     course_id: Optional[int] = None,
@@ -92,9 +140,10 @@ async def get_all_discussions(
     Récupère toutes les discussions accessibles à l'utilisateur.
     Peut être filtré par cours, tag et discussions non lues.
     """
-    print("\n=== Début get_all_discussions ===")
-    print(f"Utilisateur: {current_user.username} (ID: {current_user.id})")
-    print(f"Paramètres: course_id={course_id}, tag={tag}, unread_only={unread_only}")
+    logger.debug(
+        "get_all_discussions: course_id=%s tag=%s unread_only=%s",
+        course_id, tag, unread_only, extra={"user_id": current_user.id}
+    )
     
     # Récupérer toutes les discussions auxquelles l'utilisateur participe
     discussions_query = db.query(Discussion).join(
@@ -143,33 +192,28 @@ async def get_all_discussions(
         ).count()
         
         # Construire l'objet de discussion
-        discussion_data = {
-            "id": discussion.id,
-            "title": discussion.title,
-            "createdAt": discussion.created_at,
-            "updatedAt": discussion.updated_at,
-            "createdBy": discussion.created_by,
-            "creatorName": f"{next((p.first_name + ' ' + p.last_name for p in participants if p.id == discussion.created_by), UNKNOWN_USER)}",
-            "messageCount": message_count,
-            "lastMessageAt": last_message.sent_at if last_message else discussion.updated_at,
-            "lastMessageBy": f"{last_message.sender.first_name} {last_message.sender.last_name}" if last_message and last_message.sender else "Aucun message",
-            "participants": [{
-                "id": p.id,
-                "name": f"{p.first_name} {p.last_name}",
-                "role": p.role
-            } for p in participants],
-            "isArchived": False,  # À implémenter si nécessaire
-            "isGroup": discussion.is_group
-        }
-        
-        # Ajouter des champs facultatifs si nécessaires
-        if hasattr(discussion, 'course_id') and discussion.course_id:
-            discussion_data["courseId"] = discussion.course_id
-            
-        result.append(discussion_data)
+        result.append(DiscussionSummary(
+            id=discussion.id,
+            title=discussion.title,
+            createdAt=discussion.created_at,
+            updatedAt=discussion.updated_at,
+            createdBy=discussion.created_by,
+            creatorName=f"{next((p.first_name + ' ' + p.last_name for p in participants if p.id == discussion.created_by), UNKNOWN_USER)}",
+            messageCount=message_count,
+            lastMessageAt=last_message.sent_at if last_message else discussion.updated_at,
+            lastMessageBy=f"{last_message.sender.first_name} {last_message.sender.last_name}" if last_message and last_message.sender else "Aucun message",
+            participants=[DiscussionParticipantSummary(
+                id=p.id,
+                name=f"{p.first_name} {p.last_name}",
+                role=p.role
+            ) for p in participants],
+            isArchived=False,  # À implémenter si nécessaire
+            isGroup=bool(discussion.is_group),
+            courseId=getattr(discussion, 'course_id', None)
+        ))
     
     # Trier par date de dernier message (du plus récent au plus ancien)
-    result.sort(key=lambda x: x["lastMessageAt"], reverse=True)
+    result.sort(key=lambda x: x.lastMessageAt or datetime.min, reverse=True)
     
     # Appliquer le filtre des discussions non lues si demandé
     if unread_only:
@@ -178,11 +222,12 @@ async def get_all_discussions(
         # Vous devrez implémenter cette logique en fonction de votre modèle de données
         pass
     
-    print(f"\n=== Fin get_all_discussions: {len(result)} discussions ===\n")
-    return result
+    logger.debug("get_all_discussions: %d discussions", len(result))
+    # Modèles construits ici : réponse renvoyée telle quelle, sans revalidation par le response_model
+    return ORJSONResponse([discussion.model_dump(mode="json") for discussion in result])
 
 @router.post("/", response_model=DiscussionResponse, status_code=status.HTTP_201_CREATED)
-async def create_discussion(
+def create_discussion(
     discussion: DiscussionCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -335,7 +380,7 @@ async def create_discussion(
     return response
 
 @router.get("/{discussion_id}", response_model=DiscussionResponse)
-async def get_discussion(
+def get_discussion(
     discussion_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -393,7 +438,7 @@ async def get_discussion(
         db.commit()
     except Exception as e:
         db.rollback()
-        print(f"Erreur lors de la mise à jour des messages lus: {e}")
+        logger.warning("Erreur lors de la mise à jour des messages lus: %s", e)
     
     # Construire la réponse
     response = {
@@ -432,7 +477,7 @@ async def get_discussion(
     return response
 
 @router.put("/{discussion_id}", response_model=DiscussionResponse)
-async def update_discussion(
+def update_discussion(
     discussion_id: int,
     discussion_update: DiscussionUpdate,
     db: Session = Depends(get_db),
@@ -525,7 +570,7 @@ async def update_discussion(
 async def add_message(
     request: Request,
     discussion_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -534,9 +579,6 @@ async def add_message(
     # Déterminer le type de contenu et extraire les données
     content_type = request.headers.get("content-type", "")
     
-    print(f"\n=== Début add_message ===")
-    print(f"Content-Type: {content_type}")
-    
     if "multipart/form-data" in content_type:
         # Traiter FormData (avec ou sans fichiers)
         form = await request.form()
@@ -551,22 +593,13 @@ async def add_message(
         attachments = []
     
     # Vérifier que la discussion existe et que l'utilisateur y a accès
-    discussion = db.query(Discussion).join(
-        discussion_participants,
-        Discussion.id == discussion_participants.c.discussion_id
-    ).filter(
-        Discussion.id == discussion_id,
-        discussion_participants.c.user_id == current_user.id
-    ).first()
+    discussion = await _get_participant_discussion(db, discussion_id, current_user.id)
     
     if not discussion:
         raise HTTPException(status_code=404, detail=DISCUSSION_NOT_FOUND)
     
     # Traiter les pièces jointes si présentes
-    print(f"\n=== Début traitement des pièces jointes ===")
-    print(f"Attachments reçus: {attachments}")
-    print(f"Type: {type(attachments)}")
-    print(f"Nombre d'attachments: {len(attachments) if attachments else 0}")
+    logger.debug("add_message: %d pièce(s) jointe(s) reçue(s)", len(attachments) if attachments else 0)
     
     attachment_data = []
     if attachments and len(attachments) > 0:
@@ -581,10 +614,9 @@ async def add_message(
                 unique_filename = f"{uuid.uuid4()}{file_extension}"
                 file_path = upload_dir / unique_filename
                 
-                # Sauvegarder le fichier
-                with open(file_path, "wb") as buffer:
-                    content_file = await file.read()
-                    buffer.write(content_file)
+                # Sauvegarder le fichier (écriture disque hors de la boucle d'événements)
+                content_file = await file.read()
+                await run_in_threadpool(file_path.write_bytes, content_file)
                 
                 attachment_data.append({
                     "original_filename": file.filename,
@@ -613,14 +645,16 @@ async def add_message(
     discussion.updated_at = datetime.now(timezone.utc)
     
     # Vérifier si l'utilisateur est déjà un participant
-    existing_participant = db.query(discussion_participants).filter(
-        discussion_participants.c.discussion_id == discussion_id,
-        discussion_participants.c.user_id == current_user.id
-    ).first()
+    existing_participant = (await db.execute(
+        select(discussion_participants.c.user_id).where(
+            discussion_participants.c.discussion_id == discussion_id,
+            discussion_participants.c.user_id == current_user.id
+        )
+    )).first()
     
     # Ajouter l'utilisateur comme participant s'il ne l'est pas déjà
     if not existing_participant:
-        db.execute(
+        await db.execute(
             discussion_participants.insert().values(
                 discussion_id=discussion_id,
                 user_id=current_user.id,
@@ -629,14 +663,12 @@ async def add_message(
         )
     
     # Valider les changements dans la base de données pour obtenir l'ID du message
-    db.commit()
-    db.refresh(db_message)
+    await db.commit()
+    await db.refresh(db_message)
     
     # Sauvegarder les métadonnées des pièces jointes
     if attachment_data:
-        print(f"\n=== Sauvegarde de {len(attachment_data)} pièces jointes ===")
         for attachment in attachment_data:
-            print(f"Sauvegarde: {attachment['original_filename']} -> {attachment['stored_filename']}")
             db_attachment = MessageAttachment(
                 message_id=db_message.id,
                 original_filename=attachment["original_filename"],
@@ -656,42 +688,22 @@ async def add_message(
     db.add(db_message_read)
     
     # Valider TOUS les changements (attachments + message read)
-    db.commit()
-    db.refresh(db_message)
-    
-    # Vérifier que les attachments ont bien été sauvegardés
-    if attachment_data:
-        saved_attachments = db.query(MessageAttachment).filter(
-            MessageAttachment.message_id == db_message.id
-        ).all()
-        print(f"Vérification: {len(saved_attachments)} attachments sauvegardés en base")
-        for att in saved_attachments:
-            print(f"  -> ID: {att.id}, Fichier: {att.original_filename}")
-    
-    # Récupérer les informations de l'expéditeur
-    sender = db.query(User).filter(User.id == current_user.id).first()
+    await db.commit()
+    await db.refresh(db_message)
     
     # Récupérer les pièces jointes du message créé
-    message_attachments = db.query(MessageAttachment).filter(
-        MessageAttachment.message_id == db_message.id
-    ).all()
+    message_attachments = (await db.scalars(
+        select(MessageAttachment).where(MessageAttachment.message_id == db_message.id)
+    )).all()
     
-    attachments_data = []
-    for attachment in message_attachments:
-        attachments_data.append({
-            "id": attachment.id,
-            "originalFilename": attachment.original_filename,
-            "fileSize": attachment.file_size,
-            "mimeType": attachment.mime_type,
-            "downloadUrl": f"/api/v1/discussions/attachments/{attachment.id}/download"
-        })
+    attachments_data = [_attachment_to_dict(attachment) for attachment in message_attachments]
     
     # Construire la réponse
     response = {
         "id": db_message.id,
         "discussionId": db_message.discussion_id,
         "authorId": db_message.sender_id,
-        "authorName": f"{sender.first_name} {sender.last_name}",
+        "authorName": f"{current_user.first_name} {current_user.last_name}",
         "content": db_message.content,
         "createdAt": db_message.sent_at,
         "updatedAt": db_message.updated_at,
@@ -704,7 +716,7 @@ async def add_message(
 @router.get("/{discussion_id}/messages", response_model=List[MessageResponse])
 async def get_messages(
     discussion_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
     skip: int = 0,
     limit: int = 50
@@ -713,42 +725,37 @@ async def get_messages(
     Récupère les messages d'une discussion avec pagination.
     """
     # Vérifier que la discussion existe et que l'utilisateur y a accès
-    discussion = db.query(Discussion).join(
-        discussion_participants,
-        Discussion.id == discussion_participants.c.discussion_id
-    ).filter(
-        Discussion.id == discussion_id,
-        discussion_participants.c.user_id == current_user.id
-    ).first()
+    discussion = await _get_participant_discussion(db, discussion_id, current_user.id)
     
     if not discussion:
         raise HTTPException(status_code=404, detail=DISCUSSION_NOT_FOUND)
     
     # Récupérer les messages de la discussion avec pagination
-    messages = db.query(Message).filter(
-        Message.discussion_id == discussion_id
-    ).order_by(
-        Message.sent_at.desc()
-    ).offset(skip).limit(limit).all()
-    
-    print(f"\n=== Récupération des messages pour la discussion {discussion_id} ===")
-    print(f"Nombre de messages trouvés: {len(messages)}")
+    messages = (await db.scalars(
+        select(Message).where(
+            Message.discussion_id == discussion_id
+        ).order_by(
+            Message.sent_at.desc()
+        ).offset(skip).limit(limit)
+    )).all()
+    message_ids = [msg.id for msg in messages]
+    
+    logger.debug("Discussion %s: %d messages trouvés", discussion_id, len(messages))
+    
+    # Messages déjà lus par l'utilisateur courant (une seule requête pour la page)
+    read_ids = set((await db.scalars(
+        select(MessageRead.message_id).where(
+            MessageRead.message_id.in_(message_ids),
+            MessageRead.user_id == current_user.id
+        )
+    )).all()) if message_ids else set()
     
     # Marquer les messages non lus comme lus pour l'utilisateur courant
     unread_messages = []
     for msg in messages:
-        # Vérifier si le message a déjà été lu par l'utilisateur
-        is_read = db.query(MessageRead).filter(
-            MessageRead.message_id == msg.id,
-            MessageRead.user_id == current_user.id
-        ).first()
-        
         # Si le message n'a pas encore été lu et n'est pas de l'utilisateur courant
-        if not is_read and msg.sender_id != current_user.id:
+        if msg.id not in read_ids and msg.sender_id != current_user.id:
             unread_messages.append(msg.id)
-            
-        # Afficher les détails du message pour le débogage
-        print(f"Message ID: {msg.id}, Contenu: {msg.content[:50]}..., Expéditeur: {msg.sender_id}, Date: {msg.sent_at}")
     
     # Marquer les messages non lus comme lus
     if unread_messages:
@@ -760,38 +767,34 @@ async def get_messages(
                     read_at=datetime.now(timezone.utc)
                 )
                 db.add(db_message_read)
-            db.commit()
+            await db.commit()
+            read_ids.update(unread_messages)
         except Exception as e:
-            db.rollback()
-            print(f"Erreur lors du marquage des messages comme lus: {e}")
+            await db.rollback()
+            logger.warning("Erreur lors du marquage des messages comme lus: %s", e)
+    
+    # Récupérer les expéditeurs et les pièces jointes de la page en une requête chacun
+    senders = {
+        sender.id: sender for sender in (await db.execute(
+            select(User.id, User.first_name, User.last_name).where(
+                User.id.in_({msg.sender_id for msg in messages})
+            )
+        )).all()
+    } if messages else {}
+    
+    attachments_by_message: Dict[int, List[Dict[str, Any]]] = {}
+    if message_ids:
+        for attachment in (await db.scalars(
+            select(MessageAttachment).where(MessageAttachment.message_id.in_(message_ids))
+        )).all():
+            attachments_by_message.setdefault(attachment.message_id, []).append(
+                _attachment_to_dict(attachment)
+            )
     
     # Construire la réponse
     response = []
     for msg in messages:
-        # Vérifier si le message a été lu par l'utilisateur
-        is_read = msg.sender_id == current_user.id or db.query(MessageRead).filter(
-            MessageRead.message_id == msg.id,
-            MessageRead.user_id == current_user.id
-        ).first() is not None
-        
-        # Récupérer les informations de l'expéditeur
-        sender = db.query(User).filter(User.id == msg.sender_id).first()
-        
-        # Récupérer les pièces jointes du message
-        attachments = db.query(MessageAttachment).filter(
-            MessageAttachment.message_id == msg.id
-        ).all()
-        
-        attachments_data = []
-        for attachment in attachments:
-            attachments_data.append({
-                "id": attachment.id,
-                "originalFilename": attachment.original_filename,
-                "fileSize": attachment.file_size,
-                "mimeType": attachment.mime_type,
-                "downloadUrl": f"/api/v1/discussions/attachments/{attachment.id}/download"
-            })
-        
+        sender = senders.get(msg.sender_id)
         response.append({
             "id": msg.id,
             "discussionId": msg.discussion_id,
@@ -800,28 +803,18 @@ async def get_messages(
             "content": msg.content,
             "createdAt": msg.sent_at,
             "updatedAt": msg.updated_at,
-            "isRead": is_read,
-            "attachments": attachments_data
+            "isRead": msg.sender_id == current_user.id or msg.id in read_ids,
+            "attachments": attachments_by_message.get(msg.id, [])
         })
     
     # Inverser l'ordre pour avoir les plus anciens en premier
     response.reverse()
     
-    # Afficher la réponse avant de la renvoyer
-    print("\n=== Réponse JSON qui sera renvoyée ===")
-    for msg in response:
-        attachments_info = f" - {len(msg.get('attachments', []))} attachments" if msg.get('attachments') else " - Pas d'attachments"
-        print(f"Message ID: {msg['id']}, Auteur: {msg['authorName']}, Contenu: {msg['content'][:50]}...{attachments_info}")
-        if msg.get('attachments'):
-            for att in msg['attachments']:
-                print(f"  -> Attachment: {att.get('originalFilename', 'N/A')} ({att.get('fileSize', 0)} bytes)")
-    print("=== Fin de la réponse ===\n")
-    
     return response
 
 
 @router.get("/attachments/{attachment_id}/download")
-async def download_attachment(
+def download_attachment(
     attachment_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
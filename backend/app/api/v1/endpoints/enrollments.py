@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import Dict, Any
 
+from app.core.recommendation_cache import recommendation_cache
 from app.database import get_db
 from app.models.user import User
 from app.models.models import Course, course_student
@@ -17,7 +18,7 @@ ENROLLMENT_ERROR = "Erreur lors de l'inscription au cours"
 router = APIRouter()
 
 @router.post("/student/enroll/{course_id}", response_model=Dict[str, Any])
-async def enroll_in_course(
+def enroll_in_course(
     course_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -61,6 +62,7 @@ async def enroll_in_course(
             )
         )
         db.commit()
+        recommendation_cache.invalidate_user(current_user.id)
         
         return {
             "success": True,
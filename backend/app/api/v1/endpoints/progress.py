@@ -1,7 +1,10 @@
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
+from app.core.recommendation_cache import recommendation_cache
 from app.database import get_db
 from app.models.user import User
 from app.models.models import Course, Lesson, Module
@@ -14,10 +17,12 @@ from app.schemas.progress import (
 from app.services.progress_service import ProgressService
 from app.services.auth_service import get_current_active_user
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.get("/courses/{course_id}/progress", response_model=UserProgressResponse)
-async def get_course_progress(
+def get_course_progress(
     course_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -38,7 +43,7 @@ async def get_course_progress(
         )
 
 @router.put("/courses/{course_id}/lessons/{lesson_id}/progress")
-async def update_lesson_progress(
+def update_lesson_progress(
     course_id: int,
     lesson_id: int,
     progress_data: ProgressUpdate,
@@ -59,6 +64,9 @@ async def update_lesson_progress(
             lesson_id=lesson_id,
             progress_data=progress_data
         )
+        if progress_data.is_completed is not None:
+            # Leçon terminée ou rouverte : recommandations et tableau de bord à recalculer
+            recommendation_cache.invalidate_user(current_user.id)
         return {"message": "Progression mise à jour avec succès", "progress": progress}
     except HTTPException as e:
         raise e
@@ -69,7 +77,7 @@ async def update_lesson_progress(
         )
 
 @router.get("/my-progress", response_model=List[dict])
-async def get_my_progress(
+def get_my_progress(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
@@ -116,7 +124,7 @@ async def get_my_progress(
                 })
             except Exception as e:
                 # Si une erreur se produit pour un cours, passer au suivant
-                print(f"Erreur lors du traitement du cours {course.id}: {str(e)}")
+                logger.warning("Erreur lors du traitement du cours %s: %s", course.id, e)
                 continue
         
         return result
@@ -1,17 +1,25 @@
 from typing import List, Optional, Dict, Any, Union
 from datetime import datetime, timezone, timedelta
+import logging
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, insert, update, delete, func
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field, validator
 
 from app import models
 from app.api.deps import get_db, get_current_active_user
+from app.core.recommendation_cache import recommendation_cache
+from app.database import get_async_db, get_read_db
 from app.models.user import User
 from app.models.user_quiz_answers import UserQuizAnswer
 from app.models.progress import UserQuizResult
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 # Constantes pour les messages d'erreur
@@ -58,12 +66,10 @@ def get_quiz_questions(db: Session, quiz_id: int):
     from app.models.quiz import QuizQuestion as QuizQuestionModel
     from app.models.quiz import QuizOption as QuizOptionModel
     
-    print(f"Récupération des questions pour le quiz {quiz_id}")
-    
     # Récupérer les questions du quiz
     questions = db.query(QuizQuestionModel).filter(QuizQuestionModel.quiz_id == quiz_id).all()
     
-    print(f"Nombre de questions trouvées: {len(questions)}")
+    logger.debug("Quiz %s: %d questions trouvées", quiz_id, len(questions))
     
     questions_data = []
     for question in questions:
@@ -183,12 +189,52 @@ class QuizSubmissionResult(BaseModel):
     feedback: Optional[str] = None
     detailedResults: List[Dict[str, Any]] = []
 
+class AvailableQuizQuestion(BaseModel):
+    id: str
+    text: str
+    type: str
+    options: List[TeacherQuestionOption] = []
+
+class AvailableQuizSettings(BaseModel):
+    timeLimit: int
+    passingScore: Optional[int] = None
+    showResults: bool = True
+    allowRetries: bool = True
+    shuffleQuestions: bool = False
+    shuffleAnswers: bool = False
+
+class AvailableQuizMetadata(BaseModel):
+    courseName: str
+    courseSlug: str
+    lessonName: str
+    difficulty: str
+    tags: List[str] = []
+    categories: List[str] = []
+
+class AvailableQuizResponse(BaseModel):
+    id: int
+    title: str
+    description: str
+    courseId: int
+    lessonId: int
+    isPublished: Optional[bool] = None
+    passingScore: Optional[int] = None
+    timeLimit: int
+    questions: List[AvailableQuizQuestion] = []
+    settings: AvailableQuizSettings
+    metadata: AvailableQuizMetadata
+    attempts: int = 0
+    bestScore: Optional[float] = None
+    lastAttemptDate: Optional[str] = None
+    isCompleted: bool = False
+    isPassed: bool = False
+
 
 # Endpoints pour les quiz
 
-@router.get("/student/available", response_model=List[Dict[str, Any]])
-async def get_student_available_quizzes(
-    db: Session = Depends(get_db),
+@router.get("/student/available", response_model=List[AvailableQuizResponse])
+def get_student_available_quizzes(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
     course_id: Optional[int] = None,
     role: Optional[str] = None
@@ -224,9 +270,7 @@ async def get_student_available_quizzes(
     ).all()
     
     # Journalisation pour le débogage
-    print(f"Quiz actifs trouvés: {len(quizzes)}")
-    for quiz in quizzes:
-        print(f"- {quiz.title} (ID: {quiz.id}, Actif: {quiz.is_active})")
+    logger.debug("Quiz actifs trouvés: %d", len(quizzes))
 
     # Étape 4 : récupérer les quiz déjà tentés pour afficher les statistiques
     attempted_quiz_results = {
@@ -246,46 +290,47 @@ async def get_student_available_quizzes(
         best_score = quiz_result.score if quiz_result else None
         last_attempt_date = quiz_result.completed_at.isoformat() if quiz_result and quiz_result.completed_at else None
 
-        quiz_data = {
-            "id": (quiz.id),
-            "title": quiz.title,
-            "description": quiz.description or "",
-            "courseId": (lesson.course_id),
-            "lessonId": (quiz.lesson_id),
-            "isPublished": quiz.is_active,
-            "passingScore": quiz.passing_score,
-            "timeLimit": 30,
-            "questions": get_quiz_questions(db, quiz.id),
-            "settings": {
-                "timeLimit": 30,
-                "passingScore": quiz.passing_score,
-                "showResults": True,
-                "allowRetries": True,
-                "shuffleQuestions": False,
-                "shuffleAnswers": False
-            },
-            "metadata": {
-                "courseName": course.title,
-                "courseSlug": course.slug if hasattr(course, 'slug') else f"cours-{course.id}",
-                "lessonName": lesson.title,
-                "difficulty": "intermediate",
-                "tags": [],
-                "categories": []
-            },
-            "attempts": attempts,
-            "bestScore": best_score,
-            "lastAttemptDate": last_attempt_date,
-            "isCompleted": quiz_result is not None,
-            "isPassed": quiz_result.passed if quiz_result else False
-        }
+        quiz_data = AvailableQuizResponse(
+            id=quiz.id,
+            title=quiz.title,
+            description=quiz.description or "",
+            courseId=lesson.course_id,
+            lessonId=quiz.lesson_id,
+            isPublished=quiz.is_active,
+            passingScore=quiz.passing_score,
+            timeLimit=30,
+            questions=get_quiz_questions(db, quiz.id),
+            settings=AvailableQuizSettings(
+                timeLimit=30,
+                passingScore=quiz.passing_score,
+                showResults=True,
+                allowRetries=True,
+                shuffleQuestions=False,
+                shuffleAnswers=False
+            ),
+            metadata=AvailableQuizMetadata(
+                courseName=course.title,
+                courseSlug=course.slug if hasattr(course, 'slug') else f"cours-{course.id}",
+                lessonName=lesson.title,
+                difficulty="intermediate",
+                tags=[],
+                categories=[]
+            ),
+            attempts=attempts,
+            bestScore=best_score,
+            lastAttemptDate=last_attempt_date,
+            isCompleted=quiz_result is not None,
+            isPassed=bool(quiz_result.passed) if quiz_result else False
+        )
 
         available_quizzes.append(quiz_data)
 
-    return available_quizzes
+    # Modèles construits ici : réponse renvoyée telle quelle, sans revalidation par le response_model
+    return ORJSONResponse([quiz_data.model_dump(mode="json") for quiz_data in available_quizzes])
 
 @router.get("/", response_model=List[Union[TeacherQuizResponse, StudentQuizResponse]])
-async def get_all_quizzes(
-    db: Session = Depends(get_db),
+def get_all_quizzes(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
     course_id: Optional[int] = None
 ):
@@ -300,8 +345,6 @@ async def get_all_quizzes(
     from app.models.quiz import Quiz as QuizModel
     from app.models.models import Lesson, Course
     
-    print(f"Récupération des quiz pour l'enseignant {current_user.id}")
-    
     # Requête avec jointures pour filtrer par enseignant
     query = db.query(QuizModel)\
         .join(Lesson, QuizModel.lesson_id == Lesson.id)\
@@ -315,11 +358,10 @@ async def get_all_quizzes(
     # Exécuter la requête
     db_quizzes = query.all()
     
-    print(f"Nombre de quiz trouvés dans la base de données: {len(db_quizzes)}")
+    logger.debug("Quiz de l'enseignant %s: %d trouvés", current_user.id, len(db_quizzes))
     
     # Si aucun quiz n'est trouvé dans la base de données, retourner une liste vide
     if not db_quizzes:
-        print("Aucun quiz trouvé dans la base de données")
         return []
     
     # Convertir les modèles de base de données en format attendu par l'API
@@ -349,18 +391,18 @@ async def get_all_quizzes(
     return result
 
 @router.get("/teacher", response_model=List[Union[TeacherQuizResponse, StudentQuizResponse]])
-async def get_teacher_quizzes(
-    db: Session = Depends(get_db),
+def get_teacher_quizzes(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
     course_id: Optional[int] = None
 ):
     """
     Récupère tous les quiz créés par l'enseignant (endpoint spécifique pour le frontend).
     """
-    return await get_all_quizzes(db, current_user, course_id)
+    return get_all_quizzes(db, current_user, course_id)
 
 @router.post("/", response_model=TeacherQuizResponse, status_code=status.HTTP_201_CREATED)
-async def create_quiz(
+def create_quiz(
     quiz: QuizCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -436,14 +478,9 @@ async def create_quiz(
     
     # Vérifier que chaque question a au moins une réponse correcte
     for i, question_data in enumerate(quiz.questions, 1):
-        print(f"\n=== Traitement de la question {i} ===")
-        print(f"Type de question: {question_data.type}")
-        print(f"Options reçues: {[(opt.text, opt.isCorrect) for opt in question_data.options]}")
-        
         if question_data.type in ['single', 'multiple']:
             # Vérifier si au moins une option est marquée comme correcte
             has_correct = any(opt.isCorrect for opt in question_data.options)
-            print(f"Au moins une réponse correcte trouvée: {has_correct}")
             
             if not has_correct:
                 db.rollback()
@@ -508,17 +545,13 @@ async def create_quiz(
 async def submit_quiz_attempt(
     quiz_id: int,
     attempt: dict = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Dict[str, Any]:
     """
     Soumet une tentative de quiz et enregistre les résultats dans la base de données.
     """
-    """
-    Soumet une tentative de quiz et enregistre les résultats dans la base de données.
-    """
-    print(f"Soumission du quiz {quiz_id} par l'utilisateur {current_user.id}")
-    print(f"Données de la tentative: {attempt}")
+    logger.debug("Soumission du quiz %s", quiz_id, extra={"user_id": current_user.id})
     
     # Récupérer le quiz avec ses questions et options pour calculer le score
     from app.models.quiz import Quiz as QuizModel
@@ -526,28 +559,31 @@ async def submit_quiz_attempt(
     from app.models.quiz import QuizOption as QuizOptionModel
     
     # Récupérer le quiz
-    db_quiz = db.query(QuizModel).filter(QuizModel.id == quiz_id).first()
+    db_quiz = await db.get(QuizModel, quiz_id)
     if not db_quiz:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Quiz avec l'ID {quiz_id} non trouvé"
         )
     
-    # Récupérer les questions et leurs options correctes
-    questions = db.query(QuizQuestionModel).filter(QuizQuestionModel.quiz_id == quiz_id).all()
-    
-    # Dictionnaire pour stocker les réponses correctes
-    correct_answers = {}
-    
-    for question in questions:
-        # Récupérer les options correctes pour cette question
-        correct_options = db.query(QuizOptionModel).filter(
-            QuizOptionModel.question_id == question.id,
+    # Récupérer les questions du quiz
+    question_ids = (await db.scalars(
+        select(QuizQuestionModel.id).where(QuizQuestionModel.quiz_id == quiz_id)
+    )).all()
+    
+    # Dictionnaire pour stocker les réponses correctes (IDs des options correctes par question)
+    correct_answers = {str(question_id): [] for question_id in question_ids}
+    
+    correct_options = await db.execute(
+        select(QuizOptionModel.question_id, QuizOptionModel.id).join(
+            QuizQuestionModel, QuizOptionModel.question_id == QuizQuestionModel.id
+        ).where(
+            QuizQuestionModel.quiz_id == quiz_id,
             QuizOptionModel.is_correct == True
-        ).all()
-        
-        # Stocker les IDs des options correctes
-        correct_answers[str(question.id)] = [str(opt.id) for opt in correct_options]
+        )
+    )
+    for question_id, option_id in correct_options:
+        correct_answers[str(question_id)].append(str(option_id))
     
     # Calculer le score
     correct_count = 0
@@ -567,43 +603,47 @@ async def submit_quiz_attempt(
                     correct_count += 1
     
     # Calculer le score en pourcentage
-    score = (correct_count / len(questions)) * 100 if questions else 0
+    score = (correct_count / len(question_ids)) * 100 if question_ids else 0
     
     # Déterminer si l'étudiant a réussi le quiz
     passed = score >= db_quiz.passing_score
     
     # Enregistrer le résultat dans la table user_quiz_results
-    from sqlalchemy import text
-    
     # Vérifier si un résultat existe déjà pour cet utilisateur et ce quiz
-    existing_result = db.execute(
-        text("SELECT id FROM user_quiz_results WHERE user_id = :user_id AND quiz_id = :quiz_id"),
-        {"user_id": current_user.id, "quiz_id": quiz_id}
-    ).fetchone()
+    existing_result_id = await db.scalar(
+        select(UserQuizResult.id).where(
+            UserQuizResult.user_id == current_user.id,
+            UserQuizResult.quiz_id == quiz_id
+        ).limit(1)
+    )
     
-    if existing_result:
+    if existing_result_id:
         # Mettre à jour le résultat existant
-        db.execute(
-            text("UPDATE user_quiz_results SET score = :score, passed = :passed, completed_at = NOW() WHERE id = :id"),
-            {"score": score, "passed": passed, "id": existing_result[0]}
+        await db.execute(
+            update(UserQuizResult).where(UserQuizResult.id == existing_result_id).values(
+                score=score, passed=passed, completed_at=func.now()
+            )
         )
     else:
         # Insérer un nouveau résultat
-        db.execute(
-            text("INSERT INTO user_quiz_results (user_id, quiz_id, score, passed, completed_at) VALUES (:user_id, :quiz_id, :score, :passed, NOW())"),
-            {"user_id": current_user.id, "quiz_id": quiz_id, "score": score, "passed": passed}
+        await db.execute(
+            insert(UserQuizResult).values(
+                user_id=current_user.id, quiz_id=quiz_id, score=score,
+                passed=passed, completed_at=func.now()
+            )
         )
     
-    db.commit()
+    await db.commit()
+    recommendation_cache.invalidate_user(current_user.id)
     
     # Sauvegarder les réponses individuelles dans user_quiz_answers
-    from app.models.user_quiz_answers import UserQuizAnswer
-    
     # Supprimer les anciennes réponses pour ce quiz et cet utilisateur
-    db.query(UserQuizAnswer).filter(
-        UserQuizAnswer.user_id == current_user.id,
-        UserQuizAnswer.quiz_id == quiz_id
-    ).delete()
+    await db.execute(
+        delete(UserQuizAnswer).where(
+            UserQuizAnswer.user_id == current_user.id,
+            UserQuizAnswer.quiz_id == quiz_id
+        )
+    )
     
     # Sauvegarder les nouvelles réponses
     for answer in attempt.get("answers", []):
@@ -643,7 +683,7 @@ async def submit_quiz_attempt(
         
         db.add(user_quiz_answer)
     
-    db.commit()
+    await db.commit()
     
     # Préparer la réponse
     result = {
@@ -652,7 +692,7 @@ async def submit_quiz_attempt(
         "score": score,
         "passed": passed,
         "correctAnswers": correct_count,
-        "totalQuestions": len(questions),
+        "totalQuestions": len(question_ids),
         "completedAt": datetime.now().isoformat(),
         "timeSpent": attempt.get("timeSpent", 0)
     }
@@ -660,7 +700,7 @@ async def submit_quiz_attempt(
     return result
 
 @router.patch("/{quiz_id}/publish")
-async def toggle_quiz_publication(
+def toggle_quiz_publication(
     quiz_id: int,
     publish_data: dict = Body(...),
     db: Session = Depends(get_db),
@@ -711,8 +751,8 @@ async def toggle_quiz_publication(
     }
 
 @router.get("/student/results")
-async def get_student_quiz_results(
-    db: Session = Depends(get_db),
+def get_student_quiz_results(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -777,9 +817,9 @@ async def get_student_quiz_results(
         }
 
 @router.get("/{quiz_id}", response_model=Union[TeacherQuizResponse, StudentQuizResponse])
-async def get_quiz(
+def get_quiz(
     quiz_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Dict[str, Any]:
     """
@@ -788,9 +828,6 @@ async def get_quiz(
     """
     Récupère un quiz spécifique par son ID.
     """
-    print(f"\n=== Début de la fonction get_quiz pour le quiz_id: {quiz_id} ===")
-    print(f"Utilisateur actuel: {current_user.email} (ID: {current_user.id}, Rôle: {current_user.role})")
-    
     try:
         # Importer les modèles nécessaires
         from app.models.quiz import Quiz as QuizModel
@@ -798,14 +835,11 @@ async def get_quiz(
         from app.models.quiz import QuizOption as QuizOptionModel
         from sqlalchemy.orm import joinedload
         
-        print(f"Recherche du quiz avec ID: {quiz_id} dans la base de données")
-        
         # Récupérer le quiz avec ses questions et options
         db_quiz = db.query(QuizModel).filter(QuizModel.id == quiz_id).first()
-        print(f"Résultat de la requête: {db_quiz}")
         
         if not db_quiz:
-            print(f"Quiz avec ID {quiz_id} non trouvé dans la base de données, utilisation des données de démonstration")
+            logger.debug("Quiz %s non trouvé, utilisation des données de démonstration", quiz_id)
             # Si non trouvé dans la BD, essayer les données de démonstration
             quiz = next((q for q in demo_quizzes if q["id"] == quiz_id), None)
             
@@ -816,11 +850,9 @@ async def get_quiz(
                 )
             return quiz
             
-        print(f"Quiz trouvé dans la base de données: {db_quiz.title}")
-        
         # Récupérer les questions du quiz
         questions = db.query(QuizQuestionModel).filter(QuizQuestionModel.quiz_id == db_quiz.id).all()
-        print(f"Nombre de questions trouvées: {len(questions)}")
+        logger.debug("Quiz %s: %d questions trouvées", quiz_id, len(questions))
         
         # Convertir le modèle de base de données en format attendu par l'API
         created_at = db_quiz.created_at if db_quiz.created_at else datetime.now()
@@ -895,14 +927,11 @@ async def get_quiz(
                 detail="Rôle utilisateur non reconnu"
             )
             
-    except HTTPException as he:
+    except HTTPException:
         # Relancer les exceptions HTTP telles quelles
-        raise he
+        raise
     except Exception as e:
-        print(f"Erreur lors de la récupération du quiz: {str(e)}")
-        print(f"Type d'erreur: {type(e).__name__}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erreur lors de la récupération du quiz %s", quiz_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Une erreur est survenue lors de la récupération du quiz: {str(e)}"
@@ -911,7 +940,7 @@ async def get_quiz(
 
 
 @router.put("/{quiz_id}", response_model=TeacherQuizResponse)
-async def update_quiz(
+def update_quiz(
     quiz_id: int,
     quiz_data: QuizUpdate,
     db: Session = Depends(get_db),
@@ -1024,7 +1053,7 @@ async def update_quiz(
 
 
 @router.delete("/{quiz_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_quiz(
+def delete_quiz(
     quiz_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -1055,41 +1084,23 @@ async def delete_quiz(
                 detail=QUIZ_NOT_FOUND
             )
         
-        print(f"Début de la suppression du quiz {quiz_id}...")
-        
         # 2. Supprimer d'abord les réponses des utilisateurs pour ce quiz
         answers_count = db.query(UserQuizAnswer).filter(
             UserQuizAnswer.quiz_id == quiz_id
-        ).count()
-        print(f"Suppression de {answers_count} réponses d'utilisateurs...")
-        
-        db.query(UserQuizAnswer).filter(
-            UserQuizAnswer.quiz_id == quiz_id
         ).delete(synchronize_session=False)
         
         # 3. Supprimer les résultats des utilisateurs pour ce quiz
         results_count = db.query(UserQuizResult).filter(
             UserQuizResult.quiz_id == quiz_id
-        ).count()
-        print(f"Suppression de {results_count} résultats d'utilisateurs...")
-        
-        db.query(UserQuizResult).filter(
-            UserQuizResult.quiz_id == quiz_id
         ).delete(synchronize_session=False)
         
         # 4. Récupérer les questions pour le log
         questions = db.query(models.QuizQuestion).filter(
             models.QuizQuestion.quiz_id == quiz_id
         ).all()
-        print(f"Traitement de {len(questions)} questions...")
         
         # 5. Supprimer les options de chaque question du quiz
         for question in questions:
-            options_count = db.query(models.QuizOption).filter(
-                models.QuizOption.question_id == question.id
-            ).count()
-            print(f"Suppression de {options_count} options pour la question {question.id}...")
-            
             db.query(models.QuizOption).filter(
                 models.QuizOption.question_id == question.id
             ).delete(synchronize_session=False)
@@ -1100,24 +1111,23 @@ async def delete_quiz(
         ).delete(synchronize_session=False)
         
         # 7. Enfin, supprimer le quiz lui-même
-        print(f"Suppression du quiz {quiz_id}...")
         db.delete(db_quiz)
         
         # Valider les changements
         db.commit()
-        print("Suppression terminée avec succès.")
+        logger.info(
+            "Quiz %s supprimé (%d réponses, %d résultats, %d questions)",
+            quiz_id, answers_count, results_count, len(questions)
+        )
         
         # Retourner une réponse vide avec le code 204 (No Content)
         return Response(status_code=status.HTTP_204_NO_CONTENT)
         
-    except HTTPException as he:
-        print(f"Erreur HTTP lors de la suppression: {str(he)}")
+    except HTTPException:
         db.rollback()
         raise
     except Exception as e:
-        import traceback
-        error_trace = traceback.format_exc()
-        print(f"Erreur lors de la suppression du quiz: {str(e)}\n{error_trace}")
+        logger.exception("Erreur lors de la suppression du quiz %s", quiz_id)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1125,7 +1135,7 @@ async def delete_quiz(
         )
 
 @router.post("/{quiz_id}/submit", response_model=QuizSubmissionResult)
-async def submit_quiz(
+def submit_quiz(
     quiz_id: int,
     submission: QuizSubmission,
     db: Session = Depends(get_db),
@@ -1271,6 +1281,7 @@ async def submit_quiz(
     
     # Valider les changements dans la base de données
     db.commit()
+    recommendation_cache.invalidate_user(current_user.id)
     
     # Préparer la réponse
     result = {
@@ -1288,9 +1299,9 @@ async def submit_quiz(
     return result
 
 @router.get("/{quiz_id}/results", response_model=List[Dict[str, Any]])
-async def get_quiz_results(
+def get_quiz_results(
     quiz_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -1339,8 +1350,8 @@ async def get_quiz_results(
     
     return results
 @router.get("/student/history", response_model=List[Dict[str, Any]])
-async def get_student_quiz_history(
-    db: Session = Depends(get_db),
+def get_student_quiz_history(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
     course_id: Optional[int] = None
 ):
@@ -1,11 +1,14 @@
 from typing import List, Dict, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.user import User
-from app.models.models import Course, Category
+from app.models.models import Course, Category, course_student
+from app.config import settings
 from app.services.auth_service import get_current_active_user
 from app.services.advanced_recommendation_service import AdvancedRecommendationService
+from app.services.recommendation_precompute import get_user_recommendations, refresh_user_recommendations
 from pydantic import BaseModel
 from datetime import datetime
 import logging
@@ -44,8 +47,8 @@ class RecommendationResponse(BaseModel):
 
 # Endpoint racine pour les recommandations
 @router.get("/", response_model=RecommendationResponse)
-async def get_recommendations_root(
-    db: Session = Depends(get_db),
+def get_recommendations_root(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
     limit: int = Query(default=10, ge=1, le=50),
     include_metadata: bool = Query(default=True, alias="includeMetadata"),
@@ -56,7 +59,7 @@ async def get_recommendations_root(
     Endpoint racine pour les recommandations - redirige vers les recommandations de cours.
     """
     # Rediriger vers l'endpoint des cours avec les mêmes paramètres
-    return await get_course_recommendations(
+    return get_course_recommendations(
         db=db,
         current_user=current_user,
         limit=limit,
@@ -86,11 +89,28 @@ LEVEL_ADVANCED = "Avancé"
 
 # Le service sera instancié dans chaque fonction avec la session DB
 
+def _recommendation_profile(db: Session, user: User, stored: list, generated_at: Optional[datetime]) -> Dict[str, Any]:
+    """Résumé du profil de recommandation, à partir des recommandations précalculées."""
+    enrolled_count = db.query(func.count(course_student.c.course_id)).filter(
+        course_student.c.student_id == user.id
+    ).scalar()
+    return {
+        "userId": user.id,
+        "email": user.email,
+        "fullName": f"{user.first_name} {user.last_name}",
+        "enrolledCoursesCount": enrolled_count,
+        "recommendationCount": len(stored),
+        "averageScore": round(sum(rec.score for rec in stored) / len(stored), 3) if stored else None,
+        "reasons": sorted({rec.reason for rec in stored if rec.reason}),
+        "recommendationsGeneratedAt": generated_at
+    }
+
 @router.get("/courses", response_model=RecommendationResponse)
-async def get_course_recommendations(
-    db: Session = Depends(get_db),
+def get_course_recommendations(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
-    limit: int = Query(default=10, ge=1, le=50),
+    limit: int = Query(default=10, ge=1, le=settings.RECOMMENDATION_PRECOMPUTE_LIMIT,
+                       description="Nombre de recommandations, au plus le nombre précalculé par utilisateur"),
     algorithm: Optional[str] = Query(default=None, description="Algorithm to use: collaborative, content, behavioral, temporal, contextual, ensemble"),
     include_profile: bool = Query(default=False, description="Include user profile in response")
 ):
@@ -100,40 +120,26 @@ async def get_course_recommendations(
     try:
         logger.info(f"Generating recommendations for user {current_user.id} with algorithm {algorithm}")
         
-        # Utiliser la logique simple des cours recommandés du dashboard
-        from app.models.models import course_student
-        
-        # Récupérer les cours auxquels l'utilisateur n'est pas inscrit
-        enrolled_course_ids = db.query(course_student.c.course_id).filter(
-            course_student.c.student_id == current_user.id
-        ).all()
-        enrolled_ids = [course_id for (course_id,) in enrolled_course_ids]
+        # Recommandations précalculées (calculées à la demande si l'utilisateur n'en a pas)
+        stored, generated_at = get_user_recommendations(db, current_user.id, limit)
         
-        if enrolled_ids:
-            recommended_courses = db.query(Course).filter(
-                ~Course.id.in_(enrolled_ids)
-            ).limit(limit).all()
-        else:
-            recommended_courses = db.query(Course).limit(limit).all()
-        
-        # Convertir en format attendu par le service
-        raw_recommendations = []
-        for course in recommended_courses:
-            raw_recommendations.append({
-                "course": course,
-                "score": 0.8,  # Score par défaut
-                "explanation": "Cours recommandé pour vous",
-                "confidence": 80.0,
-                "success_probability": 85.0,
-                "estimated_duration": "2-4 semaines",
-                "algorithm": "content_based"
-            })
+        # Cours et catégories chargés en une requête chacun
+        courses = {
+            course.id: course
+            for course in db.query(Course).filter(Course.id.in_([rec.course_id for rec in stored]))
+        }
+        category_ids = {course.category_id for course in courses.values() if course.category_id}
+        categories = {
+            category.id: category.name
+            for category in db.query(Category).filter(Category.id.in_(category_ids))
+        } if category_ids else {}
         
         # Convertir en format API
         recommendations = []
-        for rec in raw_recommendations:
-            course = rec["course"]
-            category = db.query(Category).filter(Category.id == course.category_id).first()
+        for rec in stored:
+            course = courses.get(rec.course_id)
+            if course is None:
+                continue
             
             recommendations.append(CourseRecommendation(
                 id=course.id,
@@ -141,36 +147,29 @@ async def get_course_recommendations(
                 description=course.description or "",
                 imageUrl=course.thumbnail_url,
                 instructor="Instructeur",  # Le modèle Course n'a pas d'attribut instructor
-                category=category.name if category else "Général",
+                category=categories.get(course.category_id, "Général"),
                 level=course.level or "beginner",
                 duration=20,  # Durée par défaut en heures
                 rating=4.5,  # TODO: Calculer depuis les évaluations réelles
                 enrolledCount=0,  # TODO: Calculer le nombre d'inscriptions
                 isSaved=False,  # TODO: Vérifier les favoris utilisateur
-                matchScore=rec["score"],
-                matchReason=rec["explanation"],
-                algorithm=rec["algorithm"],
-                confidence=rec.get("confidence", 0.8),
-                successProbability=rec.get("success_probability"),
-                estimatedTime=rec.get("estimated_duration")
+                matchScore=rec.score,
+                matchReason=rec.reason or "Cours recommandé pour vous",
+                algorithm="precomputed",
+                confidence=round(rec.score * 100, 1)
             ))
         
         # Construire la réponse
         response_data = {
             "recommendations": recommendations,
             "totalCount": len(recommendations),
-            "algorithms": ["content_based"],  # Algorithme utilisé pour la génération
-            "generatedAt": datetime.now()
+            "algorithms": ["precomputed"],  # Table user_recommendations
+            "generatedAt": generated_at or datetime.utcnow()
         }
         
         # Inclure le profil utilisateur si demandé (version simplifiée)
         if include_profile:
-            response_data["userProfile"] = {
-                "userId": current_user.id,
-                "email": current_user.email,
-                "fullName": f"{current_user.first_name} {current_user.last_name}",
-                "enrolledCoursesCount": len(enrolled_ids)
-            }
+            response_data["userProfile"] = _recommendation_profile(db, current_user, stored, generated_at)
         
         return RecommendationResponse(**response_data)
         
@@ -185,8 +184,8 @@ async def get_course_recommendations(
         )
 
 @router.get("/trending", response_model=List[TrendingCourse])
-async def get_trending_courses(
-    db: Session = Depends(get_db),
+def get_trending_courses(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
     limit: int = Query(default=10, ge=1, le=20)
 ):
@@ -244,8 +243,8 @@ async def get_trending_courses(
         return []
 
 @router.get("/skill-gaps", response_model=List[SkillGap])
-async def get_skill_gaps(
-    db: Session = Depends(get_db),
+def get_skill_gaps(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -253,7 +252,7 @@ async def get_skill_gaps(
     """
     try:
         recommendation_service = AdvancedRecommendationService(db)
-        gaps_data = await recommendation_service.identify_skill_gaps(current_user.id)
+        gaps_data = recommendation_service.identify_skill_gaps(current_user.id)
         
         skill_gaps = []
         for gap in gaps_data:
@@ -275,28 +274,20 @@ async def get_skill_gaps(
         )
 
 @router.post("/refresh")
-async def refresh_recommendations(
+def refresh_recommendations(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Force le rafraîchissement du cache des recommandations.
+    Force le recalcul des recommandations de l'utilisateur et vide son cache.
     """
     try:
-        recommendation_service = AdvancedRecommendationService(db)
-        
-        # Vider le cache pour cet utilisateur
-        await recommendation_service.clear_user_cache(current_user.id)
-        
-        # Générer de nouvelles recommandations
-        fresh_recommendations = await recommendation_service.get_ensemble_recommendations(
-            current_user.id, 10
-        )
+        fresh_recommendations, generated_at = refresh_user_recommendations(db, current_user.id)
         
         return {
             "message": "Recommandations rafraîchies avec succès",
             "count": len(fresh_recommendations),
-            "refreshedAt": datetime.now()
+            "refreshedAt": generated_at or datetime.utcnow()
         }
         
     except Exception as e:
@@ -307,17 +298,18 @@ async def refresh_recommendations(
         )
 
 @router.get("/profile")
-async def get_user_recommendation_profile(
-    db: Session = Depends(get_db),
+def get_user_recommendation_profile(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Récupère le profil de recommandation de l'utilisateur.
     """
     try:
-        recommendation_service = AdvancedRecommendationService(db)
-        profile = await recommendation_service.get_user_profile(current_user.id)
-        return profile
+        stored, generated_at = get_user_recommendations(
+            db, current_user.id, settings.RECOMMENDATION_PRECOMPUTE_LIMIT
+        )
+        return _recommendation_profile(db, current_user, stored, generated_at)
         
     except Exception as e:
         logger.error(f"Error getting user profile for {current_user.id}: {str(e)}")
@@ -327,24 +319,36 @@ async def get_user_recommendation_profile(
         )
 
 @router.get("/explain/{course_id}")
-async def explain_recommendation(
+def explain_recommendation(
     course_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Explique pourquoi un cours spécifique est recommandé à l'utilisateur.
     """
     try:
-        recommendation_service = AdvancedRecommendationService(db)
-        explanation = await recommendation_service.explain_recommendation(
-            current_user.id, course_id
+        stored, generated_at = get_user_recommendations(
+            db, current_user.id, settings.RECOMMENDATION_PRECOMPUTE_LIMIT
         )
+        for rank, rec in enumerate(stored, start=1):
+            if rec.course_id == course_id:
+                return {
+                    "courseId": course_id,
+                    "recommended": True,
+                    "explanation": rec.reason or "Cours recommandé pour vous",
+                    "score": rec.score,
+                    "rank": rank,
+                    "generatedAt": generated_at
+                }
         
         return {
             "courseId": course_id,
-            "explanation": explanation,
-            "generatedAt": datetime.now()
+            "recommended": False,
+            "explanation": "Ce cours ne fait pas partie de vos recommandations actuelles",
+            "score": None,
+            "rank": None,
+            "generatedAt": generated_at
         }
         
     except Exception as e:
@@ -1,18 +1,23 @@
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, Table, MetaData, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, Table, MetaData, and_, select, distinct
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 
 # Importer la table de jointure
 from app.models.models import course_student
 
-from app.database import get_db
+from app.core.recommendation_cache import recommendation_cache
+from app.database import get_db, get_read_db, get_async_read_db
 from app.models.user import User
 from app.models.progress import UserProgress, UserQuizResult, UserRecommendation
 from app.models.quiz import Quiz, QuizQuestion, QuizOption
 from app.models.user_quiz_answers import UserQuizAnswer
-from app.models.models import Course, Lesson, Module, Category, course_student
+from app.models.models import Course, Lesson, Module, Category, LessonCompletion, course_student
 from app.services.auth_service import get_current_active_user
 from app.schemas.student import (
     DashboardStats, 
@@ -20,7 +25,13 @@ from app.schemas.student import (
     ActivityResponse,
     UpcomingQuizResponse,
     LessonResponse,
-    LessonContentResponse
+    LessonContentResponse,
+    CatalogCourse,
+    CatalogModule,
+    CatalogLesson,
+    CatalogTag,
+    CatalogInstructor,
+    CatalogCategory
 )
 from app.schemas.quiz_results import (
     QuizResultDetailResponse,
@@ -29,6 +40,8 @@ from app.schemas.quiz_results import (
     UserAnswerResponse
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 # Constantes pour les messages d'erreur et les vérifications d'accès
@@ -42,11 +55,11 @@ def check_user_access(current_user: User):
             status_code=status.HTTP_403_FORBIDDEN,
             detail=ACCESS_FORBIDDEN_MESSAGE
         )
-    print(f"DEBUG - Accès au tableau de bord étudiant par {current_user.username} avec le rôle {current_user.role}")
+    logger.debug("Accès au tableau de bord étudiant", extra={"user_id": current_user.id, "role": current_user.role})
 
 @router.get("/dashboard", response_model=Dict[str, Any])
 async def get_student_dashboard(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -79,7 +92,7 @@ async def get_student_dashboard(
 
 @router.get("/stats", response_model=DashboardStats)
 async def get_dashboard_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -88,46 +101,50 @@ async def get_dashboard_stats(
     check_user_access(current_user)
     
     # Compter les cours auxquels l'étudiant est inscrit
-    enrolled_courses = db.query(Course).join(
-        Course.students
-    ).filter(
-        User.id == current_user.id
-    ).all()
+    enrolled_courses = await db.scalar(
+        select(func.count(distinct(course_student.c.course_id))).where(
+            course_student.c.student_id == current_user.id
+        )
+    )
     
     # Compter les cours complétés (progression à 100%)
-    completed_courses = db.query(UserProgress).filter(
-        UserProgress.user_id == current_user.id,
-        UserProgress.completion_percentage == 100
-    ).count()
+    completed_courses = await db.scalar(
+        select(func.count(UserProgress.id)).where(
+            UserProgress.user_id == current_user.id,
+            UserProgress.completion_percentage == 100
+        )
+    )
     
     # Calculer le temps passé (en heures)
     # Dans une implémentation réelle, cela viendrait d'un suivi du temps passé
     hours_spent = 27  # Valeur de démonstration
     
     # Calculer le score moyen des quiz
-    average_score = db.query(UserQuizResult).filter(
-        UserQuizResult.user_id == current_user.id
-    ).with_entities(
-        func.avg(UserQuizResult.score)
-    ).scalar() or 0
+    average_score = await db.scalar(
+        select(func.avg(UserQuizResult.score)).where(
+            UserQuizResult.user_id == current_user.id
+        )
+    ) or 0
     
     # Compter le nombre de quiz réussis
-    passed_quizzes = db.query(UserQuizResult).filter(
-        UserQuizResult.user_id == current_user.id,
-        UserQuizResult.passed == True
-    ).count()
+    passed_quizzes = await db.scalar(
+        select(func.count(UserQuizResult.id)).where(
+            UserQuizResult.user_id == current_user.id,
+            UserQuizResult.passed == True
+        )
+    )
     
     return {
-        "coursesEnrolled": len(enrolled_courses),
-        "completedCourses": completed_courses,
+        "coursesEnrolled": enrolled_courses or 0,
+        "completedCourses": completed_courses or 0,
         "hoursSpent": hours_spent,
         "averageScore": round(average_score),
-        "passedQuizzes": passed_quizzes
+        "passedQuizzes": passed_quizzes or 0
     }
 
 @router.get("/in-progress-courses", response_model=List[CourseResponse])
 async def get_in_progress_courses(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -135,43 +152,41 @@ async def get_in_progress_courses(
     """
     check_user_access(current_user)
     
-    # Récupérer les cours avec progression > 0 et < 100
-    courses_with_progress = db.query(
-        Course, 
-        UserProgress.completion_percentage.label("progress")
-    ).join(
-        UserProgress, 
-        (UserProgress.course_id == Course.id) & (UserProgress.user_id == current_user.id)
-    ).filter(
-        UserProgress.completion_percentage > 0,
-        UserProgress.completion_percentage < 100
-    ).all()
+    # Récupérer les cours avec progression > 0 et < 100, avec leur instructeur
+    courses_with_progress = (await db.execute(
+        select(Course, UserProgress.completion_percentage.label("progress"), User).join(
+            UserProgress,
+            (UserProgress.course_id == Course.id) & (UserProgress.user_id == current_user.id)
+        ).join(
+            User, User.id == Course.instructor_id
+        ).where(
+            UserProgress.completion_percentage > 0,
+            UserProgress.completion_percentage < 100
+        )
+    )).all()
     
     result = []
-    for course, progress in courses_with_progress:
+    for course, progress, instructor in courses_with_progress:
         # Compter les leçons du cours
-        lessons_count = db.query(Lesson).filter(
-            Lesson.course_id == course.id
-        ).count()
+        lessons_count = await db.scalar(
+            select(func.count(Lesson.id)).where(Lesson.course_id == course.id)
+        )
         
         # Compter les leçons complétées
-        completed_lessons = db.query(Lesson).join(
-            UserProgress, 
-            (UserProgress.lesson_id == Lesson.id) & (UserProgress.user_id == current_user.id)
-        ).filter(
-            Lesson.course_id == course.id,
-            UserProgress.completion_percentage == 100
-        ).count()
+        completed_lessons = await db.scalar(
+            select(func.count(Lesson.id)).join(
+                UserProgress,
+                (UserProgress.lesson_id == Lesson.id) & (UserProgress.user_id == current_user.id)
+            ).where(
+                Lesson.course_id == course.id,
+                UserProgress.completion_percentage == 100
+            )
+        )
         
         # Calculer la durée totale du cours
         # Dans une implémentation réelle, cela viendrait de la somme des durées des leçons
         duration = "10h 30min"  # Valeur de démonstration
         
-        # Récupérer l'instructeur
-        instructor = db.query(User).filter(
-            User.id == course.instructor_id
-        ).first()
-        
         # Récupérer les tags du cours
         # Dans une implémentation réelle, cela viendrait d'une table de tags
         tags = ["Mathématiques", "Universitaire"]  # Valeurs de démonstration
@@ -188,8 +203,8 @@ async def get_in_progress_courses(
             },
             "progress": round(progress),
             "duration": duration,
-            "lessonsCount": lessons_count,
-            "completedLessons": completed_lessons,
+            "lessonsCount": lessons_count or 0,
+            "completedLessons": completed_lessons or 0,
             "tags": tags
         })
     
@@ -197,7 +212,7 @@ async def get_in_progress_courses(
 
 @router.get("/recommended-courses", response_model=List[CourseResponse])
 async def get_recommended_courses(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -205,46 +220,40 @@ async def get_recommended_courses(
     """
     check_user_access(current_user)
     
+    cached = recommendation_cache.get_for(current_user.id, "dashboard")
+    if cached is not None:
+        return cached
+    
     # Dans une implémentation réelle, ces recommandations seraient basées sur
     # les intérêts de l'étudiant, ses cours précédents, etc.
     
     # Récupérer les cours auxquels l'étudiant n'est pas encore inscrit
-    enrolled_course_ids = db.query(course_student.c.course_id).filter(
-        course_student.c.student_id == current_user.id
-    ).all()
-    
-    enrolled_ids = [course_id for (course_id,) in enrolled_course_ids]
-    
-    print(f"DEBUG - Étudiant {current_user.id} inscrit aux cours: {enrolled_ids}")
+    enrolled_ids = list((await db.scalars(
+        select(course_student.c.course_id).where(
+            course_student.c.student_id == current_user.id
+        )
+    )).all())
     
     # Récupérer tous les cours disponibles sauf ceux auxquels l'étudiant est inscrit
+    # (si l'étudiant n'est inscrit à aucun cours, recommander les 3 premiers cours)
+    courses_query = select(Course, User).join(User, User.id == Course.instructor_id)
     if enrolled_ids:
-        recommended_courses = db.query(Course).filter(
-            ~Course.id.in_(enrolled_ids)
-        ).limit(3).all()
-    else:
-        # Si l'étudiant n'est inscrit à aucun cours, recommander les 3 premiers cours
-        recommended_courses = db.query(Course).limit(3).all()
+        courses_query = courses_query.where(~Course.id.in_(enrolled_ids))
+    recommended_courses = (await db.execute(courses_query.limit(3))).all()
     
-    print(f"DEBUG - Cours recommandés trouvés: {len(recommended_courses)}")
+    logger.debug("Cours recommandés trouvés: %d", len(recommended_courses))
     
     result = []
-    for course in recommended_courses:
-        print(f"DEBUG - Traitement du cours {course.id}: {course.title}")
+    for course, instructor in recommended_courses:
         # Compter les leçons du cours
-        lessons_count = db.query(Lesson).filter(
-            Lesson.course_id == course.id
-        ).count()
+        lessons_count = await db.scalar(
+            select(func.count(Lesson.id)).where(Lesson.course_id == course.id)
+        )
         
         # Calculer la durée totale du cours
         # Dans une implémentation réelle, cela viendrait de la somme des durées des leçons
         duration = "12h 45min"  # Valeur de démonstration
         
-        # Récupérer l'instructeur
-        instructor = db.query(User).filter(
-            User.id == course.instructor_id
-        ).first()
-        
         # Récupérer les tags du cours
         # Dans une implémentation réelle, cela viendrait d'une table de tags
         tags = ["Statistiques", "Data Science"]  # Valeurs de démonstration
@@ -261,18 +270,28 @@ async def get_recommended_courses(
             },
             "progress": 0,
             "duration": duration,
-            "lessonsCount": lessons_count,
+            "lessonsCount": lessons_count or 0,
             "completedLessons": 0,
             "tags": tags,
             "isRecommended": True
         })
     
-    print(f"DEBUG - Retour de {len(result)} cours recommandés")
+    recommendation_cache.put_for(current_user.id, "dashboard", result)
     return result
 
+def _format_elapsed(time_diff: timedelta) -> str:
+    """Formate une durée écoulée en texte ("Il y a 3 heures")."""
+    if time_diff.days > 0:
+        return f"Il y a {time_diff.days} jour{'s' if time_diff.days > 1 else ''}"
+    hours = time_diff.seconds // 3600
+    if hours > 0:
+        return f"Il y a {hours} heure{'s' if hours > 1 else ''}"
+    minutes = (time_diff.seconds % 3600) // 60
+    return f"Il y a {minutes} minute{'s' if minutes > 1 else ''}"
+
 @router.get("/recent-activities", response_model=List[ActivityResponse])
 async def get_recent_activities(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -281,51 +300,44 @@ async def get_recent_activities(
     check_user_access(current_user)
     
     # Récupérer les résultats de quiz récents
-    recent_quiz_results = db.query(UserQuizResult, Quiz, Lesson, Course).join(
-        Quiz, UserQuizResult.quiz_id == Quiz.id
-    ).join(
-        Lesson, Quiz.lesson_id == Lesson.id
-    ).join(
-        Course, Lesson.course_id == Course.id
-    ).filter(
-        UserQuizResult.user_id == current_user.id
-    ).order_by(
-        UserQuizResult.completed_at.desc()
-    ).limit(5).all()
+    recent_quiz_results = (await db.execute(
+        select(UserQuizResult, Quiz, Lesson, Course).join(
+            Quiz, UserQuizResult.quiz_id == Quiz.id
+        ).join(
+            Lesson, Quiz.lesson_id == Lesson.id
+        ).join(
+            Course, Lesson.course_id == Course.id
+        ).where(
+            UserQuizResult.user_id == current_user.id
+        ).order_by(
+            UserQuizResult.completed_at.desc()
+        ).limit(5)
+    )).all()
     
     # Récupérer les leçons récemment complétées
-    recent_lessons = db.query(UserProgress, Lesson, Course).join(
-        Lesson, UserProgress.lesson_id == Lesson.id
-    ).join(
-        Course, Lesson.course_id == Course.id
-    ).filter(
-        UserProgress.user_id == current_user.id,
-        UserProgress.is_completed == True
-    ).order_by(
-        UserProgress.updated_at.desc()
-    ).limit(5).all()
+    recent_lessons = (await db.execute(
+        select(UserProgress, Lesson, Course).join(
+            Lesson, UserProgress.lesson_id == Lesson.id
+        ).join(
+            Course, Lesson.course_id == Course.id
+        ).where(
+            UserProgress.user_id == current_user.id,
+            UserProgress.is_completed == True
+        ).order_by(
+            UserProgress.updated_at.desc()
+        ).limit(5)
+    )).all()
     
     activities = []
     
     # Ajouter les résultats de quiz
     for result, quiz, lesson, course in recent_quiz_results:
-        time_diff = datetime.now() - result.completed_at
-        if time_diff.days > 0:
-            time_str = f"Il y a {time_diff.days} jour{'s' if time_diff.days > 1 else ''}"
-        else:
-            hours = time_diff.seconds // 3600
-            if hours > 0:
-                time_str = f"Il y a {hours} heure{'s' if hours > 1 else ''}"
-            else:
-                minutes = (time_diff.seconds % 3600) // 60
-                time_str = f"Il y a {minutes} minute{'s' if minutes > 1 else ''}"
-        
         activities.append({
             "id": result.id,
             "type": "quiz",
             "title": "Quiz complété",
             "description": f"Vous avez obtenu {result.score}% au quiz '{quiz.title}'",
-            "time": time_str,
+            "time": _format_elapsed(datetime.now() - result.completed_at),
             "course": {
                 "id": course.id,
                 "title": course.title,
@@ -334,23 +346,12 @@ async def get_recent_activities(
     
     # Ajouter les leçons complétées
     for progress, lesson, course in recent_lessons:
-        time_diff = datetime.now() - progress.updated_at
-        if time_diff.days > 0:
-            time_str = f"Il y a {time_diff.days} jour{'s' if time_diff.days > 1 else ''}"
-        else:
-            hours = time_diff.seconds // 3600
-            if hours > 0:
-                time_str = f"Il y a {hours} heure{'s' if hours > 1 else ''}"
-            else:
-                minutes = (time_diff.seconds % 3600) // 60
-                time_str = f"Il y a {minutes} minute{'s' if minutes > 1 else ''}"
-        
         activities.append({
             "id": progress.id,
             "type": "course",
             "title": "Leçon terminée",
             "description": f"Vous avez terminé la leçon '{lesson.title}'",
-            "time": time_str,
+            "time": _format_elapsed(datetime.now() - progress.updated_at),
             "course": {
                 "id": course.id,
                 "title": course.title,
@@ -364,7 +365,7 @@ async def get_recent_activities(
 
 @router.get("/upcoming-quizzes", response_model=List[UpcomingQuizResponse])
 async def get_upcoming_quizzes(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -373,31 +374,27 @@ async def get_upcoming_quizzes(
     check_user_access(current_user)
     
     # Récupérer les cours auxquels l'étudiant est inscrit
-    enrolled_courses = db.query(Course.id).join(
-        Course.students
-    ).filter(
-        User.id == current_user.id
-    ).all()
-    
-    enrolled_course_ids = [course_id for (course_id,) in enrolled_courses]
+    enrolled_course_ids = select(course_student.c.course_id).where(
+        course_student.c.student_id == current_user.id
+    )
     
     # Récupérer les quiz que l'étudiant n'a pas encore complétés
-    completed_quiz_ids = db.query(UserQuizResult.quiz_id).filter(
+    completed_quiz_ids = select(UserQuizResult.quiz_id).where(
         UserQuizResult.user_id == current_user.id
-    ).all()
-    
-    completed_ids = [quiz_id for (quiz_id,) in completed_quiz_ids]
+    )
     
     # Récupérer les quiz actifs des cours auxquels l'étudiant est inscrit
-    upcoming_quizzes_query = db.query(Quiz, Lesson, Course).join(
-        Lesson, Quiz.lesson_id == Lesson.id
-    ).join(
-        Course, Lesson.course_id == Course.id
-    ).filter(
-        Course.id.in_(enrolled_course_ids),
-        Quiz.is_active == True,
-        ~Quiz.id.in_(completed_ids) if completed_ids else True
-    ).all()
+    upcoming_quizzes_query = (await db.execute(
+        select(Quiz, Lesson, Course).join(
+            Lesson, Quiz.lesson_id == Lesson.id
+        ).join(
+            Course, Lesson.course_id == Course.id
+        ).where(
+            Course.id.in_(enrolled_course_ids),
+            Quiz.is_active == True,
+            Quiz.id.notin_(completed_quiz_ids)
+        )
+    )).all()
     
     result = []
     for quiz, lesson, course in upcoming_quizzes_query:
@@ -420,8 +417,8 @@ async def get_upcoming_quizzes(
     return result
 
 @router.get("/quiz-history", response_model=QuizHistoryResponse)
-async def get_quiz_history(
-    db: Session = Depends(get_db),
+def get_quiz_history(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -482,9 +479,9 @@ async def get_quiz_history(
     }
 
 @router.get("/quiz-results/{quiz_result_id}", response_model=QuizResultDetailResponse)
-async def get_quiz_result_details(
+def get_quiz_result_details(
     quiz_result_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -550,9 +547,9 @@ async def get_quiz_result_details(
         "correct_answers": correct_answers
     }
 
-@router.get("/all-courses", response_model=List[Dict[str, Any]])
-async def get_all_courses(
-    db: Session = Depends(get_db),
+@router.get("/all-courses", response_model=List[CatalogCourse])
+def get_all_courses(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -620,23 +617,23 @@ async def get_all_courses(
                     if is_completed:
                         completed_lessons += 1
                 
-                formatted_lessons.append({
-                    "id": lesson.id,
-                    "title": lesson.title,
-                    "description": lesson.description,
-                    "duration": lesson.duration,
-                    "order_index": lesson.order_index,
-                    "is_completed": is_completed,
-                    "is_free": lesson.is_free
-                })
+                formatted_lessons.append(CatalogLesson(
+                    id=lesson.id,
+                    title=lesson.title,
+                    description=lesson.description,
+                    duration=lesson.duration,
+                    order_index=lesson.order_index,
+                    is_completed=is_completed,
+                    is_free=lesson.is_free
+                ))
             
-            formatted_modules.append({
-                "id": module.id,
-                "title": module.title,
-                "description": module.description,
-                "order_index": module.order_index,
-                "lessons": formatted_lessons
-            })
+            formatted_modules.append(CatalogModule(
+                id=module.id,
+                title=module.title,
+                description=module.description,
+                order_index=module.order_index,
+                lessons=formatted_lessons
+            ))
         
         # Calculer le nombre d'étudiants inscrits
         students_count = db.query(func.count(User.id)).join(
@@ -644,49 +641,47 @@ async def get_all_courses(
         ).filter(Course.id == course.id).scalar() or 0
         
         # Récupérer les tags
-        tags = [{
-            "id": tag.id,
-            "name": tag.name
-        } for tag in course.tags]
+        tags = [CatalogTag.model_validate(tag) for tag in course.tags]
         
-        result.append({
-            "id": course.id,
-            "title": course.title,
-            "description": course.description,
-            "short_description": course.short_description,
-            "thumbnail_url": course.thumbnail_url,
-            "price": float(course.price),
-            "status": course.status,
-            "level": course.level,
-            "difficulty_level": course.level,  # Alias pour compatibilité
-            "created_at": course.created_at.isoformat() if course.created_at else None,
-            "updated_at": course.updated_at.isoformat() if course.updated_at else None,
-            "instructor": {
-                "id": instructor.id if instructor else None,
-                "name": f"{instructor.first_name} {instructor.last_name}" if instructor else "Instructeur inconnu",
-                "avatar": None  # À implémenter si nécessaire
-            },
-            "category": {
-                "id": category.id if category else None,
-                "name": category.name if category else "Général",
-                "description": category.description if category else None
-            },
-            "tags": tags,
-            "modules": formatted_modules,
-            "progress": progress_percentage,
-            "is_enrolled": is_enrolled,
-            "students_count": students_count,
-            "average_rating": 4.5,  # Valeur par défaut, à implémenter avec un système de notation
-            "isNew": (datetime.now() - course.created_at).days < 30 if course.created_at else False,
-            "isPopular": students_count > 50
-        })
-    
-    return result
+        result.append(CatalogCourse(
+            id=course.id,
+            title=course.title,
+            description=course.description,
+            short_description=course.short_description,
+            thumbnail_url=course.thumbnail_url,
+            price=float(course.price or 0),
+            status=course.status,
+            level=course.level,
+            difficulty_level=course.level,  # Alias pour compatibilité
+            created_at=course.created_at.isoformat() if course.created_at else None,
+            updated_at=course.updated_at.isoformat() if course.updated_at else None,
+            instructor=CatalogInstructor(
+                id=instructor.id if instructor else None,
+                name=f"{instructor.first_name} {instructor.last_name}" if instructor else "Instructeur inconnu",
+                avatar=None  # À implémenter si nécessaire
+            ),
+            category=CatalogCategory(
+                id=category.id if category else None,
+                name=category.name if category else "Général",
+                description=category.description if category else None
+            ),
+            tags=tags,
+            modules=formatted_modules,
+            progress=progress_percentage,
+            is_enrolled=is_enrolled,
+            students_count=students_count,
+            average_rating=4.5,  # Valeur par défaut, à implémenter avec un système de notation
+            isNew=(datetime.now() - course.created_at).days < 30 if course.created_at else False,
+            isPopular=students_count > 50
+        ))
+    
+    # Modèles construits ici : réponse renvoyée telle quelle, sans revalidation par le response_model
+    return ORJSONResponse([course.model_dump(mode="json") for course in result])
 
 @router.get("/courses/{course_id}", response_model=Dict[str, Any])
-async def get_course_details(
+def get_course_details(
     course_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -814,9 +809,9 @@ async def get_course_details(
     }
 
 @router.get("/lessons/{lesson_id}", response_model=LessonContentResponse)
-async def get_lesson_content(
+def get_lesson_content(
     lesson_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -841,24 +836,12 @@ async def get_lesson_content(
     ).first()
     
     if not course:
-        print(f"ERREUR - Cours {lesson.course_id} non trouvé")
+        logger.warning("Cours %s de la leçon %s non trouvé", lesson.course_id, lesson.id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Cours non trouvé"
         )
     
-    # Log pour déboguer
-    print(f"DEBUG - Vérification de l'inscription pour l'utilisateur {current_user.id} au cours {lesson.course_id} (Titre: {course.title})")
-    
-    # Vérifier les étudiants inscrits au cours
-    student_count = db.query(Course).join(
-        Course.students
-    ).filter(
-        Course.id == lesson.course_id
-    ).count()
-    
-    print(f"DEBUG - Nombre total d'étudiants inscrits au cours: {student_count}")
-    
     # Vérifier si l'utilisateur est inscrit en utilisant la table de jointure directement
     is_enrolled = db.query(Course).join(
         course_student,
@@ -868,22 +851,11 @@ async def get_lesson_content(
         Course.id == lesson.course_id
     ).first() is not None
     
-    print(f"DEBUG - Utilisateur {'inscrit' if is_enrolled else 'non inscrit'} au cours")
-    
-    print(f"DEBUG - Utilisateur {'inscrit' if is_enrolled else 'non inscrit'} au cours")
-    
-    # Pour déboguer, afficher tous les étudiants inscrits
-    if not is_enrolled:
-        print("DEBUG - Liste des étudiants inscrits au cours:")
-        enrolled_students = db.query(User).join(
-            Course.students
-        ).filter(
-            Course.id == lesson.course_id
-        ).all()
-        for student in enrolled_students:
-            print(f"- {student.id}: {student.username} ({student.email})")
-    
     if not is_enrolled:
+        logger.debug(
+            "Accès refusé à la leçon %s: non inscrit au cours %s", lesson.id, lesson.course_id,
+            extra={"user_id": current_user.id}
+        )
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Vous n'êtes pas inscrit à ce cours"
@@ -900,7 +872,7 @@ async def get_lesson_content(
         if previous_lesson:
             # Si la leçon précédente est gratuite, pas besoin de vérifier la progression
             if previous_lesson.is_free:
-                print(f"DEBUG - Accès autorisé car la leçon précédente {previous_lesson.title} est gratuite")
+                logger.debug("Accès autorisé car la leçon précédente %s est gratuite", previous_lesson.id)
             else:
                 previous_completed = db.query(UserProgress).filter(
                     UserProgress.user_id == current_user.id,
@@ -947,7 +919,7 @@ async def get_lesson_content(
     }
 
 @router.post("/lessons/{lesson_id}/complete", response_model=Dict[str, Any])
-async def complete_lesson(
+def complete_lesson(
     lesson_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -1036,6 +1008,7 @@ async def complete_lesson(
         db.add(course_progress)
     
     db.commit()
+    recommendation_cache.invalidate_user(current_user.id)
     
     return {
         "success": True,
@@ -1044,7 +1017,7 @@ async def complete_lesson(
     }
 
 @router.post("/enroll/{course_id}", response_model=Dict[str, Any])
-async def enroll_in_course(
+def enroll_in_course(
     course_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -1088,8 +1061,9 @@ async def enroll_in_course(
         )
         db.execute(stmt)
         db.commit()
+        recommendation_cache.invalidate_user(current_user.id)
         
-        print(f"DEBUG - Étudiant {current_user.id} inscrit au cours {course_id} ({course.title})")
+        logger.info("Inscription au cours %s", course_id, extra={"user_id": current_user.id})
         
         return {
             "success": True,
@@ -1100,7 +1074,7 @@ async def enroll_in_course(
         
     except Exception as e:
         db.rollback()
-        print(f"ERREUR - Inscription échouée: {str(e)}")
+        logger.error("Inscription au cours %s échouée: %s", course_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur lors de l'inscription au cours"
@@ -1109,18 +1083,15 @@ async def enroll_in_course(
 from app.schemas.student import CourseResponse
 
 @router.get("/courses/unenrolled", response_model=List[CourseResponse])
-async def get_unenrolled_courses(
-    db: Session = Depends(get_db),
+def get_unenrolled_courses(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Récupère la liste des cours auxquels l'étudiant n'est pas inscrit.
     """
-    print(f"Début de get_unenrolled_courses pour l'utilisateur {current_user.id} (rôle: {current_user.role})")
-    
     # Vérifier que l'utilisateur est un étudiant
     if current_user.role != "etudiant":
-        print(f"Accès refusé: l'utilisateur {current_user.id} n'est pas un étudiant (rôle: {current_user.role})")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Accès refusé. Cette fonctionnalité est réservée aux étudiants."
@@ -1132,8 +1103,6 @@ async def get_unenrolled_courses(
             course_student.c.student_id == current_user.id
         ).subquery()
         
-        print(f"Cours suivis par l'étudiant: {db.execute(enrolled_course_ids).fetchall()}")
-        
         # Récupérer les cours non suivis avec le nombre de leçons
         unenrolled_courses = db.query(
             Course,
@@ -1153,7 +1122,7 @@ async def get_unenrolled_courses(
             joinedload(Course.modules).joinedload(Module.lessons)
         ).all()
         
-        print(f"Nombre de cours non suivis trouvés: {len(unenrolled_courses)}")
+        logger.debug("Cours non suivis trouvés: %d", len(unenrolled_courses))
         
         # Formater la réponse selon le schéma attendu
         result = []
@@ -1197,43 +1166,17 @@ async def get_unenrolled_courses(
                 course_data["completedLessons"] = 0
             result.append(course_data)
         
-        # Afficher un exemple des données avant validation
-        if result:
-            print("\n=== Données avant validation (premier élément) ===")
-            print(f"Type: {type(result[0])}")
-            print(f"Données: {result[0]}")
-            
-            # Vérification des types
-            print("\nVérification des types:")
-            for key, value in result[0].items():
-                print(f"- {key}: {type(value).__name__} = {value}")
-            
-            # Vérification des champs obligatoires
-            required_fields = ["id", "title", "description", "imageUrl", "instructor", 
-                             "progress", "duration", "lessonsCount", "completedLessons", "tags"]
-            missing_fields = [field for field in required_fields if field not in result[0]]
-            if missing_fields:
-                print(f"\n⚠ Champs manquants: {missing_fields}")
-            else:
-                print("\n✅ Tous les champs obligatoires sont présents")
-        
-        print(f"\nCours non suivis formatés: {len(result)} cours")
-        
         # Valider manuellement avec le schéma
         try:
             from app.schemas.student import CourseResponse
             validated_result = [CourseResponse(**course) for course in result]
-            print("✅ Validation du schéma réussie")
             return result
         except Exception as validation_error:
-            print(f"\n❌ Erreur de validation du schéma: {str(validation_error)}")
+            logger.warning("Erreur de validation du schéma: %s", validation_error)
             raise validation_error
         
     except Exception as e:
-        import traceback
-        error_msg = f"Erreur lors de la récupération des cours non suivis: {str(e)}\n{traceback.format_exc()}"
-        print(f"\n❌ {error_msg}")
-        logger.error(error_msg)
+        logger.exception("Erreur lors de la récupération des cours non suivis")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Une erreur est survenue lors de la récupération des cours: {str(e)}"
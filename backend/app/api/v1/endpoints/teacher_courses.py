@@ -10,15 +10,13 @@ from app.models.user import User
 from app.models.models import Course, Module, Lesson, Category
 from app.services.auth_service import get_current_active_user
 
-# Configurer le logger
-logging.basicConfig(level=logging.INFO)
+# Configurer le logger (la configuration des handlers est centralisée dans app.core.logging)
 logger = logging.getLogger(__name__)
-logger.info("Module teacher_courses.py chargé")
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Dict[str, Any]])
-async def get_teacher_courses(
+def get_teacher_courses(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -35,9 +33,7 @@ async def get_teacher_courses(
         Course.instructor_id == current_user.id
     ).all()
     
-    logger.info(f"Utilisateur {current_user.email} (ID: {current_user.id}) - Nombre de cours trouvés: {len(courses)}")
-    for course in courses:
-        logger.info(f"Cours trouvé: ID={course.id}, Titre={course.title}, Status={course.status}")
+    logger.debug("Nombre de cours trouvés: %d", len(courses), extra={"user_id": current_user.id})
     
     result = []
     for course in courses:
@@ -68,7 +64,7 @@ async def get_teacher_courses(
     return result
 
 @router.get("/{course_id}", response_model=Dict[str, Any])
-async def get_course_details(
+def get_course_details(
     course_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -118,7 +114,7 @@ async def get_course_details(
     }
 
 @router.get("/{course_id}/modules", response_model=List[Dict[str, Any]])
-async def get_course_modules(
+def get_course_modules(
     course_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -160,7 +156,7 @@ async def get_course_modules(
     return result
 
 @router.get("/{course_id}/modules/{module_id}/lessons", response_model=List[Dict[str, Any]])
-async def get_module_lessons(
+def get_module_lessons(
     course_id: int,
     module_id: int,
     db: Session = Depends(get_db),
@@ -4,11 +4,12 @@ from sqlalchemy.sql import func
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.db.projections import projection, fetch_all
 from app.models.user import User
 from app.models.progress import UserProgress, UserQuizResult, UserRecommendation
 from app.models.quiz import Quiz
-from app.models.models import Course, Lesson
+from app.models.models import Course, Lesson, course_student
 from app.services.auth_service import get_current_active_user
 from app.schemas.teacher import (
     DashboardStats, 
@@ -21,9 +22,47 @@ from app.schemas.teacher import (
 
 router = APIRouter()
 
+
+@projection(User.id, User.first_name, User.last_name, User.email)
+class StudentSummary:
+    """Colonnes d'un étudiant affichées dans les listes de l'enseignant."""
+    id: int
+    first_name: Optional[str]
+    last_name: Optional[str]
+    email: str
+
+
+@projection(
+    User.id, User.first_name, User.last_name, User.email, Course.title,
+    func.coalesce(UserProgress.completion_percentage, 0),
+    UserProgress.last_accessed,
+)
+class StudentCourseProgress:
+    """Progression d'un étudiant dans un cours (une ligne par inscription)."""
+    id: int
+    first_name: Optional[str]
+    last_name: Optional[str]
+    email: str
+    course_title: str
+    progress: float
+    last_accessed: Optional[datetime]
+
+    @property
+    def name(self):
+        return f"{self.first_name or ''} {self.last_name or ''}".strip()
+
+
+def _teacher_course_ids(db: Session, teacher_id: int, course_id: Optional[int] = None) -> List[int]:
+    """Identifiants des cours de l'enseignant (sans charger les cours)."""
+    query = db.query(Course.id).filter(Course.instructor_id == teacher_id)
+    if course_id:
+        query = query.filter(Course.id == course_id)
+    return [row.id for row in query]
+
+
 @router.get("/students", response_model=List[Dict[str, Any]])
-async def get_teacher_students(
-    db: Session = Depends(get_db),
+def get_teacher_students(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -35,58 +74,58 @@ async def get_teacher_students(
             detail="Accès réservé aux enseignants"
         )
     
-    # Récupérer les cours enseignés par l'utilisateur
-    courses = db.query(Course).filter(Course.instructor_id == current_user.id).all()
-    course_ids = [course.id for course in courses]
+    course_ids = _teacher_course_ids(db, current_user.id)
     
     # Si aucun cours trouvé, retourner une liste vide
     if not course_ids:
         return []
     
-    # Récupérer tous les étudiants inscrits à ces cours
-    students = db.query(User).join(
-        Course.students
-    ).filter(
-        Course.id.in_(course_ids),
+    # Récupérer tous les étudiants inscrits à ces cours (colonnes affichées uniquement)
+    students = fetch_all(db, StudentSummary, StudentSummary.select().join(
+        course_student, course_student.c.student_id == User.id
+    ).where(
+        course_student.c.course_id.in_(course_ids),
         User.role == "etudiant"
-    ).distinct().all()
+    ).distinct())
+    
+    # Nombre de cours de l'enseignant suivis par chaque étudiant
+    course_counts = dict(db.query(
+        course_student.c.student_id, func.count(course_student.c.course_id)
+    ).filter(
+        course_student.c.course_id.in_(course_ids)
+    ).group_by(course_student.c.student_id).all())
+    
+    # Progression moyenne et dernière activité de chaque étudiant
+    progress_by_student = {
+        user_id: (average, last_accessed)
+        for user_id, average, last_accessed in db.query(
+            UserProgress.user_id,
+            func.avg(UserProgress.completion_percentage),
+            func.max(UserProgress.last_accessed)
+        ).filter(
+            UserProgress.course_id.in_(course_ids)
+        ).group_by(UserProgress.user_id)
+    }
     
     # Formater les résultats
     result = []
     for student in students:
-        # Calculer le nombre de cours auxquels l'étudiant est inscrit parmi les cours de l'enseignant
-        student_courses = db.query(Course).join(
-            Course.students
-        ).filter(
-            Course.id.in_(course_ids),
-            User.id == student.id
-        ).all()
-        
-        # Calculer la progression moyenne de l'étudiant
-        progress = db.query(func.avg(UserProgress.completion_percentage)).filter(
-            UserProgress.user_id == student.id,
-            UserProgress.course_id.in_(course_ids)
-        ).scalar() or 0
-        
-        # Trouver la dernière activité de l'étudiant
-        last_activity = db.query(UserProgress.last_accessed).filter(
-            UserProgress.user_id == student.id,
-            UserProgress.course_id.in_(course_ids)
-        ).order_by(UserProgress.last_accessed.desc()).first()
+        progress, last_accessed = progress_by_student.get(student.id, (None, None))
+        progress = progress or 0
         
         # Déterminer si l'étudiant est actif (activité dans les 30 derniers jours)
         is_active = False
         last_active_date = None
-        if last_activity:
-            last_active_date = last_activity[0].isoformat()
-            is_active = (datetime.now() - last_activity[0]) <= timedelta(days=30)
+        if last_accessed:
+            last_active_date = last_accessed.isoformat()
+            is_active = (datetime.now() - last_accessed) <= timedelta(days=30)
         
         result.append({
             "id": str(student.id),
             "firstName": student.first_name,
             "lastName": student.last_name,
             "email": student.email,
-            "courseCount": len(student_courses),
+            "courseCount": course_counts.get(student.id, 0),
             "lastActive": last_active_date,
             "progress": round(progress),
             "status": "active" if is_active else "inactive"
@@ -95,8 +134,8 @@ async def get_teacher_students(
     return result
 
 @router.get("/stats", response_model=DashboardStats)
-async def get_dashboard_stats(
-    db: Session = Depends(get_db),
+def get_dashboard_stats(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -144,9 +183,9 @@ async def get_dashboard_stats(
     }
 
 @router.get("/student-progress", response_model=List[StudentProgressResponse])
-async def get_student_progress(
+def get_student_progress(
     course_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -158,40 +197,32 @@ async def get_student_progress(
             detail="Accès réservé aux enseignants"
         )
     
-    # Récupérer les cours enseignés par l'utilisateur
-    courses_query = db.query(Course).filter(Course.instructor_id == current_user.id)
-    
-    # Filtrer par cours si spécifié
-    if course_id:
-        courses_query = courses_query.filter(Course.id == course_id)
-    
-    courses = courses_query.all()
-    course_ids = [course.id for course in courses]
+    # Récupérer les cours enseignés par l'utilisateur (filtrés par cours si spécifié)
+    course_ids = _teacher_course_ids(db, current_user.id, course_id)
     
     # Si aucun cours trouvé, retourner une liste vide
     if not course_ids:
         return []
     
     # Récupérer tous les étudiants inscrits à ces cours avec leur progression
-    students_with_progress = db.query(
-        User,
-        Course.title.label("course_title"),
-        Course.id.label("course_id"),
-        func.coalesce(UserProgress.completion_percentage, 0).label("completion_percentage"),
-        func.coalesce(UserProgress.last_accessed, datetime.now()).label("last_accessed")
+    students_with_progress = fetch_all(db, StudentCourseProgress, StudentCourseProgress.select().select_from(
+        course_student
     ).join(
-        Course.students
+        User, User.id == course_student.c.student_id
+    ).join(
+        Course, Course.id == course_student.c.course_id
     ).outerjoin(
         UserProgress, 
         (UserProgress.user_id == User.id) & (UserProgress.course_id == Course.id)
-    ).filter(
+    ).where(
         Course.id.in_(course_ids)
-    ).all()
+    ))
     
     # Formater les résultats
     response = []
-    for user, course_title, course_id, progress, last_accessed in students_with_progress:
+    for row in students_with_progress:
         # Calculer le temps écoulé depuis la dernière activité
+        last_accessed = row.last_accessed or datetime.now()
         # S'assurer que last_accessed est un objet datetime
         if isinstance(last_accessed, str):
             try:
@@ -209,20 +240,20 @@ async def get_student_progress(
             last_activity = f"{time_diff.days} jours ago"
             
         response.append({
-            "id": user.id,
-            "name": user.full_name or f"{user.first_name} {user.last_name}",
-            "email": user.email,
-            "avatar": f"https://randomuser.me/api/portraits/{'women' if user.id % 2 == 0 else 'men'}/{user.id % 70}.jpg",
-            "course": course_title,
-            "progress": round(progress),
+            "id": row.id,
+            "name": row.name or f"{row.first_name} {row.last_name}",
+            "email": row.email,
+            "avatar": f"https://randomuser.me/api/portraits/{'women' if row.id % 2 == 0 else 'men'}/{row.id % 70}.jpg",
+            "course": row.course_title,
+            "progress": round(row.progress),
             "lastActivity": last_activity
         })
     
     return response
 
 @router.get("/courses", response_model=List[Dict[str, Any]])
-async def get_teacher_courses(
-    db: Session = Depends(get_db),
+def get_teacher_courses(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -241,8 +272,8 @@ async def get_teacher_courses(
     return [{"id": course.id, "name": course.title} for course in courses]
 
 @router.get("/recommendations", response_model=List[RecommendationResponse])
-async def get_recommendations(
-    db: Session = Depends(get_db),
+def get_recommendations(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -288,8 +319,8 @@ async def get_recommendations(
     return recommendations
 
 @router.get("/refresh-recommendations", response_model=List[RecommendationResponse])
-async def refresh_recommendations(
-    db: Session = Depends(get_db),
+def refresh_recommendations(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -297,11 +328,11 @@ async def refresh_recommendations(
     """
     # Cette fonction simulerait l'appel à un service d'IA pour générer de nouvelles recommandations
     # Pour la démonstration, nous retournons les mêmes recommandations
-    return await get_recommendations(db, current_user)
+    return get_recommendations(db, current_user)
 
 @router.get("/course-completion", response_model=Dict[str, Any])
-async def get_course_completion(
-    db: Session = Depends(get_db),
+def get_course_completion(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -348,8 +379,8 @@ async def get_course_completion(
     }
 
 @router.get("/recent-activities", response_model=List[ActivityResponse])
-async def get_recent_activities(
-    db: Session = Depends(get_db),
+def get_recent_activities(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -399,8 +430,8 @@ async def get_recent_activities(
     return activities
 
 @router.get("/upcoming-tasks", response_model=List[TaskResponse])
-async def get_upcoming_tasks(
-    db: Session = Depends(get_db),
+def get_upcoming_tasks(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -450,7 +481,7 @@ async def get_upcoming_tasks(
     return tasks
 
 @router.put("/task/{task_id}", response_model=TaskResponse)
-async def update_task(
+def update_task(
     task_id: int,
     task_data: Dict[str, Any],
     db: Session = Depends(get_db),
@@ -469,7 +500,7 @@ async def update_task(
     # dans la base de données
     
     # Pour la démonstration, nous retournons simplement la tâche mise à jour
-    tasks = await get_upcoming_tasks(db, current_user)
+    tasks = get_upcoming_tasks(db, current_user)
     task = next((t for t in tasks if t["id"] == task_id), None)
     
     if not task:
@@ -486,7 +517,7 @@ async def update_task(
     return task
 
 @router.post("/recommendation/{recommendation_id}/action", response_model=Dict[str, str])
-async def recommendation_action(
+def recommendation_action(
     recommendation_id: int,
     action_data: Dict[str, str],
     db: Session = Depends(get_db),
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from typing import Optional
 import os
 from dotenv import load_dotenv
 
@@ -16,11 +17,128 @@ class Settings(BaseSettings):
     MYSQL_PORT: str = os.getenv("MYSQL_PORT", "3306")
     MYSQL_DB: str = os.getenv("MYSQL_DB", "plateforme_educative")
     
+    # URL complète optionnelle, prioritaire sur les paramètres MySQL ci-dessus
+    # (ex: sqlite:///./dev.db pour un environnement local)
+    SQLALCHEMY_DATABASE_URI: Optional[str] = os.getenv("SQLALCHEMY_DATABASE_URI")
+    
     # URL de connexion à la base de données
     @property
     def DATABASE_URL(self):
+        if self.SQLALCHEMY_DATABASE_URI:
+            return self.SQLALCHEMY_DATABASE_URI
         return f"mysql+pymysql://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@{self.MYSQL_SERVER}:{self.MYSQL_PORT}/{self.MYSQL_DB}"
     
+    # Configuration du pool de connexions (valeurs par worker uvicorn)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # secondes d'attente max pour obtenir une connexion
+    DB_POOL_RECYCLE: int = 1800  # secondes avant de recycler une connexion (< wait_timeout MySQL)
+    DB_POOL_PRE_PING: bool = True
+    
+    # Pool dédié au moteur asynchrone (AsyncSession)
+    DB_ASYNC_POOL_SIZE: int = 10
+    DB_ASYNC_MAX_OVERFLOW: int = 10
+    
+    # Réplique en lecture optionnelle (ex: sqlite:///./replica.db en local).
+    # Sans valeur, toutes les lectures passent par la base principale.
+    SQLALCHEMY_REPLICA_URI: Optional[str] = os.getenv("SQLALCHEMY_REPLICA_URI")
+    # Durée pendant laquelle les lectures d'un utilisateur restent sur la base
+    # principale après une de ses écritures (lecture de ses propres écritures,
+    # durée de vie du cookie signé `last_write` qui la transmet aux autres workers)
+    DB_READ_YOUR_WRITES_SECONDS: int = 5
+    
+    # Journal des requêtes SQL lentes (seuil en ms, proportion échantillonnée)
+    DB_SLOW_QUERY_MS: int = 200
+    DB_SLOW_QUERY_SAMPLE_RATE: float = 1.0
+    
+    # Journalisation (voir app/core/logging.py)
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVELS: str = os.getenv("LOG_LEVELS", "")  # ex: "app.api.deps=DEBUG,app.services=WARNING"
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")  # "json" ou "text"
+    LOG_DEBUG_SAMPLE_RATE: float = 0.1
+
+    # Métriques Prometheus (/metrics). Avec plusieurs workers, répertoire
+    # partagé où chaque worker publie ses compteurs (à vider au démarrage)
+    METRICS_MULTIPROC_DIR: Optional[str] = os.getenv("METRICS_MULTIPROC_DIR")
+    METRICS_FLUSH_INTERVAL: int = 5
+
+    # Cache des utilisateurs authentifiés (app/core/principal_cache.py) :
+    # nombre maximal de jetons et durée de vie maximale d'une entrée (secondes),
+    # qui borne le délai de prise en compte d'une désactivation par les autres
+    # workers. 0 désactive le cache.
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: int = 30
+
+    # Révocation des jetons (app/core/token_versions.py) : délai de prise en
+    # compte par les autres workers, intervalle des relectures complètes et
+    # recouvrement des relectures incrémentales (durée maximale entre la
+    # modification d'un utilisateur et la validation de sa transaction)
+    TOKEN_VERSION_REFRESH_INTERVAL: int = 5
+    TOKEN_VERSION_FULL_REFRESH_INTERVAL: int = 300
+    TOKEN_VERSION_REFRESH_OVERLAP: int = 10
+
+    # Vérification des mots de passe à la connexion (app/core/passwords.py) :
+    # threads dédiés et nombre maximal de vérifications en cours ou en attente
+    PASSWORD_VERIFY_WORKERS: int = 4
+    PASSWORD_VERIFY_MAX_PENDING: int = 64
+
+    # Limitation des tentatives de connexion (app/core/rate_limit.py) : seaux
+    # à jetons par IP et par compte (rafale, puis tentatives par minute).
+    # Avec LOGIN_THROTTLE_REDIS_URL, les seaux sont partagés entre workers.
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_THROTTLE_IP_BURST: int = 20
+    LOGIN_THROTTLE_IP_PER_MINUTE: int = 10
+    LOGIN_THROTTLE_ACCOUNT_BURST: int = 5
+    LOGIN_THROTTLE_ACCOUNT_PER_MINUTE: int = 2
+    LOGIN_THROTTLE_MAX_KEYS: int = 100000
+    LOGIN_THROTTLE_REDIS_URL: Optional[str] = os.getenv("LOGIN_THROTTLE_REDIS_URL")
+
+    # Tampon d'ingestion des interactions (app/core/interaction_buffer.py) :
+    # taille maximale, taille des lots et délai maximal avant écriture
+    INTERACTION_BUFFER_SIZE: int = 10000
+    INTERACTION_FLUSH_BATCH: int = 500
+    INTERACTION_FLUSH_INTERVAL_MS: int = 1000
+
+    # Lots d'interactions envoyés par les clients (/interactions/track/batch) :
+    # taille maximale d'un lot, ancienneté maximale des horodatages client (heures)
+    INTERACTION_BATCH_MAX_EVENTS: int = 500
+    INTERACTION_CLIENT_MAX_AGE_HOURS: int = 24
+
+    # Rétention des interactions brutes (scripts/purge_interactions.py) :
+    # horizon en jours et lignes supprimées par transaction. Les agrégats
+    # quotidiens (statistiques) sont conservés.
+    INTERACTION_RETENTION_DAYS: int = 180
+    INTERACTION_RETENTION_BATCH: int = 1000
+
+    # Filtrage collaboratif (app/services/collaborative_filtering.py) : durée
+    # de vie du modèle en mémoire (secondes) et similarité minimale conservée
+    RECOMMENDATION_MODEL_TTL: int = 600
+    RECOMMENDATION_MIN_SIMILARITY: float = 0.01
+
+    # Précalcul des recommandations (app/services/recommendation_precompute.py) :
+    # recommandations conservées par utilisateur, utilisateurs par paquet,
+    # processus et intervalle (secondes) de la tâche de fond, 0 pour la
+    # désactiver (précalcul par scripts/precompute_recommendations.py)
+    RECOMMENDATION_PRECOMPUTE_LIMIT: int = 20
+    RECOMMENDATION_PRECOMPUTE_CHUNK: int = 500
+    RECOMMENDATION_PRECOMPUTE_WORKERS: int = 1
+    RECOMMENDATION_PRECOMPUTE_INTERVAL: int = 0
+
+    # Cache des recommandations par utilisateur (app/core/recommendation_cache.py) :
+    # nombre maximal de listes et durée de vie d'une entrée (secondes), qui
+    # borne le délai de prise en compte d'une inscription par les autres
+    # workers. 0 désactive le cache.
+    RECOMMENDATION_CACHE_SIZE: int = 10000
+    RECOMMENDATION_CACHE_TTL: int = 300
+
+    # Matrice de caractéristiques des cours (app/services/course_features.py) :
+    # durée de vie avant reconstruction complète (secondes)
+    COURSE_FEATURES_TTL: int = 600
+
+    # Index TF-IDF du texte des cours (app/services/course_text_index.py) :
+    # durée de vie en mémoire avant rechargement depuis course_terms (secondes)
+    COURSE_TEXT_INDEX_TTL: int = 600
+    
     # Configuration JWT
     SECRET_KEY: str = os.getenv("SECRET_KEY", "votre_secret_tres_secret")
     ALGORITHM: str = "HS256"
@@ -0,0 +1,176 @@
+"""
+Tampon d'ingestion des interactions utilisateur.
+
+Chaque vue de page ou interaction suivie coûtait un INSERT, un COMMIT et une
+relecture. Les interactions sont désormais déposées dans un tampon en mémoire
+du worker (`interaction_buffer.add`), sans accès à la base pendant la
+requête ; une tâche de fond les écrit par lots (INSERT multi-lignes et mise
+à jour des agrégats quotidiens, une transaction par lot) :
+
+- dès que INTERACTION_FLUSH_BATCH interactions sont en attente ;
+- au plus tard toutes les INTERACTION_FLUSH_INTERVAL_MS millisecondes ;
+- à l'arrêt du worker (événement shutdown de l'application).
+
+Le tampon est borné à INTERACTION_BUFFER_SIZE interactions. Au-delà, `add`
+refuse l'interaction (compteur `interaction_buffer_dropped_total`) : le
+middleware de suivi l'abandonne, la route /interactions/track répond 503 pour
+que le client réessaie plus tard.
+
+L'horodatage est pris à la réception (UTC), pas à l'écriture du lot. Un lot
+dont l'écriture échoue est perdu (compteur `interaction_buffer_failed_total`) :
+ces données de suivi ne justifient pas de bloquer le worker.
+"""
+import asyncio
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.db.interaction_rollups import apply_rollups
+from app.models.interaction import UserInteraction
+
+logger = logging.getLogger(__name__)
+
+
+class InteractionBuffer:
+    """
+    File bornée d'interactions en attente d'écriture. `add` peut être appelé
+    depuis la boucle d'événements comme depuis les threads des routes
+    synchrones (verrou) ; les écritures sont sérialisées.
+    """
+
+    def __init__(self, max_size: int, batch_size: int, flush_interval_ms: int):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._events: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.accepted = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+
+    def add(
+        self,
+        user_id: int,
+        entity_type: str,
+        entity_id: int,
+        interaction_type: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        created_at: Optional[datetime] = None,
+    ) -> bool:
+        """Dépose une interaction ; retourne False si le tampon est plein (interaction abandonnée)."""
+        event = {
+            "user_id": user_id,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "interaction_type": interaction_type,
+            "metadata": metadata or {},
+            "created_at": created_at or datetime.utcnow(),
+        }
+        with self._lock:
+            if len(self._events) >= self.max_size:
+                self.dropped += 1
+                return False
+            self._events.append(event)
+            self.accepted += 1
+            pending = len(self._events)
+        if pending >= self.batch_size:
+            self._wake()
+        return True
+
+    def _wake(self) -> None:
+        if self._loop is not None and self._wakeup is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                # Boucle déjà fermée (arrêt du worker)
+                pass
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            count = min(self.batch_size, len(self._events))
+            return [self._events.popleft() for _ in range(count)]
+
+    def flush(self, engine: Engine) -> int:
+        """Écrit toutes les interactions en attente, par lots. Bloquant ; retourne le nombre écrit."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return written
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(insert(UserInteraction.__table__), batch)
+                        apply_rollups(conn, batch)
+                except Exception as e:
+                    self.failed += len(batch)
+                    logger.warning("Écriture de %d interactions impossible: %s", len(batch), e)
+                    continue
+                self.batches += 1
+                self.written += len(batch)
+                written += len(batch)
+
+    async def run(self, engine: Engine) -> None:
+        """Tâche de fond : écrit les lots dès qu'ils sont pleins ou à chaque intervalle."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._events:
+                await self._loop.run_in_executor(None, self.flush, engine)
+
+    def start(self, engine: Engine) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run(engine))
+
+    async def stop(self, engine: Engine) -> None:
+        """Arrête la tâche de fond puis écrit les interactions restantes."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._wakeup = None
+        await asyncio.get_running_loop().run_in_executor(None, self.flush, engine)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+
+interaction_buffer = InteractionBuffer(
+    settings.INTERACTION_BUFFER_SIZE, settings.INTERACTION_FLUSH_BATCH, settings.INTERACTION_FLUSH_INTERVAL_MS
+)
+
+
+def collect_interaction_buffer_metrics():
+    """Collecteur de métriques (voir app.core.metrics) pour le tampon des interactions."""
+    yield ("interaction_buffer_pending", "gauge", "Interactions en attente d'écriture.", {},
+           len(interaction_buffer))
+    yield ("interaction_buffer_accepted_total", "counter", "Interactions déposées dans le tampon.", {},
+           interaction_buffer.accepted)
+    yield ("interaction_buffer_dropped_total", "counter", "Interactions refusées (tampon plein).", {},
+           interaction_buffer.dropped)
+    yield ("interaction_buffer_written_total", "counter", "Interactions écrites en base.", {},
+           interaction_buffer.written)
+    yield ("interaction_buffer_failed_total", "counter", "Interactions perdues (écriture du lot en échec).", {},
+           interaction_buffer.failed)
+    yield ("interaction_buffer_batches_total", "counter", "Lots d'interactions écrits.", {},
+           interaction_buffer.batches)
@@ -0,0 +1,114 @@
+"""
+Configuration centrale de la journalisation.
+
+Les loggers de l'application n'écrivent jamais directement sur la sortie
+standard : les enregistrements passent par un QueueHandler (ajout en file,
+sans E/S) et un QueueListener les écrit depuis un thread dédié. Un appel de
+journalisation ne bloque donc pas une requête sur une écriture disque/console.
+
+Variables de configuration (voir app.config.Settings) :
+- LOG_LEVEL : niveau par défaut (INFO) ;
+- LOG_LEVELS : niveaux par module, ex. "app.api.deps=DEBUG,app.db.slow_query=WARNING" ;
+- LOG_FORMAT : "json" (un objet JSON par ligne) ou "text" ;
+- LOG_DEBUG_SAMPLE_RATE : proportion des messages DEBUG conservés.
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from app.config import settings
+
+# Attributs standards d'un LogRecord : tout autre attribut provient de `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formate un enregistrement en une ligne JSON, champs `extra` inclus."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Ne conserve qu'une proportion des messages DEBUG (les autres niveaux passent tous)."""
+
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.sample_rate >= 1.0:
+            return True
+        return random.random() < self.sample_rate
+
+
+def parse_log_levels(value: str) -> Dict[str, str]:
+    """Convertit "module=NIVEAU,module2=NIVEAU" en dictionnaire."""
+    levels = {}
+    for item in value.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging() -> None:
+    """
+    Installe le QueueHandler sur le logger racine et démarre le QueueListener.
+    Peut être appelée plusieurs fois : seule la première installation compte.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(DebugSamplingFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    for name, level in parse_log_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Vide la file et arrête le thread d'écriture."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
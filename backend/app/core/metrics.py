@@ -0,0 +1,238 @@
+"""
+Métriques applicatives au format texte Prometheus.
+
+Chaque worker uvicorn tient ses compteurs en mémoire. Ils ne sont modifiés
+que depuis la boucle d'événements (middleware ASGI), donc sans verrou. Les
+valeurs lues à la demande (pool de connexions, caches) sont fournies par des
+« collecteurs » enregistrés avec `register_collector`.
+
+Avec plusieurs workers, définir METRICS_MULTIPROC_DIR : chaque worker y écrit
+périodiquement un instantané (`worker_<pid>.json`, remplacement atomique) et
+l'endpoint /metrics agrège les instantanés de tous les workers. Les compteurs
+des workers arrêtés restent comptés ; les jauges ne sont retenues que pour
+les workers dont l'instantané est récent. Vider ce répertoire avant de
+démarrer le serveur.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bornes (en secondes) de l'histogramme des durées de requête
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# (nom, type, aide, étiquettes, valeur) ; type : "counter" ou "gauge"
+Sample = Tuple[str, str, str, Dict[str, str], float]
+
+_collectors: List[Callable[[], Iterable[Sample]]] = []
+
+
+def register_collector(collector: Callable[[], Iterable[Sample]]) -> None:
+    """
+    Enregistre une fonction appelée à chaque instantané, qui retourne des
+    échantillons (nom, "counter" | "gauge", aide, étiquettes, valeur).
+    """
+    _collectors.append(collector)
+
+
+class RequestMetrics:
+    """Compteurs HTTP d'un worker (requêtes, erreurs, histogramme de latence, requêtes en cours)."""
+
+    def __init__(self):
+        self.in_flight = 0
+        # (méthode, route, statut) -> nombre de requêtes
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        # (méthode, route) -> nombre de réponses 5xx / exceptions
+        self.errors: Dict[Tuple[str, str], int] = {}
+        # (méthode, route) -> [compteurs par intervalle..., somme, total]
+        self.latency: Dict[Tuple[str, str], List[float]] = {}
+
+    def observe(self, method: str, route: str, status_code: int, duration: float) -> None:
+        key = (method, route, str(status_code))
+        self.requests[key] = self.requests.get(key, 0) + 1
+        if status_code >= 500:
+            error_key = (method, route)
+            self.errors[error_key] = self.errors.get(error_key, 0) + 1
+
+        histogram = self.latency.get((method, route))
+        if histogram is None:
+            histogram = self.latency[(method, route)] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0, 0]
+        histogram[bisect_left(LATENCY_BUCKETS, duration)] += 1
+        histogram[-2] += duration
+        histogram[-1] += 1
+
+    def snapshot(self) -> Dict:
+        """Copie sérialisable en JSON des compteurs (à appeler depuis la boucle d'événements)."""
+        return {
+            "requests": [[*key, value] for key, value in self.requests.items()],
+            "errors": [[*key, value] for key, value in self.errors.items()],
+            "latency": [[*key, list(value)] for key, value in self.latency.items()],
+            "in_flight": self.in_flight,
+        }
+
+
+request_metrics = RequestMetrics()
+
+
+def _collect_samples() -> List[Sample]:
+    samples: List[Sample] = []
+    for collector in _collectors:
+        try:
+            samples.extend(collector())
+        except Exception as e:
+            logger.warning("Collecteur de métriques en échec: %s", e)
+    return samples
+
+
+def take_snapshot() -> Dict:
+    snapshot = request_metrics.snapshot()
+    snapshot["pid"] = os.getpid()
+    snapshot["timestamp"] = time.time()
+    snapshot["samples"] = [list(sample) for sample in _collect_samples()]
+    return snapshot
+
+
+def _snapshot_path(pid: int) -> str:
+    return os.path.join(settings.METRICS_MULTIPROC_DIR, f"worker_{pid}.json")
+
+
+def write_snapshot(snapshot: Dict) -> None:
+    """Écrit l'instantané du worker (remplacement atomique du fichier)."""
+    path = _snapshot_path(snapshot["pid"])
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+
+
+def _read_snapshots(exclude_pid: int) -> List[Dict]:
+    snapshots = []
+    directory = settings.METRICS_MULTIPROC_DIR
+    for name in os.listdir(directory):
+        if not (name.startswith("worker_") and name.endswith(".json")):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if snapshot.get("pid") != exclude_pid:
+            snapshots.append(snapshot)
+    return snapshots
+
+
+async def flush_periodically() -> None:
+    """Tâche de fond : publie l'instantané du worker toutes les METRICS_FLUSH_INTERVAL secondes."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(settings.METRICS_FLUSH_INTERVAL)
+        try:
+            snapshot = take_snapshot()
+            await loop.run_in_executor(None, write_snapshot, snapshot)
+        except Exception as e:
+            logger.warning("Écriture de l'instantané des métriques impossible: %s", e)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def render_metrics() -> str:
+    """
+    Agrège l'instantané courant et, en mode multi-processus, ceux des autres
+    workers, puis les formate au format texte Prometheus (version 0.0.4).
+    """
+    current = take_snapshot()
+    snapshots = [current]
+    if settings.METRICS_MULTIPROC_DIR:
+        snapshots.extend(_read_snapshots(exclude_pid=current["pid"]))
+        write_snapshot(current)
+
+    # Jauges : uniquement les workers dont l'instantané est récent
+    fresh_after = current["timestamp"] - 3 * settings.METRICS_FLUSH_INTERVAL
+    live = [snapshot for snapshot in snapshots if snapshot["timestamp"] >= fresh_after]
+
+    requests: Dict[tuple, float] = {}
+    errors: Dict[tuple, float] = {}
+    latency: Dict[tuple, List[float]] = {}
+    for snapshot in snapshots:
+        for method, route, status_code, value in snapshot["requests"]:
+            key = (method, route, status_code)
+            requests[key] = requests.get(key, 0) + value
+        for method, route, value in snapshot["errors"]:
+            errors[(method, route)] = errors.get((method, route), 0) + value
+        for method, route, values in snapshot["latency"]:
+            merged = latency.setdefault((method, route), [0] * len(values))
+            for i, value in enumerate(values):
+                merged[i] += value
+
+    lines: List[str] = []
+
+    def header(name: str, kind: str, help_text: str) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    header("http_requests_total", "counter", "Nombre de requêtes HTTP par route et statut.")
+    for (method, route, status_code), value in sorted(requests.items()):
+        labels = {"method": method, "route": route, "status": status_code}
+        lines.append(f"http_requests_total{_format_labels(labels)} {_format_value(value)}")
+
+    header("http_request_errors_total", "counter", "Nombre de réponses 5xx par route.")
+    for (method, route), value in sorted(errors.items()):
+        lines.append(f"http_request_errors_total{_format_labels({'method': method, 'route': route})} {_format_value(value)}")
+
+    header("http_request_duration_seconds", "histogram", "Durée des requêtes HTTP par route.")
+    for (method, route), values in sorted(latency.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), values[:-2]):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            labels = {"method": method, "route": route, "le": le}
+            lines.append(f"http_request_duration_seconds_bucket{_format_labels(labels)} {_format_value(cumulative)}")
+        labels = _format_labels({"method": method, "route": route})
+        lines.append(f"http_request_duration_seconds_sum{labels} {_format_value(float(values[-2]))}")
+        lines.append(f"http_request_duration_seconds_count{labels} {_format_value(values[-1])}")
+
+    header("http_requests_in_flight", "gauge", "Requêtes HTTP en cours de traitement.")
+    lines.append(f"http_requests_in_flight {sum(snapshot['in_flight'] for snapshot in live)}")
+
+    header("app_workers", "gauge", "Workers ayant publié des métriques récemment.")
+    lines.append(f"app_workers {len(live)}")
+
+    # Échantillons des collecteurs : compteurs sommés sur tous les workers,
+    # jauges sommées sur les workers actifs
+    collected: Dict[str, Dict] = {}
+    for snapshot in snapshots:
+        is_live = snapshot in live
+        for name, kind, help_text, labels, value in snapshot["samples"]:
+            if kind == "gauge" and not is_live:
+                continue
+            metric = collected.setdefault(name, {"kind": kind, "help": help_text, "values": {}})
+            key = tuple(sorted(labels.items()))
+            metric["values"][key] = metric["values"].get(key, 0) + value
+
+    for name, metric in sorted(collected.items()):
+        header(name, metric["kind"], metric["help"])
+        for key, value in sorted(metric["values"].items()):
+            lines.append(f"{name}{_format_labels(dict(key))} {_format_value(value)}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,164 @@
+"""
+Hachage et vérification des mots de passe.
+
+bcrypt (12 tours) coûte plusieurs centaines de millisecondes de CPU par
+vérification. Les vérifications de la connexion passent par un pool de
+threads dédié et borné (`password_verifier`) : elles n'occupent ni la boucle
+d'événements ni le threadpool partagé des routes synchrones. Au-delà de
+PASSWORD_VERIFY_MAX_PENDING vérifications en cours ou en attente, la
+connexion est refusée immédiatement (PasswordVerifierBusy) plutôt que mise
+en file indéfiniment.
+
+Les hash sont mis à niveau à la connexion réussie (`verify_and_update`) :
+anciens hash SHA-256 `sel$hash` de app/core/security.py, hash bcrypt d'un
+coût inférieur au coût courant, et anciens hash « enveloppés ».
+
+Un hash enveloppé (`legacy-bcrypt$<sel>$<bcrypt>`) est le bcrypt de l'ancien
+condensat SHA-256 : scripts/rehash_passwords.py protège ainsi tous les anciens
+hash sans connaître les mots de passe ; la connexion les remplace ensuite par
+un bcrypt direct.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.config import settings
+from app.core import security as legacy_security
+
+logger = logging.getLogger(__name__)
+
+# Configuration for password hashing
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=12,
+    # Les hash d'un coût inférieur sont mis à niveau à la connexion
+    bcrypt__min_rounds=12
+)
+
+# Ancien format de app/core/security.py : sel hexadécimal, "$", SHA-256 hexadécimal
+_LEGACY_HASH_RE = re.compile(r"^[0-9a-f]+\$[0-9a-f]{64}$")
+
+
+WRAPPED_LEGACY_PREFIX = "legacy-bcrypt$"
+
+
+def is_legacy_hash(hashed_password: str) -> bool:
+    return bool(_LEGACY_HASH_RE.match(hashed_password or ""))
+
+
+def is_wrapped_legacy_hash(hashed_password: str) -> bool:
+    return (hashed_password or "").startswith(WRAPPED_LEGACY_PREFIX)
+
+
+def wrap_legacy_hash(legacy_hash: str) -> str:
+    """Enveloppe un ancien hash SHA-256 `sel$hash` dans bcrypt. Bloquant (coût bcrypt)."""
+    salt, digest = legacy_hash.split("$", 1)
+    return f"{WRAPPED_LEGACY_PREFIX}{salt}${pwd_context.hash(digest)}"
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Vérifie un mot de passe. Retourne (valide, nouveau hash) ; le nouveau hash
+    est fourni lorsque le hash stocké doit être remplacé (ancien format, coût
+    bcrypt obsolète), sinon None. Bloquant (coût bcrypt).
+    """
+    if is_legacy_hash(hashed_password):
+        if not legacy_security.verify_password(plain_password, hashed_password):
+            return False, None
+        return True, pwd_context.hash(plain_password)
+
+    if is_wrapped_legacy_hash(hashed_password):
+        salt, inner_hash = hashed_password[len(WRAPPED_LEGACY_PREFIX):].split("$", 1)
+        digest = hashlib.sha256((salt + plain_password).encode()).hexdigest()
+        try:
+            if not pwd_context.verify(digest, inner_hash):
+                return False, None
+        except (ValueError, TypeError):
+            logger.warning("Hash de mot de passe dans un format non reconnu")
+            return False, None
+        return True, pwd_context.hash(plain_password)
+
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except (ValueError, TypeError):
+        # Hash illisible (compte sans mot de passe utilisable, format inconnu)
+        logger.warning("Hash de mot de passe dans un format non reconnu")
+        return False, None
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Vérifie un mot de passe (tous formats reconnus). Bloquant."""
+    return verify_and_update(plain_password, hashed_password)[0]
+
+
+class PasswordVerifierBusy(Exception):
+    """Trop de vérifications de mot de passe en cours : réessayer plus tard."""
+
+
+class PasswordVerifier:
+    """
+    Pool de threads borné pour les vérifications de mot de passe. `pending`
+    n'est modifié que depuis la boucle d'événements, donc sans verrou.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.verified = 0
+        self.rejected = 0
+        self.upgraded = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+        return self._executor
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Équivalent asynchrone de `verify_and_update`, exécuté dans le pool."""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordVerifierBusy()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            valid, new_hash = await loop.run_in_executor(
+                self._get_executor(), verify_and_update, plain_password, hashed_password
+            )
+        finally:
+            self.pending -= 1
+        self.verified += 1
+        if new_hash is not None:
+            self.upgraded += 1
+        return valid, new_hash
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_verifier = PasswordVerifier(settings.PASSWORD_VERIFY_WORKERS, settings.PASSWORD_VERIFY_MAX_PENDING)
+
+
+def collect_password_metrics():
+    """Collecteur de métriques (voir app.core.metrics) pour le pool de vérification des mots de passe."""
+    yield ("password_verify_pending", "gauge", "Vérifications de mot de passe en cours ou en attente.", {},
+           password_verifier.pending)
+    yield ("password_verify_total", "counter", "Vérifications de mot de passe effectuées.", {},
+           password_verifier.verified)
+    yield ("password_verify_rejected_total", "counter", "Connexions refusées (file de vérification pleine).", {},
+           password_verifier.rejected)
+    yield ("password_hash_upgrades_total", "counter", "Hash de mot de passe mis à niveau à la connexion.", {},
+           password_verifier.upgraded)
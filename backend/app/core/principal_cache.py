@@ -0,0 +1,130 @@
+"""
+Cache des utilisateurs authentifiés (« principaux »).
+
+Chaque requête authentifiée décodait le JWT puis relisait l'utilisateur dans
+la table `users`. Le résultat de cette lecture est gardé en mémoire, indexé
+par l'empreinte SHA-256 du jeton (le jeton lui-même n'est pas conservé).
+
+Une entrée expire au plus tôt entre l'expiration du jeton (`exp`) et
+PRINCIPAL_CACHE_TTL secondes après sa création ; au-delà de
+PRINCIPAL_CACHE_SIZE entrées, la moins récemment utilisée est évincée.
+Les modifications d'un utilisateur (mise à jour, activation, désactivation)
+appellent `invalidate_user`, ce qui supprime immédiatement ses entrées dans le
+worker courant. Les autres workers les oublient au plus tard après
+PRINCIPAL_CACHE_TTL secondes : c'est la fenêtre d'invalidation.
+
+Le cache est partagé par les threads du threadpool de FastAPI (dépendances
+synchrones) : ses opérations sont protégées par un verrou.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.config import settings
+
+
+def token_key(token: str) -> str:
+    """Clé de cache d'un jeton : son empreinte SHA-256."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class PrincipalCache:
+    """Cache LRU borné, avec expiration par entrée, des utilisateurs par jeton."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        # clé -> (expiration, id utilisateur, principal), du moins au plus récemment utilisé
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        # id utilisateur -> clés de ses jetons en cache
+        self._keys_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Principal associé à `key`, ou None s'il est absent ou expiré."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= time.time():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: str, user_id: int, principal: Any, expires_at: Optional[float] = None) -> None:
+        """Met en cache `principal` jusqu'à `expires_at` (timestamp), borné par le TTL."""
+        if not self.enabled:
+            return
+        expiry = time.time() + self.ttl
+        if expires_at is not None:
+            expiry = min(expiry, expires_at)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expiry, user_id, principal)
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int) -> int:
+        """Oublie tous les jetons en cache de l'utilisateur ; retourne le nombre d'entrées supprimées."""
+        with self._lock:
+            keys = self._keys_by_user.pop(user_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _remove(self, key: str) -> None:
+        _, user_id, _ = self._entries.pop(key)
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL)
+
+
+def collect_principal_cache_metrics():
+    """Collecteur de métriques (voir app.core.metrics) pour le cache des principaux."""
+    stats = principal_cache.stats()
+    yield ("principal_cache_entries", "gauge", "Jetons en cache.", {}, stats["size"])
+    yield ("principal_cache_hits_total", "counter", "Utilisateurs trouvés dans le cache.", {}, stats["hits"])
+    yield ("principal_cache_misses_total", "counter", "Utilisateurs relus en base.", {}, stats["misses"])
+    yield ("principal_cache_evictions_total", "counter", "Entrées évincées (taille maximale).", {}, stats["evictions"])
+    yield ("principal_cache_invalidations_total", "counter", "Entrées invalidées après modification d'un utilisateur.",
+           {}, stats["invalidations"])
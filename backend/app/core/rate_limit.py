@@ -0,0 +1,205 @@
+"""
+Limitation des tentatives de connexion (seaux à jetons).
+
+Chaque tentative de connexion coûte une vérification bcrypt : une vague de
+tentatives (credential stuffing) sature le CPU des workers. Avant toute
+vérification de mot de passe, la route de connexion consomme un jeton dans
+deux seaux :
+
+- par adresse IP du client : LOGIN_THROTTLE_IP_BURST tentatives d'affilée,
+  puis LOGIN_THROTTLE_IP_PER_MINUTE par minute ;
+- par compte visé (identifiant saisi) : LOGIN_THROTTLE_ACCOUNT_BURST, puis
+  LOGIN_THROTTLE_ACCOUNT_PER_MINUTE par minute. Une connexion réussie
+  remplit de nouveau le seau du compte.
+
+Un seau vide donne une réponse 429 (avec Retry-After), sans hachage.
+
+Les seaux sont tenus par un « backend » interchangeable (`set_backend`) :
+
+- `MemoryBucketBackend` (par défaut) : en mémoire, propre à chaque worker ;
+  modifié uniquement depuis la boucle d'événements, donc sans verrou ;
+- `RedisBucketBackend` (LOGIN_THROTTLE_REDIS_URL) : partagé entre workers et
+  serveurs, mise à jour atomique par un script Lua (paquet `redis` requis).
+
+Si le backend est indisponible, les tentatives sont laissées passer
+(compteur `login_throttle_backend_errors_total`) : le pool borné de
+vérification des mots de passe protège encore le CPU.
+
+Derrière un proxy, lancer uvicorn avec --proxy-headers pour que l'adresse
+du client soit celle transmise par le proxy.
+"""
+import abc
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BucketBackend(abc.ABC):
+    """Interface des backends : seaux à jetons identifiés par une clé."""
+
+    @abc.abstractmethod
+    async def consume(self, key: str, capacity: float, rate: float) -> float:
+        """
+        Retire un jeton du seau `key` (capacité `capacity`, remplissage `rate`
+        jetons par seconde). Retourne 0 si la tentative est acceptée, sinon le
+        délai (secondes) avant le prochain jeton.
+        """
+
+    @abc.abstractmethod
+    async def reset(self, key: str) -> None:
+        """Remplit de nouveau le seau `key`."""
+
+    def __len__(self) -> int:
+        return 0
+
+
+class MemoryBucketBackend(BucketBackend):
+    """Seaux en mémoire du worker, bornés à `max_keys` (les moins récents sont oubliés)."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # clé -> (jetons, horodatage monotone de la dernière mise à jour)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def consume(self, key: str, capacity: float, rate: float) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        if tokens >= 1:
+            tokens -= 1
+            retry_after = 0.0
+        else:
+            retry_after = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    async def reset(self, key: str) -> None:
+        self._buckets.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Seau à jetons atomique côté Redis, horloge du serveur Redis (commune aux workers)
+_REDIS_CONSUME = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class RedisBucketBackend(BucketBackend):
+    """Seaux partagés dans Redis (clés préfixées par `prefix`)."""
+
+    def __init__(self, url: str, prefix: str = "login_throttle:"):
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("LOGIN_THROTTLE_REDIS_URL requiert le paquet redis (pip install redis)") from e
+        self.prefix = prefix
+        self._client = redis_asyncio.from_url(url)
+        self._consume = self._client.register_script(_REDIS_CONSUME)
+
+    async def consume(self, key: str, capacity: float, rate: float) -> float:
+        return float(await self._consume(keys=[self.prefix + key], args=[capacity, rate]))
+
+    async def reset(self, key: str) -> None:
+        await self._client.delete(self.prefix + key)
+
+
+class LoginThrottle:
+    """Limiteur des tentatives de connexion par IP et par compte."""
+
+    def __init__(self, backend: BucketBackend):
+        self.backend = backend
+        self.enabled = settings.LOGIN_THROTTLE_ENABLED
+        self.allowed = 0
+        self.rejected: Dict[str, int] = {"ip": 0, "account": 0}
+        self.backend_errors = 0
+
+    def _limits(self, scope: str) -> Tuple[float, float]:
+        if scope == "ip":
+            return settings.LOGIN_THROTTLE_IP_BURST, settings.LOGIN_THROTTLE_IP_PER_MINUTE / 60
+        return settings.LOGIN_THROTTLE_ACCOUNT_BURST, settings.LOGIN_THROTTLE_ACCOUNT_PER_MINUTE / 60
+
+    async def check(self, ip: Optional[str], account: str) -> Tuple[Optional[str], float]:
+        """
+        Consomme une tentative pour l'IP puis pour le compte. Retourne
+        (None, 0) si la tentative est acceptée, sinon (portée refusée :
+        "ip" ou "account", délai avant nouvel essai en secondes).
+        """
+        if not self.enabled:
+            return None, 0.0
+        for scope, key in (("ip", ip), ("account", account.strip().lower())):
+            if not key:
+                continue
+            capacity, rate = self._limits(scope)
+            try:
+                retry_after = await self.backend.consume(f"{scope}:{key}", capacity, rate)
+            except Exception as e:
+                self.backend_errors += 1
+                logger.warning("Limiteur de connexion indisponible: %s", e)
+                return None, 0.0
+            if retry_after > 0:
+                self.rejected[scope] += 1
+                return scope, retry_after
+        self.allowed += 1
+        return None, 0.0
+
+    async def login_succeeded(self, account: str) -> None:
+        """Après une connexion réussie, le compte retrouve toutes ses tentatives."""
+        if not self.enabled:
+            return
+        try:
+            await self.backend.reset(f"account:{account.strip().lower()}")
+        except Exception as e:
+            self.backend_errors += 1
+            logger.warning("Limiteur de connexion indisponible: %s", e)
+
+
+def _default_backend() -> BucketBackend:
+    if settings.LOGIN_THROTTLE_REDIS_URL:
+        return RedisBucketBackend(settings.LOGIN_THROTTLE_REDIS_URL)
+    return MemoryBucketBackend(settings.LOGIN_THROTTLE_MAX_KEYS)
+
+
+login_throttle = LoginThrottle(_default_backend())
+
+
+def set_backend(backend: BucketBackend) -> None:
+    """Remplace le backend des seaux (ex: backend partagé propre au déploiement)."""
+    login_throttle.backend = backend
+
+
+def collect_login_throttle_metrics():
+    """Collecteur de métriques (voir app.core.metrics) pour le limiteur de connexion."""
+    yield ("login_throttle_allowed_total", "counter", "Tentatives de connexion acceptées par le limiteur.", {},
+           login_throttle.allowed)
+    for scope, count in login_throttle.rejected.items():
+        yield ("login_throttle_rejected_total", "counter", "Tentatives de connexion refusées (429).",
+               {"scope": scope}, count)
+    yield ("login_throttle_backend_errors_total", "counter", "Erreurs du backend du limiteur (tentative acceptée).",
+           {}, login_throttle.backend_errors)
+    yield ("login_throttle_tracked_keys", "gauge", "Seaux tenus en mémoire par le worker.", {},
+           len(login_throttle.backend))
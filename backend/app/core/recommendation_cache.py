@@ -0,0 +1,50 @@
+"""
+Cache des recommandations par utilisateur.
+
+Un même étudiant consulte ses recommandations plusieurs fois en quelques
+minutes (/api/v1/recommendations/new/*, /student/recommended-courses, tableau
+de bord) : chaque liste calculée est gardée en mémoire, indexée par
+utilisateur et par nom de liste (« precomputed », « dashboard »).
+
+La mécanique est celle du cache des principaux (app/core/principal_cache.py) :
+une entrée expire RECOMMENDATION_CACHE_TTL secondes après sa création et,
+au-delà de RECOMMENDATION_CACHE_SIZE entrées, la moins récemment utilisée est
+évincée. Les événements qui changent les entrées des recommandations
+(inscription à un cours, soumission d'un quiz, leçon terminée) et
+POST /recommendations/new/refresh appellent `invalidate_user` : toutes les
+listes de l'utilisateur sont supprimées dans le worker courant, les autres
+workers les oublient au plus tard après le TTL.
+"""
+from typing import Any, Optional
+
+from app.config import settings
+from app.core.principal_cache import PrincipalCache
+
+
+class RecommendationCache(PrincipalCache):
+    """Cache LRU borné, avec expiration par entrée, des listes de recommandations par utilisateur."""
+
+    def get_for(self, user_id: int, name: str) -> Optional[Any]:
+        return self.get(f"{user_id}:{name}")
+
+    def put_for(self, user_id: int, name: str, value: Any) -> None:
+        self.put(f"{user_id}:{name}", user_id, value)
+
+
+recommendation_cache = RecommendationCache(settings.RECOMMENDATION_CACHE_SIZE, settings.RECOMMENDATION_CACHE_TTL)
+
+
+def collect_recommendation_cache_metrics():
+    """Collecteur de métriques (voir app.core.metrics) pour le cache des recommandations."""
+    stats = recommendation_cache.stats()
+    yield ("recommendation_cache_entries", "gauge", "Listes de recommandations en cache.", {}, stats["size"])
+    yield ("recommendation_cache_hits_total", "counter", "Recommandations servies depuis le cache.", {},
+           stats["hits"])
+    yield ("recommendation_cache_misses_total", "counter", "Recommandations recalculées ou relues en base.", {},
+           stats["misses"])
+    yield ("recommendation_cache_hit_ratio", "gauge", "Part des lectures servies depuis le cache.", {},
+           stats["hit_ratio"])
+    yield ("recommendation_cache_evictions_total", "counter", "Entrées évincées (taille maximale).", {},
+           stats["evictions"])
+    yield ("recommendation_cache_invalidations_total", "counter",
+           "Entrées invalidées après une inscription, un quiz ou une leçon terminée.", {}, stats["invalidations"])
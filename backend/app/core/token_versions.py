@@ -0,0 +1,132 @@
+"""
+Table des versions de jetons, pour révoquer des JWT sans relire l'utilisateur.
+
+Les jetons d'accès portent les informations de l'utilisateur (rôle, statut,
+noms) et sa `token_version` au moment de la connexion. Incrémenter
+`users.token_version` (changement de statut, de rôle, de profil) révoque tous
+les jetons émis auparavant, quelle que soit leur durée de vie restante.
+
+Chaque worker garde en mémoire la version courante des seuls utilisateurs dont
+la version est non nulle (les autres sont à 0 par défaut) :
+
+- chargement complet au démarrage, puis toutes les
+  TOKEN_VERSION_FULL_REFRESH_INTERVAL secondes ;
+- entre-temps, toutes les TOKEN_VERSION_REFRESH_INTERVAL secondes, relecture
+  des seuls utilisateurs modifiés depuis le dernier passage (`updated_at`),
+  avec TOKEN_VERSION_REFRESH_OVERLAP secondes de recouvrement : `updated_at`
+  est fixé avant la validation de la transaction, une révocation validée
+  tardivement serait sinon ignorée jusqu'à la relecture complète. Relire
+  deux fois un utilisateur est sans effet.
+
+Le worker qui révoque met sa table à jour immédiatement (`set_version`) ; les
+autres workers appliquent la révocation au plus tard après
+TOKEN_VERSION_REFRESH_INTERVAL secondes. Si la table n'a pas pu être
+rafraîchie récemment (base indisponible, worker sans tâche de fond), elle est
+considérée comme périmée et l'authentification relit l'utilisateur en base.
+"""
+import asyncio
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class TokenVersions:
+    """Versions de jetons non nulles, par identifiant d'utilisateur."""
+
+    def __init__(self):
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        # Plus grand `updated_at` lu (horloge de la base) : point de reprise incrémental
+        self._since = None
+        self._refreshed_at: Optional[float] = None
+        self._full_refreshed_at = 0.0
+
+    def get(self, user_id: int) -> int:
+        return self._versions.get(user_id, 0)
+
+    def set_version(self, user_id: int, version: int) -> None:
+        """Applique une nouvelle version sans attendre le prochain rafraîchissement."""
+        with self._lock:
+            if version:
+                self._versions[user_id] = version
+            else:
+                self._versions.pop(user_id, None)
+
+    def is_fresh(self) -> bool:
+        """Vrai si la table a été rafraîchie récemment (sinon, relire l'utilisateur en base)."""
+        if self._refreshed_at is None:
+            return False
+        return time.monotonic() - self._refreshed_at <= 3 * settings.TOKEN_VERSION_REFRESH_INTERVAL
+
+    def refresh(self, engine: Engine, full: bool = False) -> int:
+        """
+        Relit les versions en base (complètement si `full` ou si la table n'a
+        jamais été chargée) ; retourne le nombre de lignes lues. Bloquant.
+        """
+        full = full or self._since is None
+        statement = select(User.id, User.token_version, User.updated_at)
+        if full:
+            statement = statement.where(User.token_version > 0)
+        else:
+            statement = statement.where(
+                User.updated_at >= self._since - timedelta(seconds=settings.TOKEN_VERSION_REFRESH_OVERLAP)
+            )
+
+        with engine.connect() as conn:
+            # Point de reprise lu avant les lignes : une modification concurrente
+            # sera relue au passage suivant plutôt que perdue
+            since = conn.execute(select(func.max(User.updated_at))).scalar()
+            rows = conn.execute(statement).all()
+
+        with self._lock:
+            if full:
+                self._versions = {user_id: version for user_id, version, _ in rows if version}
+                self._full_refreshed_at = time.monotonic()
+            else:
+                for user_id, version, _ in rows:
+                    if version:
+                        self._versions[user_id] = version
+                    else:
+                        self._versions.pop(user_id, None)
+            if since is not None:
+                self._since = since
+            self._refreshed_at = time.monotonic()
+        return len(rows)
+
+    def needs_full_refresh(self) -> bool:
+        return time.monotonic() - self._full_refreshed_at >= settings.TOKEN_VERSION_FULL_REFRESH_INTERVAL
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+
+token_versions = TokenVersions()
+
+
+async def refresh_periodically(engine: Engine) -> None:
+    """Tâche de fond : rafraîchit la table toutes les TOKEN_VERSION_REFRESH_INTERVAL secondes."""
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await loop.run_in_executor(None, token_versions.refresh, engine, token_versions.needs_full_refresh())
+        except Exception as e:
+            logger.warning("Rafraîchissement des versions de jetons impossible: %s", e)
+        await asyncio.sleep(settings.TOKEN_VERSION_REFRESH_INTERVAL)
+
+
+def collect_token_version_metrics():
+    """Collecteur de métriques (voir app.core.metrics) pour la table des versions de jetons."""
+    yield ("token_versions_entries", "gauge", "Utilisateurs dont les anciens jetons sont révoqués.", {},
+           len(token_versions))
+    yield ("token_versions_fresh", "gauge", "Table des versions de jetons à jour (1) ou périmée (0).", {},
+           1 if token_versions.is_fresh() else 0)
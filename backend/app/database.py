@@ -1,27 +1,69 @@
-from sqlalchemy import create_engine
+from fastapi import Request
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .db.session import (
+    engine, SessionLocal, async_engine, AsyncSessionLocal, get_pool_stats,
+    replica_engine, ReadSessionLocal, async_replica_engine, AsyncReadSessionLocal
+)
+from .db.routing import bind_principal, get_request_principal, read_your_writes, requires_primary
 
 # URL de connexion à la base de données MySQL
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-# Création du moteur SQLAlchemy
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-
-# Session de base de données
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Le moteur et la fabrique de sessions sont créés une seule fois dans
+# app.db.session pour partager le même pool de connexions partout.
 
 # Base pour les modèles
 Base = declarative_base()
 
-def get_db():
+def get_db(request: Request = None):
     """
-    Fournit une session de base de données.
+    Fournit une session de base de données (base principale).
     À utiliser comme dépendance dans les routes FastAPI.
     """
     db = SessionLocal()
+    bind_principal(db, get_request_principal(request))
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db(request: Request = None):
+    """
+    Fournit une session asynchrone (AsyncSession) sur la base principale.
+    À utiliser dans les routes `async def` pour ne pas bloquer la boucle d'événements.
+    """
+    async with AsyncSessionLocal() as db:
+        bind_principal(db, get_request_principal(request))
+        yield db
+
+def get_read_db(request: Request = None):
+    """
+    Fournit une session pour les routes en lecture seule.
+    Utilise la réplique si elle est configurée, sauf juste après une écriture
+    de l'utilisateur (ses lectures restent alors sur la base principale).
+    """
+    principal = get_request_principal(request)
+    if replica_engine is engine or requires_primary(request, principal):
+        session_factory = SessionLocal
+    else:
+        session_factory = ReadSessionLocal
+    db = session_factory()
+    bind_principal(db, principal)
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_read_db(request: Request = None):
+    """
+    Équivalent asynchrone de get_read_db.
+    """
+    principal = get_request_principal(request)
+    if async_replica_engine is async_engine or requires_primary(request, principal):
+        session_factory = AsyncSessionLocal
+    else:
+        session_factory = AsyncReadSessionLocal
+    async with session_factory() as db:
+        bind_principal(db, principal)
+        yield db
@@ -0,0 +1,227 @@
+"""
+Instrumentation SQL par requête HTTP.
+
+Des écouteurs d'événements SQLAlchemy, attachés à tous les moteurs (principal,
+réplique, synchrones et asynchrones), comptent les requêtes SQL exécutées
+pendant une requête HTTP, mesurent leur durée et retiennent la plus lente.
+Les statistiques de la requête courante sont portées par une ContextVar,
+propagée au threadpool de FastAPI et aux greenlets de l'AsyncSession.
+
+Les requêtes SQL plus lentes que DB_SLOW_QUERY_MS sont journalisées
+(échantillonnées selon DB_SLOW_QUERY_SAMPLE_RATE) avec la route et la ligne
+de code qui les a émises.
+
+Budgets de requêtes (détection des N+1) :
+
+    from app.db.instrumentation import set_query_budget, query_budget
+
+    # Toute requête HTTP sur cette route échoue au-delà de 5 requêtes SQL
+    set_query_budget("GET /api/v1/student/all-courses", 5)
+
+    # Ou autour d'un bloc de code (service, script)
+    with query_budget(3):
+        UserService.get_users(db)
+
+Un dépassement lève QueryBudgetExceeded.
+"""
+import logging
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from greenlet import getcurrent
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+slow_query_logger = logging.getLogger("app.db.slow_query")
+
+# Racine du package `app` : sert à retrouver la ligne de code appelante
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_DB_PACKAGE = os.path.dirname(os.path.abspath(__file__))
+
+# Longueur maximale d'une requête SQL dans les journaux
+_MAX_STATEMENT_LENGTH = 500
+
+
+class QueryBudgetExceeded(Exception):
+    """Levée lorsqu'une route ou un bloc dépasse son nombre maximal de requêtes SQL."""
+
+
+class QueryStats:
+    """Statistiques SQL d'une requête HTTP (ou d'un bloc `query_budget`)."""
+
+    __slots__ = (
+        "endpoint", "count", "total_time", "slowest_time", "slowest_statement",
+        "max_queries", "_endpoint_resolver",
+    )
+
+    def __init__(self, endpoint: Optional[str] = None, max_queries: Optional[int] = None,
+                 endpoint_resolver: Optional[Callable[[], Optional[str]]] = None):
+        self.endpoint = endpoint
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.max_queries = max_queries
+        # La route n'est connue qu'après le routage : elle est résolue à la première requête SQL
+        self._endpoint_resolver = endpoint_resolver
+
+    def resolve_endpoint(self) -> Optional[str]:
+        if self.endpoint is None and self._endpoint_resolver is not None:
+            self.endpoint = self._endpoint_resolver()
+            if self.endpoint is not None:
+                self._endpoint_resolver = None
+                if self.max_queries is None:
+                    self.max_queries = get_query_budget(self.endpoint)
+        return self.endpoint
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.total_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+    def to_dict(self) -> Dict:
+        return {
+            "endpoint": self.resolve_endpoint(),
+            "queries": self.count,
+            "db_time_ms": round(self.total_time * 1000, 3),
+            "slowest_ms": round(self.slowest_time * 1000, 3),
+            "slowest_statement": _shorten(self.slowest_statement),
+        }
+
+
+# Statistiques des blocs actifs (requête HTTP puis éventuels `query_budget` imbriqués)
+_current_stats: ContextVar[tuple] = ContextVar("query_stats", default=())
+
+# Budgets de requêtes SQL par route, ex: {"GET /api/v1/student/all-courses": 5}
+_query_budgets: Dict[str, int] = {}
+
+
+def set_query_budget(endpoint: str, max_queries: Optional[int]) -> None:
+    """Définit (ou supprime avec None) le nombre maximal de requêtes SQL d'une route."""
+    if max_queries is None:
+        _query_budgets.pop(endpoint, None)
+    else:
+        _query_budgets[endpoint] = max_queries
+
+
+def get_query_budget(endpoint: Optional[str]) -> Optional[int]:
+    return _query_budgets.get(endpoint) if endpoint else None
+
+
+def clear_query_budgets() -> None:
+    _query_budgets.clear()
+
+
+def start_request_stats(endpoint_resolver: Optional[Callable[[], Optional[str]]] = None):
+    """Démarre la collecte pour la requête courante ; retourne (stats, jeton de réinitialisation)."""
+    stats = QueryStats(endpoint_resolver=endpoint_resolver)
+    token = _current_stats.set(_current_stats.get() + (stats,))
+    return stats, token
+
+
+def stop_request_stats(token) -> None:
+    _current_stats.reset(token)
+
+
+def get_current_stats() -> Optional[QueryStats]:
+    active = _current_stats.get()
+    return active[0] if active else None
+
+
+@contextmanager
+def query_budget(max_queries: int):
+    """
+    Vérifie qu'un bloc de code n'exécute pas plus de `max_queries` requêtes SQL.
+    Expose les statistiques collectées (`stats.count`, `stats.total_time`, ...).
+    """
+    stats, token = start_request_stats()
+    stats.max_queries = max_queries
+    try:
+        yield stats
+    finally:
+        stop_request_stats(token)
+
+
+def _shorten(statement: Optional[str]) -> Optional[str]:
+    if statement is None:
+        return None
+    statement = " ".join(statement.split())
+    if len(statement) > _MAX_STATEMENT_LENGTH:
+        return statement[:_MAX_STATEMENT_LENGTH] + "..."
+    return statement
+
+
+def _find_call_site() -> Optional[str]:
+    """Retourne `fichier:ligne (fonction)` du premier appelant situé dans `app`, hors app/db."""
+    frame = sys._getframe(2)
+    current = getcurrent()
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_ROOT) and not filename.startswith(_DB_PACKAGE):
+            relative = os.path.relpath(filename, os.path.dirname(_APP_ROOT))
+            return f"{relative}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+        if frame is None and current.parent is not None:
+            # AsyncSession : le code synchrone de SQLAlchemy tourne dans un greenlet
+            # fils ; la pile continue dans le greenlet parent, suspendu dans la
+            # coroutine qui a appelé `await session.execute(...)`
+            current = current.parent
+            frame = current.gr_frame
+    return None
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for stats in _current_stats.get():
+        stats.count += 1
+        stats.resolve_endpoint()
+        if stats.max_queries is not None and stats.count > stats.max_queries:
+            where = stats.endpoint or "bloc query_budget"
+            raise QueryBudgetExceeded(
+                f"{where} : {stats.count} requêtes SQL pour un budget de {stats.max_queries} "
+                f"(dernière : {_shorten(statement)})"
+            )
+
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+
+    active = _current_stats.get()
+    for stats in active:
+        stats.record(statement, elapsed)
+
+    if elapsed * 1000 >= settings.DB_SLOW_QUERY_MS and random.random() < settings.DB_SLOW_QUERY_SAMPLE_RATE:
+        endpoint = active[0].endpoint if active else None
+        call_site = _find_call_site()
+        slow_query_logger.warning(
+            "slow_query duration_ms=%.1f endpoint=%s call_site=%s statement=%s",
+            elapsed * 1000, endpoint, call_site, _shorten(statement),
+            extra={
+                "duration_ms": round(elapsed * 1000, 3),
+                "endpoint": endpoint,
+                "call_site": call_site,
+                "statement": _shorten(statement),
+            },
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # Retirer l'horodatage d'une requête SQL en échec
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
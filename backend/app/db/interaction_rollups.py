@@ -0,0 +1,137 @@
+"""
+Agrégats quotidiens des interactions et purge des interactions brutes.
+
+Chaque écriture d'interactions (tampon d'ingestion, lots des clients,
+écriture unitaire) met à jour, dans la même transaction, les compteurs de
+`user_interaction_daily` : une ligne par (utilisateur, jour UTC, type
+d'entité, type d'interaction). Les statistiques lisent ces agrégats, en
+O(jours) plutôt qu'en O(interactions).
+
+Les interactions brutes (métadonnées, user agent, referer) n'ont plus à être
+conservées indéfiniment : `purge_raw_interactions` supprime par petits lots
+celles antérieures à l'horizon de rétention, après les avoir éventuellement
+archivées (scripts/purge_interactions.py).
+"""
+import json
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import IO, Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, select
+from sqlalchemy.engine import Connection, Engine
+
+from app.models.interaction import UserInteraction, UserInteractionDaily
+
+logger = logging.getLogger(__name__)
+
+
+def daily_counts(interactions: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Regroupe des interactions (colonnes de user_interactions, `created_at`
+    renseigné) en compteurs quotidiens, triés par clé : les mises à jour
+    concurrentes verrouillent les lignes dans le même ordre.
+    """
+    groups: Dict[Tuple, List] = defaultdict(lambda: [0, None])
+    for interaction in interactions:
+        created_at = interaction["created_at"]
+        key = (interaction["user_id"], created_at.date(), interaction["entity_type"], interaction["interaction_type"])
+        group = groups[key]
+        group[0] += 1
+        if group[1] is None or created_at > group[1]:
+            group[1] = created_at
+    return [
+        {
+            "user_id": user_id, "day": day, "entity_type": entity_type, "interaction_type": interaction_type,
+            "count": count, "last_interaction_at": last_interaction_at,
+        }
+        for (user_id, day, entity_type, interaction_type), (count, last_interaction_at) in sorted(groups.items())
+    ]
+
+
+def apply_rollups(conn: Connection, interactions: List[Dict[str, Any]]) -> None:
+    """Ajoute des interactions aux agrégats quotidiens (upsert multi-lignes, dans la transaction de `conn`)."""
+    counts = daily_counts(interactions)
+    if not counts:
+        return
+    table = UserInteractionDaily.__table__
+    dialect = conn.dialect.name
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        statement = insert(table).values(counts)
+        new = statement.inserted
+        statement = statement.on_duplicate_key_update(
+            count=table.c.count + new.count,
+            last_interaction_at=case(
+                (new.last_interaction_at > table.c.last_interaction_at, new.last_interaction_at),
+                else_=table.c.last_interaction_at,
+            ),
+        )
+    elif dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        statement = insert(table).values(counts)
+        new = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[column.name for column in table.primary_key.columns],
+            set_={
+                "count": table.c.count + new.count,
+                "last_interaction_at": case(
+                    (new.last_interaction_at > table.c.last_interaction_at, new.last_interaction_at),
+                    else_=table.c.last_interaction_at,
+                ),
+            },
+        )
+    else:
+        raise NotImplementedError(f"Agrégats d'interactions non pris en charge pour {dialect}")
+
+    conn.execute(statement)
+
+
+def _archive_rows(conn: Connection, ids: List[int], archive: IO[str]) -> None:
+    columns = [column for column in UserInteraction.__table__.columns]
+    for row in conn.execute(select(*columns).where(UserInteraction.id.in_(ids)).order_by(UserInteraction.id)):
+        archive.write(json.dumps(dict(row._mapping), default=str, ensure_ascii=False) + "\n")
+
+
+def purge_raw_interactions(
+    engine: Engine,
+    before: datetime,
+    batch_size: int = 1000,
+    archive: Optional[IO[str]] = None,
+    pause: float = 0.0,
+    max_batches: Optional[int] = None,
+) -> int:
+    """
+    Supprime les interactions brutes antérieures à `before`, par lots de
+    `batch_size` (une transaction courte par lot, `pause` secondes entre deux
+    lots). Si `archive` est fourni, les lignes y sont écrites (JSON, une par
+    ligne) avant suppression. Retourne le nombre de lignes supprimées.
+    """
+    deleted = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with engine.begin() as conn:
+            ids = list(conn.execute(
+                select(UserInteraction.id)
+                .where(UserInteraction.created_at < before)
+                .order_by(UserInteraction.id)
+                .limit(batch_size)
+            ).scalars())
+            if not ids:
+                break
+            if archive is not None:
+                _archive_rows(conn, ids, archive)
+            conn.execute(delete(UserInteraction).where(UserInteraction.id.in_(ids)))
+        if archive is not None:
+            archive.flush()
+        deleted += len(ids)
+        batches += 1
+        logger.debug("Interactions purgées: %d (jusqu'à l'id %d)", deleted, ids[-1])
+        if pause:
+            time.sleep(pause)
+    return deleted
@@ -0,0 +1,45 @@
+"""
+Pagination par clé (keyset) pour les listes triées par date décroissante.
+
+Une page est décrite par un curseur opaque, encodage de la clé de tri
+(date, identifiant) du dernier élément renvoyé. La page suivante est lue
+par `WHERE (date, id) < (curseur) ORDER BY date DESC, id DESC LIMIT n` :
+son coût ne dépend pas de la profondeur, contrairement à OFFSET, et aucun
+COUNT(*) n'est nécessaire.
+
+La comparaison est développée en `date < d OR (date = d AND id < i)`, que
+MySQL sait résoudre par un parcours d'index (les comparaisons de tuples ne
+le sont pas toujours).
+"""
+import base64
+from datetime import datetime
+from typing import Tuple
+
+from sqlalchemy import and_, or_
+
+# Clé de tri d'un élément : (date, identifiant)
+Cursor = Tuple[datetime, int]
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Clé de tri d'un curseur ; ValueError si le curseur est invalide."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, item_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Curseur de pagination invalide") from e
+
+
+def before_cursor(created_at_column, id_column, cursor: Cursor):
+    """Condition « strictement après le curseur » dans l'ordre (date DESC, id DESC)."""
+    created_at, item_id = cursor
+    return or_(
+        created_at_column < created_at,
+        and_(created_at_column == created_at, id_column < item_id),
+    )
@@ -0,0 +1,86 @@
+"""
+Projections : lecture de quelques colonnes sans charger d'entités ORM.
+
+Les listes volumineuses n'ont souvent besoin que de quelques champs. Charger
+les entités complètes coûte la carte d'identité de la session, l'état
+d'instrumentation de chaque objet et toutes les colonnes (dont les hash de
+mot de passe). Une projection décrit les colonnes lues par un `select()` Core
+et les reçoit dans une dataclass à slots (ou un tuple nommé) :
+
+    @projection(User.id, User.email)
+    class UserEmail:
+        id: int
+        email: str
+
+    rows = fetch_all(db, UserEmail, UserEmail.select().where(User.is_active == True))
+
+Les champs sont remplis dans l'ordre des colonnes ; les méthodes et propriétés
+déclarées dans la classe sont conservées.
+"""
+from collections import namedtuple
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional, Type, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+T = TypeVar("T")
+
+
+def projection(*columns):
+    """
+    Décorateur : transforme une classe annotée en dataclass à slots associée
+    aux colonnes `columns` (une colonne par champ annoté, dans le même ordre).
+    """
+    def decorate(cls):
+        names = list(cls.__dict__.get("__annotations__", {}))
+        if len(names) != len(columns):
+            raise TypeError(
+                f"{cls.__name__}: {len(names)} champs annotés pour {len(columns)} colonnes"
+            )
+        namespace = {
+            key: value for key, value in cls.__dict__.items()
+            if key not in ("__dict__", "__weakref__")
+        }
+        namespace["__slots__"] = tuple(names)
+        slotted = dataclass(type(cls)(cls.__name__, cls.__bases__, namespace))
+        slotted.__columns__ = tuple(columns)
+        slotted.select = classmethod(_select_columns)
+        return slotted
+    return decorate
+
+
+def row_type(name: str, *columns):
+    """
+    Tuple nommé associé à `columns` ; les noms des champs sont ceux des
+    colonnes (ou de leurs libellés).
+    """
+    cls = namedtuple(name, [column.key for column in columns])
+    cls.__columns__ = tuple(columns)
+    cls.select = classmethod(_select_columns)
+    return cls
+
+
+def _select_columns(cls) -> Select:
+    return select(*cls.__columns__)
+
+
+def fetch_all(db: Session, projection_cls: Type[T], statement: Optional[Select] = None) -> List[T]:
+    """Exécute `statement` (par défaut `projection_cls.select()`) et construit une instance par ligne."""
+    if statement is None:
+        statement = projection_cls.select()
+    return [projection_cls(*row) for row in db.execute(statement)]
+
+
+def fetch_one(db: Session, projection_cls: Type[T], statement: Optional[Select] = None) -> Optional[T]:
+    """Comme `fetch_all`, pour une seule ligne (None si aucune)."""
+    if statement is None:
+        statement = projection_cls.select()
+    row = db.execute(statement).first()
+    return projection_cls(*row) if row is not None else None
+
+
+def to_instances(projection_cls: Type[T], rows: Iterable[Any]) -> List[T]:
+    """Construit des instances à partir de lignes déjà récupérées."""
+    return [projection_cls(*row) for row in rows]
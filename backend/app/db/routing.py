@@ -0,0 +1,193 @@
+"""
+Routage lecture / écriture entre la base principale et la réplique.
+
+Les écritures restent toujours sur la base principale. Les dépendances de
+lecture (`get_read_db`, `get_async_read_db`) utilisent la réplique, sauf pour
+un utilisateur qui vient d'écrire : pendant DB_READ_YOUR_WRITES_SECONDS ses
+lectures restent sur la base principale pour qu'il voie ses propres
+modifications malgré le retard de réplication.
+
+La date de la dernière écriture suit l'utilisateur d'un worker à l'autre :
+une requête qui écrit reçoit un cookie signé (`last_write`, posé par
+ReadYourWritesMiddleware), que get_read_db et get_async_read_db honorent sur
+n'importe quel worker. Chaque worker garde aussi ses propres écritures en
+mémoire (clients sans cookies, écritures validées après l'envoi des en-têtes).
+"""
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Optional
+
+from jose import JWTError, jwt
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+from app.config import settings
+
+# Clé de session.info contenant l'identifiant de l'utilisateur de la requête
+PRINCIPAL_KEY = "principal"
+# Clé de session.info indiquant qu'une écriture a eu lieu dans la transaction
+PENDING_WRITES_KEY = "pending_writes"
+# Cookie signé portant la dernière écriture de l'utilisateur : "<principal>.<ms>.<signature>"
+LAST_WRITE_COOKIE = "last_write"
+
+
+class ReadYourWritesTracker:
+    """
+    Mémorise la date de la dernière écriture de chaque utilisateur.
+    Le nombre d'entrées est borné : les plus anciennes sont évincées.
+    """
+
+    def __init__(self, window_seconds: float, max_entries: int = 10000):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._last_writes: "OrderedDict[str, float]" = OrderedDict()
+
+    def mark_write(self, principal: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._last_writes[principal] = now
+            self._last_writes.move_to_end(principal)
+            # Éviction des entrées expirées ou en excès (les plus anciennes d'abord)
+            while self._last_writes:
+                oldest, written_at = next(iter(self._last_writes.items()))
+                if len(self._last_writes) <= self.max_entries and now - written_at < self.window_seconds:
+                    break
+                del self._last_writes[oldest]
+
+    def requires_primary(self, principal: Optional[str]) -> bool:
+        """Indique si les lectures de cet utilisateur doivent rester sur la base principale."""
+        if not principal:
+            return False
+        with self._lock:
+            written_at = self._last_writes.get(principal)
+        return written_at is not None and time.monotonic() - written_at < self.window_seconds
+
+    def clear(self) -> None:
+        with self._lock:
+            self._last_writes.clear()
+
+
+read_your_writes = ReadYourWritesTracker(settings.DB_READ_YOUR_WRITES_SECONDS)
+
+
+class RequestWrites:
+    """Dernière écriture validée pendant la requête HTTP courante (voir ReadYourWritesMiddleware)."""
+
+    __slots__ = ("principal", "written_at")
+
+    def __init__(self):
+        self.principal: Optional[str] = None
+        self.written_at: Optional[float] = None
+
+
+# Objet partagé (et non réaffecté) : les commits faits dans le threadpool ou
+# dans les greenlets de l'AsyncSession le modifient pour la requête
+_request_writes: ContextVar[Optional[RequestWrites]] = ContextVar("request_writes", default=None)
+
+
+def start_request_writes():
+    """Démarre le suivi des écritures de la requête courante ; retourne (écritures, jeton de réinitialisation)."""
+    writes = RequestWrites()
+    return writes, _request_writes.set(writes)
+
+
+def stop_request_writes(token) -> None:
+    _request_writes.reset(token)
+
+
+def _signature(principal: str, written_at_ms: int) -> str:
+    message = f"{principal}.{written_at_ms}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def last_write_cookie(principal: str, written_at: float) -> str:
+    """Valeur du cookie LAST_WRITE_COOKIE pour une écriture à `written_at` (timestamp)."""
+    written_at_ms = int(written_at * 1000)
+    return f"{principal}.{written_at_ms}.{_signature(principal, written_at_ms)}"
+
+
+def cookie_requires_primary(value: Optional[str], principal: Optional[str]) -> bool:
+    """Vrai si le cookie est signé, émis pour `principal` et encore dans la fenêtre de lecture."""
+    if not value or not principal:
+        return False
+    cookie_principal, _, rest = value.partition(".")
+    written_at_ms, _, signature = rest.partition(".")
+    if cookie_principal != principal or not written_at_ms.isdigit():
+        return False
+    if not hmac.compare_digest(signature, _signature(principal, int(written_at_ms))):
+        return False
+    return time.time() - int(written_at_ms) / 1000 < settings.DB_READ_YOUR_WRITES_SECONDS
+
+
+def requires_primary(request, principal: Optional[str]) -> bool:
+    """Indique si les lectures de la requête doivent rester sur la base principale."""
+    if read_your_writes.requires_primary(principal):
+        return True
+    return request is not None and cookie_requires_primary(request.cookies.get(LAST_WRITE_COOKIE), principal)
+
+
+def get_request_principal(request) -> Optional[str]:
+    """
+    Identifie l'utilisateur d'une requête à partir du claim `sub` du jeton.
+
+    La signature n'est pas vérifiée ici : la valeur sert uniquement à choisir
+    la base de lecture, l'authentification reste faite par get_current_user.
+    """
+    if request is None:
+        return None
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        subject = jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+    return str(subject) if subject is not None else None
+
+
+def bind_principal(db, principal: Optional[str]) -> None:
+    """Associe la session (synchrone ou AsyncSession) à l'utilisateur de la requête."""
+    if principal:
+        db.info[PRINCIPAL_KEY] = principal
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flush(session, flush_context):
+    session.info[PENDING_WRITES_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_statement(orm_execute_state):
+    # INSERT / UPDATE / DELETE exécutés directement (hors unité de travail),
+    # y compris en SQL brut via text()
+    statement = orm_execute_state.statement
+    if isinstance(statement, TextClause):
+        is_write = not statement.text.lstrip().lower().startswith(("select", "with"))
+    else:
+        is_write = not orm_execute_state.is_select
+    if is_write:
+        orm_execute_state.session.info[PENDING_WRITES_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_commit(session):
+    if session.info.pop(PENDING_WRITES_KEY, False):
+        principal = session.info.get(PRINCIPAL_KEY)
+        if principal:
+            read_your_writes.mark_write(principal)
+            writes = _request_writes.get()
+            if writes is not None:
+                writes.principal = principal
+                writes.written_at = time.time()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_writes(session):
+    session.info.pop(PENDING_WRITES_KEY, None)
@@ -1,17 +1,238 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
+"""
+Fabrique unique du moteur SQLAlchemy et du pool de connexions.
+
+Toutes les sessions de l'application (dépendances FastAPI, middleware, scripts)
+doivent être créées à partir de `SessionLocal` afin de partager un seul pool
+de connexions par processus.
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.config import settings
 
-# Création du moteur SQLAlchemy
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True
-)
 
-# Création de la session locale
+class PoolWaitStats:
+    """
+    Statistiques cumulées du temps d'attente pour obtenir une connexion du pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wait_count = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.timeouts = 0
+
+    def record(self, elapsed: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_time_total += elapsed
+            if elapsed > self.wait_time_max:
+                self.wait_time_max = elapsed
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "wait_count": self.wait_count,
+                "wait_time_total_ms": round(self.wait_time_total * 1000, 3),
+                "wait_time_avg_ms": round(self.wait_time_total * 1000 / self.wait_count, 3) if self.wait_count else 0.0,
+                "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+                "timeouts": self.timeouts,
+            }
+
+
+class _WaitTimingMixin:
+    """
+    Mesure le temps passé à attendre une connexion disponible dans le pool.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    """QueuePool instrumenté pour le moteur synchrone."""
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    """QueuePool instrumenté pour le moteur asynchrone."""
+
+
+# Pilotes asynchrones équivalents aux pilotes synchrones configurés
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def _is_sqlite_memory(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def to_async_url(database_url: str):
+    """Convertit une URL synchrone (ex: mysql+pymysql) vers son pilote asynchrone."""
+    url = make_url(database_url)
+    if url.get_dialect().is_async:
+        return url
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+def create_db_engine(database_url: Optional[str] = None, **overrides) -> Engine:
+    """
+    Crée un moteur SQLAlchemy configuré à partir de `settings`.
+
+    Les paramètres du pool (taille, débordement, recyclage, délai d'attente,
+    pre-ping) proviennent de la configuration et peuvent être surchargés
+    via `overrides`.
+    """
+    url = make_url(database_url or settings.DATABASE_URL)
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+
+    if url.get_backend_name() == "sqlite":
+        # Les sessions sont utilisées depuis le threadpool de FastAPI
+        options["connect_args"] = {"check_same_thread": False}
+
+    if not _is_sqlite_memory(url):
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+
+    options.update(overrides)
+    return create_engine(url, **options)
+
+
+def create_async_db_engine(database_url: Optional[str] = None, **overrides) -> AsyncEngine:
+    """
+    Crée le moteur asynchrone utilisé par les routes `async def` (AsyncSession).
+
+    Il dispose de son propre pool (DB_ASYNC_POOL_SIZE / DB_ASYNC_MAX_OVERFLOW) :
+    le nombre total de connexions par worker est la somme des deux pools.
+    """
+    url = to_async_url(database_url or settings.DATABASE_URL)
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+
+    if not _is_sqlite_memory(url):
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=settings.DB_ASYNC_POOL_SIZE,
+            max_overflow=settings.DB_ASYNC_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+
+    options.update(overrides)
+    return create_async_engine(url, **options)
+
+
+def get_pool_stats(bind: Optional[Engine] = None) -> Dict[str, Any]:
+    """
+    Retourne l'état courant du pool de connexions du moteur.
+
+    Inclut les connexions disponibles / empruntées, le débordement et les
+    temps d'attente cumulés, pour dimensionner le pool par worker.
+    Accepte aussi un moteur asynchrone.
+    """
+    bind = bind or engine
+    pool = getattr(bind, "sync_engine", bind).pool
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+
+    if isinstance(pool, _WaitTimingMixin):
+        stats.update(pool.wait_stats.snapshot())
+
+    return stats
+
+
+# Moteur et fabrique de sessions partagés par tout le processus
+engine = create_db_engine()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Création de la classe de base pour les modèles
-Base = declarative_base()
+# Moteur et fabrique de sessions asynchrones (AsyncSession)
+async_engine = create_async_db_engine()
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Moteurs de la réplique en lecture ; sans SQLALCHEMY_REPLICA_URI les lectures
+# utilisent simplement les moteurs principaux.
+if settings.SQLALCHEMY_REPLICA_URI:
+    replica_engine = create_db_engine(settings.SQLALCHEMY_REPLICA_URI)
+    async_replica_engine = create_async_db_engine(settings.SQLALCHEMY_REPLICA_URI)
+else:
+    replica_engine = engine
+    async_replica_engine = async_engine
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_replica_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+# Jauges exposées sur /metrics : (nom, type, aide, champ de get_pool_stats)
+_POOL_METRICS = (
+    ("db_pool_size", "gauge", "Taille du pool de connexions.", "size"),
+    ("db_pool_checked_out", "gauge", "Connexions empruntées au pool.", "checked_out"),
+    ("db_pool_checked_in", "gauge", "Connexions disponibles dans le pool.", "checked_in"),
+    ("db_pool_overflow", "gauge", "Connexions ouvertes au-delà de la taille du pool.", "overflow"),
+    ("db_pool_wait_seconds_total", "counter", "Temps cumulé d'attente d'une connexion.", "wait_time_total_ms"),
+    ("db_pool_wait_total", "counter", "Nombre d'attentes d'une connexion.", "wait_count"),
+    ("db_pool_timeouts_total", "counter", "Délais d'attente d'une connexion dépassés.", "timeouts"),
+)
+
+
+def collect_pool_metrics():
+    """Collecteur de métriques (voir app.core.metrics) pour les pools de connexions."""
+    engines = {"primary": engine, "primary_async": async_engine}
+    if replica_engine is not engine:
+        engines.update({"replica": replica_engine, "replica_async": async_replica_engine})
+
+    for name, bind in engines.items():
+        stats = get_pool_stats(bind)
+        for metric, kind, help_text, field in _POOL_METRICS:
+            if field not in stats:
+                continue
+            value = stats[field]
+            if field == "wait_time_total_ms":
+                value = value / 1000
+            yield (metric, kind, help_text, {"engine": name}, value)
@@ -1,11 +1,34 @@
+import asyncio
+import logging
+
 from fastapi import FastAPI, Depends, HTTPException, status, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from . import models, schemas
-from .database import engine, get_db
+from .database import engine, async_engine, get_db
+from .db.session import collect_pool_metrics
 from .config import settings
+from .core.logging import setup_logging, shutdown_logging
+from .core import metrics
+from .core.principal_cache import collect_principal_cache_metrics
+from .core import token_versions
+from .core.passwords import collect_password_metrics, password_verifier
+from .core.rate_limit import collect_login_throttle_metrics
+from .core.interaction_buffer import collect_interaction_buffer_metrics, interaction_buffer
+from .core.recommendation_cache import collect_recommendation_cache_metrics
+from .services.recommendation_precompute import precompute_periodically
+from .services.course_features import course_features
+from .services.course_text_index import ensure_course_index
 from .middleware.tracking import PageViewTrackingMiddleware
+from .middleware.query_stats import QueryStatsMiddleware
+from .middleware.metrics import MetricsMiddleware
+from .middleware.read_your_writes import ReadYourWritesMiddleware
+
+# Journalisation structurée et non bloquante (QueueHandler / QueueListener)
+setup_logging()
+logger = logging.getLogger(__name__)
 
 # Création des tables dans la base de données
 models.Base.metadata.create_all(bind=engine)
@@ -14,6 +37,8 @@ app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     description="API pour la plateforme éducative intelligente",
+    # Sérialisation JSON via orjson (plus rapide que le module json standard)
+    default_response_class=ORJSONResponse,
 )
 
 # Configuration CORS
@@ -29,9 +54,122 @@ app.add_middleware(
 # Middleware de suivi des pages vues
 app.add_middleware(PageViewTrackingMiddleware)
 
+# Statistiques SQL par requête (en-tête Server-Timing, journal des requêtes lentes)
+app.add_middleware(QueryStatsMiddleware)
+
+# Métriques HTTP par route (exposées sur /metrics)
+app.add_middleware(MetricsMiddleware)
+
+# Cookie de lecture de ses propres écritures, partagé entre workers (app/db/routing.py)
+app.add_middleware(ReadYourWritesMiddleware)
+metrics.register_collector(collect_pool_metrics)
+metrics.register_collector(collect_principal_cache_metrics)
+metrics.register_collector(token_versions.collect_token_version_metrics)
+metrics.register_collector(collect_password_metrics)
+metrics.register_collector(collect_login_throttle_metrics)
+metrics.register_collector(collect_interaction_buffer_metrics)
+metrics.register_collector(collect_recommendation_cache_metrics)
+
+# Publication périodique des métriques du worker (mode multi-processus)
+_metrics_flush_task = None
+
+@app.on_event("startup")
+async def start_metrics_flush():
+    global _metrics_flush_task
+    if settings.METRICS_MULTIPROC_DIR:
+        _metrics_flush_task = asyncio.create_task(metrics.flush_periodically())
+
+@app.on_event("shutdown")
+async def stop_metrics_flush():
+    if _metrics_flush_task is not None:
+        _metrics_flush_task.cancel()
+        metrics.write_snapshot(metrics.take_snapshot())
+
+# Table des versions de jetons (révocation sans relire l'utilisateur à chaque requête)
+_token_versions_task = None
+
+@app.on_event("startup")
+async def start_token_versions_refresh():
+    global _token_versions_task
+    _token_versions_task = asyncio.create_task(token_versions.refresh_periodically(engine))
+
+@app.on_event("shutdown")
+async def stop_token_versions_refresh():
+    if _token_versions_task is not None:
+        _token_versions_task.cancel()
+
+# Écriture par lots des interactions suivies ; les interactions en attente
+# sont écrites à l'arrêt, avant la libération des pools de connexions
+@app.on_event("startup")
+async def start_interaction_buffer():
+    interaction_buffer.start(engine)
+
+@app.on_event("shutdown")
+async def stop_interaction_buffer():
+    await interaction_buffer.stop(engine)
+
+# Précalcul périodique des recommandations (désactivé par défaut : avec
+# plusieurs workers, préférer scripts/precompute_recommendations.py en cron)
+_recommendation_precompute_task = None
+
+@app.on_event("startup")
+async def start_recommendation_precompute():
+    global _recommendation_precompute_task
+    if settings.RECOMMENDATION_PRECOMPUTE_INTERVAL > 0:
+        _recommendation_precompute_task = asyncio.create_task(precompute_periodically())
+
+@app.on_event("shutdown")
+async def stop_recommendation_precompute():
+    if _recommendation_precompute_task is not None:
+        _recommendation_precompute_task.cancel()
+
+# Index du texte des cours : construit si la table course_terms est vide,
+# puis chargé, sans retarder le démarrage du worker
+_course_text_index_task = None
+
+async def _load_course_text_index():
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, ensure_course_index)
+        # Colonnes de texte de la matrice des cours recalculées avec l'index
+        course_features.invalidate()
+    except Exception as e:
+        logger.warning("Index du texte des cours indisponible: %s", e)
+
+@app.on_event("startup")
+async def start_course_text_index():
+    global _course_text_index_task
+    _course_text_index_task = asyncio.create_task(_load_course_text_index())
+
+@app.on_event("shutdown")
+async def stop_course_text_index():
+    if _course_text_index_task is not None:
+        _course_text_index_task.cancel()
+
+# Arrêt du pool de vérification des mots de passe
+@app.on_event("shutdown")
+async def stop_password_verifier():
+    password_verifier.shutdown()
+
+# Libération des pools de connexions à l'arrêt du worker
+@app.on_event("shutdown")
+async def dispose_database_engines():
+    await async_engine.dispose()
+    engine.dispose()
+
+# Vidage de la file de journalisation à l'arrêt du worker
+@app.on_event("shutdown")
+async def flush_logs():
+    shutdown_logging()
+
 # Schéma d'authentification
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
 
+# Métriques au format texte Prometheus (fonction synchrone, exécutée dans le
+# pool de threads : en multi-processus, les instantanés sont lus et écrits sur disque)
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
+
 # Route racine
 @app.get("/")
 async def root():
@@ -46,8 +184,8 @@ from .api import users, courses, auth, recommendations, interactions, student_da
 
 # Ajouter des logs pour déboguer
 import sys
-print("Chemins Python:", sys.path)
-print("Tentative d'importation de teacher_courses...")
+logger.debug("Chemins Python: %s", sys.path)
+logger.debug("Tentative d'importation de teacher_courses...")
 
 try:
     from .api.v1.endpoints import (
@@ -55,17 +193,17 @@ try:
         teacher_courses, progress, courses as courses_v1, 
         student_courses, enrollments
     )
-    print("Import des modules API réussi!")
-    print("Routes disponibles dans teacher_courses:", [route.path for route in teacher_courses.router.routes])
+    logger.debug("Import des modules API réussi!")
+    logger.debug("Routes disponibles dans teacher_courses: %s", [route.path for route in teacher_courses.router.routes])
 except Exception as e:
-    print("Erreur lors de l'importation des modules API:", str(e))
+    logger.error("Erreur lors de l'importation des modules API: %s", e)
     # Fallback à l'ancien import
     from .api.v1.endpoints import quiz, assignment, discussion, recommendation, courses as teacher_courses
     from .api.v1.endpoints import courses as courses_v1
     # Importer les routeurs séparément pour éviter les conflits
     from .api.v1.endpoints.progress import router as progress_router
     from .api.v1.endpoints import student_courses, enrollments
-    print("Fallback à l'importation de base des modules API")
+    logger.warning("Fallback à l'importation de base des modules API")
 else:
     # Importer le routeur de progression normalement si le premier import a réussi
     from .api.v1.endpoints.progress import router as progress_router
@@ -111,9 +249,7 @@ async def not_found_exception_handler(request, exc):
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     # Journaliser l'erreur pour le débogage
-    import traceback
-    print(f"Erreur non gérée: {str(exc)}")
-    traceback.print_exc()
+    logger.error("Erreur non gérée: %s", exc, exc_info=exc)
     
     # Retourner une réponse JSON avec le code d'erreur 500
     return JSONResponse(
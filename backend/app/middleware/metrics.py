@@ -0,0 +1,38 @@
+import time
+
+from ..core.metrics import request_metrics
+from .route_labels import UNMATCHED_ROUTE, get_route_path
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI qui alimente les métriques HTTP exposées sur /metrics :
+    nombre de requêtes, erreurs 5xx, histogramme de latence par route et
+    requêtes en cours. Les compteurs sont mis à jour depuis la boucle
+    d'événements, sans verrou.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+        request_metrics.in_flight += 1
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_metrics.in_flight -= 1
+            route = get_route_path(scope) or UNMATCHED_ROUTE
+            request_metrics.observe(scope["method"], route, status_code, time.perf_counter() - start)
@@ -0,0 +1,57 @@
+import logging
+
+from ..db.instrumentation import start_request_stats, stop_request_stats
+from .route_labels import get_route_label
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStatsMiddleware:
+    """
+    Middleware ASGI qui collecte les statistiques SQL de chaque requête HTTP.
+
+    Ajoute un en-tête `Server-Timing` (nombre de requêtes SQL, temps total en
+    base, requête la plus lente) et écrit une ligne de journal structurée à la
+    fin de la requête. Les requêtes SQL exécutées après l'envoi des en-têtes
+    (fermeture des sessions) ne figurent que dans le journal.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_request_stats(lambda: get_route_label(scope))
+        status_code = 500
+
+        async def send_with_server_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", self._server_timing(stats).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            stop_request_stats(token)
+            summary = stats.to_dict()
+            summary["status"] = status_code
+            logger.info(
+                "request_db_stats endpoint=%s status=%s queries=%d db_time_ms=%.1f slowest_ms=%.1f",
+                summary["endpoint"] or scope.get("path"), status_code, summary["queries"],
+                summary["db_time_ms"], summary["slowest_ms"],
+                extra={"db_stats": summary},
+            )
+
+    @staticmethod
+    def _server_timing(stats) -> str:
+        return (
+            f'db;dur={stats.total_time * 1000:.1f};desc="{stats.count} queries", '
+            f"db-slowest;dur={stats.slowest_time * 1000:.1f}"
+        )
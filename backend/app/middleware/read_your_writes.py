@@ -0,0 +1,40 @@
+from ..config import settings
+from ..db.routing import LAST_WRITE_COOKIE, last_write_cookie, start_request_writes, stop_request_writes
+
+
+class ReadYourWritesMiddleware:
+    """
+    Middleware ASGI qui pose le cookie de lecture de ses propres écritures.
+
+    Si la requête a validé une écriture avant l'envoi des en-têtes, la réponse
+    porte un cookie signé avec la date de cette écriture : les requêtes
+    suivantes de l'utilisateur lisent la base principale pendant
+    DB_READ_YOUR_WRITES_SECONDS, quel que soit le worker qui les traite
+    (voir app/db/routing.py).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        writes, token = start_request_writes()
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and writes.written_at is not None:
+                cookie = (
+                    f"{LAST_WRITE_COOKIE}={last_write_cookie(writes.principal, writes.written_at)}; "
+                    f"Max-Age={settings.DB_READ_YOUR_WRITES_SECONDS}; Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = {**message, "headers": list(message.get("headers", [])) + [
+                    (b"set-cookie", cookie.encode("latin-1"))
+                ]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            stop_request_writes(token)
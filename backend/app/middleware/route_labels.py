@@ -0,0 +1,35 @@
+from typing import Dict, Optional
+
+# Libellé des requêtes qui ne correspondent à aucune route (404)
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Correspondance fonction de route -> chemin déclaré, par application
+_route_paths: Dict[int, Dict] = {}
+
+
+def get_route_path(scope) -> Optional[str]:
+    """
+    Retourne le chemin déclaré de la route (ex: /api/v1/quizzes/{quiz_id}).
+
+    La route n'est connue qu'après le routage (Starlette renseigne
+    scope["endpoint"]) ; retourne None avant.
+    """
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return None
+    app = scope.get("app")
+    paths = _route_paths.get(id(app))
+    if paths is None:
+        paths = {}
+        for route in getattr(app, "routes", []):
+            paths.setdefault(getattr(route, "endpoint", None), getattr(route, "path", None))
+        _route_paths[id(app)] = paths
+    return paths.get(endpoint) or scope.get("path")
+
+
+def get_route_label(scope) -> Optional[str]:
+    """Libellé `MÉTHODE /chemin/déclaré` d'une requête, ou None si la route n'est pas encore résolue."""
+    path = get_route_path(scope)
+    if path is None:
+        return None
+    return f"{scope.get('method')} {path}"
@@ -1,40 +1,68 @@
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
-from sqlalchemy.orm import Session
+import logging
+import re
+from typing import Callable, Iterable
+from urllib.parse import parse_qsl
 
-from ..database import SessionLocal
 from ..services import interaction_service
 
-class PageViewTrackingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Ignorer les requêtes non-GET et les fichiers statiques
-        if request.method != 'GET' or any(path in request.url.path for path in ['/static', '/docs', '/redoc', '/openapi.json']):
-            return await call_next(request)
-        
-        # Vérifier si l'utilisateur est authentifié
-        user = request.state.user if hasattr(request.state, 'user') else None
-        
-        if user and user.is_authenticated:
-            db = SessionLocal()
-            try:
-                # Enregistrer la vue de la page
-                interaction_svc = interaction_service.InteractionService(db)
-                interaction_svc.log_interaction(
-                    user_id=user.id,
-                    entity_type='page',
-                    entity_id=0,  # 0 car c'est une vue de page, pas une entité spécifique
-                    interaction_type='view',
-                    metadata={
-                        'path': request.url.path,
-                        'method': request.method,
-                        'query_params': dict(request.query_params)
-                    }
-                )
-            except Exception as e:
-                # Ne pas échouer la requête en cas d'erreur de suivi
-                print(f"Erreur lors du suivi de la page: {e}")
-            finally:
-                db.close()
-        
-        # Continuer la requête
-        return await call_next(request)
+logger = logging.getLogger(__name__)
+
+# Chemins jamais suivis (préfixes) : fichiers statiques, documentation, métriques
+EXCLUDED_PATH_PREFIXES = ('/static', '/docs', '/redoc', '/openapi.json', '/metrics')
+
+
+def compile_excluded_paths(prefixes: Iterable[str]) -> "re.Pattern[str]":
+    """Expression unique reconnaissant les chemins égaux à un préfixe ou situés en dessous"""
+    alternatives = '|'.join(re.escape(prefix.rstrip('/')) for prefix in prefixes)
+    return re.compile(rf'(?:{alternatives})(?:/|$)')
+
+
+class PageViewTrackingMiddleware:
+    """
+    Middleware ASGI qui enregistre une vue de page pour chaque requête GET
+    authentifiée (hors chemins exclus).
+
+    La réponse n'est ni enveloppée ni mise en mémoire tampon : `send` est
+    transmis tel quel à l'application, ce qui préserve les réponses en flux
+    (FileResponse, téléchargements). L'utilisateur est celui que la dépendance
+    d'authentification a placé dans `request.state.user` ; la vue est confiée
+    après la réponse à `sink` (par défaut le tampon d'ingestion des
+    interactions), qui ne doit pas bloquer.
+    """
+
+    def __init__(
+        self,
+        app,
+        excluded_paths: Iterable[str] = EXCLUDED_PATH_PREFIXES,
+        sink: Callable[..., bool] = interaction_service.InteractionService.queue_interaction
+    ):
+        self.app = app
+        self.excluded = compile_excluded_paths(excluded_paths)
+        self.sink = sink
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or self.excluded.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+        # Renseigné par la dépendance d'authentification (request.state.user)
+        user = scope.get("state", {}).get("user")
+        if user is None:
+            return
+        try:
+            self.sink(
+                user_id=user.id,
+                entity_type='page',
+                entity_id=0,  # 0 car c'est une vue de page, pas une entité spécifique
+                interaction_type='view',
+                metadata={
+                    'path': scope["path"],
+                    'method': scope["method"],
+                    'query_params': dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+                }
+            )
+        except Exception as e:
+            # Ne pas échouer la requête en cas d'erreur de suivi
+            logger.warning("Erreur lors du suivi de la page: %s", e)
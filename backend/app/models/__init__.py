@@ -5,11 +5,11 @@ from ..database import Base
 from .user import User
 from .quiz import Quiz, QuizQuestion, QuizOption
 from .progress import UserProgress, UserQuizResult, UserRecommendation
-from .interaction import UserInteraction
+from .interaction import UserInteraction, UserInteractionDaily
 from .models import (
     Course, Lesson, Tag, course_tags, Category, Resource, 
     LessonCompletion, Module, course_student, 
-    course_prerequisites, CourseStatus
+    course_prerequisites, course_terms, CourseStatus
 )
 
 # Import des modèles de messagerie
@@ -32,14 +32,14 @@ __all__ = [
     'UserProgress', 'UserQuizResult', 'UserRecommendation',
     
     # Interaction
-    'UserInteraction',
+    'UserInteraction', 'UserInteractionDaily',
     
     # Messagerie
     'Discussion', 'Message', 'MessageRead', 'discussion_participants',
     
     # Autres modèles
     'Tag', 'course_tags', 'Category', 'Resource', 'LessonCompletion',
-    'Module', 'course_student', 'course_prerequisites', 'CourseStatus'
+    'Module', 'course_student', 'course_prerequisites', 'course_terms', 'CourseStatus'
 ]
 
 # Configuration des relations après l'import de tous les modèles
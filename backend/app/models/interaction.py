@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey, Index, Text
+from sqlalchemy import Column, Integer, String, Date, DateTime, JSON, ForeignKey, Index, Text
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.mysql import LONGTEXT
 from sqlalchemy.ext.declarative import declared_attr
@@ -20,6 +20,8 @@ class UserInteraction(Base):
         Index('idx_entity', 'entity_type', 'entity_id'),
         Index('idx_interaction_type', 'interaction_type'),
         Index('idx_created_at', 'created_at'),
+        # Historique d'un utilisateur par date décroissante (pagination par curseur)
+        Index('idx_user_created', 'user_id', 'created_at'),
         {
             'mysql_engine': 'InnoDB',
             'mysql_charset': 'utf8mb4',
@@ -136,3 +138,44 @@ class UserInteraction(Base):
         if not self.interaction_metadata:
             return default
         return self.interaction_metadata.get(key, default)
+
+
+class UserInteractionDaily(Base):
+    """
+    Agrégat quotidien des interactions d'un utilisateur.
+
+    Une ligne par (utilisateur, jour UTC, type d'entité, type d'interaction),
+    mise à jour dans la transaction qui enregistre les interactions (voir
+    app/db/interaction_rollups.py). Les statistiques lisent ces agrégats :
+    elles restent disponibles après la purge des interactions brutes.
+    """
+    __tablename__ = "user_interaction_daily"
+    __table_args__ = (
+        {
+            'mysql_engine': 'InnoDB',
+            'mysql_charset': 'utf8mb4',
+            'mysql_collate': 'utf8mb4_unicode_ci'
+        },
+    )
+
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE", name="fk_interaction_daily_user"),
+        primary_key=True,
+        comment="ID de l'utilisateur"
+    )
+    day = Column(Date, primary_key=True, comment="Jour (UTC) des interactions")
+    entity_type = Column(String(50), primary_key=True, comment="Type d'entité")
+    interaction_type = Column(String(50), primary_key=True, comment="Type d'interaction")
+    count = Column(Integer, nullable=False, default=0, comment="Nombre d'interactions du jour")
+    last_interaction_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        comment="Date et heure de la dernière interaction du jour"
+    )
+
+    def __repr__(self):
+        return (
+            f"<UserInteractionDaily(user_id={self.user_id}, day={self.day}, "
+            f"{self.entity_type}/{self.interaction_type}={self.count})>"
+        )
@@ -1,4 +1,5 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, DateTime, Table, Float, Enum
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, DateTime, Table, Float, Enum, Index
+from sqlalchemy.dialects.mysql import VARCHAR
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -28,6 +29,18 @@ course_prerequisites = Table(
     Column('prerequisite_id', Integer, ForeignKey('courses.id'))
 )
 
+# Index inversé du texte des cours (titre, descriptions, tags) : occurrences
+# de chaque terme par cours (voir app/services/course_text_index.py). Les
+# termes sont comparés octet par octet : « avancé » et « avance » diffèrent
+course_terms = Table(
+    'course_terms',
+    Base.metadata,
+    Column('course_id', Integer, ForeignKey('courses.id', ondelete='CASCADE'), primary_key=True),
+    Column('term', String(100).with_variant(VARCHAR(100, collation='utf8mb4_bin'), 'mysql'), primary_key=True),
+    Column('count', Integer, nullable=False),
+    Index('idx_course_terms_term', 'term')
+)
+
 class CourseStatus(str, enum.Enum):
     # Accepter à la fois les valeurs en majuscules et minuscules pour compatibilité
     DRAFT = "DRAFT"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, String, Boolean, and_
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, String, Boolean, Index, and_
 from sqlalchemy.orm import relationship, foreign
 from sqlalchemy.sql import func
 from ..database import Base
@@ -56,7 +56,13 @@ class UserRecommendation(Base):
     # Raison de la recommandation (basée sur les compétences, le comportement, etc.)
     reason = Column(String(255), nullable=True)
     
+    # Date de génération (identique pour toutes les lignes d'un même calcul)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    __table_args__ = (
+        # Recommandations d'un utilisateur par score décroissant
+        Index('idx_user_recommendation_score', 'user_id', 'score'),
+    )
+    
     def __repr__(self):
         return f"<UserRecommendation user_id={self.user_id} course_id={self.course_id} score={self.score}>"
@@ -17,8 +17,10 @@ class User(Base):
     last_name = Column(String(50), nullable=True)
     role = Column(Enum('etudiant', 'enseignant', 'admin', name='user_role'), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
+    # Incrémentée pour révoquer tous les jetons émis (voir app/core/token_versions.py)
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True, index=True)
     
     # Propriétés calculées pour la compatibilité avec le code existant
     @property
@@ -27,6 +27,28 @@ class PaginatedResponse(GenericModel, Generic[T]):
             'datetime': lambda v: v.isoformat() if v else None
         }
 
+class CursorPaginatedResponse(GenericModel, Generic[T]):
+    """
+    Réponse paginée compatible avec PaginatedResponse, complétée d'un curseur
+    vers la page suivante (pagination par clé, voir app/db/keyset.py).
+    
+    Attributes:
+        items: Liste des éléments de la page courante
+        total: Nombre total d'éléments (None s'il n'a pas été compté)
+        total_is_estimate: Vrai si `total` est une estimation
+        page: Numéro de la page courante (1 en pagination par curseur)
+        limit: Nombre d'éléments par page
+        pages: Nombre total de pages (None sans total)
+        next_cursor: Curseur de la page suivante, None sur la dernière page
+    """
+    items: List[T] = Field(..., description="Liste des éléments de la page courante")
+    total: Optional[int] = Field(None, ge=0, description="Nombre total d'éléments")
+    total_is_estimate: bool = Field(False, description="Nombre total estimé")
+    page: int = Field(1, ge=1, description="Numéro de la page courante")
+    limit: int = Field(20, ge=1, le=100, description="Nombre d'éléments par page")
+    pages: Optional[int] = Field(None, ge=0, description="Nombre total de pages")
+    next_cursor: Optional[str] = Field(None, description="Curseur de la page suivante")
+
 # Import des schémas pour les rendre disponibles directement depuis le package schemas
 from .user import User, UserCreate, UserInDB, UserUpdate, UserLogin, Token, TokenData
 from .course import (
@@ -41,7 +63,7 @@ from .progress import (
     UserRecommendation, UserRecommendationCreate,
     LearningStats
 )
-from .interaction import InteractionBase, InteractionCreate, UserInteraction, UserInteractionStats
+from .interaction import InteractionBase, InteractionCreate, UserInteraction, UserInteractionStats, InteractionAccepted, InteractionBatchItem, InteractionBatchError, InteractionBatchResult
 
 # Cette structure permet d'importer facilement tous les schémas avec:
 # from app.schemas import User, Course, etc.
@@ -93,3 +93,60 @@ class Course(CourseBase):
 class CourseWithProgress(Course):
     progress: Optional[float] = 0.0
     is_enrolled: bool = False
+
+# Détail d'un cours pour son enseignant (GET /courses/{course_id})
+class CourseCategorySummary(BaseModel):
+    id: int
+    name: str
+
+    class Config:
+        from_attributes = True
+
+class CourseStudentSummary(BaseModel):
+    id: int
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: str
+
+    class Config:
+        from_attributes = True
+
+class CourseDetailLesson(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    content: Optional[str] = None
+    video_url: Optional[str] = None
+    duration: Optional[int] = None
+    is_free: Optional[bool] = None
+    order_index: int
+
+    class Config:
+        from_attributes = True
+
+class CourseDetailModule(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    order_index: int
+    order: int
+    lessons: List[CourseDetailLesson] = []
+    lesson_count: int = 0
+
+class CourseDetail(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    short_description: Optional[str] = None
+    status: str
+    price: Optional[float] = None
+    thumbnail_url: Optional[str] = None
+    image: Optional[str] = None
+    category_id: Optional[int] = None
+    category: Optional[CourseCategorySummary] = None
+    modules: List[CourseDetailModule] = []
+    module_count: int = 0
+    student_count: int = 0
+    students: List[CourseStudentSummary] = []
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
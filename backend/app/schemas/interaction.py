@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Dict, Any, Optional, List, Union
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, validator
 from enum import Enum
 
 class EntityType(str, Enum):
@@ -20,7 +20,16 @@ class InteractionType(str, Enum):
     DOWNLOAD = "download"
     SHARE = "share"
 
+class CountMode(str, Enum):
+    """Calcul du nombre total d'éléments d'une liste paginée"""
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    NONE = "none"
+
 class InteractionBase(BaseModel):
+    # Les clients envoient `metadata` : accepté comme l'alias `interaction_metadata`
+    model_config = ConfigDict(populate_by_name=True)
+
     entity_type: EntityType = Field(..., description="Type d'entité (course, lesson, quiz, etc.)")
     entity_id: int = Field(..., description="ID de l'entité")
     interaction_type: InteractionType = Field(..., description="Type d'interaction (view, click, complete, etc.)")
@@ -51,6 +60,26 @@ class UserInteraction(InteractionBase):
             datetime: lambda v: v.isoformat()
         }
 
+class InteractionBatchItem(InteractionCreate):
+    """Interaction d'un lot envoyé par la file d'événements du client"""
+    client_timestamp: Optional[datetime] = Field(
+        None,
+        description="Date et heure de l'interaction côté client (par défaut, réception du lot)"
+    )
+
+class InteractionBatchError(BaseModel):
+    index: int = Field(..., description="Position de l'interaction refusée dans le lot")
+    errors: List[str]
+
+class InteractionBatchResult(BaseModel):
+    accepted: int
+    rejected: int
+    errors: List[InteractionBatchError] = []
+
+class InteractionAccepted(BaseModel):
+    """Interaction acceptée, écrite en base par lots en tâche de fond"""
+    status: str = "accepted"
+
 class UserInteractionStats(BaseModel):
     total_interactions: int
     last_interaction: Optional[datetime]
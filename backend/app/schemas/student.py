@@ -81,3 +81,63 @@ class LessonCompleteResponse(BaseModel):
     success: bool
     message: str
     courseProgress: float
+
+# Catalogue des cours (/student/all-courses)
+class CatalogInstructor(BaseModel):
+    id: Optional[int] = None
+    name: str
+    avatar: Optional[str] = None
+
+class CatalogCategory(BaseModel):
+    id: Optional[int] = None
+    name: str
+    description: Optional[str] = None
+
+class CatalogTag(BaseModel):
+    id: int
+    name: str
+
+    class Config:
+        from_attributes = True
+
+class CatalogLesson(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    duration: Optional[int] = None
+    order_index: Optional[int] = None
+    is_completed: bool = False
+    is_free: Optional[bool] = None
+
+    class Config:
+        from_attributes = True
+
+class CatalogModule(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    order_index: int
+    lessons: List[CatalogLesson] = []
+
+class CatalogCourse(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    short_description: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    price: float
+    status: str
+    level: str
+    difficulty_level: str
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    instructor: CatalogInstructor
+    category: CatalogCategory
+    tags: List[CatalogTag] = []
+    modules: List[CatalogModule] = []
+    progress: float = 0
+    is_enrolled: bool = False
+    students_count: int = 0
+    average_rating: float
+    isNew: bool
+    isPopular: bool
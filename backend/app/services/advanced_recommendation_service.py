@@ -18,6 +18,8 @@ from ..models.user import User
 from ..models.models import Course, Category, course_student
 from ..models.progress import UserProgress, UserQuizResult
 from ..models.interaction import UserInteraction
+from .course_features import course_features
+from .recommendation_utils import RecommendationUtils
 
 logger = logging.getLogger(__name__)
 
@@ -174,43 +176,43 @@ class AdvancedRecommendationService:
     def get_ai_powered_recommendations(self, user_id: int, limit: int = 8) -> List[Dict[str, Any]]:
         """Recommandations alimentées par IA avec scoring avancé."""
         try:
-            user_profile = self._build_user_profile(user_id)
-            
-            # Algorithme de scoring IA avancé
-            all_courses = self.db.query(Course, Category).join(
-                Category, Course.category_id == Category.id
-            ).filter(
-                Course.is_active == True,
-                ~Course.id.in_(
-                    self.db.query(Enrollment.course_id).filter(Enrollment.user_id == user_id)
-                )
-            ).all()
+            user_profile = RecommendationUtils.build_user_profile(self.db, user_id)
+            
+            # Score IA multi-factoriel de tous les cours en un produit
+            # matrice × poids (voir course_features.py), puis top-k
+            features = course_features.get(self.db)
+            enrolled_ids = [course_id for (course_id,) in self.db.query(course_student.c.course_id).filter(
+                course_student.c.student_id == user_id
+            )]
+            top = features.top_k(features.ai_scores(user_profile), enrolled_ids, limit, threshold=0.3)
+            courses = {
+                course.id: course
+                for course in self.db.query(Course).filter(Course.id.in_([features.course_id(p) for p, _ in top]))
+            }
             
             ai_recommendations = []
-            for course, category in all_courses:
-                # Score IA multi-factoriel
-                ai_score = self._calculate_ai_score(course, category, user_profile)
+            for position, ai_score in top:
+                course = courses.get(features.course_id(position))
+                if course is None:
+                    continue
                 
-                if ai_score > 0.3:
-                    # Prédiction de réussite
-                    success_probability = self._predict_success_probability(course, user_profile)
-                    
-                    # Estimation du temps d'apprentissage
-                    estimated_duration = self._estimate_learning_time(course, user_profile)
-                    
-                    ai_recommendations.append({
-                        "course": course,
-                        "score": ai_score,
-                        "explanation": f"IA recommande ce cours avec {success_probability:.0f}% de chance de réussite",
-                        "confidence": min(ai_score * 100, 95),
-                        "success_probability": success_probability,
-                        "estimated_duration": estimated_duration,
-                        "ai_powered": True
-                    })
-            
-            # Trier par score IA et diversifier
-            ai_recommendations.sort(key=lambda x: x["score"], reverse=True)
-            return self._diversify_ai_recommendations(ai_recommendations[:limit])
+                # Prédiction de réussite
+                success_probability = RecommendationUtils.predict_success_probability(course, user_profile)
+                
+                # Estimation du temps d'apprentissage
+                estimated_duration = RecommendationUtils.estimate_learning_time(course, user_profile)
+                
+                ai_recommendations.append({
+                    "course": course,
+                    "score": ai_score,
+                    "explanation": f"IA recommande ce cours avec {success_probability:.0f}% de chance de réussite",
+                    "confidence": min(ai_score * 100, 95),
+                    "success_probability": success_probability,
+                    "estimated_duration": estimated_duration,
+                    "ai_powered": True
+                })
+            
+            return ai_recommendations
             
         except Exception as e:
             logger.error(f"Error getting AI recommendations: {e}")
@@ -1,61 +1,29 @@
+import logging
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..models.user import User
 from ..database import get_db
+from ..db.projections import fetch_one
 from ..schemas.token import TokenData
 from ..config import settings
-
-# Configuration for password hashing
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    bcrypt__default_rounds=12
+from ..core.principal_cache import principal_cache, token_key
+from ..core.token_versions import token_versions
+from ..core.passwords import (
+    pwd_context, hash_password, verify_password, verify_and_update, password_verifier, PasswordVerifierBusy
 )
+from .user_service import UserListItem
 
-# Fonction pour vérifier le mot de passe avec plus de logs
-def verify_password_debug(plain_password: str, hashed_password: str) -> bool:
-    """Vérifie un mot de passe avec des logs détaillés."""
-    print(f"\n=== DÉBUT VÉRIFICATION MOT DE PASSE ===")
-    print(f"Mot de passe fourni: {plain_password}")
-    print(f"Hash stocké: {hashed_password}")
-    
-    # Vérifier si le hash commence par $2b$
-    if not hashed_password.startswith('$2b$'):
-        print("ERREUR: Le hash ne commence pas par $2b$")
-        return False
-    
-    # Vérifier le format du hash
-    try:
-        # Essayer de vérifier le mot de passe
-        is_valid = pwd_context.verify(plain_password, hashed_password)
-        print(f"Résultat de la vérification: {'SUCCÈS' if is_valid else 'ÉCHEC'}")
-        
-        # Si échec, essayer de générer un nouveau hash pour débogage
-        if not is_valid:
-            print("\nEssai de génération d'un nouveau hash avec le même mot de passe:")
-            new_hash = pwd_context.hash(plain_password)
-            print(f"Nouveau hash généré: {new_hash}")
-            print(f"Ancien hash: {hashed_password}")
-            print(f"Les hashes sont-ils identiques? {new_hash == hashed_password}")
-            
-            # Essayer de vérifier avec le nouveau hash
-            print("\nEssai de vérification avec le nouveau hash:")
-            is_new_hash_valid = pwd_context.verify(plain_password, new_hash)
-            print(f"Le nouveau hash est {'valide' if is_new_hash_valid else 'invalide'}")
-            
-        return is_valid
-    except Exception as e:
-        print(f"ERREUR lors de la vérification du mot de passe: {str(e)}")
-        return False
+logger = logging.getLogger(__name__)
 
-# Remplacer la fonction verify_password existante par notre version de débogage
-verify_password = verify_password_debug
+# Le hachage et la vérification des mots de passe (pool borné, mise à niveau
+# des anciens hash) sont définis dans app/core/passwords.py
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
@@ -68,7 +36,7 @@ ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
 def get_password_hash(password: str) -> str:
     """Generate a password hash."""
-    return pwd_context.hash(password)
+    return hash_password(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token with user information."""
@@ -88,8 +56,76 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    """Get the current user from the token with enhanced error handling."""
+def user_claims(user: User) -> dict:
+    """
+    Informations de l'utilisateur portées par son jeton d'accès : elles
+    suffisent à authentifier les requêtes suivantes sans relire la base.
+    """
+    return {
+        "sub": str(user.id),   # Sujet du token (ID de l'utilisateur converti en chaîne)
+        "username": user.username,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "role": user.role,
+        "is_active": user.is_active,
+        # Révocation : le jeton n'est plus accepté dès que la version de l'utilisateur change
+        "token_version": user.token_version or 0,
+    }
+
+def _revoked_token_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Jeton révoqué, veuillez vous reconnecter",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def get_principal(db: Session, token: str, payload: dict, user_id: int) -> Optional[UserListItem]:
+    """
+    Utilisateur d'un jeton déjà décodé (`payload`).
+
+    Si le jeton porte les informations de l'utilisateur (voir `user_claims`)
+    et que la table des versions est à jour, le principal est construit à
+    partir du jeton, sans accès à la base. Sinon (jeton antérieur, table
+    périmée), l'utilisateur est lu dans le cache des principaux ou relu en
+    base (colonnes utiles uniquement) puis mis en cache jusqu'à l'expiration
+    du jeton. Lève une 401 si le jeton a été révoqué ; None si l'utilisateur
+    n'existe pas.
+    """
+    version = payload.get("token_version")
+    if version is not None and token_versions.is_fresh():
+        if version != token_versions.get(user_id):
+            logger.info("Jeton révoqué", extra={"user_id": user_id})
+            raise _revoked_token_exception()
+        return UserListItem(
+            user_id, payload.get("username"), payload.get("email"),
+            payload.get("first_name"), payload.get("last_name"), payload.get("role"),
+            payload.get("is_active", True), version, None, None,
+        )
+
+    key = token_key(token)
+    principal = principal_cache.get(key)
+    if principal is None or principal.id != user_id:
+        principal = fetch_one(db, UserListItem, UserListItem.select().where(User.id == user_id))
+        if principal is None:
+            return None
+        principal_cache.put(key, user_id, principal, payload.get("exp"))
+
+    if version is not None and version != principal.token_version:
+        logger.info("Jeton révoqué", extra={"user_id": user_id})
+        raise _revoked_token_exception()
+    return principal
+
+def get_current_user(
+    request: Request, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+) -> UserListItem:
+    """
+    Get the current user from the token with enhanced error handling.
+    Synchronous on purpose: FastAPI runs it in the threadpool, so the
+    blocking user lookup never runs on the event loop.
+    The user is served from the principal cache when possible and kept in
+    `request.state.user` for page view tracking.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -102,40 +138,42 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         user_id_str: str = payload.get("sub")
         
         if not user_id_str:
-            print("Aucun ID utilisateur trouvé dans le token")
+            logger.info("Aucun ID utilisateur trouvé dans le token")
             raise credentials_exception
             
         # Vérifier le type de token
         if payload.get("type") != "access":
-            print(f"Type de token invalide: {payload.get('type')}")
+            logger.info("Type de token invalide: %s", payload.get('type'))
             raise credentials_exception
             
         # Convertir l'ID utilisateur en entier
         try:
             user_id = int(user_id_str)
         except (ValueError, TypeError):
-            print(f"Erreur: Impossible de convertir l'ID utilisateur '{user_id_str}' en entier")
+            logger.info("ID utilisateur du token non entier")
             raise credentials_exception
             
-        # Rechercher l'utilisateur par ID
-        user = db.query(User).filter(User.id == user_id).first()
+        # Rechercher l'utilisateur par ID (cache des principaux, puis base)
+        user = get_principal(db, token, payload, user_id)
         
         if not user:
-            print(f"Aucun utilisateur trouvé avec l'ID: {user_id}")
+            logger.info("Aucun utilisateur trouvé pour le token", extra={"user_id": user_id})
             raise credentials_exception
             
-        # Retourner directement l'utilisateur SQLAlchemy
-        # La conversion en Pydantic sera gérée par la route
+        # La conversion en Pydantic est faite par get_current_active_user
+        request.state.user = user
         return user
         
+    except HTTPException:
+        raise
     except JWTError as e:
-        print(f"Erreur JWT: {str(e)}")
+        logger.info("Erreur JWT: %s", e)
         raise credentials_exception
     except Exception as e:
-        print(f"Erreur inattendue lors de la récupération de l'utilisateur: {str(e)}")
+        logger.exception("Erreur inattendue lors de la récupération de l'utilisateur")
         raise credentials_exception
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: UserListItem = Depends(get_current_user)) -> User:
     """Get the current active user."""
     from app.schemas.user import User as UserSchema
     
@@ -149,56 +187,88 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
     # Si l'utilisateur est déjà un modèle Pydantic, vérifier s'il est actif
     if isinstance(current_user, UserSchema):
         if not current_user.is_active:
-            print(f"Tentative d'accès refusée: compte désactivé pour l'utilisateur {current_user.email}")
+            logger.info("Accès refusé: compte désactivé", extra={"user_id": current_user.id})
             raise inactive_error
         return current_user
     
-    # Si c'est un modèle SQLAlchemy, vérifier s'il est actif
+    # Sinon (principal ou modèle SQLAlchemy), vérifier s'il est actif
     if not current_user.is_active:
-        print(f"Tentative d'accès refusée: compte désactivé pour l'utilisateur {current_user.email}")
+        logger.info("Accès refusé: compte désactivé", extra={"user_id": current_user.id})
         raise inactive_error
     
     return UserSchema.from_orm(current_user)
 
-def authenticate_user(db: Session, email: str, password: str):
+def _check_login_allowed(user: Optional[User]) -> bool:
     """
-    Authenticate a user with email and password.
-    Vérifie également si le compte utilisateur est actif.
+    Vérifie, avant le mot de passe, que l'identifiant existe et que le compte
+    est actif (403 sinon).
     """
-    from fastapi import HTTPException
-    from fastapi import status
-    
-    print(f"Tentative d'authentification pour l'email: {email}")
-    
-    # Recherche par email ou nom d'utilisateur
-    user = db.query(User).filter(
-        (User.email == email) | (User.username == email)
-    ).first()
-    
     if not user:
-        print(f"Aucun utilisateur trouvé avec l'email/nom d'utilisateur: {email}")
+        logger.info("Authentification: identifiant inconnu")
         return False
     
-    print(f"Utilisateur trouvé: {user.email} (ID: {user.id})")
-    print(f"Statut actif: {'Oui' if user.is_active else 'Non'}")
-    
-    # Vérifier si le compte est actif avant de vérifier le mot de passe
     if not user.is_active:
-        print(f"Tentative de connexion refusée: le compte est désactivé pour l'utilisateur {email}")
+        logger.info("Connexion refusée: compte désactivé", extra={"user_id": user.id})
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Ce compte a été désactivé",
             headers={"X-Error-Code": "ACCOUNT_DISABLED"}
         )
+    return True
+
+def _apply_password_check(user: User, valid: bool, new_hash: Optional[str]) -> bool:
+    """Journalise le résultat et remplace le hash à mettre à niveau (à valider par l'appelant)."""
+    if not valid:
+        logger.info("Échec de la vérification du mot de passe", extra={"user_id": user.id})
+        return False
+    if new_hash is not None:
+        # Ancien format (SHA-256 `sel$hash`) ou coût bcrypt obsolète
+        user.password_hash = new_hash
+        logger.info("Hash du mot de passe mis à niveau", extra={"user_id": user.id})
+    logger.debug("Authentification réussie", extra={"user_id": user.id})
+    return True
+
+def authenticate_user(db: Session, email: str, password: str):
+    """
+    Authenticate a user with email and password.
+    Vérifie également si le compte utilisateur est actif et met à niveau
+    le hash du mot de passe si nécessaire. Bloquant (coût bcrypt).
+    """
+    # Recherche par email ou nom d'utilisateur
+    user = db.query(User).filter(
+        (User.email == email) | (User.username == email)
+    ).first()
+    
+    # Vérifier si le compte est actif avant de vérifier le mot de passe
+    if not _check_login_allowed(user):
+        return False
     
-    print(f"Hash du mot de passe stocké: {user.password_hash}")
+    valid, new_hash = verify_and_update(password, user.password_hash)
+    if not _apply_password_check(user, valid, new_hash):
+        return False
+    if new_hash is not None:
+        db.commit()
+    return user
+
+async def authenticate_user_async(db: AsyncSession, email: str, password: str):
+    """
+    Équivalent asynchrone de `authenticate_user` : la vérification du mot de
+    passe s'exécute dans le pool borné de app/core/passwords.py. Lève
+    PasswordVerifierBusy si la file de vérification est pleine.
+    """
+    result = await db.execute(select(User).where(
+        (User.email == email) | (User.username == email)
+    ))
+    user = result.scalars().first()
     
-    # Vérifier le mot de passe
-    if not verify_password(password, user.password_hash):
-        print("Échec de la vérification du mot de passe")
+    if not _check_login_allowed(user):
         return False
     
-    print("Authentification réussie!")
+    valid, new_hash = await password_verifier.verify_and_update(password, user.password_hash)
+    if not _apply_password_check(user, valid, new_hash):
+        return False
+    if new_hash is not None:
+        await db.commit()
     return user
 
 def create_user(db: Session, user_data: dict):
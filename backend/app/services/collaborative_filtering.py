@@ -0,0 +1,181 @@
+"""
+Filtrage collaboratif sur matrice creuse (NumPy / SciPy).
+
+La matrice des notes utilisateur × cours (CSR) est construite en une seule
+lecture de la base :
+
+- 1.0 pour chaque inscription (course_student) ;
+- sinon, meilleur score de quiz du cours / 100 (user_quiz_results, via la
+  leçon du quiz).
+
+La similarité cosinus entre cours (item-item) est calculée une fois par
+produit de matrices creuses, Xᵀ·X sur les colonnes normalisées ; les
+similarités inférieures à `min_similarity` sont supprimées pour garder la
+matrice creuse. Le score d'un cours pour un utilisateur est la moyenne,
+pondérée par ses notes, de la similarité entre ce cours et les cours qu'il
+suit : un produit ligne creuse × matrice, puis une sélection top-k par
+`argpartition`. Plusieurs utilisateurs se notent en un seul produit
+(`recommend_many`).
+
+Le modèle est partagé par le worker (`collaborative_models`) et reconstruit
+au plus toutes les RECOMMENDATION_MODEL_TTL secondes.
+"""
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.models import Lesson, course_student
+from ..models.progress import UserQuizResult
+from ..models.quiz import Quiz
+
+logger = logging.getLogger(__name__)
+
+
+def load_ratings(db: Session) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Notes (utilisateurs, cours, valeurs) lues en deux requêtes, sans passer par l'ORM."""
+    enrollments = db.execute(select(course_student.c.student_id, course_student.c.course_id)).all()
+    quiz_scores = db.execute(
+        select(UserQuizResult.user_id, Lesson.course_id, func.max(UserQuizResult.score))
+        .join(Quiz, Quiz.id == UserQuizResult.quiz_id)
+        .join(Lesson, Lesson.id == Quiz.lesson_id)
+        .group_by(UserQuizResult.user_id, Lesson.course_id)
+    ).all()
+
+    users = np.fromiter((row[0] for row in enrollments), dtype=np.int64, count=len(enrollments))
+    courses = np.fromiter((row[1] for row in enrollments), dtype=np.int64, count=len(enrollments))
+    values = np.ones(len(enrollments), dtype=np.float32)
+    if quiz_scores:
+        users = np.concatenate([users, np.fromiter((row[0] for row in quiz_scores), dtype=np.int64)])
+        courses = np.concatenate([courses, np.fromiter((row[1] for row in quiz_scores), dtype=np.int64)])
+        values = np.concatenate([
+            values, np.clip(np.fromiter((row[2] for row in quiz_scores), dtype=np.float32) / 100.0, 0.0, 1.0)
+        ])
+    return users, courses, values
+
+
+class CollaborativeModel:
+    """Matrice des notes et similarités entre cours, indexées par position."""
+
+    def __init__(self, user_ids: np.ndarray, course_ids: np.ndarray, ratings: sparse.csr_matrix,
+                 similarity: sparse.csr_matrix):
+        self.user_ids = user_ids
+        self.course_ids = course_ids
+        self.ratings = ratings
+        self.similarity = similarity
+        self.built_at = time.monotonic()
+        self._user_index = {int(user_id): index for index, user_id in enumerate(user_ids)}
+
+    @classmethod
+    def from_ratings(cls, users: np.ndarray, courses: np.ndarray, values: np.ndarray,
+                     min_similarity: float = 0.01) -> "CollaborativeModel":
+        """Construit le modèle ; une paire (utilisateur, cours) répétée garde la note la plus haute."""
+        user_ids, user_positions = np.unique(users, return_inverse=True)
+        course_ids, course_positions = np.unique(courses, return_inverse=True)
+        shape = (len(user_ids), len(course_ids))
+
+        # Maximum par paire : tri par (paire, note) puis dernière valeur de chaque paire
+        keys = user_positions.astype(np.int64) * max(len(course_ids), 1) + course_positions
+        order = np.lexsort((values, keys))
+        keys, values = keys[order], values[order]
+        last = np.ones(len(keys), dtype=bool)
+        if len(keys):
+            last[:-1] = keys[1:] != keys[:-1]
+        keys, values = keys[last], values[last]
+        rows, cols = np.divmod(keys, max(len(course_ids), 1))
+        ratings = sparse.csr_matrix((values.astype(np.float32), (rows, cols)), shape=shape)
+
+        # Cosinus entre colonnes : Xᵀ·X sur les colonnes de norme 1
+        norms = np.sqrt(np.asarray(ratings.multiply(ratings).sum(axis=0)).ravel())
+        norms[norms == 0] = 1.0
+        normalized = ratings @ sparse.diags((1.0 / norms).astype(np.float32))
+        similarity = (normalized.T @ normalized).tocsr()
+        similarity.setdiag(0)
+        if min_similarity > 0:
+            similarity.data[similarity.data < min_similarity] = 0
+        similarity.eliminate_zeros()
+        return cls(user_ids, course_ids, ratings, similarity.astype(np.float32))
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._user_index
+
+    def _top_k(self, scores: np.ndarray, rated: np.ndarray, limit: int) -> List[Tuple[int, float]]:
+        scores[rated] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(scores[candidates], -limit)[-limit:]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(self.course_ids[c]), float(scores[c])) for c in candidates]
+
+    def recommend_many(self, user_ids: Iterable[int], limit: int) -> Dict[int, List[Tuple[int, float]]]:
+        """
+        Cours recommandés (identifiant, score entre 0 et 1) pour plusieurs
+        utilisateurs, en un seul produit de matrices. Les utilisateurs
+        absents de la matrice (aucune inscription) ne figurent pas dans le
+        résultat.
+        """
+        known = [user_id for user_id in user_ids if user_id in self._user_index]
+        if not known or self.similarity.nnz == 0:
+            return {user_id: [] for user_id in known}
+        rows = self.ratings[[self._user_index[user_id] for user_id in known]]
+        scores = (rows @ self.similarity).toarray()
+        # Moyenne pondérée par les notes de l'utilisateur
+        weights = np.asarray(rows.sum(axis=1)).ravel()
+        weights[weights == 0] = 1.0
+        scores /= weights[:, None]
+
+        result = {}
+        for position, user_id in enumerate(known):
+            row = rows.getrow(position)
+            result[user_id] = self._top_k(scores[position], row.indices, limit)
+        return result
+
+    def recommend(self, user_id: int, limit: int) -> List[Tuple[int, float]]:
+        """Cours recommandés (identifiant, score entre 0 et 1) pour un utilisateur."""
+        return self.recommend_many([user_id], limit).get(user_id, [])
+
+
+def build_model(db: Session) -> CollaborativeModel:
+    start = time.perf_counter()
+    model = CollaborativeModel.from_ratings(*load_ratings(db), min_similarity=settings.RECOMMENDATION_MIN_SIMILARITY)
+    logger.info(
+        "Modèle collaboratif construit: %d utilisateurs, %d cours, %d notes, %d similarités en %.2f s",
+        len(model.user_ids), len(model.course_ids), model.ratings.nnz, model.similarity.nnz,
+        time.perf_counter() - start,
+    )
+    return model
+
+
+class CollaborativeModelCache:
+    """Modèle partagé par le worker, reconstruit après `ttl` secondes ou sur invalidation."""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._model: Optional[CollaborativeModel] = None
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def get(self, db: Session) -> CollaborativeModel:
+        model = self._model
+        if model is not None and time.monotonic() - model.built_at < self.ttl:
+            return model
+        with self._lock:
+            # Un seul thread reconstruit ; les autres attendent le même modèle
+            model = self._model
+            if model is None or time.monotonic() - model.built_at >= self.ttl:
+                model = build_model(db)
+                self._model = model
+                self.builds += 1
+            return model
+
+    def invalidate(self) -> None:
+        self._model = None
+
+
+collaborative_models = CollaborativeModelCache(settings.RECOMMENDATION_MODEL_TTL)
@@ -0,0 +1,304 @@
+"""
+Matrice de caractéristiques des cours pour le scoring par contenu.
+
+Chaque cours publié est décrit une fois par une ligne dense (NumPy, float32) :
+
+- catégorie (one-hot, une colonne par catégorie) ;
+- niveau déduit du texte (débutant / intermédiaire / avancé, one-hot) ;
+- popularité, min(inscrits / 100, 1) ;
+- mots-clés : présence du nom de chaque catégorie dans le texte du cours ;
+- correspondance avec chaque style d'apprentissage.
+
+Les colonnes issues du texte sont lues dans l'index TF-IDF des cours
+(course_text_index.py) : aucun texte n'est analysé ici.
+
+Les scores par contenu (`content_based_advanced`, recommandations « IA »)
+sont linéaires en ces colonnes : un utilisateur se traduit en vecteurs de
+poids et tous les cours sont notés par un seul produit matrice × poids, puis
+une sélection top-k (`np.partition`), au lieu d'une boucle Python et d'une
+requête de popularité par cours.
+
+La matrice est reconstruite toutes les COURSE_FEATURES_TTL secondes (les
+inscriptions font évoluer la popularité). Les cours créés, modifiés ou
+supprimés sont signalés par `invalidate_course` : seules leurs lignes sont
+recalculées au prochain accès dans le worker courant, les autres workers les
+voient au plus tard après le TTL.
+"""
+import copy
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.models import Category, Course, CourseStatus, course_student
+from .course_text_index import DIFFICULTIES, LEARNING_STYLES, CourseTextIndex, course_text_index
+
+logger = logging.getLogger(__name__)
+
+PUBLISHED_STATUSES = (CourseStatus.PUBLISHED, CourseStatus.published)
+
+# Précision des scores comparés par `top_k`
+SCORE_DECIMALS = 5
+
+class CourseFeatures:
+    """Matrice (cours × caractéristiques) et index des colonnes."""
+
+    def __init__(self, category_names: List[str]):
+        self.category_names = category_names
+        self.category_index = {name: index for index, name in enumerate(category_names)}
+        k = len(category_names)
+        self.category_columns = slice(0, k)
+        self.difficulty_columns = slice(k, k + len(DIFFICULTIES))
+        self.popularity_column = k + len(DIFFICULTIES)
+        self.keyword_columns = slice(self.popularity_column + 1, self.popularity_column + 1 + k)
+        self.style_columns = slice(self.keyword_columns.stop, self.keyword_columns.stop + len(LEARNING_STYLES))
+        self.width = self.style_columns.stop
+
+        self.course_ids = np.zeros(0, dtype=np.int64)
+        self.matrix = np.zeros((0, self.width), dtype=np.float32)
+        # Cours publiés et rattachés à une catégorie (seuls notés)
+        self.active = np.zeros(0, dtype=bool)
+        self.categories = np.zeros(0, dtype=np.int32)
+        self.difficulties = np.zeros(0, dtype=np.int8)
+        self._row_index: Dict[int, int] = {}
+        self.built_at = time.monotonic()
+
+    def copy(self) -> "CourseFeatures":
+        """Copie modifiable : les lecteurs de l'instance courante ne voient pas la mise à jour."""
+        clone = copy.copy(self)
+        clone.course_ids = self.course_ids.copy()
+        clone.matrix = self.matrix.copy()
+        clone.active = self.active.copy()
+        clone.categories = self.categories.copy()
+        clone.difficulties = self.difficulties.copy()
+        clone._row_index = dict(self._row_index)
+        return clone
+
+    def set_rows(self, rows: Sequence[tuple], category_names: Dict[int, str], enrolled: Dict[int, int],
+                 text_index: CourseTextIndex, removed: Iterable[int] = ()) -> None:
+        """
+        Ajoute ou remplace les lignes des cours `rows` (id, statut, catégorie)
+        et désactive les cours `removed`. Un cours absent de l'index du texte
+        (sans texte) est de niveau intermédiaire, sans mot-clé ni style.
+        """
+        count = len(rows)
+        course_ids = np.asarray([row[0] for row in rows], dtype=np.int64)
+        categories = np.asarray([
+            self.category_index.get(category_names.get(category_id), -1) for _, _, category_id in rows
+        ], dtype=np.int32)
+        block = np.zeros((count, self.width), dtype=np.float32)
+        block[np.flatnonzero(categories >= 0), self.category_columns.start + categories[categories >= 0]] = 1.0
+        block[:, self.popularity_column] = np.minimum(
+            np.asarray([enrolled.get(course_id, 0) for course_id in course_ids], dtype=np.float32) / 100.0, 1.0
+        )
+
+        text_rows = np.asarray([
+            -1 if position is None else position for position in map(text_index.position, course_ids.tolist())
+        ], dtype=np.int64)
+        indexed = text_rows >= 0
+        difficulties = np.ones(count, dtype=np.int8)
+        difficulties[indexed] = text_index.difficulties()[text_rows[indexed]]
+        block[np.arange(count), self.difficulty_columns.start + difficulties] = 1.0
+        for index, name in enumerate(self.category_names):
+            block[indexed, self.keyword_columns.start + index] = text_index.keyword_presence(name)[text_rows[indexed]]
+        block[indexed, self.style_columns] = text_index.style_matches()[text_rows[indexed]]
+        active = np.asarray([status in PUBLISHED_STATUSES for _, status, _ in rows], dtype=bool) & (categories >= 0)
+
+        positions = np.asarray([
+            -1 if position is None else position for position in map(self._row_index.get, course_ids.tolist())
+        ], dtype=np.int64)
+        known = positions >= 0
+        self.matrix[positions[known]] = block[known]
+        self.categories[positions[known]] = categories[known]
+        self.difficulties[positions[known]] = difficulties[known]
+        self.active[positions[known]] = active[known]
+        for course_id in removed:
+            position = self._row_index.get(course_id)
+            if position is not None:
+                self.active[position] = False
+        new = ~known
+        if new.any():
+            start = len(self.course_ids)
+            self.course_ids = np.concatenate([self.course_ids, course_ids[new]])
+            self.matrix = np.vstack([self.matrix, block[new]])
+            self.categories = np.concatenate([self.categories, categories[new]])
+            self.difficulties = np.concatenate([self.difficulties, difficulties[new]])
+            self.active = np.concatenate([self.active, active[new]])
+            self._row_index.update((int(course_id), start + i) for i, course_id in enumerate(course_ids[new]))
+
+    def scores(self, weights: np.ndarray) -> np.ndarray:
+        """Produit matrice × poids : une colonne de scores par vecteur de poids."""
+        return self.matrix @ weights
+
+    def top_k(self, scores: np.ndarray, exclude: Iterable[int], limit: int,
+              threshold: float) -> List[Tuple[int, float]]:
+        """
+        Meilleurs cours actifs (position, score) au-dessus de `threshold`, hors
+        cours `exclude`, par score décroissant puis ordre des identifiants.
+        """
+        mask = self.active.copy()
+        excluded = [self._row_index[course_id] for course_id in exclude if course_id in self._row_index]
+        mask[excluded] = False
+        candidates = np.flatnonzero(mask & (scores > threshold))
+        # Scores arrondis (float32) : les ex æquo sont départagés par identifiant
+        ranked = -np.round(scores[candidates].astype(np.float64), SCORE_DECIMALS)
+        if len(candidates) > limit:
+            # Tous les ex æquo du k-ième score sont gardés avant le tri
+            kth = np.partition(ranked, limit - 1)[limit - 1]
+            keep = ranked <= kth
+            candidates, ranked = candidates[keep], ranked[keep]
+        order = np.lexsort((self.course_ids[candidates], ranked))[:limit]
+        return [(int(position), float(scores[position])) for position in candidates[order]]
+
+    def content_weights(self, user_profile: Dict) -> np.ndarray:
+        """
+        Poids de `content_based_advanced` : colonne 0 pour la partie linéaire,
+        colonne 1 pour la similarité sémantique (plafonnée à 1 avant pondération).
+        """
+        weights = np.zeros((self.width, 2), dtype=np.float32)
+        for name, preference in user_profile.get("category_preferences", {}).items():
+            index = self.category_index.get(name)
+            if index is not None:
+                weights[self.category_columns.start + index, 0] = preference * 0.4
+                weights[self.keyword_columns.start + index, 1] = preference * 0.1
+        weights[self.difficulty_columns, 0] = self._difficulty_weights(
+            user_profile.get("preferred_difficulty", "intermediate"), 0.3, 0.15
+        )
+        weights[self.popularity_column, 0] = 0.2
+        return weights
+
+    def content_scores(self, user_profile: Dict) -> np.ndarray:
+        scores = self.scores(self.content_weights(user_profile))
+        return scores[:, 0] + np.minimum(scores[:, 1], 1.0) * 0.1
+
+    def ai_weights(self, user_profile: Dict) -> np.ndarray:
+        """Poids de `RecommendationUtils.calculate_ai_score`."""
+        weights = np.zeros(self.width, dtype=np.float32)
+        for name, preference in user_profile.get("category_preferences", {}).items():
+            index = self.category_index.get(name)
+            if index is not None:
+                weights[self.category_columns.start + index] += preference * 0.3
+        for name, performance in user_profile.get("category_performance", {}).items():
+            index = self.category_index.get(name)
+            if index is not None:
+                if performance > 80:
+                    weights[self.category_columns.start + index] += 0.2
+                elif performance < 60:
+                    weights[self.category_columns.start + index] += 0.1
+        difficulty = self._difficulty_weights(user_profile.get("preferred_difficulty", "intermediate"), 0.25, 0.15)
+        learning_velocity = user_profile.get("learning_velocity", 1.0)
+        if learning_velocity > 1.5:
+            difficulty[1:] += 0.15
+        elif learning_velocity < 0.7:
+            difficulty[:2] += 0.15
+        weights[self.difficulty_columns] = difficulty
+        learning_style = user_profile.get("learning_style", "balanced")
+        if learning_style in LEARNING_STYLES:
+            weights[self.style_columns.start + LEARNING_STYLES.index(learning_style)] = 0.1
+        else:
+            # Style inconnu : correspondance neutre (0.5) pour tous les cours,
+            # portée par les colonnes de niveau (une seule vaut 1 par cours)
+            weights[self.difficulty_columns] += 0.05
+        return weights
+
+    def ai_scores(self, user_profile: Dict) -> np.ndarray:
+        return np.minimum(self.scores(self.ai_weights(user_profile)), 1.0)
+
+    @staticmethod
+    def _difficulty_weights(preferred: str, same: float, adjacent: float) -> np.ndarray:
+        preferred_index = DIFFICULTIES.index(preferred) if preferred in DIFFICULTIES else 1
+        return np.asarray([
+            same if i == preferred_index else adjacent if abs(i - preferred_index) == 1 else 0.0
+            for i in range(len(DIFFICULTIES))
+        ], dtype=np.float32)
+
+    def category_name(self, position: int) -> str:
+        return self.category_names[self.categories[position]]
+
+    def difficulty(self, position: int) -> str:
+        return DIFFICULTIES[self.difficulties[position]]
+
+    def course_id(self, position: int) -> int:
+        return int(self.course_ids[position])
+
+
+def _enrollment_counts(db: Session, course_ids: Optional[List[int]] = None) -> Dict[int, int]:
+    query = select(course_student.c.course_id, func.count()).group_by(course_student.c.course_id)
+    if course_ids is not None:
+        query = query.where(course_student.c.course_id.in_(course_ids))
+    return dict(db.execute(query).all())
+
+
+def _course_rows(db: Session, course_ids: Optional[List[int]] = None) -> List[tuple]:
+    query = select(Course.id, Course.status, Course.category_id).order_by(Course.id)
+    if course_ids is not None:
+        query = query.where(Course.id.in_(course_ids))
+    return db.execute(query).all()
+
+
+def build_features(db: Session) -> CourseFeatures:
+    start = time.perf_counter()
+    category_names = dict(db.execute(select(Category.id, Category.name)).all())
+    features = CourseFeatures(sorted(set(category_names.values())))
+    features.set_rows(_course_rows(db), category_names, _enrollment_counts(db), course_text_index.get(db))
+    logger.info("Caractéristiques des cours construites: %d cours, %d colonnes en %.2f s",
+                len(features.course_ids), features.width, time.perf_counter() - start)
+    return features
+
+
+class CourseFeatureStore:
+    """Matrice partagée par le worker, reconstruite après `ttl` secondes, mise à jour par cours."""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._features: Optional[CourseFeatures] = None
+        self._dirty: Set[int] = set()
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.updates = 0
+
+    def get(self, db: Session) -> CourseFeatures:
+        features = self._features
+        if features is not None and not self._dirty and time.monotonic() - features.built_at < self.ttl:
+            return features
+        with self._lock:
+            features = self._features
+            if features is None or time.monotonic() - features.built_at >= self.ttl:
+                features = build_features(db)
+                self._dirty.clear()
+                self.builds += 1
+            elif self._dirty:
+                features = self._update(db, features, sorted(self._dirty))
+                self._dirty.clear()
+            self._features = features
+            return features
+
+    def _update(self, db: Session, features: CourseFeatures, course_ids: List[int]) -> CourseFeatures:
+        category_names = dict(db.execute(select(Category.id, Category.name)).all())
+        if set(category_names.values()) != set(features.category_names):
+            # Nouvelle catégorie (ou renommée) : les colonnes changent
+            self.builds += 1
+            return build_features(db)
+        rows = _course_rows(db, course_ids)
+        found = {row[0] for row in rows}
+        features = features.copy()
+        features.set_rows(rows, category_names, _enrollment_counts(db, course_ids), course_text_index.get(db),
+                          removed=[course_id for course_id in course_ids if course_id not in found])
+        self.updates += 1
+        return features
+
+    def invalidate_course(self, course_id: int) -> None:
+        """Signale un cours créé, modifié ou supprimé : sa ligne est recalculée au prochain accès."""
+        with self._lock:
+            self._dirty.add(course_id)
+
+    def invalidate(self) -> None:
+        self._features = None
+
+
+course_features = CourseFeatureStore(settings.COURSE_FEATURES_TTL)
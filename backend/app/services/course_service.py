@@ -1,9 +1,14 @@
+import logging
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from .. import models, schemas
 from ..models.models import Module  # Import direct du modèle Module
+from .course_features import course_features
+from .course_text_index import course_text_index
+
+logger = logging.getLogger(__name__)
 
 class CourseService:
     @staticmethod
@@ -70,12 +75,13 @@ class CourseService:
         from sqlalchemy.orm import joinedload, contains_eager
         from sqlalchemy import or_
         
-        print(f"\n--- SERVICE COURSE ---")
-        print(f"Paramètres reçus: skip={skip}, limit={limit}, level={level}, tag={tag}, search={search}, user_id={user_id}")
+        logger.debug(
+            "Paramètres reçus: skip=%s limit=%s level=%s tag=%s search=%s user_id=%s",
+            skip, limit, level, tag, search, user_id
+        )
         
         # Requête de base pour les cours
         query = db.query(models.Course)
-        print(f"Requête de base créée")
         
         # Chargement des relations
         query = query.options(
@@ -103,21 +109,16 @@ class CourseService:
             )
         
         # Exécution de la requête
-        print(f"Exécution de la requête avec offset={skip}, limit={limit}")
         courses = query.offset(skip).limit(limit).all()
-        print(f"Nombre de cours récupérés de la DB: {len(courses)}")
+        logger.debug("Nombre de cours récupérés de la DB: %d", len(courses))
         
-        if courses:
-            print(f"Cours trouvés: {[(c.id, c.title) for c in courses[:3]]}")
-        else:
-            print("Aucun cours trouvé dans la base de données")
+        if not courses and logger.isEnabledFor(logging.DEBUG):
             # Vérifions s'il y a des cours du tout
             total_courses = db.query(models.Course).count()
-            print(f"Nombre total de cours dans la DB: {total_courses}")
+            logger.debug("Aucun cours trouvé (total dans la DB: %d)", total_courses)
         
         # Si un user_id est fourni, marquer les leçons complétées
         if user_id is not None:
-            print(f"Marquage des leçons complétées pour l'utilisateur {user_id}")
             for course in courses:
                 for module in course.modules:
                     for lesson in module.lessons:
@@ -127,7 +128,6 @@ class CourseService:
                             for completion in lesson.completed_by
                         )
         
-        print(f"--- FIN SERVICE COURSE ---\n")
         return courses
     
     @staticmethod
@@ -173,6 +173,8 @@ class CourseService:
         db.add(db_course)
         db.commit()
         db.refresh(db_course)
+        course_text_index.reindex_course(db_course.id)
+        course_features.invalidate_course(db_course.id)
         
         return db_course
     
@@ -192,6 +194,8 @@ class CourseService:
         
         db.commit()
         db.refresh(db_course)
+        course_text_index.reindex_course(course_id)
+        course_features.invalidate_course(course_id)
         return db_course
     
     @staticmethod
@@ -200,6 +204,8 @@ class CourseService:
         db_course = CourseService.get_course(db, course_id)
         db.delete(db_course)
         db.commit()
+        course_text_index.reindex_course(course_id)
+        course_features.invalidate_course(course_id)
         return True
     
     @staticmethod
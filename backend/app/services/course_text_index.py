@@ -0,0 +1,431 @@
+"""
+Index TF-IDF du texte des cours (titre, description, description courte et
+noms des tags).
+
+Le texte d'un cours est découpé en termes une seule fois et les occurrences
+sont enregistrées dans la table course_terms (index inversé persistant) :
+pour tous les cours par scripts/build_course_index.py, ou au démarrage si la
+table est vide, et pour un cours à sa création ou modification
+(`reindex_course`).
+
+Chaque worker charge la table en une matrice creuse cours × termes (SciPy
+CSR) pondérée TF-IDF, lignes normalisées : la similarité cosinus entre cours
+est un produit scalaire. Les mots-clés de niveau et de style d'apprentissage
+et les noms de catégories sont recherchés dans le vocabulaire trié (un terme
+qui commence par le mot-clé le reconnaît : « débutant » trouve
+« débutants »), puis dans les listes de cours de ces termes : aucune analyse
+du texte des cours au moment des requêtes.
+
+L'index est rechargé toutes les COURSE_TEXT_INDEX_TTL secondes ; les cours
+réindexés dans le worker courant sont mis à jour au prochain accès, sans
+reconstruction (seules leurs lignes sont recalculées, l'IDF reste celle du
+dernier chargement), les autres workers les voient au plus tard après le TTL.
+"""
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..db import session as db_session
+from ..models.models import Course, Tag, course_tags, course_terms
+
+logger = logging.getLogger(__name__)
+
+DIFFICULTIES = ("beginner", "intermediate", "advanced")
+LEARNING_STYLES = ("visual", "kinesthetic", "analytical", "balanced")
+
+# Mots-clés du niveau et des styles d'apprentissage
+BEGINNER_KEYWORDS = ["débutant", "introduction", "bases", "fondamentaux", "initiation"]
+ADVANCED_KEYWORDS = ["avancé", "expert", "maîtrise", "professionnel", "spécialisé"]
+STYLE_KEYWORDS = {
+    "visual": ["vidéo", "graphique", "image", "visuel", "schéma"],
+    "kinesthetic": ["pratique", "exercice", "projet", "hands-on", "interactif"],
+    "analytical": ["théorie", "analyse", "concept", "principe", "méthodologie"],
+    "balanced": ["complet", "varié", "équilibré", "multiple", "diversifié"]
+}
+
+TOKEN_PATTERN = re.compile(r"[\w-]+")
+MAX_TERM_LENGTH = 100
+
+INSERT_CHUNK = 5000
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Termes d'un texte : mots en minuscules (tirets conservés), une lettre exclue."""
+    if not text:
+        return []
+    return [token[:MAX_TERM_LENGTH] for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 1]
+
+
+def course_text(title: Optional[str], description: Optional[str], short_description: Optional[str],
+                tag_names: Iterable[str] = ()) -> str:
+    return " ".join(part for part in (title, description, short_description, *tag_names) if part)
+
+
+def text_matches(tokens: Sequence[str], keyword: str) -> bool:
+    """Même règle que l'index (`CourseTextIndex.keyword_presence`), sur les termes d'un seul texte."""
+    keyword_tokens = tokenize(keyword)
+    return bool(keyword_tokens) and all(
+        any(token.startswith(keyword_token) for token in tokens) for keyword_token in keyword_tokens
+    )
+
+
+def difficulty_from_hits(beginner_hits, advanced_hits):
+    """Indice dans DIFFICULTIES : le plus de mots-clés débutant ou avancé l'emporte, intermédiaire sinon."""
+    return np.where(beginner_hits > advanced_hits, 0, np.where(advanced_hits > beginner_hits, 2, 1))
+
+
+def text_difficulty(text: Optional[str]) -> int:
+    """Niveau d'un texte non indexé (cours absent de l'index chargé)."""
+    return tokens_difficulty(tokenize(text))
+
+
+def tokens_difficulty(tokens: Sequence[str]) -> int:
+    """Niveau d'un texte déjà découpé en termes (règle de `difficulties`)."""
+    return int(difficulty_from_hits(sum(text_matches(tokens, k) for k in BEGINNER_KEYWORDS),
+                                    sum(text_matches(tokens, k) for k in ADVANCED_KEYWORDS)))
+
+
+def tokens_style_matches(tokens: Sequence[str]) -> List[float]:
+    """Correspondance d'un texte avec chaque style de LEARNING_STYLES (règle de `style_matches`)."""
+    return [
+        min(sum(text_matches(tokens, k) for k in STYLE_KEYWORDS[style]) / len(STYLE_KEYWORDS[style]), 1.0)
+        for style in LEARNING_STYLES
+    ]
+
+
+def inverse_document_frequency(documents: int, document_frequency: np.ndarray) -> np.ndarray:
+    return (np.log((1 + documents) / (1 + document_frequency)) + 1).astype(np.float32)
+
+
+def tf_idf(counts: sparse.csr_matrix, idf: np.ndarray) -> sparse.csr_matrix:
+    """Occurrences pondérées (1 + log tf) × idf, lignes normalisées."""
+    vectors = counts.astype(np.float32)
+    vectors.data = 1 + np.log(vectors.data)
+    vectors = sparse.csr_matrix(vectors.multiply(idf[np.newaxis, :]))
+    norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ vectors, dtype=np.float32)
+
+
+class CourseTextIndex:
+    """Matrice TF-IDF (cours × termes) et listes de cours par terme."""
+
+    def __init__(self, course_ids: np.ndarray, terms: np.ndarray, counts: sparse.csr_matrix,
+                 idf: Optional[np.ndarray] = None, vectors: Optional[sparse.csr_matrix] = None):
+        # `terms` est trié : les termes d'un même préfixe sont des colonnes contiguës
+        self.course_ids = course_ids
+        self.terms = terms
+        self.counts = counts
+        self._row_index = dict(zip(course_ids.tolist(), range(len(course_ids))))
+        # Listes de cours par terme (index inversé), construites au premier besoin
+        self._postings: Optional[sparse.csc_matrix] = None
+        self.idf = inverse_document_frequency(len(course_ids), counts.getnnz(axis=0)) if idf is None else idf
+        self.vectors = tf_idf(counts, self.idf) if vectors is None else vectors
+
+        self._keywords: Dict[str, np.ndarray] = {}
+        self._difficulties: Optional[np.ndarray] = None
+        self._styles: Optional[np.ndarray] = None
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def from_postings(cls, courses: Sequence[int], terms: Sequence[str], counts: Sequence[int]) -> "CourseTextIndex":
+        """Index à partir de triplets (cours, terme, occurrences)."""
+        course_ids, rows = np.unique(np.asarray(courses, dtype=np.int64), return_inverse=True)
+        # Termes numérotés par dictionnaire puis renumérotés dans l'ordre alphabétique
+        # (plus rapide qu'un np.unique sur des chaînes)
+        numbers: Dict[str, int] = {}
+        columns = np.fromiter((numbers.setdefault(term, len(numbers)) for term in terms), dtype=np.int64,
+                              count=len(terms))
+        vocabulary = np.asarray(sorted(numbers), dtype=object)
+        renumber = np.empty(len(numbers), dtype=np.int64)
+        renumber[np.fromiter((numbers[term] for term in vocabulary), dtype=np.int64, count=len(vocabulary))] = \
+            np.arange(len(vocabulary))
+        columns = renumber[columns]
+        matrix = sparse.csr_matrix(
+            (np.asarray(counts, dtype=np.float32), (rows, columns)), shape=(len(course_ids), len(vocabulary))
+        )
+        return cls(course_ids, vocabulary, matrix)
+
+    def postings(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Triplets (cours, terme, occurrences) de l'index."""
+        coo = self.counts.tocoo()
+        return self.course_ids[coo.row], self.terms[coo.col], coo.data
+
+    def replace(self, documents: Dict[int, Counter]) -> "CourseTextIndex":
+        """
+        Nouvel index où les cours de `documents` sont remplacés (supprimés si
+        sans terme), sans reconstruction : leurs lignes passent en fin de
+        matrice, les nouveaux termes sont insérés dans le vocabulaire trié et
+        seules les lignes modifiées sont pondérées (IDF du dernier chargement,
+        calculée sur ces seuls cours pour les nouveaux termes). Les mots-clés,
+        niveaux et styles en cache sont conservés et complétés.
+        """
+        counters = {course_id: counter for course_id, counter in documents.items() if counter}
+        keep = np.ones(len(self.course_ids), dtype=bool)
+        keep[self.positions(documents)] = False
+
+        terms, counts, vectors, idf = self.terms, self.counts, self.vectors, self.idf
+        new_terms = sorted({term for counter in counters.values() for term in counter if not self._has_term(term)})
+        if new_terms:
+            # Insertion dans le vocabulaire trié : les colonnes suivantes sont décalées
+            insert_at = np.asarray([bisect_left(terms, term) for term in new_terms], dtype=np.int64)
+            columns = np.arange(len(terms)) + np.searchsorted(insert_at, np.arange(len(terms)), side="right")
+            terms = np.insert(terms, insert_at, np.asarray(new_terms, dtype=object))
+            shape = (len(self.course_ids), len(terms))
+            counts = sparse.csr_matrix((counts.data, columns[counts.indices], counts.indptr), shape=shape)
+            vectors = sparse.csr_matrix((vectors.data, columns[vectors.indices], vectors.indptr), shape=shape)
+            added = np.ones(len(terms), dtype=bool)
+            added[columns] = False
+            idf = np.empty(len(terms), dtype=np.float32)
+            idf[columns] = self.idf
+            frequency = Counter(term for counter in counters.values() for term in counter)
+            idf[added] = inverse_document_frequency(
+                len(self.course_ids), np.asarray([frequency[term] for term in new_terms])
+            )
+
+        rows = [row for row, counter in enumerate(counters.values()) for _ in counter]
+        columns = [bisect_left(terms, term) for counter in counters.values() for term in counter]
+        values = [count for counter in counters.values() for count in counter.values()]
+        block = sparse.csr_matrix((np.asarray(values, dtype=np.float32), (rows, columns)),
+                                  shape=(len(counters), len(terms)))
+
+        index = CourseTextIndex(
+            np.concatenate([self.course_ids[keep], np.fromiter(counters, dtype=np.int64, count=len(counters))]),
+            terms,
+            sparse.vstack([counts[keep], block], format="csr"),
+            idf=idf,
+            vectors=sparse.vstack([vectors[keep], tf_idf(block, idf)], format="csr", dtype=np.float32),
+        )
+        tokens = [list(counter) for counter in counters.values()]
+        for keyword, present in self._keywords.items():
+            matches = np.asarray([text_matches(course_tokens, keyword) for course_tokens in tokens], dtype=bool)
+            index._keywords[keyword] = np.concatenate([present[keep], matches])
+        if self._difficulties is not None:
+            difficulties = np.asarray([tokens_difficulty(course_tokens) for course_tokens in tokens], dtype=np.int8)
+            index._difficulties = np.concatenate([self._difficulties[keep], difficulties])
+        if self._styles is not None:
+            styles = np.asarray([tokens_style_matches(course_tokens) for course_tokens in tokens],
+                                dtype=self._styles.dtype).reshape(-1, len(LEARNING_STYLES))
+            index._styles = np.concatenate([self._styles[keep], styles])
+        # Rechargement complet (IDF exacte, cours réindexés par les autres workers) à l'échéance habituelle
+        index.built_at = self.built_at
+        return index
+
+    def _has_term(self, term: str) -> bool:
+        position = bisect_left(self.terms, term)
+        return position < len(self.terms) and self.terms[position] == term
+
+    def position(self, course_id: int) -> Optional[int]:
+        return self._row_index.get(course_id)
+
+    def positions(self, course_ids: Iterable[int]) -> np.ndarray:
+        return np.asarray([row for row in map(self._row_index.get, course_ids) if row is not None], dtype=np.int64)
+
+    def _term_documents(self, keyword_token: str) -> np.ndarray:
+        if self._postings is None:
+            self._postings = self.counts.tocsc()
+        start = bisect_left(self.terms, keyword_token)
+        stop = bisect_left(self.terms, keyword_token + "\uffff", lo=start)
+        present = np.zeros(len(self.course_ids), dtype=bool)
+        present[self._postings.indices[self._postings.indptr[start]:self._postings.indptr[stop]]] = True
+        return present
+
+    def keyword_presence(self, keyword: str) -> np.ndarray:
+        """Cours contenant, pour chaque mot du mot-clé, un terme qui commence par ce mot."""
+        present = self._keywords.get(keyword)
+        if present is None:
+            keyword_tokens = tokenize(keyword)
+            present = np.zeros(len(self.course_ids), dtype=bool)
+            if keyword_tokens:
+                present[:] = True
+                for keyword_token in keyword_tokens:
+                    present &= self._term_documents(keyword_token)
+            self._keywords[keyword] = present
+        return present
+
+    def keyword_hits(self, keywords: Iterable[str]) -> np.ndarray:
+        """Nombre de mots-clés présents dans chaque cours."""
+        hits = np.zeros(len(self.course_ids), dtype=np.int32)
+        for keyword in keywords:
+            hits += self.keyword_presence(keyword)
+        return hits
+
+    def difficulties(self) -> np.ndarray:
+        """Niveau déduit de chaque cours (indice dans DIFFICULTIES)."""
+        if self._difficulties is None:
+            self._difficulties = difficulty_from_hits(
+                self.keyword_hits(BEGINNER_KEYWORDS), self.keyword_hits(ADVANCED_KEYWORDS)
+            ).astype(np.int8)
+        return self._difficulties
+
+    def style_matches(self) -> np.ndarray:
+        """Correspondance (0 à 1) de chaque cours avec chaque style de LEARNING_STYLES."""
+        if self._styles is None:
+            self._styles = np.stack([
+                np.minimum(self.keyword_hits(STYLE_KEYWORDS[style]) / len(STYLE_KEYWORDS[style]), 1.0)
+                for style in LEARNING_STYLES
+            ], axis=1)
+        return self._styles
+
+    def difficulty(self, course_id: int) -> Optional[int]:
+        row = self.position(course_id)
+        return None if row is None else int(self.difficulties()[row])
+
+    def style_match(self, course_id: int, learning_style: str) -> Optional[float]:
+        row = self.position(course_id)
+        if row is None:
+            return None
+        if learning_style not in LEARNING_STYLES:
+            return 0.5
+        return float(self.style_matches()[row, LEARNING_STYLES.index(learning_style)])
+
+    def contains(self, course_id: int, keyword: str) -> Optional[bool]:
+        row = self.position(course_id)
+        return None if row is None else bool(self.keyword_presence(keyword)[row])
+
+    def centroid(self, rows: np.ndarray) -> np.ndarray:
+        """Vecteur TF-IDF moyen (normalisé) des cours `rows`."""
+        vector = np.asarray(self.vectors[rows].sum(axis=0), dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def similarity(self, vector: np.ndarray) -> np.ndarray:
+        """Similarité cosinus de chaque cours avec `vector`."""
+        return self.vectors @ vector
+
+    def top_k(self, scores: np.ndarray, candidates: np.ndarray, limit: int) -> List[Tuple[int, float]]:
+        """Meilleurs cours (identifiant, score) parmi `candidates`, scores positifs, par score décroissant."""
+        rows = np.flatnonzero(candidates & (scores > 0))
+        if len(rows) > limit:
+            rows = rows[np.argpartition(-scores[rows], limit - 1)[:limit]]
+        rows = rows[np.lexsort((self.course_ids[rows], -scores[rows]))]
+        return [(int(self.course_ids[row]), float(scores[row])) for row in rows]
+
+
+def course_documents(conn, course_ids: Optional[List[int]] = None) -> Dict[int, Counter]:
+    """Occurrences des termes du texte de chaque cours (tous, ou `course_ids`)."""
+    query = select(Course.id, Course.title, Course.description, Course.short_description)
+    tags_query = select(course_tags.c.course_id, Tag.name).join(Tag, Tag.id == course_tags.c.tag_id)
+    if course_ids is not None:
+        query = query.where(Course.id.in_(course_ids))
+        tags_query = tags_query.where(course_tags.c.course_id.in_(course_ids))
+    tags = defaultdict(list)
+    for course_id, name in conn.execute(tags_query):
+        tags[course_id].append(name)
+    return {
+        course_id: Counter(tokenize(course_text(title, description, short_description, tags[course_id])))
+        for course_id, title, description, short_description in conn.execute(query)
+    }
+
+
+def index_courses(engine: Engine, course_ids: Optional[List[int]] = None) -> Dict[int, Counter]:
+    """
+    Réécrit dans course_terms les termes de tous les cours (ou de
+    `course_ids`), dans une seule transaction, et retourne les documents
+    indexés (les cours supprimés n'y figurent pas).
+    """
+    with engine.begin() as conn:
+        documents = course_documents(conn, course_ids)
+        if course_ids is None:
+            conn.execute(delete(course_terms))
+        else:
+            conn.execute(delete(course_terms).where(course_terms.c.course_id.in_(course_ids)))
+        rows = [
+            {"course_id": course_id, "term": term, "count": count}
+            for course_id, counter in documents.items()
+            for term, count in counter.items()
+        ]
+        for start in range(0, len(rows), INSERT_CHUNK):
+            conn.execute(insert(course_terms), rows[start:start + INSERT_CHUNK])
+    return documents
+
+
+def load_index(db: Session) -> CourseTextIndex:
+    start = time.perf_counter()
+    courses, terms, counts = [], [], []
+    for course_id, term, count in db.execute(select(course_terms.c.course_id, course_terms.c.term, course_terms.c.count)):
+        courses.append(course_id)
+        terms.append(term)
+        counts.append(count)
+    index = CourseTextIndex.from_postings(courses, terms, counts)
+    logger.info("Index du texte des cours chargé: %d cours, %d termes, %d occurrences en %.2f s",
+                len(index.course_ids), len(index.terms), index.counts.nnz, time.perf_counter() - start)
+    return index
+
+
+class CourseTextIndexStore:
+    """Index partagé par le worker, rechargé depuis course_terms après `ttl` secondes."""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._index: Optional[CourseTextIndex] = None
+        self._pending: Dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.updates = 0
+
+    def current(self) -> Optional[CourseTextIndex]:
+        """
+        Dernier index chargé, avec les cours réindexés depuis, pour les appels
+        sans session (None avant le premier chargement).
+        """
+        if self._pending and self._index is not None:
+            with self._lock:
+                self._apply_pending()
+        return self._index
+
+    def get(self, db: Session) -> CourseTextIndex:
+        index = self._index
+        if index is not None and not self._pending and time.monotonic() - index.built_at < self.ttl:
+            return index
+        with self._lock:
+            index = self._index
+            if index is None or time.monotonic() - index.built_at >= self.ttl:
+                self._index = load_index(db)
+                self._pending.clear()
+                self.loads += 1
+            else:
+                self._apply_pending()
+            return self._index
+
+    def _apply_pending(self) -> None:
+        # Appelé sous self._lock
+        if self._pending and self._index is not None:
+            self._index = self._index.replace(self._pending)
+            self._pending.clear()
+            self.updates += 1
+
+    def reindex_course(self, course_id: int) -> None:
+        """Réindexe un cours créé, modifié ou supprimé (table course_terms et index du worker)."""
+        documents = index_courses(db_session.engine, [course_id])
+        with self._lock:
+            self._pending[course_id] = documents.get(course_id, Counter())
+
+    def invalidate(self) -> None:
+        self._index = None
+
+
+course_text_index = CourseTextIndexStore(settings.COURSE_TEXT_INDEX_TTL)
+
+
+def ensure_course_index() -> None:
+    """Au démarrage : construit course_terms si la table est vide, puis charge l'index."""
+    with db_session.SessionLocal() as db:
+        if db.execute(select(course_terms.c.course_id).limit(1)).first() is None:
+            start = time.perf_counter()
+            documents = index_courses(db_session.engine)
+            logger.info("Index du texte des cours construit: %d cours en %.1f s",
+                        len(documents), time.perf_counter() - start)
+        course_text_index.invalidate()
+        course_text_index.get(db)
@@ -1,10 +1,13 @@
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, insert
 import json
 
-from ..models import UserInteraction
+from ..core.interaction_buffer import interaction_buffer
+from ..db.interaction_rollups import apply_rollups
+from ..db.keyset import Cursor, before_cursor
+from ..models import UserInteraction, UserInteractionDaily
 from ..schemas.interaction import EntityType, InteractionType, UserInteractionStats
 
 class InteractionService:
@@ -21,36 +24,75 @@ class InteractionService:
     ) -> UserInteraction:
         """
         Enregistre une interaction utilisateur dans la base de données
+        (écriture immédiate, pour les appelants qui ont besoin de la ligne).
         """
         interaction = UserInteraction(
             user_id=user_id,
             entity_type=entity_type,
             entity_id=entity_id,
             interaction_type=interaction_type,
-            interaction_metadata=metadata or {}
+            interaction_metadata=metadata or {},
+            created_at=datetime.utcnow()
         )
         
         self.db.add(interaction)
+        self.db.flush()
+        apply_rollups(self.db.connection(), [{
+            'user_id': user_id,
+            'entity_type': entity_type,
+            'interaction_type': interaction_type,
+            'created_at': interaction.created_at
+        }])
         self.db.commit()
         self.db.refresh(interaction)
         
         return interaction
     
-    def get_user_interactions(
+    def log_interactions(self, interactions: List[Dict[str, Any]]) -> int:
+        """
+        Enregistre un lot d'interactions en un seul INSERT multi-lignes et met
+        à jour les agrégats quotidiens dans la même transaction. Chaque élément
+        porte les colonnes de user_interactions (user_id, entity_type,
+        entity_id, interaction_type, metadata, created_at).
+        """
+        if not interactions:
+            return 0
+        self.db.execute(insert(UserInteraction.__table__).values(interactions))
+        apply_rollups(self.db.connection(), interactions)
+        self.db.commit()
+        return len(interactions)
+    
+    @staticmethod
+    def queue_interaction(
+        user_id: int,
+        entity_type: str,
+        entity_id: int,
+        interaction_type: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Dépose une interaction dans le tampon d'ingestion, écrit par lots en
+        tâche de fond (voir app/core/interaction_buffer.py). Retourne False si
+        le tampon est plein et l'interaction abandonnée.
+        """
+        return interaction_buffer.add(
+            user_id=user_id,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            interaction_type=interaction_type,
+            metadata=metadata
+        )
+    
+    def _user_interactions_query(
         self,
         user_id: int,
         entity_type: Optional[EntityType] = None,
         interaction_type: Optional[InteractionType] = None,
         entity_id: Optional[int] = None,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None,
-        limit: int = 100,
-        offset: int = 0
-    ) -> Tuple[List[UserInteraction], int]:
-        """
-        Récupère les interactions d'un utilisateur avec des filtres optionnels
-        Retourne un tuple (liste des interactions, nombre total)
-        """
+        end_date: Optional[datetime] = None
+    ):
+        """Interactions d'un utilisateur, filtres optionnels appliqués"""
         query = self.db.query(UserInteraction).filter(
             UserInteraction.user_id == user_id
         )
@@ -71,15 +113,122 @@ class InteractionService:
         if end_date:
             query = query.filter(UserInteraction.created_at <= end_date)
         
+        return query
+    
+    def get_user_interactions(
+        self,
+        user_id: int,
+        entity_type: Optional[EntityType] = None,
+        interaction_type: Optional[InteractionType] = None,
+        entity_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: int = 100,
+        offset: int = 0,
+        count_total: bool = True
+    ) -> Tuple[List[UserInteraction], Optional[int]]:
+        """
+        Récupère les interactions d'un utilisateur avec des filtres optionnels
+        Retourne un tuple (liste des interactions, nombre total ou None si
+        count_total est faux)
+        """
+        query = self._user_interactions_query(
+            user_id, entity_type, interaction_type, entity_id, start_date, end_date
+        )
+        
         # Compte total pour la pagination
-        total = query.count()
+        total = query.count() if count_total else None
         
-        # Application du tri et de la pagination
+        # Application du tri et de la pagination (id en second critère : ordre
+        # stable, compatible avec la pagination par curseur)
         interactions = query.order_by(
-            UserInteraction.created_at.desc()
+            UserInteraction.created_at.desc(),
+            UserInteraction.id.desc()
         ).offset(offset).limit(limit).all()
         
         return interactions, total
+    
+    def get_user_interactions_after(
+        self,
+        user_id: int,
+        cursor: Optional[Cursor] = None,
+        entity_type: Optional[EntityType] = None,
+        interaction_type: Optional[InteractionType] = None,
+        entity_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: int = 100
+    ) -> Tuple[List[UserInteraction], bool]:
+        """
+        Page d'interactions suivant le curseur (pagination par clé, voir
+        app/db/keyset.py), sans COUNT(*) ni OFFSET.
+        Retourne un tuple (liste des interactions, existence d'une page suivante)
+        """
+        query = self._user_interactions_query(
+            user_id, entity_type, interaction_type, entity_id, start_date, end_date
+        )
+        if cursor is not None:
+            query = query.filter(before_cursor(UserInteraction.created_at, UserInteraction.id, cursor))
+        
+        # Un élément de plus pour savoir s'il existe une page suivante
+        interactions = query.order_by(
+            UserInteraction.created_at.desc(),
+            UserInteraction.id.desc()
+        ).limit(limit + 1).all()
+        
+        return interactions[:limit], len(interactions) > limit
+    
+    def count_user_interactions(
+        self,
+        user_id: int,
+        entity_type: Optional[EntityType] = None,
+        interaction_type: Optional[InteractionType] = None,
+        entity_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> int:
+        """Nombre exact d'interactions (COUNT sur les lignes filtrées)"""
+        return self._user_interactions_query(
+            user_id, entity_type, interaction_type, entity_id, start_date, end_date
+        ).count()
+    
+    def estimate_user_interactions(
+        self,
+        user_id: int,
+        entity_type: Optional[EntityType] = None,
+        interaction_type: Optional[InteractionType] = None,
+        entity_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        cap: int = 10000
+    ) -> Tuple[int, bool]:
+        """
+        Estimation du nombre d'interactions, sans parcourir toutes les lignes.
+        Retourne un tuple (nombre, estimation ou valeur exacte).
+        
+        Sans filtre sur l'entité, le nombre est lu dans les agrégats quotidiens
+        (jours entiers, interactions purgées comprises). Sinon, le comptage est
+        plafonné à `cap` lignes.
+        """
+        if entity_id is None:
+            query = self.db.query(func.sum(UserInteractionDaily.count)).filter(
+                UserInteractionDaily.user_id == user_id
+            )
+            if entity_type:
+                query = query.filter(UserInteractionDaily.entity_type == entity_type.value)
+            if interaction_type:
+                query = query.filter(UserInteractionDaily.interaction_type == interaction_type.value)
+            if start_date:
+                query = query.filter(UserInteractionDaily.day >= start_date.date())
+            if end_date:
+                query = query.filter(UserInteractionDaily.day <= end_date.date())
+            return int(query.scalar() or 0), True
+        
+        capped = self._user_interactions_query(
+            user_id, entity_type, interaction_type, entity_id, start_date, end_date
+        ).with_entities(UserInteraction.id).limit(cap).subquery()
+        total = self.db.query(func.count()).select_from(capped).scalar()
+        return total, total >= cap
         
     def get_user_stats(
         self,
@@ -87,30 +236,31 @@ class InteractionService:
         days: int = 30
     ) -> UserInteractionStats:
         """
-        Récupère des statistiques sur les interactions d'un utilisateur
+        Récupère des statistiques sur les interactions d'un utilisateur, à
+        partir des agrégats quotidiens (jours UTC entiers, aujourd'hui inclus)
         """
-        # Date de début pour les statistiques
-        start_date = datetime.utcnow() - timedelta(days=days)
+        # Premier jour inclus dans les statistiques
+        start_day = (datetime.utcnow() - timedelta(days=days)).date()
         
         # Requête de base
         query = self.db.query(
-            UserInteraction.interaction_type,
-            UserInteraction.entity_type,
-            func.count().label('count')
+            UserInteractionDaily.interaction_type,
+            UserInteractionDaily.entity_type,
+            func.sum(UserInteractionDaily.count).label('count')
         ).filter(
-            UserInteraction.user_id == user_id,
-            UserInteraction.created_at >= start_date
+            UserInteractionDaily.user_id == user_id,
+            UserInteractionDaily.day >= start_day
         ).group_by(
-            UserInteraction.interaction_type,
-            UserInteraction.entity_type
+            UserInteractionDaily.interaction_type,
+            UserInteractionDaily.entity_type
         )
         
         # Dernière interaction
-        last_interaction = self.db.query(UserInteraction).filter(
-            UserInteraction.user_id == user_id
-        ).order_by(
-            UserInteraction.created_at.desc()
-        ).first()
+        last_interaction = self.db.query(
+            func.max(UserInteractionDaily.last_interaction_at)
+        ).filter(
+            UserInteractionDaily.user_id == user_id
+        ).scalar()
         
         # Agrégation des résultats
         interaction_types = {}
@@ -118,21 +268,23 @@ class InteractionService:
         total = 0
         
         for row in query.all():
-            total += row.count
+            # SUM peut être renvoyé en décimal (MySQL)
+            count = int(row.count)
+            total += count
             
             # Comptage par type d'interaction
             if row.interaction_type not in interaction_types:
                 interaction_types[row.interaction_type] = 0
-            interaction_types[row.interaction_type] += row.count
+            interaction_types[row.interaction_type] += count
             
             # Comptage par type d'entité
             if row.entity_type not in entity_types:
                 entity_types[row.entity_type] = 0
-            entity_types[row.entity_type] += row.count
+            entity_types[row.entity_type] += count
         
         return UserInteractionStats(
             total_interactions=total,
-            last_interaction=last_interaction.created_at if last_interaction else None,
+            last_interaction=last_interaction,
             interaction_types=interaction_types,
             entity_types=entity_types
         )
@@ -0,0 +1,228 @@
+"""
+Précalcul des recommandations de cours dans la table user_recommendations.
+
+Le calcul (filtrage collaboratif item-item, complété par les cours publiés
+les plus suivis) est fait hors requête, pour tous les utilisateurs actifs :
+par le script scripts/precompute_recommendations.py (cron) ou par la tâche
+de fond `precompute_periodically` si RECOMMENDATION_PRECOMPUTE_INTERVAL est
+renseigné. Les utilisateurs sont traités par paquets, éventuellement répartis
+sur un pool de processus.
+
+Les lignes d'un paquet sont remplacées dans une seule transaction
+(DELETE puis INSERT) : un lecteur voit soit les anciennes recommandations
+d'un utilisateur, soit les nouvelles, jamais un mélange. Toutes les lignes
+d'un même calcul portent la même date de génération (created_at).
+
+Les routes lisent la table (`get_user_recommendations`), à travers le cache
+des recommandations (app/core/recommendation_cache.py) ; un utilisateur sans
+ligne précalculée (nouveau compte) est calculé à la demande et écrit.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import repeat
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..core.recommendation_cache import recommendation_cache
+from ..db import session as db_session
+from ..models.models import Course, CourseStatus, course_student
+from ..models.progress import UserRecommendation
+from ..models.user import User
+from .collaborative_filtering import collaborative_models
+
+logger = logging.getLogger(__name__)
+
+REASON_COLLABORATIVE = "Suivi par des étudiants qui suivent les mêmes cours que vous"
+REASON_POPULAR = "Cours parmi les plus suivis de la plateforme"
+
+# Les cours populaires complètent la liste après les recommandations
+# collaboratives : leur score reste inférieur à cette valeur
+POPULAR_SCORE_CEILING = 0.5
+
+PUBLISHED_STATUSES = (CourseStatus.PUBLISHED, CourseStatus.published)
+
+# (identifiant du cours, score, raison)
+Recommendation = Tuple[int, float, str]
+
+
+def _popular_courses(db: Session, limit: int) -> List[Tuple[int, float]]:
+    """Cours publiés les plus suivis, avec un score proportionnel au nombre d'inscrits."""
+    enrolled = func.count(course_student.c.student_id)
+    rows = db.execute(
+        select(Course.id, enrolled)
+        .outerjoin(course_student, course_student.c.course_id == Course.id)
+        .where(Course.status.in_(PUBLISHED_STATUSES))
+        .group_by(Course.id)
+        .order_by(enrolled.desc(), Course.id)
+        .limit(limit)
+    ).all()
+    top = max((count for _, count in rows), default=0) or 1
+    return [(course_id, POPULAR_SCORE_CEILING * count / top) for course_id, count in rows]
+
+
+def compute_recommendations(db: Session, user_ids: Sequence[int], limit: int) -> Dict[int, List[Recommendation]]:
+    """Top `limit` des cours publiés non suivis, pour chaque utilisateur."""
+    published = set(db.execute(select(Course.id).where(Course.status.in_(PUBLISHED_STATUSES))).scalars())
+    enrolled: Dict[int, set] = {user_id: set() for user_id in user_ids}
+    for user_id, course_id in db.execute(
+        select(course_student.c.student_id, course_student.c.course_id)
+        .where(course_student.c.student_id.in_(user_ids))
+    ):
+        enrolled[user_id].add(course_id)
+    # Assez de cours populaires pour compléter la liste malgré les cours suivis
+    popular = _popular_courses(db, limit + max((len(courses) for courses in enrolled.values()), default=0))
+    scored = collaborative_models.get(db).recommend_many(user_ids, limit * 2)
+
+    results = {}
+    for user_id in user_ids:
+        recommendations = []
+        seen = set(enrolled[user_id])
+        for course_id, score in scored.get(user_id, []):
+            if course_id in published and course_id not in seen:
+                recommendations.append((course_id, score, REASON_COLLABORATIVE))
+                seen.add(course_id)
+        for course_id, score in popular:
+            if len(recommendations) >= limit:
+                break
+            if course_id not in seen:
+                recommendations.append((course_id, score, REASON_POPULAR))
+                seen.add(course_id)
+        results[user_id] = recommendations[:limit]
+    return results
+
+
+def store_recommendations(engine: Engine, results: Dict[int, List[Recommendation]],
+                          generated_at: datetime) -> int:
+    """Remplace les recommandations des utilisateurs de `results` dans une seule transaction."""
+    rows = [
+        {"user_id": user_id, "course_id": course_id, "score": score, "reason": reason, "created_at": generated_at}
+        for user_id, recommendations in results.items()
+        for course_id, score, reason in recommendations
+    ]
+    with engine.begin() as conn:
+        conn.execute(delete(UserRecommendation).where(UserRecommendation.user_id.in_(list(results))))
+        if rows:
+            conn.execute(insert(UserRecommendation.__table__), rows)
+    return len(rows)
+
+
+def _init_worker() -> None:
+    # Connexions héritées du processus parent : ne pas les réutiliser
+    db_session.engine.dispose(close=False)
+
+
+def _precompute_chunk(user_ids: List[int], limit: int, generated_at: datetime) -> int:
+    db = db_session.SessionLocal()
+    try:
+        results = compute_recommendations(db, user_ids, limit)
+    finally:
+        db.close()
+    return store_recommendations(db_session.engine, results, generated_at)
+
+
+def precompute_all(limit: Optional[int] = None, chunk_size: Optional[int] = None, workers: int = 1,
+                   user_ids: Optional[List[int]] = None) -> Dict[str, float]:
+    """
+    Recalcule les recommandations de tous les utilisateurs actifs (ou de
+    `user_ids`) et retourne un résumé (utilisateurs, lignes, durée).
+    """
+    limit = limit or settings.RECOMMENDATION_PRECOMPUTE_LIMIT
+    chunk_size = chunk_size or settings.RECOMMENDATION_PRECOMPUTE_CHUNK
+    start = time.perf_counter()
+    generated_at = datetime.utcnow()
+
+    with db_session.SessionLocal() as db:
+        if user_ids is None:
+            user_ids = list(db.execute(select(User.id).where(User.is_active == True).order_by(User.id)).scalars())  # noqa: E712
+        # Modèle reconstruit une fois avant la création du pool : les processus
+        # créés par fork en héritent
+        collaborative_models.invalidate()
+        collaborative_models.get(db)
+    chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            rows = sum(pool.map(_precompute_chunk, chunks, repeat(limit), repeat(generated_at)))
+    else:
+        rows = sum(_precompute_chunk(chunk, limit, generated_at) for chunk in chunks)
+
+    elapsed = time.perf_counter() - start
+    logger.info("Recommandations précalculées: %d utilisateurs, %d lignes en %.1f s", len(user_ids), rows, elapsed)
+    return {"users": len(user_ids), "rows": rows, "elapsed": elapsed}
+
+
+class StoredRecommendation(NamedTuple):
+    course_id: int
+    score: float
+    reason: Optional[str]
+    created_at: datetime
+
+
+def _load_user_recommendations(db: Session, user_id: int) -> Tuple[List[StoredRecommendation], Optional[datetime]]:
+    recommendations = [StoredRecommendation(*row) for row in db.query(
+        UserRecommendation.course_id, UserRecommendation.score,
+        UserRecommendation.reason, UserRecommendation.created_at
+    ).filter(
+        UserRecommendation.user_id == user_id
+    ).order_by(UserRecommendation.score.desc(), UserRecommendation.id)]
+
+    if not recommendations:
+        return refresh_user_recommendations(db, user_id)
+
+    enrolled = {course_id for (course_id,) in db.query(course_student.c.course_id).filter(
+        course_student.c.student_id == user_id
+    )}
+    recommendations = [rec for rec in recommendations if rec.course_id not in enrolled]
+    return recommendations, max((rec.created_at for rec in recommendations), default=None)
+
+
+def refresh_user_recommendations(db: Session,
+                                 user_id: int) -> Tuple[List[StoredRecommendation], Optional[datetime]]:
+    """Recalcule et enregistre les recommandations d'un utilisateur, et vide son cache."""
+    generated_at = datetime.utcnow()
+    results = compute_recommendations(db, [user_id], settings.RECOMMENDATION_PRECOMPUTE_LIMIT)
+    # Écriture sur la base principale, la session courante pouvant être une réplique
+    store_recommendations(db_session.engine, results, generated_at)
+    recommendation_cache.invalidate_user(user_id)
+    recommendations = [
+        StoredRecommendation(course_id, score, reason, generated_at)
+        for course_id, score, reason in results[user_id]
+    ]
+    return recommendations, (generated_at if recommendations else None)
+
+
+def get_user_recommendations(db: Session, user_id: int,
+                             limit: int) -> Tuple[List[StoredRecommendation], Optional[datetime]]:
+    """
+    Recommandations précalculées d'un utilisateur, par score décroissant, et
+    leur date de génération. Les cours suivis depuis le calcul sont retirés.
+    Sans ligne précalculée, le calcul est fait à la demande et enregistré.
+    Le résultat est gardé dans le cache des recommandations.
+    """
+    cached = recommendation_cache.get_for(user_id, "precomputed")
+    if cached is None:
+        cached = _load_user_recommendations(db, user_id)
+        recommendation_cache.put_for(user_id, "precomputed", cached)
+    recommendations, generated_at = cached
+    return recommendations[:limit], generated_at
+
+
+async def precompute_periodically() -> None:
+    """Tâche de fond : précalcul toutes les RECOMMENDATION_PRECOMPUTE_INTERVAL secondes."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(settings.RECOMMENDATION_PRECOMPUTE_INTERVAL)
+        try:
+            await loop.run_in_executor(
+                None, lambda: precompute_all(workers=settings.RECOMMENDATION_PRECOMPUTE_WORKERS)
+            )
+            recommendation_cache.clear()
+        except Exception as e:
+            logger.warning("Précalcul des recommandations impossible: %s", e)
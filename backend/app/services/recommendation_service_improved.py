@@ -1,7 +1,10 @@
 from typing import List, Dict, Any, Optional
+import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
 from .. import models
+from .course_features import PUBLISHED_STATUSES
+from .course_text_index import course_text_index
 
 class RecommendationService:
     """Service pour gérer les recommandations de cours."""
@@ -11,34 +14,60 @@ class RecommendationService:
     
     def get_content_based_recommendations(
         self, 
+        user_id: int,
         limit: int = 10
     ) -> List[Dict[str, Any]]:
         """
-        Récupère des recommandations basées sur le contenu.
+        Récupère des recommandations basées sur le contenu des cours suivis.
+        
+        Les cours sont classés par similarité cosinus TF-IDF avec le vecteur
+        moyen des cours de l'utilisateur (index du texte des cours) ; seuls
+        les meilleurs candidats sont relus en base, pour écarter les cours
+        non publiés.
         
         Args:
+            user_id: ID de l'utilisateur
             limit: Nombre maximum de recommandations
             
         Returns:
             Liste des recommandations avec scores
         """
-        # Implémentation basique - retourne les cours les plus populaires
-        courses = (
-            self.db.query(models.Course)
-            .filter(models.Course.is_active == True)
-            .order_by(desc(models.Course.created_at))
-            .limit(limit)
-            .all()
+        index = course_text_index.get(self.db)
+        enrolled_ids = self.db.query(models.course_student.c.course_id).filter(
+            models.course_student.c.student_id == user_id
         )
+        enrolled = index.positions(course_id for (course_id,) in enrolled_ids)
+        if not len(enrolled):
+            return []
         
-        return [
-            {
-                "course": course,
-                "score": 0.8,
-                "reason": "Recommandé pour vous"
+        candidates = np.ones(len(index.course_ids), dtype=bool)
+        candidates[enrolled] = False
+        scores = index.similarity(index.centroid(enrolled))
+        
+        # Fenêtre de candidats élargie tant que les cours non publiés empêchent
+        # d'atteindre `limit`
+        window = limit * 2
+        while True:
+            top = index.top_k(scores, candidates, window)
+            courses = {
+                course.id: course
+                for course in self.db.query(models.Course).filter(
+                    models.Course.id.in_([course_id for course_id, _ in top]),
+                    models.Course.status.in_(PUBLISHED_STATUSES)
+                )
             }
-            for course in courses
-        ]
+            recommendations = [
+                {
+                    "course": courses[course_id],
+                    "score": score,
+                    "reason": "Proche des cours que vous suivez"
+                }
+                for course_id, score in top
+                if course_id in courses
+            ]
+            if len(recommendations) >= limit or len(top) < window:
+                return recommendations[:limit]
+            window *= 4
     
     def get_collaborative_filtering_recommendations(
         self, 
@@ -89,7 +118,7 @@ class RecommendationService:
             Liste des recommandations avec scores
         """
         # Implémentation basique - combine les deux approches
-        content_recs = self.get_content_based_recommendations(limit // 2)
+        content_recs = self.get_content_based_recommendations(user_id, limit // 2)
         collab_recs = self.get_collaborative_recommendations(user_id, limit - len(content_recs))
         
         # Combine et ajuste les scores
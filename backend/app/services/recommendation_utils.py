@@ -9,11 +9,20 @@ from datetime import datetime, timedelta
 import numpy as np
 from collections import defaultdict, Counter
 import math
+import logging
 
 from ..models.user import User
-from ..models.models import Course, Category, course_student
+from ..models.models import Course, Category, Lesson, course_student
+from ..models.quiz import Quiz
 from ..models.progress import UserProgress, UserQuizResult
 from ..models.interaction import UserInteraction
+from .collaborative_filtering import collaborative_models
+from .course_features import course_features
+from .course_text_index import (
+    DIFFICULTIES, STYLE_KEYWORDS, course_text, course_text_index, text_difficulty, text_matches, tokenize
+)
+
+logger = logging.getLogger(__name__)
 
 class RecommendationUtils:
     """Classe utilitaire pour les calculs de recommandations."""
@@ -40,7 +49,7 @@ class RecommendationUtils:
         # Analyser les interactions
         interactions = db.query(UserInteraction).filter(
             UserInteraction.user_id == user_id
-        ).order_by(desc(UserInteraction.timestamp)).limit(1000).all()
+        ).order_by(desc(UserInteraction.created_at)).limit(1000).all()
         
         # Calculer les préférences par catégorie
         category_preferences = defaultdict(float)
@@ -49,17 +58,20 @@ class RecommendationUtils:
         for course, category in enrollments:
             category_preferences[category.name] += 1.0
             
-        for quiz_result in quiz_results:
-            if hasattr(quiz_result, 'quiz') and quiz_result.quiz:
-                quiz_course = db.query(Course, Category).join(
-                    Category, Course.category_id == Category.id
-                ).filter(Course.id == quiz_result.quiz.course_id).first()
-                
-                if quiz_course:
-                    category_performance[quiz_course[1].name].append(quiz_result.score)
+        # Un quiz est rattaché au cours par sa leçon
+        for category_name, score in db.query(Category.name, UserQuizResult.score).join(
+            Quiz, Quiz.id == UserQuizResult.quiz_id
+        ).join(
+            Lesson, Lesson.id == Quiz.lesson_id
+        ).join(
+            Course, Course.id == Lesson.course_id
+        ).join(
+            Category, Course.category_id == Category.id
+        ).filter(UserQuizResult.user_id == user_id):
+            category_performance[category_name].append(score)
         
         # Analyser les patterns temporels
-        interaction_times = [i.timestamp.hour for i in interactions if i.timestamp]
+        interaction_times = [i.created_at.hour for i in interactions if i.created_at]
         preferred_time = max(set(interaction_times), key=interaction_times.count) if interaction_times else 14
         
         # Analyser la difficulté préférée
@@ -86,35 +98,20 @@ class RecommendationUtils:
     
     @staticmethod
     def collaborative_filtering_advanced(db: Session, user_id: int, limit: int) -> List[Dict[str, Any]]:
-        """Filtrage collaboratif avancé avec similarité cosinus."""
+        """Filtrage collaboratif item-item sur matrice creuse (voir collaborative_filtering.py)."""
         try:
-            # Construire la matrice utilisateur-cours
-            user_course_matrix = RecommendationUtils.build_user_course_matrix(db)
-            
-            if user_id not in user_course_matrix:
+            scored = collaborative_models.get(db).recommend(user_id, limit)
+            if not scored:
                 return []
             
-            # Calculer les similarités avec tous les autres utilisateurs
-            user_similarities = {}
-            target_user_vector = user_course_matrix[user_id]
-            
-            for other_user_id, other_vector in user_course_matrix.items():
-                if other_user_id != user_id:
-                    similarity = RecommendationUtils.cosine_similarity(target_user_vector, other_vector)
-                    if similarity > 0.1:  # Seuil de similarité
-                        user_similarities[other_user_id] = similarity
-            
-            # Recommander les cours des utilisateurs similaires
-            course_scores = defaultdict(float)
-            for similar_user_id, similarity in user_similarities.items():
-                for course_id, rating in user_course_matrix[similar_user_id].items():
-                    if course_id not in target_user_vector and rating > 0:
-                        course_scores[course_id] += similarity * rating
-            
-            # Convertir en recommandations
+            # Un seul chargement des cours, dans l'ordre des scores
+            courses = {
+                course.id: course
+                for course in db.query(Course).filter(Course.id.in_([course_id for course_id, _ in scored]))
+            }
             recommendations = []
-            for course_id, score in sorted(course_scores.items(), key=lambda x: x[1], reverse=True)[:limit]:
-                course = db.query(Course).filter(Course.id == course_id).first()
+            for course_id, score in scored:
+                course = courses.get(course_id)
                 if course:
                     recommendations.append({
                         "course": course,
@@ -126,64 +123,42 @@ class RecommendationUtils:
             return recommendations
             
         except Exception as e:
+            logger.error(f"Error in collaborative filtering: {e}")
             return []
     
     @staticmethod
     def content_based_advanced(db: Session, user_id: int, user_profile: Dict, limit: int) -> List[Dict[str, Any]]:
-        """Recommandations basées sur le contenu avec analyse sémantique."""
+        """Recommandations basées sur le contenu, notées sur la matrice des cours (voir course_features.py)."""
         try:
-            # Analyser les préférences de contenu de l'utilisateur
-            preferred_categories = user_profile.get("category_preferences", {})
-            preferred_difficulty = user_profile.get("preferred_difficulty", "intermediate")
+            features = course_features.get(db)
+            enrolled_ids = [course_id for (course_id,) in db.query(course_student.c.course_id).filter(
+                course_student.c.student_id == user_id
+            )]
             
-            # Récupérer tous les cours disponibles
-            available_courses = db.query(Course, Category).join(
-                Category, Course.category_id == Category.id
-            ).filter(
-                Course.status == "published",
-                ~Course.id.in_(
-                    db.query(course_student.c.course_id).filter(course_student.c.student_id == user_id)
-                )
-            ).all()
+            # Score de tous les cours en un produit matrice × poids, puis top-k
+            scores = features.content_scores(user_profile)
+            top = features.top_k(scores, enrolled_ids, limit, threshold=0.1)
+            courses = {
+                course.id: course
+                for course in db.query(Course).filter(Course.id.in_([features.course_id(p) for p, _ in top]))
+            }
             
             recommendations = []
-            for course, category in available_courses:
-                # Calculer le score de similarité de contenu
-                content_score = 0.0
-                
-                # Score basé sur la catégorie
-                if category.name in preferred_categories:
-                    content_score += preferred_categories[category.name] * 0.4
-                
-                # Score basé sur la difficulté
-                course_difficulty = RecommendationUtils.infer_course_difficulty(course)
-                if course_difficulty == preferred_difficulty:
-                    content_score += 0.3
-                elif abs(RecommendationUtils.difficulty_to_num(course_difficulty) - 
-                        RecommendationUtils.difficulty_to_num(preferred_difficulty)) == 1:
-                    content_score += 0.15
-                
-                # Score basé sur la popularité
-                popularity_score = RecommendationUtils.calculate_course_popularity(db, course.id)
-                content_score += popularity_score * 0.2
-                
-                # Score basé sur la description
-                semantic_score = RecommendationUtils.calculate_semantic_similarity(course, user_profile)
-                content_score += semantic_score * 0.1
-                
-                if content_score > 0.1:
+            for position, score in top:
+                course = courses.get(features.course_id(position))
+                if course:
                     recommendations.append({
                         "course": course,
-                        "score": min(content_score, 1.0),
+                        "score": min(score, 1.0),
                         "algorithm": "content",
-                        "reason": f"Correspond à vos préférences ({category.name}, {course_difficulty})"
+                        "reason": f"Correspond à vos préférences ({features.category_name(position)}, "
+                                  f"{features.difficulty(position)})"
                     })
             
-            # Trier et limiter
-            recommendations.sort(key=lambda x: x["score"], reverse=True)
-            return recommendations[:limit]
+            return recommendations
             
         except Exception as e:
+            logger.error(f"Error in content-based recommendations: {e}")
             return []
     
     @staticmethod
@@ -302,28 +277,6 @@ class RecommendationUtils:
     
     # Méthodes utilitaires de base
     
-    @staticmethod
-    def build_user_course_matrix(db: Session) -> Dict[int, Dict[int, float]]:
-        """Construit la matrice utilisateur-cours."""
-        matrix = defaultdict(lambda: defaultdict(float))
-        
-        # Utiliser les inscriptions comme base
-        enrollments = db.query(course_student).all()
-        for enrollment in enrollments:
-            matrix[enrollment.student_id][enrollment.course_id] = 1.0
-        
-        # Ajuster avec les résultats de quiz
-        quiz_results = db.query(UserQuizResult).all()
-        for result in quiz_results:
-            if hasattr(result, 'quiz') and result.quiz and hasattr(result.quiz, 'course_id'):
-                normalized_score = result.score / 100.0
-                matrix[result.user_id][result.quiz.course_id] = max(
-                    matrix[result.user_id][result.quiz.course_id],
-                    normalized_score
-                )
-        
-        return dict(matrix)
-    
     @staticmethod
     def cosine_similarity(vector1: Dict, vector2: Dict) -> float:
         """Calcule la similarité cosinus entre deux vecteurs."""
@@ -396,21 +349,13 @@ class RecommendationUtils:
     
     @staticmethod
     def infer_course_difficulty(course: Course) -> str:
-        """Infère la difficulté d'un cours."""
-        text = f"{course.title} {course.description}".lower()
-        
-        beginner_keywords = ["débutant", "introduction", "bases", "fondamentaux", "initiation"]
-        advanced_keywords = ["avancé", "expert", "maîtrise", "professionnel", "spécialisé"]
-        
-        beginner_count = sum(1 for keyword in beginner_keywords if keyword in text)
-        advanced_count = sum(1 for keyword in advanced_keywords if keyword in text)
-        
-        if beginner_count > advanced_count:
-            return "beginner"
-        elif advanced_count > beginner_count:
-            return "advanced"
-        else:
-            return "intermediate"
+        """Infère la difficulté d'un cours (lue dans l'index du texte des cours)."""
+        index = course_text_index.current()
+        difficulty = index.difficulty(course.id) if index is not None else None
+        if difficulty is None:
+            # Cours absent de l'index chargé : analyse de son seul texte
+            difficulty = text_difficulty(course_text(course.title, course.description, course.short_description))
+        return DIFFICULTIES[difficulty]
     
     @staticmethod
     def difficulty_to_num(difficulty: str) -> int:
@@ -430,13 +375,19 @@ class RecommendationUtils:
     @staticmethod
     def calculate_semantic_similarity(course: Course, user_profile: Dict) -> float:
         """Calcule la similarité sémantique."""
-        course_text = f"{course.title} {course.description}".lower()
         category_preferences = user_profile.get("category_preferences", {})
+        index = course_text_index.current()
+        tokens = None
         
         # Recherche de mots-clés liés aux préférences
         similarity_score = 0.0
         for category, preference_strength in category_preferences.items():
-            if category.lower() in course_text:
+            found = index.contains(course.id, category) if index is not None else None
+            if found is None:
+                if tokens is None:
+                    tokens = tokenize(course_text(course.title, course.description, course.short_description))
+                found = text_matches(tokens, category)
+            if found:
                 similarity_score += preference_strength * 0.1
         
         return min(similarity_score, 1.0)
@@ -444,16 +395,13 @@ class RecommendationUtils:
     @staticmethod
     def match_learning_style(course: Course, learning_style: str) -> float:
         """Évalue la correspondance entre un cours et un style d'apprentissage."""
-        course_text = f"{course.title} {course.description}".lower()
-        
-        style_keywords = {
-            "visual": ["vidéo", "graphique", "image", "visuel", "schéma"],
-            "kinesthetic": ["pratique", "exercice", "projet", "hands-on", "interactif"],
-            "analytical": ["théorie", "analyse", "concept", "principe", "méthodologie"],
-            "balanced": ["complet", "varié", "équilibré", "multiple", "diversifié"]
-        }
-        
-        keywords = style_keywords.get(learning_style, [])
-        matches = sum(1 for keyword in keywords if keyword in course_text)
+        index = course_text_index.current()
+        match = index.style_match(course.id, learning_style) if index is not None else None
+        if match is not None:
+            return match
+        
+        keywords = STYLE_KEYWORDS.get(learning_style, [])
+        tokens = tokenize(course_text(course.title, course.description, course.short_description))
+        matches = sum(1 for keyword in keywords if text_matches(tokens, keyword))
         
         return min(matches / len(keywords), 1.0) if keywords else 0.5
@@ -1,10 +1,59 @@
+from datetime import datetime
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from .. import models, schemas
+from ..db.projections import projection, fetch_all
+from ..core.principal_cache import principal_cache
+from ..core.token_versions import token_versions
+
+# Champs repris dans les jetons dont la modification doit révoquer les jetons émis
+TOKEN_SECURITY_FIELDS = ("role", "is_active")
+
+
+@projection(
+    models.User.id, models.User.username, models.User.email,
+    models.User.first_name, models.User.last_name, models.User.role,
+    models.User.is_active, models.User.token_version, models.User.created_at, models.User.updated_at,
+)
+class UserListItem:
+    """Colonnes d'un utilisateur nécessaires au schéma `schemas.User`."""
+    id: int
+    username: str
+    email: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    role: str
+    is_active: bool
+    token_version: int
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @property
+    def full_name(self):
+        return f"{self.first_name or ''} {self.last_name or ''}".strip()
+
+    @property
+    def is_superuser(self):
+        return self.role == 'admin'
+
 
 class UserService:
+    @staticmethod
+    def revoke_tokens(db_user: models.User) -> None:
+        """
+        Révoque les jetons déjà émis pour l'utilisateur en incrémentant sa
+        version de jeton. À appeler avant le commit, puis `tokens_revoked` après.
+        """
+        db_user.token_version = (db_user.token_version or 0) + 1
+
+    @staticmethod
+    def tokens_revoked(db_user: models.User) -> None:
+        """Applique une révocation validée en base dans le worker courant."""
+        token_versions.set_version(db_user.id, db_user.token_version)
+        principal_cache.invalidate_user(db_user.id)
+
     @staticmethod
     def get_user(db: Session, user_id: int) -> models.User:
         """Récupère un utilisateur par son ID"""
@@ -19,9 +68,10 @@ class UserService:
         return db.query(models.User).filter(models.User.email == email).first()
     
     @staticmethod
-    def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[models.User]:
-        """Récupère une liste d'utilisateurs avec pagination"""
-        return db.query(models.User).offset(skip).limit(limit).all()
+    def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[UserListItem]:
+        """Récupère une liste d'utilisateurs avec pagination (projection, sans entités ORM)"""
+        statement = UserListItem.select().order_by(models.User.id).offset(skip).limit(limit)
+        return fetch_all(db, UserListItem, statement)
     
     @staticmethod
     def update_user(
@@ -42,11 +92,21 @@ class UserService:
         
         # Met à jour uniquement les champs fournis
         update_data = user_update.dict(exclude_unset=True)
+        revoke = any(
+            field in TOKEN_SECURITY_FIELDS and getattr(db_user, field) != value
+            for field, value in update_data.items()
+        )
         for field, value in update_data.items():
             setattr(db_user, field, value)
+        if revoke:
+            UserService.revoke_tokens(db_user)
         
         db.commit()
         db.refresh(db_user)
+        if revoke:
+            UserService.tokens_revoked(db_user)
+        else:
+            principal_cache.invalidate_user(db_user.id)
         return db_user
     
     @staticmethod
@@ -78,12 +138,16 @@ class UserService:
         if db_user.role == 'enseignant' and db_user.taught_courses:
             # Désactiver l'enseignant mais conserver ses cours
             db_user.is_active = False
+            UserService.revoke_tokens(db_user)
             db.commit()
+            UserService.tokens_revoked(db_user)
             return {"message": "L'enseignant a été désactivé. Ses cours restent accessibles mais il ne pourra plus se connecter."}
         
         # Pour les autres utilisateurs (étudiants, admins)
         db_user.is_active = False
+        UserService.revoke_tokens(db_user)
         db.commit()
+        UserService.tokens_revoked(db_user)
         return {"message": "L'utilisateur a été désactivé avec succès."}
     
     @staticmethod
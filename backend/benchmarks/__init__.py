@@ -0,0 +1 @@
+# Fichier d'initialisation du package benchmarks
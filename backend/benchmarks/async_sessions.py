@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark : requêtes concurrentes sur les routes `async def`.
+
+Compare trois façons de servir la même charge (N requêtes simultanées, chaque
+requête SQL subissant une latence simulée) :
+
+- `async def` + Session synchrone (ancien modèle) : les requêtes bloquent la
+  boucle d'événements et s'exécutent les unes après les autres ;
+- `def` + Session synchrone : FastAPI exécute la route dans son threadpool ;
+- `async def` + AsyncSession : les requêtes attendent la base sans bloquer.
+
+La latence est injectée au niveau du curseur sqlite3, donc dans le thread qui
+exécute réellement la requête (boucle, threadpool ou thread aiosqlite).
+
+Usage :
+    python -m benchmarks.async_sessions --requests 20 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# La base de benchmark doit être configurée avant l'import de l'application
+_DB_FILE = os.path.join(tempfile.mkdtemp(prefix="bench_async_"), "bench.db")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{_DB_FILE}")
+
+QUERY_LATENCY = {"seconds": 0.0}
+
+
+class SlowCursor(sqlite3.Cursor):
+    """Curseur sqlite3 qui simule la latence d'un serveur MySQL distant."""
+
+    def execute(self, *args, **kwargs):
+        if QUERY_LATENCY["seconds"]:
+            time.sleep(QUERY_LATENCY["seconds"])
+        return super().execute(*args, **kwargs)
+
+
+class SlowConnection(sqlite3.Connection):
+    def cursor(self, factory=SlowCursor):
+        return super().cursor(factory)
+
+
+from app.db import session as db_session  # noqa: E402
+
+# Recréer les moteurs partagés avec la connexion "lente"
+db_session.engine = db_session.create_db_engine(connect_args={"check_same_thread": False, "factory": SlowConnection})
+db_session.SessionLocal.configure(bind=db_session.engine)
+db_session.async_engine = db_session.create_async_db_engine(connect_args={"factory": SlowConnection})
+db_session.AsyncSessionLocal.configure(bind=db_session.async_engine)
+
+import httpx  # noqa: E402
+from fastapi import Depends  # noqa: E402
+from sqlalchemy import func  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import models  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.auth_service import create_access_token, get_current_active_user  # noqa: E402
+
+
+def _compute_stats(db: Session, current_user) -> dict:
+    """Requêtes de l'ancien /student/stats, exécutées avec une Session synchrone."""
+    enrolled = db.query(models.Course).join(models.Course.students).filter(
+        models.User.id == current_user.id
+    ).all()
+    completed = db.query(models.UserProgress).filter(
+        models.UserProgress.user_id == current_user.id,
+        models.UserProgress.completion_percentage == 100,
+    ).count()
+    average = db.query(func.avg(models.UserQuizResult.score)).filter(
+        models.UserQuizResult.user_id == current_user.id
+    ).scalar() or 0
+    passed = db.query(models.UserQuizResult).filter(
+        models.UserQuizResult.user_id == current_user.id,
+        models.UserQuizResult.passed == True,
+    ).count()
+    return {"coursesEnrolled": len(enrolled), "completedCourses": completed,
+            "averageScore": round(average), "passedQuizzes": passed}
+
+
+@app.get("/__bench__/legacy-stats")
+async def legacy_stats(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user),
+):
+    """Ancien modèle : Session synchrone appelée depuis un `async def`."""
+    return _compute_stats(db, current_user)
+
+
+@app.get("/__bench__/threadpool-stats")
+def threadpool_stats(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user),
+):
+    """Même travail, exécuté dans le threadpool (`def`)."""
+    return _compute_stats(db, current_user)
+
+
+def seed_database() -> str:
+    """Crée un petit jeu de données et retourne un jeton pour l'étudiant."""
+    Base.metadata.create_all(bind=db_session.engine)
+    db = db_session.SessionLocal()
+    try:
+        teacher = models.User(username="prof", email="prof@example.com", password_hash="x",
+                              first_name="Sophie", last_name="Martin", role="enseignant")
+        student = models.User(username="etu", email="etu@example.com", password_hash="x",
+                              first_name="Jean", last_name="Dupont", role="etudiant")
+        db.add_all([teacher, student])
+        db.flush()
+        for i in range(5):
+            course = models.Course(title=f"Cours {i}", slug=f"cours-{i}", description=f"Description du cours {i}",
+                                   instructor_id=teacher.id,
+                                   status=models.CourseStatus.published)
+            db.add(course)
+            db.flush()
+            db.execute(models.course_student.insert().values(course_id=course.id, student_id=student.id))
+            db.add(models.UserProgress(user_id=student.id, course_id=course.id, completion_percentage=50.0))
+        db.commit()
+        return create_access_token({"sub": str(student.id)})
+    finally:
+        db.close()
+
+
+async def run_scenario(client: httpx.AsyncClient, path: str, token: str, requests: int) -> float:
+    headers = {"Authorization": f"Bearer {token}"}
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(client.get(path, headers=headers) for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    failed = [r.status_code for r in responses if r.status_code != 200]
+    if failed:
+        raise RuntimeError(f"{path}: réponses en erreur {failed[:5]}")
+    return elapsed
+
+
+async def main(requests: int, latency_ms: float) -> None:
+    token = seed_database()
+    QUERY_LATENCY["seconds"] = latency_ms / 1000.0
+
+    scenarios = [
+        ("async def + Session (ancien)", "/__bench__/legacy-stats"),
+        ("def + Session (threadpool)", "/__bench__/threadpool-stats"),
+        ("async def + AsyncSession", "/api/v1/student/stats"),
+    ]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Préchauffage (connexions du pool, compilation des requêtes)
+        for _, path in scenarios:
+            await run_scenario(client, path, token, 1)
+
+        print(f"\n{requests} requêtes simultanées, latence simulée de {latency_ms:.0f} ms par requête SQL\n")
+        print(f"{'Scénario':<34}{'Durée totale':>14}{'Débit (req/s)':>16}")
+        for label, path in scenarios:
+            elapsed = await run_scenario(client, path, token, requests)
+            print(f"{label:<34}{elapsed * 1000:>11.0f} ms{requests / elapsed:>16.1f}")
+
+    await db_session.async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20, help="Nombre de requêtes simultanées")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Latence simulée par requête SQL")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency_ms))
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Benchmark : filtrage collaboratif, dictionnaires imbriqués / matrice creuse.
+
+Pour chaque volume d'inscriptions (course_student, popularité des cours en
+loi de Zipf, et un résultat de quiz pour une inscription sur cinq) :
+
+- avant : copie de l'ancien `RecommendationUtils.collaborative_filtering_advanced`,
+  qui reconstruit la matrice utilisateur × cours en dictionnaires à chaque
+  appel puis compare l'utilisateur à tous les autres (similarité cosinus en
+  Python). Le temps par utilisateur inclut donc la construction ;
+- après : `app/services/collaborative_filtering.py`, matrice CSR et
+  similarités item-item construites une fois, puis un produit ligne creuse ×
+  matrice par utilisateur (`recommend`) ou par paquet d'utilisateurs
+  (`recommend_many`).
+
+L'ancien algorithme est mesuré sur quelques utilisateurs seulement
+(--legacy-users) et peut être ignoré au-delà d'un volume (--legacy-max).
+
+Usage :
+    python -m benchmarks.collaborative_filtering --enrollments 10000 100000 1000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# La base de benchmark doit être configurée avant l'import de l'application
+_DB_DIR = tempfile.mkdtemp(prefix="bench_collaborative_")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(_DB_DIR, 'bench.db')}")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import numpy as np  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.models.models import course_student  # noqa: E402
+from app.models.progress import UserQuizResult  # noqa: E402
+from app.services.collaborative_filtering import build_model  # noqa: E402
+from app.services.recommendation_utils import RecommendationUtils  # noqa: E402
+from benchmarks.dataset import DatasetParams, seed_dataset  # noqa: E402
+
+COURSES_PER_STUDENT = 10
+LIMIT = 10
+
+
+def legacy_build_user_course_matrix(db: Session):
+    """Ancienne construction de la matrice utilisateur-cours (copie)."""
+    matrix = defaultdict(lambda: defaultdict(float))
+
+    enrollments = db.query(course_student).all()
+    for enrollment in enrollments:
+        matrix[enrollment.student_id][enrollment.course_id] = 1.0
+
+    quiz_results = db.query(UserQuizResult).all()
+    for result in quiz_results:
+        if hasattr(result, 'quiz') and result.quiz and hasattr(result.quiz, 'course_id'):
+            normalized_score = result.score / 100.0
+            matrix[result.user_id][result.quiz.course_id] = max(
+                matrix[result.user_id][result.quiz.course_id],
+                normalized_score
+            )
+
+    return dict(matrix)
+
+
+def legacy_recommend(db: Session, user_id: int, limit: int):
+    """Ancien filtrage collaboratif utilisateur-utilisateur (copie, sans la relecture des cours)."""
+    user_course_matrix = legacy_build_user_course_matrix(db)
+    if user_id not in user_course_matrix:
+        return []
+
+    user_similarities = {}
+    target_user_vector = user_course_matrix[user_id]
+    for other_user_id, other_vector in user_course_matrix.items():
+        if other_user_id != user_id:
+            similarity = RecommendationUtils.cosine_similarity(target_user_vector, other_vector)
+            if similarity > 0.1:
+                user_similarities[other_user_id] = similarity
+
+    course_scores = defaultdict(float)
+    for similar_user_id, similarity in user_similarities.items():
+        for course_id, rating in user_course_matrix[similar_user_id].items():
+            if course_id not in target_user_vector and rating > 0:
+                course_scores[course_id] += similarity * rating
+
+    return sorted(course_scores.items(), key=lambda x: x[1], reverse=True)[:limit]
+
+
+def seed(engine, enrollments: int, seed_value: int = 42):
+    """Utilisateurs, cours et un quiz par cours via `seed_dataset`, puis inscriptions en masse."""
+    students = max(enrollments // COURSES_PER_STUDENT, 1)
+    courses = max(enrollments // 500, 200)
+    dataset = seed_dataset(engine, DatasetParams(
+        students=students, teachers=10, courses=courses, lessons_per_course=1, modules_per_course=1,
+        quizzes_per_course=1, questions_per_quiz=0, courses_per_student=0, interactions_per_student=0,
+        messages_per_discussion=0, seed=seed_value,
+    ))
+
+    # Paires (étudiant, cours) tirées en une fois ; les doublons sont retirés
+    rng = np.random.default_rng(seed_value)
+    weights = 1.0 / np.arange(1, courses + 1)
+    student_ids = np.asarray(dataset.student_ids, dtype=np.int64)
+    course_ids = np.asarray(dataset.course_ids, dtype=np.int64)
+    pairs = np.unique(np.stack([
+        rng.choice(student_ids, size=int(enrollments * 1.5)),
+        rng.choice(course_ids, size=int(enrollments * 1.5), p=weights / weights.sum()),
+    ], axis=1), axis=0)
+    pairs = pairs[rng.permutation(len(pairs))[:enrollments]]
+
+    # Un quiz par cours, de même identifiant que le cours (voir seed_dataset)
+    graded = pairs[rng.random(len(pairs)) < 0.2]
+    scores = rng.integers(0, 101, size=len(graded))
+    with engine.begin() as conn:
+        for start in range(0, len(pairs), 50000):
+            conn.execute(course_student.insert(), [
+                {"student_id": int(s), "course_id": int(c)} for s, c in pairs[start:start + 50000]
+            ])
+        for start in range(0, len(graded), 50000):
+            conn.execute(UserQuizResult.__table__.insert(), [
+                {"user_id": int(s), "quiz_id": int(c), "score": float(score), "passed": bool(score >= 70)}
+                for (s, c), score in zip(graded[start:start + 50000], scores[start:start + 50000])
+            ])
+    return np.unique(pairs[:, 0]), len(pairs)
+
+
+def main(args) -> None:
+    print(f"{'inscriptions':>12}{'utilisateurs':>14}{'cours':>7}"
+          f"{'avant/util.':>13}{'construction':>14}{'après/util.':>13}{'lot util./s':>13}{'gain':>9}")
+    for size in args.enrollments:
+        engine = create_engine(f"sqlite:///{os.path.join(_DB_DIR, f'cf_{size}.db')}")
+        users, enrolled = seed(engine, size)
+        sample = np.random.default_rng(7).choice(users, size=min(args.users, len(users)), replace=False)
+        sample = [int(user_id) for user_id in sample]
+
+        with Session(engine) as db:
+            start = time.perf_counter()
+            model = build_model(db)
+            build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for user_id in sample:
+                model.recommend(user_id, LIMIT)
+            per_user = (time.perf_counter() - start) / len(sample)
+
+            start = time.perf_counter()
+            for offset in range(0, len(sample), args.batch):
+                model.recommend_many(sample[offset:offset + args.batch], LIMIT)
+            batch_rate = len(sample) / (time.perf_counter() - start)
+
+            legacy = None
+            if args.legacy_max is None or size <= args.legacy_max:
+                start = time.perf_counter()
+                for user_id in sample[:args.legacy_users]:
+                    legacy_recommend(db, user_id, LIMIT)
+                    db.expunge_all()
+                legacy = (time.perf_counter() - start) / min(args.legacy_users, len(sample))
+
+        legacy_cell = f"{legacy * 1000:>11,.0f}ms" if legacy is not None else f"{'-':>13}"
+        gain_cell = f"{legacy / per_user:>8,.0f}x" if legacy is not None else f"{'-':>9}"
+        print(f"{enrolled:>12,}{len(users):>14,}{len(model.course_ids):>7,}{legacy_cell}"
+              f"{build * 1000:>12,.0f}ms{per_user * 1000:>11,.2f}ms{batch_rate:>13,.0f}{gain_cell}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--enrollments", type=int, nargs="+", default=[10000, 100000, 1000000],
+                        help="Volumes d'inscriptions à mesurer")
+    parser.add_argument("--users", type=int, default=1000, help="Utilisateurs notés par le nouveau moteur")
+    parser.add_argument("--batch", type=int, default=200, help="Utilisateurs par appel à recommend_many")
+    parser.add_argument("--legacy-users", type=int, default=3, help="Utilisateurs notés par l'ancien algorithme")
+    parser.add_argument("--legacy-max", type=int, help="Volume au-delà duquel l'ancien algorithme est ignoré")
+    main(parser.parse_args())
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Benchmark : scoring par contenu, boucle par cours / matrice de caractéristiques.
+
+Pour chaque nombre de cours (titres et descriptions tirés parmi des mots-clés
+de niveau et de style, cinq catégories, inscriptions réparties sur les cours) :
+
+- avant : copie de l'ancien `RecommendationUtils.content_based_advanced` et de
+  la boucle des recommandations « IA » (`calculate_ai_score`) : lecture de
+  tous les cours, analyse du texte et une requête de popularité par cours ;
+- après : `app/services/course_features.py`, matrice construite une fois (à
+  partir de l'index du texte des cours, `course_text_index.py`) puis un
+  produit matrice × poids et un top-k par utilisateur.
+
+Les profils sont synthétiques (préférences de catégories, niveau, vélocité et
+style tirés au hasard) ; la colonne « accord » donne la part des top-k
+identiques entre les deux implémentations.
+
+Usage :
+    python -m benchmarks.content_scoring --courses 1000 50000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# La base de benchmark doit être configurée avant l'import de l'application
+_DB_DIR = tempfile.mkdtemp(prefix="bench_content_")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(_DB_DIR, 'bench.db')}")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from sqlalchemy import bindparam, create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.models.models import Category, Course, course_student  # noqa: E402
+from app.services.course_features import build_features  # noqa: E402
+from app.services.course_text_index import (  # noqa: E402
+    ADVANCED_KEYWORDS, BEGINNER_KEYWORDS, DIFFICULTIES, LEARNING_STYLES, STYLE_KEYWORDS, course_text_index,
+    index_courses,
+)
+from app.services.recommendation_utils import RecommendationUtils  # noqa: E402
+from benchmarks.dataset import DatasetParams, seed_dataset  # noqa: E402
+
+LIMIT = 10
+CATEGORIES = ["Programmation", "Mathématiques", "Données", "Réseaux", "Design"]
+
+
+def legacy_difficulty(course: Course) -> str:
+    """Ancien `infer_course_difficulty` : recherche des mots-clés dans le texte (copie)."""
+    text = f"{course.title} {course.description}".lower()
+    beginner_count = sum(1 for keyword in BEGINNER_KEYWORDS if keyword in text)
+    advanced_count = sum(1 for keyword in ADVANCED_KEYWORDS if keyword in text)
+    if beginner_count > advanced_count:
+        return "beginner"
+    elif advanced_count > beginner_count:
+        return "advanced"
+    return "intermediate"
+
+
+def legacy_semantic_similarity(course: Course, user_profile: dict) -> float:
+    """Ancien `calculate_semantic_similarity` (copie)."""
+    course_text = f"{course.title} {course.description}".lower()
+    similarity_score = 0.0
+    for category, preference_strength in user_profile.get("category_preferences", {}).items():
+        if category.lower() in course_text:
+            similarity_score += preference_strength * 0.1
+    return min(similarity_score, 1.0)
+
+
+def legacy_style_match(course: Course, learning_style: str) -> float:
+    """Ancien `match_learning_style` (copie)."""
+    course_text = f"{course.title} {course.description}".lower()
+    keywords = STYLE_KEYWORDS.get(learning_style, [])
+    matches = sum(1 for keyword in keywords if keyword in course_text)
+    return min(matches / len(keywords), 1.0) if keywords else 0.5
+
+
+def legacy_ai_score(course: Course, category: Category, user_profile: dict) -> float:
+    """Ancien `calculate_ai_score` (copie)."""
+    ai_score = 0.0
+    category_preferences = user_profile.get("category_preferences", {})
+    if category.name in category_preferences:
+        ai_score += category_preferences[category.name] * 0.3
+    course_difficulty = legacy_difficulty(course)
+    preferred_difficulty = user_profile.get("preferred_difficulty", "intermediate")
+    if course_difficulty == preferred_difficulty:
+        ai_score += 0.25
+    elif abs(RecommendationUtils.difficulty_to_num(course_difficulty) -
+             RecommendationUtils.difficulty_to_num(preferred_difficulty)) == 1:
+        ai_score += 0.15
+    category_performance = user_profile.get("category_performance", {})
+    if category.name in category_performance:
+        performance = category_performance[category.name]
+        if performance > 80:
+            ai_score += 0.2
+        elif performance < 60:
+            ai_score += 0.1
+    learning_velocity = user_profile.get("learning_velocity", 1.0)
+    if learning_velocity > 1.5:
+        if course_difficulty in ["intermediate", "advanced"]:
+            ai_score += 0.15
+    elif learning_velocity < 0.7:
+        if course_difficulty in ["beginner", "intermediate"]:
+            ai_score += 0.15
+    ai_score += legacy_style_match(course, user_profile.get("learning_style", "balanced")) * 0.1
+    return min(ai_score, 1.0)
+
+
+def legacy_content_based(db: Session, user_id: int, user_profile: dict, limit: int):
+    """Ancien `content_based_advanced` (copie, sans la gestion d'erreur)."""
+    preferred_categories = user_profile.get("category_preferences", {})
+    preferred_difficulty = user_profile.get("preferred_difficulty", "intermediate")
+
+    available_courses = db.query(Course, Category).join(
+        Category, Course.category_id == Category.id
+    ).filter(
+        Course.status == "published",
+        ~Course.id.in_(
+            db.query(course_student.c.course_id).filter(course_student.c.student_id == user_id)
+        )
+    ).all()
+
+    recommendations = []
+    for course, category in available_courses:
+        content_score = 0.0
+        if category.name in preferred_categories:
+            content_score += preferred_categories[category.name] * 0.4
+        course_difficulty = legacy_difficulty(course)
+        if course_difficulty == preferred_difficulty:
+            content_score += 0.3
+        elif abs(RecommendationUtils.difficulty_to_num(course_difficulty) -
+                 RecommendationUtils.difficulty_to_num(preferred_difficulty)) == 1:
+            content_score += 0.15
+        content_score += RecommendationUtils.calculate_course_popularity(db, course.id) * 0.2
+        content_score += legacy_semantic_similarity(course, user_profile) * 0.1
+        if content_score > 0.1:
+            recommendations.append((course.id, min(content_score, 1.0)))
+
+    recommendations.sort(key=lambda x: x[1], reverse=True)
+    return recommendations[:limit]
+
+
+def legacy_ai(db: Session, user_id: int, user_profile: dict, limit: int):
+    """Ancienne boucle des recommandations « IA » : `legacy_ai_score` sur chaque cours."""
+    available_courses = db.query(Course, Category).join(
+        Category, Course.category_id == Category.id
+    ).filter(
+        Course.status == "published",
+        ~Course.id.in_(
+            db.query(course_student.c.course_id).filter(course_student.c.student_id == user_id)
+        )
+    ).all()
+
+    recommendations = []
+    for course, category in available_courses:
+        ai_score = legacy_ai_score(course, category, user_profile)
+        if ai_score > 0.3:
+            recommendations.append((course.id, ai_score))
+    recommendations.sort(key=lambda x: x[1], reverse=True)
+    return recommendations[:limit]
+
+
+def seed(engine, courses: int, seed_value: int = 42):
+    """Cours et inscriptions via `seed_dataset`, puis textes tirés parmi les mots-clés."""
+    dataset = seed_dataset(engine, DatasetParams(
+        students=max(courses // 5, 200), teachers=10, courses=courses, lessons_per_course=0,
+        modules_per_course=0, quizzes_per_course=0, questions_per_quiz=0, courses_per_student=25,
+        interactions_per_student=0, messages_per_discussion=0, seed=seed_value,
+    ))
+
+    rng = random.Random(seed_value)
+    vocabulary = BEGINNER_KEYWORDS + ADVANCED_KEYWORDS + CATEGORIES + [
+        keyword for keywords in STYLE_KEYWORDS.values() for keyword in keywords
+    ]
+    courses_table = Course.__table__
+    with engine.begin() as conn:
+        conn.execute(courses_table.update().where(courses_table.c.id == bindparam("course_id")), [
+            {"course_id": course_id, "description": " ".join(rng.sample(vocabulary, 4))}
+            for course_id in dataset.course_ids
+        ])
+    return dataset.student_ids
+
+
+def profiles(student_ids, count: int, seed_value: int = 7):
+    rng = random.Random(seed_value)
+    for user_id in rng.sample(student_ids, min(count, len(student_ids))):
+        yield user_id, {
+            "category_preferences": {name: rng.random() for name in rng.sample(CATEGORIES, 2)},
+            "category_performance": {name: rng.uniform(40, 100) for name in rng.sample(CATEGORIES, 2)},
+            "preferred_difficulty": rng.choice(DIFFICULTIES),
+            "learning_velocity": rng.choice([0.5, 1.0, 2.0]),
+            "learning_style": rng.choice(LEARNING_STYLES),
+        }
+
+
+def main(args) -> None:
+    print(f"{'cours':>8}{'index':>10}{'construction':>14}"
+          f"{'contenu avant':>15}{'après':>10}{'IA avant':>11}{'après':>10}{'gain':>9}{'accord':>8}")
+    for size in args.courses:
+        engine = create_engine(f"sqlite:///{os.path.join(_DB_DIR, f'content_{size}.db')}")
+        student_ids = seed(engine, size)
+        sample = list(profiles(student_ids, args.users))
+
+        with Session(engine) as db:
+            start = time.perf_counter()
+            index_courses(engine)
+            course_text_index.invalidate()
+            course_text_index.get(db)
+            indexing = time.perf_counter() - start
+
+            start = time.perf_counter()
+            features = build_features(db)
+            build = time.perf_counter() - start
+
+            def enrolled(user_id):
+                return [course_id for (course_id,) in db.query(course_student.c.course_id).filter(
+                    course_student.c.student_id == user_id
+                )]
+
+            new_content, new_ai = {}, {}
+            start = time.perf_counter()
+            for user_id, profile in sample:
+                top = features.top_k(features.content_scores(profile), enrolled(user_id), LIMIT, threshold=0.1)
+                new_content[user_id] = [features.course_id(position) for position, _ in top]
+            content_after = (time.perf_counter() - start) / len(sample)
+
+            start = time.perf_counter()
+            for user_id, profile in sample:
+                top = features.top_k(features.ai_scores(profile), enrolled(user_id), LIMIT, threshold=0.3)
+                new_ai[user_id] = [features.course_id(position) for position, _ in top]
+            ai_after = (time.perf_counter() - start) / len(sample)
+
+            legacy_sample = sample[:args.legacy_users]
+            agree = 0
+            start = time.perf_counter()
+            for user_id, profile in legacy_sample:
+                top = legacy_content_based(db, user_id, profile, LIMIT)
+                agree += [course_id for course_id, _ in top] == new_content[user_id]
+                db.expunge_all()
+            content_before = (time.perf_counter() - start) / len(legacy_sample)
+
+            start = time.perf_counter()
+            for user_id, profile in legacy_sample:
+                top = legacy_ai(db, user_id, profile, LIMIT)
+                agree += [course_id for course_id, _ in top] == new_ai[user_id]
+                db.expunge_all()
+            ai_before = (time.perf_counter() - start) / len(legacy_sample)
+
+        print(f"{len(features.course_ids):>8,}{indexing * 1000:>8,.0f}ms{build * 1000:>12,.0f}ms"
+              f"{content_before * 1000:>13,.0f}ms{content_after * 1000:>8,.2f}ms"
+              f"{ai_before * 1000:>9,.0f}ms{ai_after * 1000:>8,.2f}ms"
+              f"{content_before / content_after:>8,.0f}x{agree / (2 * len(legacy_sample)):>8.0%}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, nargs="+", default=[1000, 50000], help="Nombres de cours à mesurer")
+    parser.add_argument("--users", type=int, default=200, help="Profils notés par la matrice")
+    parser.add_argument("--legacy-users", type=int, default=3, help="Profils notés par l'ancienne boucle")
+    main(parser.parse_args())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark : analyse du texte des cours, recherche dans le texte / index TF-IDF.
+
+Pour chaque nombre de cours (descriptions d'une cinquantaine de mots, dont
+quelques mots-clés de niveau, de style et noms de catégories) :
+
+- index : construction de la table course_terms (`index_courses`) puis
+  chargement de la matrice TF-IDF (`load_index`) ;
+- mise à jour : remplacement d'un cours modifié dans l'index chargé
+  (`CourseTextIndex.replace`, niveaux et styles en cache), par cours ;
+- texte avant/après, par cours : niveau, style d'apprentissage et similarité
+  sémantique (`RecommendationUtils`), par l'ancienne recherche de sous-chaînes
+  dans le titre et la description (copie) puis par lecture de l'index ;
+- similarité : recommandations par contenu d'un utilisateur
+  (`RecommendationService.get_content_based_recommendations`, cosinus TF-IDF
+  avec ses cours suivis), par utilisateur.
+
+La colonne « accord » donne la part des cours de même niveau avec les deux
+méthodes (l'index reconnaît les mots qui commencent par un mot-clé, l'ancienne
+recherche toute sous-chaîne).
+
+Usage :
+    python -m benchmarks.course_text_index --courses 1000 50000
+"""
+
+import argparse
+import os
+from collections import Counter
+import random
+import sys
+import tempfile
+import time
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# La base de benchmark doit être configurée avant l'import de l'application
+_DB_DIR = tempfile.mkdtemp(prefix="bench_text_index_")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(_DB_DIR, 'bench.db')}")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from sqlalchemy import bindparam, create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.models.models import Course  # noqa: E402
+from app.services.course_text_index import (  # noqa: E402
+    ADVANCED_KEYWORDS, BEGINNER_KEYWORDS, LEARNING_STYLES, STYLE_KEYWORDS, course_text_index, index_courses,
+    load_index,
+)
+from app.services.recommendation_service_improved import RecommendationService  # noqa: E402
+from app.services.recommendation_utils import RecommendationUtils  # noqa: E402
+from benchmarks.content_scoring import (  # noqa: E402
+    CATEGORIES, legacy_difficulty, legacy_semantic_similarity, legacy_style_match,
+)
+from benchmarks.dataset import DatasetParams, seed_dataset  # noqa: E402
+
+WORDS_PER_DESCRIPTION = 50
+LIMIT = 10
+
+
+def seed(engine, courses: int, seed_value: int = 42):
+    """Cours et inscriptions via `seed_dataset`, puis descriptions tirées d'un vocabulaire synthétique."""
+    dataset = seed_dataset(engine, DatasetParams(
+        students=max(courses // 5, 200), teachers=10, courses=courses, lessons_per_course=0,
+        modules_per_course=0, quizzes_per_course=0, questions_per_quiz=0, courses_per_student=10,
+        interactions_per_student=0, messages_per_discussion=0, seed=seed_value,
+    ))
+
+    rng = random.Random(seed_value)
+    keywords = BEGINNER_KEYWORDS + ADVANCED_KEYWORDS + CATEGORIES + [
+        keyword for style_keywords in STYLE_KEYWORDS.values() for keyword in style_keywords
+    ]
+    filler = [f"notion{i}" for i in range(5000)]
+    courses_table = Course.__table__
+    with engine.begin() as conn:
+        conn.execute(courses_table.update().where(courses_table.c.id == bindparam("course_id")), [
+            {"course_id": course_id, "description": " ".join(
+                rng.sample(keywords, 4) + rng.choices(filler, k=WORDS_PER_DESCRIPTION - 4)
+            )}
+            for course_id in dataset.course_ids
+        ])
+    return dataset.student_ids
+
+
+def text_inference(courses, profile, difficulty, style_match, semantic_similarity):
+    return [
+        (difficulty(course), style_match(course, profile["learning_style"]), semantic_similarity(course, profile))
+        for course in courses
+    ]
+
+
+def main(args) -> None:
+    print(f"{'cours':>8}{'construction':>14}{'chargement':>12}{'mise à jour':>13}"
+          f"{'texte avant':>13}{'après':>10}{'gain':>8}{'similarité':>12}{'accord':>8}")
+    profile = {"learning_style": LEARNING_STYLES[0], "category_preferences": {CATEGORIES[0]: 0.8, CATEGORIES[2]: 0.4}}
+    for size in args.courses:
+        engine = create_engine(f"sqlite:///{os.path.join(_DB_DIR, f'text_{size}.db')}")
+        student_ids = seed(engine, size)
+
+        start = time.perf_counter()
+        index_courses(engine)
+        build = time.perf_counter() - start
+
+        with Session(engine) as db:
+            start = time.perf_counter()
+            load_index(db)
+            load = time.perf_counter() - start
+            course_text_index.invalidate()
+            index = course_text_index.get(db)
+            index.difficulties()
+            index.style_matches()
+
+            rng = random.Random(3)
+            edits = rng.sample(index.course_ids.tolist(), min(20, len(index.course_ids)))
+            start = time.perf_counter()
+            for course_id in edits:
+                terms = rng.sample(list(index.terms[:WORDS_PER_DESCRIPTION * 10]), WORDS_PER_DESCRIPTION - 1)
+                index.replace({course_id: Counter(terms + [f"nouveau{course_id}"])})
+            update = (time.perf_counter() - start) / len(edits)
+
+            courses = db.query(Course).all()
+            start = time.perf_counter()
+            before = text_inference(courses, profile, legacy_difficulty, legacy_style_match,
+                                    legacy_semantic_similarity)
+            text_before = (time.perf_counter() - start) / len(courses)
+
+            start = time.perf_counter()
+            after = text_inference(courses, profile, RecommendationUtils.infer_course_difficulty,
+                                   RecommendationUtils.match_learning_style,
+                                   RecommendationUtils.calculate_semantic_similarity)
+            text_after = (time.perf_counter() - start) / len(courses)
+            agree = sum(old[0] == new[0] for old, new in zip(before, after)) / len(courses)
+
+            service = RecommendationService(db)
+            sample = random.Random(7).sample(student_ids, min(args.users, len(student_ids)))
+            start = time.perf_counter()
+            for user_id in sample:
+                service.get_content_based_recommendations(user_id, LIMIT)
+            similarity = (time.perf_counter() - start) / len(sample)
+
+        print(f"{size:>8,}{build * 1000:>12,.0f}ms{load * 1000:>10,.0f}ms{update * 1000:>11,.1f}ms"
+              f"{text_before * 1e6:>11,.1f}µs{text_after * 1e6:>8,.1f}µs{text_before / text_after:>7,.1f}x"
+              f"{similarity * 1000:>10,.2f}ms{agree:>8.0%}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, nargs="+", default=[1000, 50000], help="Nombres de cours à mesurer")
+    parser.add_argument("--users", type=int, default=100, help="Utilisateurs pour la similarité")
+    main(parser.parse_args())
@@ -0,0 +1,237 @@
+"""
+Jeu de données paramétrable pour les benchmarks.
+
+Les lignes sont construites en Python (générateur aléatoire initialisé avec
+une graine) puis insérées table par table avec des INSERT multi-lignes, en
+fixant les identifiants : aucune relecture n'est nécessaire pour relier les
+tables entre elles.
+"""
+
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy.engine import Engine
+
+from app import models
+from app.database import Base
+from app.db.interaction_rollups import daily_counts
+
+# Les comptes générés ne servent qu'avec des jetons JWT créés par le benchmark :
+# leur mot de passe n'est pas utilisable
+UNUSABLE_PASSWORD_HASH = "!"
+
+
+@dataclass
+class DatasetParams:
+    students: int = 200
+    teachers: int = 10
+    courses: int = 40
+    lessons_per_course: int = 12
+    modules_per_course: int = 3
+    quizzes_per_course: int = 2
+    questions_per_quiz: int = 5
+    courses_per_student: int = 5
+    interactions_per_student: int = 30
+    messages_per_discussion: int = 20
+    seed: int = 42
+
+
+@dataclass
+class Dataset:
+    """Identifiants utiles pour construire les requêtes du benchmark."""
+    student_ids: List[int] = field(default_factory=list)
+    teacher_ids: List[int] = field(default_factory=list)
+    course_ids: List[int] = field(default_factory=list)
+    # quiz_id -> {question_id: id de l'option correcte}
+    quiz_answers: Dict[int, Dict[int, int]] = field(default_factory=dict)
+    # étudiant -> quiz des cours auxquels il est inscrit
+    student_quizzes: Dict[int, List[int]] = field(default_factory=dict)
+    # utilisateur -> discussions auxquelles il participe
+    user_discussions: Dict[int, List[int]] = field(default_factory=dict)
+    row_counts: Dict[str, int] = field(default_factory=dict)
+
+
+def _insert(conn, table, rows: List[dict], counts: Dict[str, int], chunk_size: int = 5000) -> None:
+    for start in range(0, len(rows), chunk_size):
+        conn.execute(table.insert(), rows[start:start + chunk_size])
+    counts[table.name] = counts.get(table.name, 0) + len(rows)
+
+
+def seed_dataset(engine: Engine, params: DatasetParams) -> Dataset:
+    """Crée le schéma et insère le jeu de données décrit par `params`."""
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(params.seed)
+    now = datetime.utcnow()
+    dataset = Dataset()
+    counts = dataset.row_counts
+
+    users = []
+    for i in range(params.teachers):
+        user_id = len(users) + 1
+        dataset.teacher_ids.append(user_id)
+        users.append({
+            "id": user_id, "username": f"prof{i}", "email": f"prof{i}.bench@example.com",
+            "password_hash": UNUSABLE_PASSWORD_HASH, "first_name": "Professeur", "last_name": f"Numéro {i}",
+            "role": "enseignant", "is_active": True,
+        })
+    for i in range(params.students):
+        user_id = len(users) + 1
+        dataset.student_ids.append(user_id)
+        users.append({
+            "id": user_id, "username": f"etu{i}", "email": f"etu{i}.bench@example.com",
+            "password_hash": UNUSABLE_PASSWORD_HASH, "first_name": "Étudiant", "last_name": f"Numéro {i}",
+            "role": "etudiant", "is_active": True,
+        })
+
+    categories = [{"id": i + 1, "name": name} for i, name in enumerate(
+        ["Programmation", "Mathématiques", "Données", "Réseaux", "Design"]
+    )]
+
+    courses, modules, lessons = [], [], []
+    quizzes, questions, options = [], [], []
+    course_lessons: Dict[int, List[int]] = {}
+    course_quizzes: Dict[int, List[int]] = {}
+    for c in range(params.courses):
+        course_id = c + 1
+        dataset.course_ids.append(course_id)
+        courses.append({
+            "id": course_id, "title": f"Cours {course_id}", "slug": f"cours-bench-{course_id}",
+            "description": f"Description détaillée du cours {course_id}",
+            "short_description": f"Cours {course_id}",
+            "status": models.CourseStatus.published,
+            "level": rng.choice(["beginner", "intermediate", "advanced"]),
+            "price": 0.0,
+            "instructor_id": dataset.teacher_ids[c % params.teachers],
+            "category_id": rng.choice(categories)["id"],
+        })
+        module_ids = []
+        for m in range(params.modules_per_course):
+            module_ids.append(len(modules) + 1)
+            modules.append({
+                "id": len(modules) + 1, "title": f"Module {m + 1}", "order_index": m,
+                "course_id": course_id,
+            })
+        course_lessons[course_id] = []
+        for k in range(params.lessons_per_course):
+            lesson_id = len(lessons) + 1
+            course_lessons[course_id].append(lesson_id)
+            lessons.append({
+                "id": lesson_id, "title": f"Leçon {k + 1}", "content": "Contenu de la leçon",
+                "duration": rng.randint(300, 1800), "order_index": k, "course_id": course_id,
+                "module_id": module_ids[k * len(module_ids) // params.lessons_per_course],
+            })
+        course_quizzes[course_id] = []
+        for q in range(params.quizzes_per_course):
+            quiz_id = len(quizzes) + 1
+            course_quizzes[course_id].append(quiz_id)
+            quizzes.append({
+                "id": quiz_id, "title": f"Quiz {q + 1} du cours {course_id}",
+                "lesson_id": rng.choice(course_lessons[course_id]), "is_active": True,
+                "passing_score": 70,
+            })
+            dataset.quiz_answers[quiz_id] = {}
+            for _ in range(params.questions_per_quiz):
+                question_id = len(questions) + 1
+                questions.append({
+                    "id": question_id, "quiz_id": quiz_id, "question_text": f"Question {question_id} ?",
+                    "question_type": "multiple_choice", "points": 1,
+                })
+                correct = rng.randrange(4)
+                for o in range(4):
+                    option_id = len(options) + 1
+                    if o == correct:
+                        dataset.quiz_answers[quiz_id][question_id] = option_id
+                    options.append({
+                        "id": option_id, "question_id": question_id,
+                        "option_text": f"Réponse {o + 1}", "is_correct": o == correct,
+                    })
+
+    # Popularité des cours décroissante (loi de Zipf) pour les inscriptions
+    weights = [1.0 / (rank + 1) for rank in range(params.courses)]
+    enrollments, progress, completions, quiz_results, interactions = [], [], [], [], []
+    course_students: Dict[int, List[int]] = {course_id: [] for course_id in dataset.course_ids}
+    for student_id in dataset.student_ids:
+        enrolled = set()
+        while len(enrolled) < min(params.courses_per_student, params.courses):
+            enrolled.add(rng.choices(dataset.course_ids, weights)[0])
+        dataset.student_quizzes[student_id] = []
+        for course_id in sorted(enrolled):
+            course_students[course_id].append(student_id)
+            enrollments.append({"course_id": course_id, "student_id": student_id})
+            done = rng.randint(0, params.lessons_per_course)
+            # updated_at renseigné : le tableau de bord étudiant calcule des durées dessus
+            last_accessed = now - timedelta(days=rng.randint(0, 60))
+            progress.append({
+                "user_id": student_id, "course_id": course_id,
+                "completion_percentage": round(100.0 * done / max(params.lessons_per_course, 1), 1),
+                "is_completed": done == params.lessons_per_course,
+                "last_accessed": last_accessed, "updated_at": last_accessed,
+            })
+            for lesson_id in course_lessons[course_id][:done]:
+                completions.append({
+                    "user_id": student_id, "lesson_id": lesson_id,
+                    "completed_at": now - timedelta(days=rng.randint(0, 60)),
+                })
+            for quiz_id in course_quizzes[course_id]:
+                dataset.student_quizzes[student_id].append(quiz_id)
+                if rng.random() < 0.5:
+                    score = float(rng.randint(0, 100))
+                    quiz_results.append({
+                        "user_id": student_id, "quiz_id": quiz_id, "score": score,
+                        "passed": score >= 70, "completed_at": now - timedelta(days=rng.randint(0, 60)),
+                    })
+        for _ in range(params.interactions_per_student):
+            course_id = rng.choice(sorted(enrolled))
+            entity_type, entity_id = rng.choice([
+                ("course", course_id), ("lesson", rng.choice(course_lessons[course_id])),
+            ])
+            interactions.append({
+                "user_id": student_id, "entity_type": entity_type, "entity_id": entity_id,
+                "interaction_type": rng.choice(["view", "view", "view", "click", "complete"]),
+                "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+            })
+
+    # Une discussion de groupe par cours : l'enseignant et les inscrits
+    discussions, participants, messages = [], [], []
+    for course in courses:
+        discussion_id = len(discussions) + 1
+        members = [course["instructor_id"]] + course_students[course["id"]]
+        discussions.append({
+            "id": discussion_id, "title": f"Discussion du cours {course['id']}",
+            "created_by": course["instructor_id"], "is_group": True,
+        })
+        for user_id in members:
+            participants.append({"user_id": user_id, "discussion_id": discussion_id})
+            dataset.user_discussions.setdefault(user_id, []).append(discussion_id)
+        for m in range(params.messages_per_discussion):
+            messages.append({
+                "content": f"Message {m + 1}", "discussion_id": discussion_id,
+                "sender_id": rng.choice(members),
+                "sent_at": now - timedelta(minutes=params.messages_per_discussion - m),
+            })
+
+    with engine.begin() as conn:
+        for table, rows in [
+            (models.User.__table__, users),
+            (models.Category.__table__, categories),
+            (models.Course.__table__, courses),
+            (models.Module.__table__, modules),
+            (models.Lesson.__table__, lessons),
+            (models.Quiz.__table__, quizzes),
+            (models.QuizQuestion.__table__, questions),
+            (models.QuizOption.__table__, options),
+            (models.course_student, enrollments),
+            (models.UserProgress.__table__, progress),
+            (models.LessonCompletion.__table__, completions),
+            (models.UserQuizResult.__table__, quiz_results),
+            (models.UserInteraction.__table__, interactions),
+            (models.UserInteractionDaily.__table__, daily_counts(interactions)),
+            (models.Discussion.__table__, discussions),
+            (models.discussion_participants, participants),
+            (models.Message.__table__, messages),
+        ]:
+            _insert(conn, table, rows, counts)
+
+    return dataset
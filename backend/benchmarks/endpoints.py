@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Benchmark des endpoints principaux de l'API.
+
+Démarre l'application FastAPI sur une base locale (sqlite temporaire par
+défaut), la remplit avec un jeu de données paramétrable, puis envoie des
+requêtes concurrentes sur les routes les plus sollicitées : tableau de bord
+étudiant, catalogue des cours, étudiants d'un enseignant, quiz disponibles /
+soumission, discussions et messages, recommandations.
+
+Pour chaque scénario : latences p50/p95/p99, débit et nombre de requêtes SQL
+par requête HTTP (lu dans l'en-tête Server-Timing). Les résultats sont écrits
+en JSON pour comparer deux commits :
+
+    python -m benchmarks.endpoints --students 500 --courses 50 --output avant.json
+    git checkout autre-branche
+    python -m benchmarks.endpoints --students 500 --courses 50 --output apres.json --compare avant.json
+
+Avec --database-url, la base indiquée est utilisée (elle doit être vide).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    role: str  # "etudiant" ou "enseignant"
+    # (dataset, user_id, rng) -> (chemin, corps JSON éventuel)
+    build: Callable[..., Tuple[str, Optional[dict]]]
+
+
+def _submit_quiz(dataset, user_id, rng):
+    quiz_id = rng.choice(dataset.student_quizzes[user_id])
+    answers = [
+        {"questionId": question_id, "answer": str(option_id if rng.random() < 0.7 else option_id + 1)}
+        for question_id, option_id in dataset.quiz_answers[quiz_id].items()
+    ]
+    return f"/api/v1/quizzes/{quiz_id}/submit", {"answers": answers}
+
+
+def _discussion_messages(dataset, user_id, rng):
+    discussion_id = rng.choice(dataset.user_discussions[user_id])
+    return f"/api/v1/discussions/{discussion_id}/messages", None
+
+
+SCENARIOS = [
+    Scenario("student_dashboard", "GET", "etudiant", lambda d, u, r: ("/api/v1/student/dashboard", None)),
+    Scenario("all_courses", "GET", "etudiant", lambda d, u, r: ("/api/v1/student/all-courses", None)),
+    Scenario("teacher_students", "GET", "enseignant", lambda d, u, r: ("/api/v1/teacher/dashboard/students", None)),
+    Scenario("quiz_available", "GET", "etudiant", lambda d, u, r: ("/api/v1/quizzes/student/available", None)),
+    Scenario("quiz_submit", "POST", "etudiant", _submit_quiz),
+    Scenario("discussion_list", "GET", "etudiant", lambda d, u, r: ("/api/v1/discussions/", None)),
+    Scenario("discussion_messages", "GET", "etudiant", _discussion_messages),
+    Scenario("recommendations", "GET", "etudiant", lambda d, u, r: ("/api/v1/recommendations/new/", None)),
+    Scenario("recommended_courses", "GET", "etudiant", lambda d, u, r: ("/api/v1/student/recommended-courses", None)),
+]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Percentile par interpolation linéaire sur une liste triée."""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(latencies: List[float], queries: List[int], errors: Dict[str, int], elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(count / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(ordered, 0.50) * 1000, 2),
+            "p95": round(percentile(ordered, 0.95) * 1000, 2),
+            "p99": round(percentile(ordered, 0.99) * 1000, 2),
+            "mean": round(sum(ordered) / count * 1000, 2) if count else 0.0,
+            "max": round(ordered[-1] * 1000, 2) if count else 0.0,
+        },
+        "queries_per_request": {
+            "mean": round(sum(queries) / len(queries), 1) if queries else None,
+            "max": max(queries) if queries else None,
+        },
+    }
+
+
+async def run_scenario(client, scenario: Scenario, dataset, tokens: Dict[int, str],
+                       requests: int, concurrency: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    user_ids = dataset.student_ids if scenario.role == "etudiant" else dataset.teacher_ids
+    calls = []
+    for _ in range(requests):
+        user_id = rng.choice(user_ids)
+        calls.append((user_id, *scenario.build(dataset, user_id, rng)))
+
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors: Dict[str, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(user_id: int, path: str, body: Optional[dict]) -> None:
+        headers = {"Authorization": f"Bearer {tokens[user_id]}"}
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.request(scenario.method, path, headers=headers, json=body)
+            latencies.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+        match = _QUERIES_RE.search(response.headers.get("server-timing", ""))
+        if match:
+            queries.append(int(match.group(1)))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call(*c) for c in calls))
+    return summarize(latencies, queries, errors, time.perf_counter() - start)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results: dict, baseline: Optional[dict]) -> None:
+    header = f"{'Scénario':<24}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'SQL/req':>9}{'erreurs':>9}"
+    if baseline:
+        header += f"{'Δ p95':>10}{'Δ req/s':>10}"
+    print(header)
+    for name, result in results["scenarios"].items():
+        latency = result["latency_ms"]
+        sql = result["queries_per_request"]["mean"]
+        line = (
+            f"{name:<24}{latency['p50']:>9.1f}{latency['p95']:>9.1f}{latency['p99']:>9.1f}"
+            f"{result['throughput_rps']:>9.1f}{sql if sql is not None else '-':>9}"
+            f"{sum(result['errors'].values()):>9}"
+        )
+        previous = (baseline or {}).get("scenarios", {}).get(name)
+        if previous:
+            def delta(new, old):
+                return f"{(new - old) / old * 100:+.0f}%" if old else "-"
+            line += f"{delta(latency['p95'], previous['latency_ms']['p95']):>10}"
+            line += f"{delta(result['throughput_rps'], previous['throughput_rps']):>10}"
+        print(line)
+
+
+async def main(args) -> dict:
+    from app.db import session as db_session
+    from app.main import app
+    from app.models import User
+    from app.services.auth_service import create_access_token, user_claims
+    from benchmarks.dataset import DatasetParams, seed_dataset
+    import httpx
+
+    params = DatasetParams(
+        students=args.students, teachers=args.teachers, courses=args.courses,
+        lessons_per_course=args.lessons, courses_per_student=args.courses_per_student,
+        interactions_per_student=args.interactions, messages_per_discussion=args.messages,
+        seed=args.seed,
+    )
+    seed_start = time.perf_counter()
+    dataset = seed_dataset(db_session.engine, params)
+    seed_time = time.perf_counter() - seed_start
+    print(f"Jeu de données inséré en {seed_time:.1f} s : {dataset.row_counts}")
+
+    # Jetons identiques à ceux de la connexion : l'authentification se fait à
+    # partir des informations du jeton, sans relire l'utilisateur
+    with db_session.SessionLocal() as db:
+        tokens = {
+            user.id: create_access_token(user_claims(user))
+            for user in db.query(User).filter(User.id.in_(dataset.student_ids + dataset.teacher_ids))
+        }
+
+    selected = [s for s in SCENARIOS if not args.scenarios or s.name in args.scenarios]
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "database": db_session.engine.url.get_backend_name(),
+            "dataset": asdict(params),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed_time_s": round(seed_time, 2),
+        },
+        "scenarios": {},
+    }
+
+    # Démarrage de l'application comme sous uvicorn : tâches de fond (versions
+    # de jetons, écriture des interactions) et index chargés après l'insertion
+    await app.router.startup()
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            for scenario in selected:
+                # Préchauffage (pool de connexions, compilation des requêtes)
+                await run_scenario(client, scenario, dataset, tokens, args.warmup, args.concurrency, args.seed + 1)
+                results["scenarios"][scenario.name] = await run_scenario(
+                    client, scenario, dataset, tokens, args.requests, args.concurrency, args.seed
+                )
+    finally:
+        await app.router.shutdown()
+
+    await db_session.async_engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=200, help="Nombre d'étudiants")
+    parser.add_argument("--teachers", type=int, default=10, help="Nombre d'enseignants")
+    parser.add_argument("--courses", type=int, default=40, help="Nombre de cours")
+    parser.add_argument("--lessons", type=int, default=12, help="Leçons par cours")
+    parser.add_argument("--courses-per-student", type=int, default=5, help="Inscriptions par étudiant")
+    parser.add_argument("--interactions", type=int, default=30, help="Interactions par étudiant")
+    parser.add_argument("--messages", type=int, default=20, help="Messages par discussion")
+    parser.add_argument("--requests", type=int, default=200, help="Requêtes mesurées par scénario")
+    parser.add_argument("--warmup", type=int, default=10, help="Requêtes de préchauffage par scénario")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requêtes simultanées")
+    parser.add_argument("--scenarios", nargs="*", help=f"Sous-ensemble parmi : {', '.join(s.name for s in SCENARIOS)}")
+    parser.add_argument("--seed", type=int, default=42, help="Graine du générateur aléatoire")
+    parser.add_argument("--database-url", help="Base à utiliser (sqlite temporaire par défaut)")
+    parser.add_argument("--output", help="Fichier JSON des résultats")
+    parser.add_argument("--compare", help="Résultats JSON de référence à comparer")
+    args = parser.parse_args()
+
+    # La base doit être configurée avant l'import de l'application
+    if args.database_url:
+        os.environ["SQLALCHEMY_DATABASE_URI"] = args.database_url
+    else:
+        db_file = os.path.join(tempfile.mkdtemp(prefix="bench_endpoints_"), "bench.db")
+        os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_file}"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    results = asyncio.run(main(args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print()
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\nRésultats écrits dans {args.output}")
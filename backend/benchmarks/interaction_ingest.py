@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark : débit d'ingestion des interactions, écriture unitaire / par lots.
+
+Les mêmes interactions sont enregistrées par des producteurs concurrents
+(threads, comme les routes synchrones) :
+
+- avant : `InteractionService.log_interaction`, un INSERT + COMMIT + relecture
+  par interaction, une session par producteur ;
+- après : `InteractionService.queue_interaction` (app/core/interaction_buffer.py),
+  écriture par lots en tâche de fond. Le temps mesuré inclut l'écriture des
+  dernières interactions à l'arrêt du tampon.
+
+Pour chaque mode : interactions par seconde, transactions effectuées et
+lignes effectivement présentes en base.
+
+Usage :
+    python -m benchmarks.interaction_ingest --events 20000 --producers 8
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# La base de benchmark doit être configurée avant l'import de l'application
+_DB_FILE = os.path.join(tempfile.mkdtemp(prefix="bench_interactions_"), "bench.db")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{_DB_FILE}")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from sqlalchemy import delete, func, select  # noqa: E402
+
+from app.core.interaction_buffer import interaction_buffer  # noqa: E402
+from app.db import session as db_session  # noqa: E402
+from app.models.interaction import UserInteraction  # noqa: E402
+from app.services.interaction_service import InteractionService  # noqa: E402
+from benchmarks.dataset import DatasetParams, seed_dataset  # noqa: E402
+
+
+def _event(index: int, student_ids):
+    return {
+        "user_id": student_ids[index % len(student_ids)],
+        "entity_type": "page",
+        "entity_id": 0,
+        "interaction_type": "view",
+        "metadata": {"path": f"/api/v1/courses/{index % 50}", "method": "GET", "query_params": {}},
+    }
+
+
+def _split(events: int, producers: int):
+    return [range(p, events, producers) for p in range(producers)]
+
+
+def run_direct(args, student_ids) -> dict:
+    def produce(indexes):
+        db = db_session.SessionLocal()
+        try:
+            service = InteractionService(db)
+            for index in indexes:
+                service.log_interaction(**_event(index, student_ids))
+        finally:
+            db.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.producers) as pool:
+        list(pool.map(produce, _split(args.events, args.producers)))
+    return {"elapsed": time.perf_counter() - start, "transactions": args.events, "dropped": 0}
+
+
+async def run_buffered(args, student_ids) -> dict:
+    def produce(indexes):
+        for index in indexes:
+            InteractionService.queue_interaction(**_event(index, student_ids))
+
+    batches_before = interaction_buffer.batches
+    dropped_before = interaction_buffer.dropped
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    interaction_buffer.start(db_session.engine)
+    with ThreadPoolExecutor(max_workers=args.producers) as pool:
+        await asyncio.gather(*(loop.run_in_executor(pool, produce, indexes)
+                               for indexes in _split(args.events, args.producers)))
+    await interaction_buffer.stop(db_session.engine)
+    return {
+        "elapsed": time.perf_counter() - start,
+        "transactions": interaction_buffer.batches - batches_before,
+        "dropped": interaction_buffer.dropped - dropped_before,
+    }
+
+
+def count_rows() -> int:
+    with db_session.engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(UserInteraction)).scalar()
+
+
+def reset_rows() -> None:
+    with db_session.engine.begin() as conn:
+        conn.execute(delete(UserInteraction))
+
+
+def main(args) -> None:
+    interaction_buffer.batch_size = args.batch_size
+    interaction_buffer.max_size = args.buffer_size
+    dataset = seed_dataset(db_session.engine, DatasetParams(
+        students=100, teachers=1, courses=1, lessons_per_course=1, quizzes_per_course=0,
+        interactions_per_student=0, messages_per_discussion=0,
+    ))
+    student_ids = dataset.student_ids
+
+    print(f"{args.events:,} interactions, {args.producers} producteurs, "
+          f"lots de {args.batch_size}, tampon de {args.buffer_size:,}\n")
+    print(f"{'Mode':<12}{'interactions/s':>16}{'transactions':>14}{'abandonnées':>13}{'lignes':>10}")
+    for label, runner in (("unitaire", lambda: run_direct(args, student_ids)),
+                          ("par lots", lambda: asyncio.run(run_buffered(args, student_ids)))):
+        reset_rows()
+        result = runner()
+        print(f"{label:<12}{args.events / result['elapsed']:>16,.0f}{result['transactions']:>14,}"
+              f"{result['dropped']:>13,}{count_rows():>10,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20000, help="Interactions à enregistrer par mode")
+    parser.add_argument("--producers", type=int, default=8, help="Producteurs concurrents")
+    parser.add_argument("--batch-size", type=int, default=500, help="Taille des lots (INTERACTION_FLUSH_BATCH)")
+    parser.add_argument("--buffer-size", type=int, default=100000, help="Taille du tampon (INTERACTION_BUFFER_SIZE)")
+    main(parser.parse_args())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark : connexions légitimes pendant une vague de tentatives frauduleuses.
+
+Des attaquants (quelques adresses IP, forte concurrence) envoient en continu
+des mots de passe erronés sur d'autres comptes existants, pendant que des
+utilisateurs légitimes (une IP chacun) se connectent régulièrement. Le même
+scénario est joué limiteur désactivé puis activé (app/core/rate_limit.py).
+
+Pour chaque passe : connexions légitimes réussies par seconde, latences
+p50/p95, réponses 429/503, et nombre de vérifications bcrypt effectuées
+(le coût CPU subi par le worker).
+
+Usage :
+    python -m benchmarks.login_throttle --duration 10 --attackers 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# La base de benchmark doit être configurée avant l'import de l'application
+_DB_FILE = os.path.join(tempfile.mkdtemp(prefix="bench_login_"), "bench.db")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{_DB_FILE}")
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+import httpx  # noqa: E402
+from sqlalchemy import update  # noqa: E402
+
+from app.core.passwords import hash_password, password_verifier  # noqa: E402
+from app.core.rate_limit import MemoryBucketBackend, login_throttle, set_backend  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.db import session as db_session  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+from benchmarks.dataset import DatasetParams, seed_dataset  # noqa: E402
+from benchmarks.endpoints import percentile  # noqa: E402
+
+PASSWORD = "motdepasse-bench"
+LOGIN_PATH = f"{settings.API_V1_STR}/auth/token"
+
+
+def _client(ip: str) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False, client=(ip, 40000))
+    return httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60)
+
+
+async def run_pass(args, usernames: List[str], victims: List[str], throttled: bool) -> Dict:
+    login_throttle.enabled = throttled
+    set_backend(MemoryBucketBackend(settings.LOGIN_THROTTLE_MAX_KEYS))
+    verified_before = password_verifier.verified
+
+    deadline = time.perf_counter() + args.duration
+    latencies: List[float] = []
+    statuses: Dict[str, Dict[int, int]] = {"legit": {}, "attack": {}}
+
+    def count(kind: str, status_code: int) -> None:
+        statuses[kind][status_code] = statuses[kind].get(status_code, 0) + 1
+
+    async def legit_user(index: int) -> None:
+        username = usernames[index % len(usernames)]
+        async with _client(f"10.1.{index // 250}.{index % 250 + 1}") as client:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.post(LOGIN_PATH, data={"username": username, "password": PASSWORD})
+                count("legit", response.status_code)
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(args.think_time)
+
+    async def attacker(index: int) -> None:
+        async with _client(f"10.66.0.{index % args.attacker_ips + 1}") as client:
+            attempt = 0
+            while time.perf_counter() < deadline:
+                username = victims[(index + attempt) % len(victims)]
+                response = await client.post(LOGIN_PATH, data={"username": username, "password": f"faux{attempt}"})
+                count("attack", response.status_code)
+                attempt += 1
+                if response.status_code in (429, 503):
+                    # Un attaquant insiste sans attendre le Retry-After
+                    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(legit_user(i) for i in range(args.users)),
+        *(attacker(i) for i in range(args.attackers)),
+    )
+    elapsed = time.perf_counter() - start
+    ordered = sorted(latencies)
+    return {
+        "legit_ok_per_s": len(latencies) / elapsed,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "legit": statuses["legit"],
+        "attack": statuses["attack"],
+        "bcrypt_per_s": (password_verifier.verified - verified_before) / elapsed,
+    }
+
+
+async def main(args) -> None:
+    if args.ip_burst is not None:
+        settings.LOGIN_THROTTLE_IP_BURST = args.ip_burst
+    dataset = seed_dataset(db_session.engine, DatasetParams(
+        students=args.users + args.victims, teachers=1, courses=1, lessons_per_course=1, quizzes_per_course=0,
+        interactions_per_student=0, messages_per_discussion=0,
+    ))
+    # Même hash (coût courant) pour tous les comptes : un seul calcul bcrypt
+    password_hash = hash_password(PASSWORD)
+    with db_session.engine.begin() as conn:
+        conn.execute(update(User).values(password_hash=password_hash))
+    usernames = [f"etu{i}" for i in range(args.users)]
+    victims = [f"etu{i}" for i in range(args.users, len(dataset.student_ids))]
+
+    print(f"{args.users} utilisateurs légitimes (une connexion toutes les {args.think_time} s), "
+          f"{args.attackers} attaquants sur {args.attacker_ips} IP, {args.duration} s par passe, "
+          f"rafale par IP : {settings.LOGIN_THROTTLE_IP_BURST}\n")
+    print(f"{'Limiteur':<12}{'OK/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'bcrypt/s':>10}  légitimes / attaque (statuts)")
+    for throttled in (False, True):
+        result = await run_pass(args, usernames, victims, throttled)
+        print(
+            f"{'activé' if throttled else 'désactivé':<12}{result['legit_ok_per_s']:>8.1f}"
+            f"{result['p50_ms']:>9.0f}{result['p95_ms']:>9.0f}{result['bcrypt_per_s']:>10.1f}"
+            f"  {dict(sorted(result['legit'].items()))} / {dict(sorted(result['attack'].items()))}"
+        )
+
+    password_verifier.shutdown()
+    await db_session.async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10, help="Utilisateurs légitimes")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Secondes entre deux connexions légitimes")
+    parser.add_argument("--victims", type=int, default=200, help="Comptes visés par les attaquants")
+    parser.add_argument("--attackers", type=int, default=50, help="Attaquants simultanés")
+    parser.add_argument("--attacker-ips", type=int, default=3, help="Adresses IP des attaquants")
+    parser.add_argument("--duration", type=float, default=10.0, help="Durée d'une passe (secondes)")
+    parser.add_argument("--ip-burst", type=int, help="Rafale par IP (LOGIN_THROTTLE_IP_BURST par défaut)")
+    asyncio.run(main(parser.parse_args()))
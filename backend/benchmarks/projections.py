@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark : mémoire et temps de chargement des listes, entités ORM / projections.
+
+Pour chaque liste, les mêmes lignes sont chargées deux fois :
+
+- avant : entités ORM complètes (`db.query(User)`), comme le faisaient
+  UserService.get_users et les listes du tableau de bord enseignant ;
+- après : projection (`app.db.projections`) des seules colonnes utiles.
+
+La mémoire est mesurée avec tracemalloc (pic pendant le chargement et mémoire
+encore retenue par le résultat et la session) et ramenée à 10 000 lignes.
+
+Usage :
+    python -m benchmarks.projections --students 10000 --courses 20
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# La base de benchmark doit être configurée avant l'import de l'application
+_DB_FILE = os.path.join(tempfile.mkdtemp(prefix="bench_projections_"), "bench.db")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{_DB_FILE}")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from sqlalchemy.sql import func  # noqa: E402
+
+from app.db import session as db_session  # noqa: E402
+from app.db.projections import fetch_all  # noqa: E402
+from app.models.models import Course, course_student  # noqa: E402
+from app.models.progress import UserProgress  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.api.v1.endpoints.teacher_dashboard import StudentCourseProgress  # noqa: E402
+from app.services.user_service import UserListItem  # noqa: E402
+from benchmarks.dataset import DatasetParams, seed_dataset  # noqa: E402
+
+
+def users_orm(db):
+    return db.query(User).order_by(User.id).all()
+
+
+def users_projection(db):
+    return fetch_all(db, UserListItem, UserListItem.select().order_by(User.id))
+
+
+def progress_orm(db):
+    return db.query(
+        User, Course.title, func.coalesce(UserProgress.completion_percentage, 0), UserProgress.last_accessed
+    ).select_from(course_student).join(
+        User, User.id == course_student.c.student_id
+    ).join(
+        Course, Course.id == course_student.c.course_id
+    ).outerjoin(
+        UserProgress, (UserProgress.user_id == User.id) & (UserProgress.course_id == Course.id)
+    ).all()
+
+
+def progress_projection(db):
+    return fetch_all(db, StudentCourseProgress, StudentCourseProgress.select().select_from(
+        course_student
+    ).join(
+        User, User.id == course_student.c.student_id
+    ).join(
+        Course, Course.id == course_student.c.course_id
+    ).outerjoin(
+        UserProgress, (UserProgress.user_id == User.id) & (UserProgress.course_id == Course.id)
+    ))
+
+
+def measure(loader, repeat: int):
+    """(lignes, pic Ko, retenu Ko, durée ms) pour un chargement dans une session neuve."""
+    durations = []
+    for _ in range(repeat):
+        db = db_session.SessionLocal()
+        try:
+            start = time.perf_counter()
+            loader(db)
+            durations.append((time.perf_counter() - start) * 1000)
+        finally:
+            db.close()
+
+    db = db_session.SessionLocal()
+    try:
+        gc.collect()
+        tracemalloc.start()
+        rows = loader(db)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        count = len(rows)
+        del rows
+    finally:
+        db.close()
+    return count, peak / 1024, retained / 1024, min(durations)
+
+
+def main(args) -> None:
+    dataset = seed_dataset(db_session.engine, DatasetParams(
+        students=args.students, courses=args.courses, courses_per_student=args.courses_per_student,
+        lessons_per_course=4, quizzes_per_course=0, interactions_per_student=0, messages_per_discussion=0,
+    ))
+    print(f"Jeu de données : {dataset.row_counts}")
+
+    scenarios = [
+        ("UserService.get_users", users_orm, users_projection),
+        ("teacher /student-progress", progress_orm, progress_projection),
+    ]
+    print(f"\nMémoire pour 10 000 lignes (Ko) et durée de chargement (meilleure de {args.repeat})\n")
+    print(f"{'Liste':<28}{'Lignes':>8}{'Pic avant':>11}{'Pic après':>11}"
+          f"{'Retenu avant':>14}{'Retenu après':>14}{'ms avant':>10}{'ms après':>10}")
+    for label, before, after in scenarios:
+        count, peak_before, kept_before, ms_before = measure(before, args.repeat)
+        _, peak_after, kept_after, ms_after = measure(after, args.repeat)
+        scale = 10000 / count if count else 0
+        print(
+            f"{label:<28}{count:>8}{peak_before * scale:>11.0f}{peak_after * scale:>11.0f}"
+            f"{kept_before * scale:>14.0f}{kept_after * scale:>14.0f}{ms_before:>10.1f}{ms_after:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=10000, help="Nombre d'étudiants")
+    parser.add_argument("--courses", type=int, default=20, help="Nombre de cours")
+    parser.add_argument("--courses-per-student", type=int, default=3, help="Inscriptions par étudiant")
+    parser.add_argument("--repeat", type=int, default=3, help="Chargements mesurés par liste")
+    main(parser.parse_args())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark : temps de sérialisation d'une réponse, avant / après.
+
+Pour chaque route concernée, la même réponse est sérialisée de trois façons :
+
+- dict : dictionnaires construits à la main, `response_model=Dict[str, Any]`
+  (ou `List[...]`) et `JSONResponse` (module json standard) ;
+- typé : modèles Pydantic v2 renvoyés à FastAPI avec un response_model typé et
+  `ORJSONResponse`. FastAPI 0.104 ne se contente pas d'un contrôle d'instance :
+  `_prepare_response_content` convertit le modèle en dictionnaire, puis
+  `serialize_response` le revalide contre le response_model ;
+- direct : implémentation actuelle, la route renvoie elle-même une
+  `ORJSONResponse` construite avec `model_dump(mode="json")`, que FastAPI
+  transmet sans revalidation (le response_model ne sert plus qu'à OpenAPI).
+
+Seule la sérialisation est mesurée (validation éventuelle du response_model,
+conversion JSON et encodage en octets), pas les requêtes SQL.
+
+Usage :
+    python -m benchmarks.serialization --students 200 --courses 40 --repeat 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# La base de benchmark doit être configurée avant l'import de l'application
+_DB_FILE = os.path.join(tempfile.mkdtemp(prefix="bench_serialization_"), "bench.db")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{_DB_FILE}")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import _prepare_response_content, serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.db import session as db_session  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.api.v1.endpoints import courses, discussion, quiz, student_dashboard  # noqa: E402
+from benchmarks.dataset import DatasetParams, seed_dataset  # noqa: E402
+
+
+async def measure(payload, response_model, response_class, repeat: int) -> float:
+    """Durée moyenne (ms) de la sérialisation d'une réponse passée par le response_model."""
+    field = create_response_field(name="response", type_=response_model)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        content = await serialize_response(
+            field=field, response_content=_prepare_response_content(payload, exclude_unset=False)
+        )
+        response_class(content).body
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def measure_direct(payload, repeat: int) -> float:
+    """Durée moyenne (ms) de la construction de la réponse par la route elle-même."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        if isinstance(payload, list):
+            ORJSONResponse([item.model_dump(mode="json") for item in payload]).body
+        else:
+            ORJSONResponse(payload.model_dump(mode="json")).body
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def _as_dicts(payload):
+    """Réponse équivalente sous forme de dictionnaires (ancienne implémentation)."""
+    if isinstance(payload, list):
+        return [item.model_dump() for item in payload]
+    return payload.model_dump()
+
+
+async def main(args) -> None:
+    dataset = seed_dataset(db_session.engine, DatasetParams(
+        students=args.students, courses=args.courses, lessons_per_course=args.lessons,
+    ))
+    db = db_session.SessionLocal()
+    try:
+        student = db.get(User, dataset.student_ids[0])
+        teacher = db.get(User, dataset.teacher_ids[0])
+        teacher_course = next(c for c in dataset.course_ids if (c - 1) % len(dataset.teacher_ids) == 0)
+
+        scenarios = [
+            ("GET /student/all-courses", List[Dict[str, Any]], List[student_dashboard.CatalogCourse],
+             student_dashboard.get_all_courses(db=db, current_user=student)),
+            ("GET /discussions/", List[Dict[str, Any]], List[discussion.DiscussionSummary],
+             discussion.get_all_discussions(db=db, current_user=student, course_id=None, tag=None, unread_only=False)),
+            ("GET /quizzes/student/available", List[Dict[str, Any]], List[quiz.AvailableQuizResponse],
+             quiz.get_student_available_quizzes(db=db, current_user=student, course_id=None, role=None)),
+            ("GET /courses/{course_id}", Dict[str, Any], courses.CourseDetail,
+             courses.get_course_details(course_id=teacher_course, db=db, current_user=teacher)),
+        ]
+    finally:
+        db.close()
+
+    print(f"\nSérialisation d'une réponse (moyenne sur {args.repeat} itérations)\n")
+    print(f"{'Route':<34}{'Taille':>10}{'Dict (ms)':>12}{'Typé (ms)':>12}{'Direct (ms)':>13}{'Gain':>8}")
+    for label, before_model, typed_model, response in scenarios:
+        # Les routes renvoient leur réponse : modèles reconstruits depuis le corps
+        payload = TypeAdapter(typed_model).validate_json(response.body)
+        dicts = _as_dicts(payload)
+        before = await measure(dicts, before_model, JSONResponse, args.repeat)
+        typed = await measure(payload, typed_model, ORJSONResponse, args.repeat)
+        direct = measure_direct(payload, args.repeat)
+        size = len(response.body)
+        print(f"{label:<34}{size / 1024:>8.0f} Ko{before:>12.2f}{typed:>12.2f}{direct:>13.2f}{before / direct:>7.1f}x")
+
+    await db_session.async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=200, help="Nombre d'étudiants")
+    parser.add_argument("--courses", type=int, default=40, help="Nombre de cours")
+    parser.add_argument("--lessons", type=int, default=12, help="Leçons par cours")
+    parser.add_argument("--repeat", type=int, default=50, help="Itérations par mesure")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Benchmark : surcoût du middleware de suivi des pages vues, BaseHTTPMiddleware / ASGI.
+
+Une petite application Starlette sert une réponse JSON et un fichier
+volumineux (FileResponse) à un utilisateur authentifié. Elle est enveloppée :
+
+- sans middleware (référence) ;
+- avant : l'ancien PageViewTrackingMiddleware (BaseHTTPMiddleware, recopié
+  ci-dessous), qui fait transiter le corps de la réponse par une tâche et un
+  flux mémoire ;
+- après : app/middleware/tracking.py (ASGI, `send` transmis tel quel).
+
+L'application est appelée directement (sans serveur ni client HTTP). Pour
+chaque cas : requêtes par seconde, délai avant le premier octet du corps
+(p50) et, pour le fichier, pic de mémoire allouée pendant une requête.
+
+Usage :
+    python -m benchmarks.tracking_middleware --requests 2000 --file-mb 20
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import FileResponse, JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from app.middleware.tracking import PageViewTrackingMiddleware  # noqa: E402
+from benchmarks.endpoints import percentile  # noqa: E402
+
+USER = SimpleNamespace(id=1, is_authenticated=True)
+TRACKED = []
+
+
+def sink(**event) -> bool:
+    TRACKED.append(event)
+    return True
+
+
+class LegacyPageViewTrackingMiddleware(BaseHTTPMiddleware):
+    """Ancienne implémentation (dispatch), la vue étant confiée au même `sink`."""
+
+    async def dispatch(self, request, call_next):
+        if request.method != 'GET' or any(path in request.url.path for path in ['/static', '/docs', '/redoc', '/openapi.json']):
+            return await call_next(request)
+        user = request.state.user if hasattr(request.state, 'user') else None
+        if user and user.is_authenticated:
+            sink(
+                user_id=user.id, entity_type='page', entity_id=0, interaction_type='view',
+                metadata={'path': request.url.path, 'method': request.method,
+                          'query_params': dict(request.query_params)},
+            )
+        return await call_next(request)
+
+
+def build_app(file_path: str) -> Starlette:
+    payload = {"items": [{"id": i, "title": f"Cours {i}", "progress": i / 50} for i in range(50)]}
+
+    async def json_endpoint(request: Request):
+        request.state.user = USER
+        return JSONResponse(payload)
+
+    async def file_endpoint(request: Request):
+        request.state.user = USER
+        return FileResponse(file_path, filename="support.bin")
+
+    return Starlette(routes=[Route("/json", json_endpoint), Route("/file", file_endpoint)])
+
+
+async def call(app, path: str) -> dict:
+    """Une requête GET ; retourne le délai avant le premier octet du corps et la taille reçue."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"page=1",
+        "root_path": "", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 40000),
+        "server": ("bench", 80),
+    }
+    done = asyncio.Event()
+    request_sent = False
+    result = {"first_byte": None, "bytes": 0}
+    start = time.perf_counter()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            if result["first_byte"] is None:
+                result["first_byte"] = time.perf_counter() - start
+            result["bytes"] += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                done.set()
+
+    await app(scope, receive, send)
+    done.set()
+    return result
+
+
+async def measure(app, path: str, requests: int, concurrency: int) -> dict:
+    first_bytes = []
+    received = 0
+
+    async def worker(count: int) -> None:
+        nonlocal received
+        for _ in range(count):
+            result = await call(app, path)
+            first_bytes.append(result["first_byte"])
+            received += result["bytes"]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done_requests = (requests // concurrency) * concurrency
+    return {
+        "per_s": done_requests / elapsed,
+        "mb_per_s": received / elapsed / 1e6,
+        "ttfb_ms": percentile(sorted(first_bytes), 0.50) * 1000,
+    }
+
+
+async def peak_memory(app, path: str) -> float:
+    tracemalloc.start()
+    await call(app, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+async def main(args) -> None:
+    with tempfile.NamedTemporaryFile(prefix="bench_tracking_", delete=False) as f:
+        f.write(os.urandom(args.file_mb * 1024 * 1024))
+        file_path = f.name
+    try:
+        inner = build_app(file_path)
+        variants = (
+            ("sans middleware", inner),
+            ("avant (BaseHTTP)", LegacyPageViewTrackingMiddleware(inner)),
+            ("après (ASGI)", PageViewTrackingMiddleware(inner, sink=sink)),
+        )
+        print(f"JSON : {args.requests:,} requêtes ; fichier de {args.file_mb} Mo : {args.file_requests} requêtes ; "
+              f"concurrence {args.concurrency}\n")
+        print(f"{'Variante':<20}{'JSON req/s':>12}{'JSON 1er octet ms':>19}"
+              f"{'fichier Mo/s':>14}{'fichier 1er octet ms':>22}{'pic mémoire Mo':>16}")
+        for label, app in variants:
+            TRACKED.clear()
+            json_result = await measure(app, "/json", args.requests, args.concurrency)
+            file_result = await measure(app, "/file", args.file_requests, args.concurrency)
+            peak = await peak_memory(app, "/file")
+            print(f"{label:<20}{json_result['per_s']:>12,.0f}{json_result['ttfb_ms']:>19.3f}"
+                  f"{file_result['mb_per_s']:>14,.0f}{file_result['ttfb_ms']:>22.3f}{peak:>16.2f}")
+    finally:
+        os.remove(file_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Requêtes JSON par variante")
+    parser.add_argument("--file-requests", type=int, default=40, help="Téléchargements par variante")
+    parser.add_argument("--file-mb", type=int, default=20, help="Taille du fichier servi (Mo)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requêtes simultanées")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,36 @@
+"""Add course_terms inverted index of course text
+
+Revision ID: add_course_terms
+Revises: add_user_recommendation_score_index
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision = 'add_course_terms'
+down_revision = 'add_user_recommendation_score_index'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Occurrences de chaque terme par cours ; remplie par
+    # scripts/build_course_index.py ou au démarrage de l'application.
+    # Collation binaire : « avancé » et « avance » sont deux termes distincts
+    op.create_table(
+        'course_terms',
+        sa.Column('course_id', sa.Integer(), sa.ForeignKey('courses.id', ondelete='CASCADE', name='fk_course_terms_course'), nullable=False),
+        sa.Column('term', mysql.VARCHAR(100, collation='utf8mb4_bin'), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('course_id', 'term'),
+        mysql_charset='utf8mb4',
+        mysql_engine='InnoDB',
+        mysql_collate='utf8mb4_unicode_ci'
+    )
+    op.create_index('idx_course_terms_term', 'course_terms', ['term'])
+
+def downgrade():
+    op.drop_index('idx_course_terms_term', table_name='course_terms')
+    op.drop_table('course_terms')
@@ -0,0 +1,24 @@
+"""Index user_interactions on (user_id, created_at) for cursor pagination
+
+Revision ID: add_interaction_user_created_index
+Revises: add_user_interaction_daily
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_interaction_user_created_index'
+down_revision = 'add_user_interaction_daily'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Historique d'un utilisateur par date décroissante : la page suivant un
+    # curseur (created_at, id) est lue directement dans l'index (InnoDB y
+    # ajoute la clé primaire)
+    op.create_index('idx_user_created', 'user_interactions', ['user_id', 'created_at'])
+
+def downgrade():
+    op.drop_index('idx_user_created', table_name='user_interactions')
@@ -0,0 +1,43 @@
+"""Add user_interaction_daily rollups of user_interactions
+
+Revision ID: add_user_interaction_daily
+Revises: add_user_token_version
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_interaction_daily'
+down_revision = 'add_user_token_version'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Agrégats quotidiens : une ligne par (utilisateur, jour, entité, interaction)
+    op.create_table(
+        'user_interaction_daily',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE', name='fk_interaction_daily_user'), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('entity_type', sa.String(50), nullable=False),
+        sa.Column('interaction_type', sa.String(50), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('last_interaction_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('user_id', 'day', 'entity_type', 'interaction_type'),
+        mysql_charset='utf8mb4',
+        mysql_engine='InnoDB',
+        mysql_collate='utf8mb4_unicode_ci'
+    )
+
+    # Reprise de l'historique à partir des interactions brutes existantes
+    op.execute(
+        "INSERT INTO user_interaction_daily "
+        "(user_id, day, entity_type, interaction_type, count, last_interaction_at) "
+        "SELECT user_id, DATE(created_at), entity_type, interaction_type, COUNT(*), MAX(created_at) "
+        "FROM user_interactions "
+        "GROUP BY user_id, DATE(created_at), entity_type, interaction_type"
+    )
+
+def downgrade():
+    op.drop_table('user_interaction_daily')
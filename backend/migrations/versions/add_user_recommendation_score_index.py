@@ -0,0 +1,22 @@
+"""Index user_recommendations on (user_id, score) for precomputed recommendations
+
+Revision ID: add_user_recommendation_score_index
+Revises: add_interaction_user_created_index
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_recommendation_score_index'
+down_revision = 'add_interaction_user_created_index'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Les recommandations précalculées sont lues et remplacées par utilisateur
+    op.create_index('idx_user_recommendation_score', 'user_recommendations', ['user_id', 'score'])
+
+def downgrade():
+    op.drop_index('idx_user_recommendation_score', table_name='user_recommendations')
@@ -0,0 +1,29 @@
+"""Add users.token_version for JWT revocation
+
+Revision ID: add_user_token_version
+Revises: add_message_attachments
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_token_version'
+down_revision = 'add_message_attachments'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Version des jetons : incrémentée pour révoquer les jetons émis
+    op.add_column('users',
+        sa.Column('token_version', sa.Integer(),
+                  server_default=sa.text('0'),
+                  nullable=False))
+
+    # Relecture incrémentale des versions modifiées (updated_at >= ...)
+    op.create_index('ix_users_updated_at', 'users', ['updated_at'])
+
+def downgrade():
+    op.drop_index('ix_users_updated_at', table_name='users')
+    op.drop_column('users', 'token_version')
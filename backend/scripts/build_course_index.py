@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Reconstruction de l'index du texte des cours (table course_terms).
+
+Le titre, la description, la description courte et les tags de chaque cours
+sont découpés en termes et leurs occurrences réécrites dans course_terms,
+d'où chaque worker charge l'index TF-IDF (app/services/course_text_index.py).
+Les cours créés ou modifiés par l'API sont réindexés un par un ; ce script
+sert après un import en masse ou un changement du découpage :
+    python scripts/build_course_index.py
+    python scripts/build_course_index.py --courses 12 57
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, nargs="+", help="Limiter la reconstruction à ces cours")
+    args = parser.parse_args(argv)
+
+    from app.db.session import engine
+    from app.services.course_text_index import index_courses
+
+    start = time.perf_counter()
+    documents = index_courses(engine, args.courses)
+    terms = sum(len(counter) for counter in documents.values())
+    print(f"{len(documents):,} cours, {terms:,} lignes course_terms en {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Précalcul des recommandations de cours de tous les utilisateurs actifs.
+
+Les recommandations (filtrage collaboratif, complété par les cours les plus
+suivis) sont écrites dans user_recommendations, d'où les routes
+/api/v1/recommendations/new/* les servent. Les utilisateurs sont traités par
+paquets de --chunk-size, répartis sur --workers processus ; les lignes d'un
+utilisateur sont remplacées en une transaction.
+
+À lancer périodiquement (cron), par exemple toutes les heures :
+    python scripts/precompute_recommendations.py --workers 4
+    python scripts/precompute_recommendations.py --users 12 57
+"""
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=settings.RECOMMENDATION_PRECOMPUTE_LIMIT,
+                        help="Recommandations conservées par utilisateur")
+    parser.add_argument("--chunk-size", type=int, default=settings.RECOMMENDATION_PRECOMPUTE_CHUNK,
+                        help="Utilisateurs par paquet (et par transaction)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processus de calcul")
+    parser.add_argument("--users", type=int, nargs="+", help="Limiter le calcul à ces utilisateurs")
+    args = parser.parse_args(argv)
+
+    from app.services.recommendation_precompute import precompute_all
+
+    result = precompute_all(limit=args.limit, chunk_size=args.chunk_size, workers=args.workers,
+                            user_ids=args.users)
+    print(f"{result['users']:,} utilisateurs, {result['rows']:,} recommandations "
+          f"en {result['elapsed']:.1f} s ({args.workers} processus)")
+
+
+if __name__ == "__main__":
+    main()
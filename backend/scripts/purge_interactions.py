@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Purge des interactions brutes (user_interactions) au-delà de l'horizon de rétention.
+
+Les statistiques d'interactions lisent les agrégats quotidiens
+(user_interaction_daily), qui ne sont pas touchés : seules les lignes brutes
+(métadonnées, user agent, referer) plus anciennes que --days jours sont
+supprimées, par petits lots et en transactions courtes pour ne pas bloquer
+les écritures de l'application. Avec --archive, les lignes sont d'abord
+écrites dans un fichier JSON Lines (compressé si le nom finit par .gz).
+
+À lancer périodiquement (cron), par exemple une fois par nuit :
+    python scripts/purge_interactions.py --days 180 --archive /var/backups/interactions-$(date +%F).jsonl.gz
+    python scripts/purge_interactions.py --dry-run
+"""
+
+import argparse
+import gzip
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=settings.INTERACTION_RETENTION_DAYS,
+                        help="Horizon de rétention des interactions brutes (jours)")
+    parser.add_argument("--batch-size", type=int, default=settings.INTERACTION_RETENTION_BATCH,
+                        help="Lignes supprimées par transaction")
+    parser.add_argument("--pause", type=float, default=0.05, help="Pause entre deux lots (secondes)")
+    parser.add_argument("--max-batches", type=int, help="Nombre maximal de lots pour cette exécution")
+    parser.add_argument("--archive", help="Fichier JSON Lines où archiver les lignes supprimées (.gz accepté)")
+    parser.add_argument("--dry-run", action="store_true", help="Compter les lignes concernées sans rien supprimer")
+    parser.add_argument("--database-url", help="Base cible (défaut : SQLALCHEMY_DATABASE_URI)")
+    args = parser.parse_args(argv)
+
+    from sqlalchemy import func, select
+    from app.db.interaction_rollups import purge_raw_interactions
+    from app.db.session import create_db_engine
+    from app.models.interaction import UserInteraction
+
+    engine = create_db_engine(args.database_url)
+    before = datetime.utcnow() - timedelta(days=args.days)
+    print(f"Interactions antérieures au {before:%Y-%m-%d %H:%M} UTC sur "
+          f"{engine.url.render_as_string(hide_password=True)}")
+
+    if args.dry_run:
+        with engine.connect() as conn:
+            count = conn.execute(
+                select(func.count()).select_from(UserInteraction).where(UserInteraction.created_at < before)
+            ).scalar()
+        print(f"{count:,} interactions seraient supprimées")
+        return
+
+    archive = None
+    if args.archive:
+        opener = gzip.open if args.archive.endswith(".gz") else open
+        archive = opener(args.archive, "at", encoding="utf-8")
+    start = time.perf_counter()
+    try:
+        deleted = purge_raw_interactions(
+            engine, before, batch_size=args.batch_size, archive=archive,
+            pause=args.pause, max_batches=args.max_batches,
+        )
+    finally:
+        if archive is not None:
+            archive.close()
+    elapsed = time.perf_counter() - start
+    print(f"{deleted:,} interactions supprimées en {elapsed:.1f} s"
+          + (f", archivées dans {args.archive}" if args.archive else ""))
+
+
+if __name__ == "__main__":
+    main()
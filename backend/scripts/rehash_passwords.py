@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Recalcul massif des hash de mots de passe, parallèle et reprenable.
+
+Remplace scripts/update_password_hashes.py (parcours séquentiel, un commit
+par utilisateur). Deux modes :
+
+- wrap-legacy (défaut) : enveloppe dans bcrypt les anciens hash SHA-256
+  `sel$hash` (voir app/core/passwords.py), sans connaître les mots de passe.
+  La connexion suivante de l'utilisateur les remplace par un bcrypt direct.
+- reset-defaults (développement uniquement) : remplace le mot de passe de
+  chaque compte par un mot de passe par défaut, comme l'ancien script, et
+  révoque les jetons émis.
+
+Les utilisateurs sont lus par tranches ordonnées par identifiant (pagination
+par clé, `id > dernier id`), hachés sur un pool de processus (un par cœur par
+défaut) puis réécrits par un `UPDATE ... CASE` par tranche. Après chaque
+tranche validée, le dernier identifiant traité est enregistré dans le fichier
+de reprise : relancer la même commande reprend là où elle s'était arrêtée
+(--restart pour repartir de zéro).
+
+En mode wrap-legacy, une ligne n'est réécrite que si son hash n'a pas changé
+entre-temps (connexion de l'utilisateur pendant le traitement).
+
+Usage :
+    python scripts/rehash_passwords.py --database-url mysql+pymysql://... --workers 8
+    python scripts/rehash_passwords.py --mode reset-defaults --database-url sqlite:////tmp/dev.db
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Mots de passe par défaut du mode reset-defaults (comptes de démonstration)
+DEFAULT_PASSWORDS = {
+    "admin": "admin123",
+    "prof_math": "teacher123",
+    "prof_info": "teacher123",
+    "etudiant1": "student123",
+    "etudiant2": "student123",
+}
+FALLBACK_PASSWORD = "password123"
+
+# (id, nom d'utilisateur, hash actuel)
+UserRow = Tuple[int, str, str]
+
+
+def hash_chunk(mode: str, rows: List[UserRow]) -> List[Tuple[int, str, str]]:
+    """
+    Calcule les nouveaux hash d'une tranche (exécuté dans un processus du
+    pool). Retourne (id, ancien hash, nouveau hash) pour les lignes à réécrire.
+    """
+    from app.core.passwords import hash_password, is_legacy_hash, wrap_legacy_hash
+
+    results = []
+    for user_id, username, password_hash in rows:
+        if mode == "wrap-legacy":
+            if is_legacy_hash(password_hash):
+                results.append((user_id, password_hash, wrap_legacy_hash(password_hash)))
+        else:
+            password = DEFAULT_PASSWORDS.get(username, FALLBACK_PASSWORD)
+            results.append((user_id, password_hash, hash_password(password)))
+    return results
+
+
+def read_chunks(engine, mode: str, chunk_size: int, after_id: int):
+    """Tranches (dernier id, lignes lues, lignes à traiter), par pagination sur l'identifiant."""
+    from sqlalchemy import select
+    from app.models.user import User
+
+    while True:
+        statement = select(User.id, User.username, User.password_hash).where(
+            User.id > after_id
+        ).order_by(User.id).limit(chunk_size)
+        with engine.connect() as conn:
+            rows = [tuple(row) for row in conn.execute(statement)]
+        if not rows:
+            return
+        after_id = rows[-1][0]
+        scanned = len(rows)
+        if mode == "wrap-legacy":
+            # Filtre grossier : seuls les hash susceptibles d'être anciens partent au pool
+            rows = [row for row in rows if row[2] and not row[2].startswith(("$", "legacy-bcrypt$"))]
+        yield after_id, scanned, rows
+
+
+def write_chunk(engine, mode: str, results: List[Tuple[int, str, str]]) -> int:
+    """Réécrit une tranche en un seul UPDATE ... CASE ; retourne le nombre de lignes modifiées."""
+    from sqlalchemy import and_, case, or_, update
+    from app.models.user import User
+
+    if not results:
+        return 0
+    if mode == "wrap-legacy":
+        # Ne réécrire que si le hash n'a pas changé depuis la lecture : la
+        # condition est aussi dans le WHERE pour que rowcount ne compte que ces lignes
+        unchanged = [and_(User.id == user_id, User.password_hash == old_hash) for user_id, old_hash, _ in results]
+        condition = or_(*unchanged)
+        new_hash = case(
+            *((guard, new_value) for guard, (_, _, new_value) in zip(unchanged, results)),
+            else_=User.password_hash,
+        )
+        values = {"password_hash": new_hash}
+    else:
+        condition = User.id.in_([user_id for user_id, _, _ in results])
+        new_hash = case({user_id: new_value for user_id, _, new_value in results}, value=User.id)
+        values = {"password_hash": new_hash, "token_version": User.token_version + 1}
+
+    statement = update(User).where(condition).values(**values)
+    with engine.begin() as conn:
+        return conn.execute(statement).rowcount
+
+
+def load_checkpoint(path: str, mode: str) -> dict:
+    if os.path.exists(path):
+        with open(path) as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("mode") != mode:
+            raise SystemExit(f"Le fichier de reprise {path} concerne le mode {checkpoint.get('mode')} (--restart pour l'ignorer)")
+        return checkpoint
+    return {"mode": mode, "last_id": 0, "scanned": 0, "rehashed": 0, "elapsed_s": 0.0}
+
+
+def save_checkpoint(path: str, checkpoint: dict) -> None:
+    """Écriture atomique du fichier de reprise."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def run(engine, args) -> dict:
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    checkpoint = load_checkpoint(args.checkpoint, args.mode)
+    if checkpoint["last_id"]:
+        print(f"Reprise après l'utilisateur {checkpoint['last_id']} "
+              f"({checkpoint['scanned']:,} lus, {checkpoint['rehashed']:,} réécrits)")
+
+    start = time.perf_counter()
+    previous_elapsed = checkpoint["elapsed_s"]
+    scanned = rehashed = 0
+    # Tranches soumises au pool, réécrites dans l'ordre de lecture : le point
+    # de reprise ne dépasse jamais une tranche non validée
+    in_flight = deque()
+
+    def drain_one() -> None:
+        nonlocal scanned, rehashed
+        last_id, chunk_scanned, future = in_flight.popleft()
+        results = future.result()
+        if args.dry_run:
+            rehashed += len(results)
+        else:
+            written = write_chunk(engine, args.mode, results)
+            rehashed += written
+            checkpoint.update(
+                last_id=last_id,
+                scanned=checkpoint["scanned"] + chunk_scanned,
+                rehashed=checkpoint["rehashed"] + written,
+                elapsed_s=round(previous_elapsed + time.perf_counter() - start, 2),
+            )
+            save_checkpoint(args.checkpoint, checkpoint)
+        scanned += chunk_scanned
+        elapsed = time.perf_counter() - start
+        print(f"  id ≤ {last_id}: {scanned:,} lus, {rehashed:,} réécrits "
+              f"({scanned / elapsed:,.0f} lus/s, {rehashed / elapsed:,.1f} hash/s)")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for last_id, chunk_scanned, rows in read_chunks(engine, args.mode, args.chunk_size, checkpoint["last_id"]):
+            in_flight.append((last_id, chunk_scanned, pool.submit(hash_chunk, args.mode, rows)))
+            # Borne la mémoire : au plus deux tranches par processus en attente
+            while len(in_flight) >= 2 * args.workers:
+                drain_one()
+        while in_flight:
+            drain_one()
+
+    elapsed = time.perf_counter() - start
+    return {"scanned": scanned, "rehashed": rehashed, "elapsed": elapsed}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["wrap-legacy", "reset-defaults"], default="wrap-legacy",
+                        help="Anciens hash à envelopper, ou mots de passe par défaut (développement)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Utilisateurs par tranche")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processus de hachage")
+    parser.add_argument("--checkpoint", default="rehash_passwords.checkpoint.json", help="Fichier de reprise")
+    parser.add_argument("--restart", action="store_true", help="Ignorer le fichier de reprise existant")
+    parser.add_argument("--dry-run", action="store_true", help="Calculer les hash sans rien écrire")
+    parser.add_argument("--database-url", help="Base cible (défaut : SQLALCHEMY_DATABASE_URI)")
+    args = parser.parse_args(argv)
+
+    from app.db.session import create_db_engine
+
+    engine = create_db_engine(args.database_url)
+    print(f"Mode {args.mode} sur {engine.url.render_as_string(hide_password=True)}, "
+          f"{args.workers} processus, tranches de {args.chunk_size}")
+    summary = run(engine, args)
+    elapsed = summary["elapsed"] or 1e-9
+    print(f"{summary['scanned']:,} utilisateurs lus, {summary['rehashed']:,} hash réécrits en {elapsed:.1f} s "
+          f"({summary['rehashed'] / elapsed:,.1f} hash/s)")
+    if not args.dry_run and os.path.exists(args.checkpoint):
+        print(f"Terminé : le fichier de reprise {args.checkpoint} peut être supprimé")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Génère un jeu de données volumineux et réaliste pour reproduire localement
+les lenteurs de production.
+
+Tables alimentées : utilisateurs, catégories, cours, modules, leçons, quiz
+(questions, options), inscriptions (course_student), user_progress,
+lesson_completions, résultats et réponses de quiz, user_interactions (et
+leurs agrégats quotidiens),
+discussions, participants et messages.
+
+Les lignes sont générées en flux, étudiant par étudiant, et insérées par lots
+(INSERT multi-lignes via executemany) sans passer par l'ORM. Les identifiants
+sont calculés à l'avance, ce qui évite toute relecture. Le résultat est
+déterministe pour une graine, une date de référence et des paramètres donnés.
+
+Usage :
+    python scripts/seed_data.py --students 100000 --courses 2000 --seed 42
+    python scripts/seed_data.py --scale large --database-url sqlite:////tmp/seed.db
+"""
+
+import argparse
+import bisect
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Préréglages : (étudiants, enseignants, cours)
+SCALES = {
+    "small": (1_000, 20, 50),
+    "medium": (20_000, 200, 500),
+    "large": (200_000, 1_000, 3_000),
+}
+
+FIRST_NAMES = ["Awa", "Moussa", "Fatou", "Ibrahim", "Aminata", "Jean", "Marie", "Paul", "Sophie", "Karim",
+               "Mariam", "Lucas", "Emma", "Oumar", "Salimata", "Hugo", "Léa", "Adama", "Nadia", "Yacouba"]
+LAST_NAMES = ["Coulibaly", "Traoré", "Diallo", "Koné", "Ouattara", "Martin", "Bernard", "Dubois", "Sangaré",
+              "Keita", "Camara", "Touré", "Petit", "Durand", "Cissé", "Bamba", "Fofana", "Moreau", "Sylla", "Diarra"]
+CATEGORIES = ["Programmation", "Mathématiques", "Science des données", "Réseaux", "Design",
+              "Langues", "Gestion de projet", "Intelligence artificielle", "Bases de données", "Sécurité"]
+LEVELS = ["beginner", "intermediate", "advanced"]
+INTERACTION_TYPES = ["view", "click", "complete", "bookmark", "rate"]
+INTERACTION_WEIGHTS = [0.62, 0.2, 0.1, 0.05, 0.03]
+
+
+class BulkWriter:
+    """
+    Tampons de lignes par table, vidés par INSERT multi-lignes dès que
+    `chunk_size` lignes sont en attente.
+    """
+
+    def __init__(self, engine, chunk_size: int):
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.buffers = {}
+        self.counts = {}
+        self.started = time.perf_counter()
+        self.conn = engine.connect()
+        _tune_connection(self.conn)
+
+    def add(self, table, row: dict) -> None:
+        buffer = self.buffers.setdefault(table, [])
+        buffer.append(row)
+        if len(buffer) >= self.chunk_size:
+            self.flush(table)
+
+    def flush(self, table=None) -> None:
+        tables = [table] if table is not None else list(self.buffers)
+        for t in tables:
+            rows = self.buffers.get(t)
+            if not rows:
+                continue
+            self.conn.execute(t.insert(), rows)
+            self.conn.commit()
+            self.counts[t.name] = self.counts.get(t.name, 0) + len(rows)
+            self.buffers[t] = []
+
+    def progress(self, label: str) -> None:
+        total = sum(self.counts.values())
+        elapsed = time.perf_counter() - self.started
+        print(f"  {label}: {total:,} lignes en {elapsed:.0f} s ({total / max(elapsed, 1e-9):,.0f} lignes/s)", flush=True)
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+
+def _tune_connection(conn) -> None:
+    """Réglages de session propres au chargement massif."""
+    dialect = conn.engine.dialect.name
+    if dialect == "mysql":
+        conn.exec_driver_sql("SET SESSION foreign_key_checks = 0")
+        conn.exec_driver_sql("SET SESSION unique_checks = 0")
+    elif dialect == "sqlite":
+        conn.exec_driver_sql("PRAGMA synchronous = OFF")
+        conn.exec_driver_sql("PRAGMA journal_mode = WAL")
+    conn.commit()
+
+
+def _next_ids(conn, tables):
+    """Premier identifiant libre de chaque table (les données existantes sont conservées)."""
+    from sqlalchemy import func, select
+
+    return {t.name: (conn.execute(select(func.max(t.c.id))).scalar() or 0) + 1 for t in tables}
+
+
+def _password_hash(password: str) -> str:
+    """Hash bcrypt calculé une seule fois et partagé par tous les comptes générés."""
+    import bcrypt
+
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+
+def seed(engine, args) -> dict:
+    from app import models
+    from app.database import Base
+    from app.db.interaction_rollups import daily_counts
+    from app.models.user_quiz_answers import UserQuizAnswer
+
+    Base.metadata.create_all(bind=engine)
+
+    users_t = models.User.__table__
+    categories_t = models.Category.__table__
+    courses_t = models.Course.__table__
+    modules_t = models.Module.__table__
+    lessons_t = models.Lesson.__table__
+    quizzes_t = models.Quiz.__table__
+    questions_t = models.QuizQuestion.__table__
+    options_t = models.QuizOption.__table__
+    progress_t = models.UserProgress.__table__
+    completions_t = models.LessonCompletion.__table__
+    results_t = models.UserQuizResult.__table__
+    answers_t = UserQuizAnswer.__table__
+    interactions_t = models.UserInteraction.__table__
+    interaction_daily_t = models.UserInteractionDaily.__table__
+    discussions_t = models.Discussion.__table__
+    messages_t = models.Message.__table__
+
+    writer = BulkWriter(engine, args.chunk_size)
+    ids = _next_ids(writer.conn, [users_t, categories_t, courses_t, modules_t, lessons_t,
+                                  quizzes_t, questions_t, options_t, discussions_t])
+    # Générateurs indépendants par famille de tables : changer un paramètre
+    # (ex: nombre de messages) ne modifie pas les autres tables
+    rng_users, rng_catalog, rng_activity, rng_messages = (
+        random.Random(f"{args.seed}:{name}") for name in ("users", "catalog", "activity", "messages")
+    )
+    now = args.reference_date
+    password_hash = _password_hash(args.password)
+
+    lessons_per_course = args.modules_per_course * args.lessons_per_module
+
+    # Utilisateurs : enseignants puis étudiants, identifiants contigus
+    print("Utilisateurs...", flush=True)
+    first_teacher = ids["users"]
+    first_student = first_teacher + args.teachers
+    for i in range(args.teachers + args.students):
+        user_id = first_teacher + i
+        role = "enseignant" if i < args.teachers else "etudiant"
+        prefix = "prof" if role == "enseignant" else "etu"
+        writer.add(users_t, {
+            "id": user_id, "username": f"{prefix}{user_id}", "email": f"{prefix}{user_id}@example.com",
+            "password_hash": password_hash,
+            "first_name": rng_users.choice(FIRST_NAMES), "last_name": rng_users.choice(LAST_NAMES),
+            "role": role, "is_active": rng_users.random() > 0.02,
+            "created_at": now - timedelta(days=rng_users.randint(0, 730)),
+        })
+    writer.flush()
+
+    # Catalogue : catégories, cours, modules, leçons, quiz
+    print("Catalogue...", flush=True)
+    first_category = ids["categories"]
+    for i, name in enumerate(CATEGORIES):
+        # Noms uniques : suffixés si la table contient déjà des catégories
+        label = name if first_category == 1 else f"{name} {first_category + i}"
+        writer.add(categories_t, {"id": first_category + i, "name": label})
+
+    first_course, first_module, first_lesson = ids["courses"], ids["modules"], ids["lessons"]
+    first_quiz, first_question, first_option = ids["quizzes"], ids["quiz_questions"], ids["quiz_options"]
+    course_instructor = []
+    for c in range(args.courses):
+        course_id = first_course + c
+        instructor_id = first_teacher + rng_catalog.randrange(args.teachers)
+        course_instructor.append(instructor_id)
+        writer.add(courses_t, {
+            "id": course_id, "title": f"Cours {course_id}", "slug": f"cours-{course_id}-{args.seed}",
+            "description": f"Description détaillée du cours {course_id}",
+            "short_description": f"Cours {course_id}",
+            "status": models.CourseStatus.published if rng_catalog.random() < 0.9 else models.CourseStatus.draft,
+            "level": rng_catalog.choice(LEVELS),
+            "price": rng_catalog.choice([0.0, 0.0, 0.0, 19.99, 49.99]),
+            "instructor_id": instructor_id,
+            "category_id": first_category + rng_catalog.randrange(len(CATEGORIES)),
+            "created_at": now - timedelta(days=rng_catalog.randint(30, 730)),
+        })
+        for m in range(args.modules_per_course):
+            module_id = first_module + c * args.modules_per_course + m
+            writer.add(modules_t, {
+                "id": module_id, "title": f"Module {m + 1}", "order_index": m, "course_id": course_id,
+            })
+            for k in range(args.lessons_per_module):
+                index = m * args.lessons_per_module + k
+                writer.add(lessons_t, {
+                    "id": first_lesson + c * lessons_per_course + index,
+                    "title": f"Leçon {index + 1}", "content": "Contenu de la leçon",
+                    "duration": rng_catalog.randint(300, 2400), "order_index": index,
+                    "is_free": index == 0, "course_id": course_id, "module_id": module_id,
+                })
+        for q in range(args.quizzes_per_course):
+            quiz_index = c * args.quizzes_per_course + q
+            # Quiz répartis sur le cours : le dernier porte sur la dernière leçon
+            lesson_index = (q + 1) * lessons_per_course // args.quizzes_per_course - 1
+            writer.add(quizzes_t, {
+                "id": first_quiz + quiz_index, "title": f"Quiz {q + 1}",
+                "lesson_id": first_lesson + c * lessons_per_course + lesson_index,
+                "is_active": True, "passing_score": 70,
+            })
+            for n in range(args.questions_per_quiz):
+                question_index = quiz_index * args.questions_per_quiz + n
+                writer.add(questions_t, {
+                    "id": first_question + question_index, "quiz_id": first_quiz + quiz_index,
+                    "question_text": f"Question {n + 1}", "question_type": "multiple_choice", "points": 1,
+                })
+                for o in range(4):
+                    writer.add(options_t, {
+                        "id": first_option + question_index * 4 + o,
+                        "question_id": first_question + question_index,
+                        "option_text": f"Réponse {o + 1}", "is_correct": o == question_index % 4,
+                    })
+    writer.flush()
+
+    # Activité des étudiants. Popularité des cours en loi de Zipf, nombre
+    # d'inscriptions et d'interactions à queue lourde, progression en loi bêta
+    # (beaucoup d'abandons, quelques cours terminés).
+    print("Activité des étudiants...", flush=True)
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) ** 0.9 for rank in range(args.courses)))
+    popularity = list(range(args.courses))
+    rng_catalog.shuffle(popularity)
+    total_weight = cum_weights[-1]
+    interaction_cum = list(itertools.accumulate(INTERACTION_WEIGHTS))
+    report_every = max(args.students // 10, 1)
+
+    for s in range(args.students):
+        rng = rng_activity
+        student_id = first_student + s
+        wanted = min(max(1, int(rng.expovariate(1 / args.courses_per_student))), args.courses)
+        enrolled = set()
+        while len(enrolled) < wanted:
+            enrolled.add(popularity[bisect.bisect(cum_weights, rng.random() * total_weight)])
+        enrolled = sorted(enrolled)
+
+        for c in enrolled:
+            course_id = first_course + c
+            enrolled_at = now - timedelta(days=rng.randint(1, 365), seconds=rng.randrange(86400))
+            writer.add(models.course_student, {"course_id": course_id, "student_id": student_id})
+
+            done = int(round(rng.betavariate(0.8, 1.2) * lessons_per_course))
+            writer.add(progress_t, {
+                "user_id": student_id, "course_id": course_id, "lesson_id": None,
+                "is_completed": done == lessons_per_course,
+                "completion_percentage": round(100.0 * done / lessons_per_course, 1),
+                "last_accessed": enrolled_at + timedelta(days=done),
+                "created_at": enrolled_at,
+                # Les pages étudiant (tableau de bord, activités récentes) trient et
+                # calculent des durées sur updated_at : jamais NULL
+                "updated_at": enrolled_at + timedelta(days=done),
+            })
+            first_course_lesson = first_lesson + c * lessons_per_course
+            for index in range(done):
+                completed_at = enrolled_at + timedelta(days=index, seconds=rng.randrange(86400))
+                writer.add(completions_t, {
+                    "user_id": student_id, "lesson_id": first_course_lesson + index, "completed_at": completed_at,
+                })
+                writer.add(progress_t, {
+                    "user_id": student_id, "course_id": course_id, "lesson_id": first_course_lesson + index,
+                    "is_completed": True, "completion_percentage": 100.0,
+                    "last_accessed": completed_at, "created_at": completed_at, "updated_at": completed_at,
+                })
+
+            # Quiz des leçons atteintes, tentés dans 60 % des cas
+            for q in range(args.quizzes_per_course):
+                lesson_index = (q + 1) * lessons_per_course // args.quizzes_per_course - 1
+                if lesson_index >= done or rng.random() > 0.6:
+                    continue
+                quiz_index = c * args.quizzes_per_course + q
+                skill = min(max(rng.gauss(0.72, 0.15), 0.0), 1.0)
+                correct = 0
+                completed_at = enrolled_at + timedelta(days=lesson_index, hours=1)
+                for n in range(args.questions_per_quiz):
+                    question_index = quiz_index * args.questions_per_quiz + n
+                    is_correct = rng.random() < skill
+                    correct += is_correct
+                    option = question_index % 4 if is_correct else (question_index + 1 + rng.randrange(3)) % 4
+                    writer.add(answers_t, {
+                        "user_id": student_id, "quiz_id": first_quiz + quiz_index,
+                        "question_id": first_question + question_index,
+                        "option_id": first_option + question_index * 4 + option,
+                        "is_correct": is_correct, "created_at": completed_at,
+                    })
+                score = round(100.0 * correct / args.questions_per_quiz, 1)
+                writer.add(results_t, {
+                    "user_id": student_id, "quiz_id": first_quiz + quiz_index, "score": score,
+                    "passed": score >= 70, "completed_at": completed_at,
+                })
+
+        # Interactions, plus nombreuses sur les jours récents
+        student_interactions = []
+        for _ in range(int(rng.expovariate(1 / args.interactions_per_student))):
+            c = rng.choice(enrolled)
+            if rng.random() < 0.4:
+                entity_type, entity_id = "course", first_course + c
+            else:
+                entity_type, entity_id = "lesson", first_lesson + c * lessons_per_course + rng.randrange(lessons_per_course)
+            interaction_type = INTERACTION_TYPES[bisect.bisect(interaction_cum, rng.random() * interaction_cum[-1])]
+            metadata = {"source": rng.choice(["web", "web", "mobile"])}
+            if interaction_type == "view":
+                metadata["duration"] = rng.randint(5, 1800)
+            interaction = {
+                "user_id": student_id, "entity_type": entity_type, "entity_id": entity_id,
+                "interaction_type": interaction_type,
+                "metadata": metadata,
+                "created_at": now - timedelta(minutes=int(rng.expovariate(1 / (60 * 24 * 20)))),
+            }
+            writer.add(interactions_t, interaction)
+            student_interactions.append(interaction)
+        # Agrégats quotidiens de l'étudiant (app/db/interaction_rollups.py)
+        for row in daily_counts(student_interactions):
+            writer.add(interaction_daily_t, row)
+
+        if (s + 1) % report_every == 0:
+            writer.progress(f"{s + 1:,}/{args.students:,} étudiants")
+    writer.flush()
+
+    # Discussions de cours : l'enseignant et un échantillon d'étudiants
+    print("Discussions et messages...", flush=True)
+    first_discussion = ids["discussions"]
+    for d in range(args.discussions):
+        rng = rng_messages
+        discussion_id = first_discussion + d
+        c = rng.randrange(args.courses)
+        instructor_id = course_instructor[c]
+        size = min(max(2, int(rng.lognormvariate(2.5, 0.8))), args.students)
+        members = [instructor_id] + [first_student + s for s in rng.sample(range(args.students), size)]
+        created_at = now - timedelta(days=rng.randint(1, 365))
+        writer.add(discussions_t, {
+            "id": discussion_id, "title": f"Discussion {discussion_id} - cours {first_course + c}",
+            "created_by": instructor_id, "is_group": True, "created_at": created_at, "updated_at": created_at,
+        })
+        for user_id in members:
+            writer.add(models.discussion_participants, {
+                "user_id": user_id, "discussion_id": discussion_id, "joined_at": created_at, "is_active": True,
+            })
+        sent_at = created_at
+        for m in range(int(rng.expovariate(1 / args.messages_per_discussion)) + 1):
+            sent_at += timedelta(minutes=int(rng.expovariate(1 / 180)))
+            writer.add(messages_t, {
+                "content": f"Message {m + 1}", "discussion_id": discussion_id,
+                "sender_id": rng.choice(members), "sent_at": sent_at, "updated_at": sent_at,
+                "is_deleted": False,
+            })
+    writer.close()
+    writer.progress("total")
+    return writer.counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), help="Préréglage du nombre d'étudiants, d'enseignants et de cours")
+    parser.add_argument("--students", type=int, default=10_000, help="Nombre d'étudiants")
+    parser.add_argument("--teachers", type=int, default=100, help="Nombre d'enseignants")
+    parser.add_argument("--courses", type=int, default=300, help="Nombre de cours")
+    parser.add_argument("--modules-per-course", type=int, default=4, help="Modules par cours")
+    parser.add_argument("--lessons-per-module", type=int, default=5, help="Leçons par module")
+    parser.add_argument("--quizzes-per-course", type=int, default=2, help="Quiz par cours")
+    parser.add_argument("--questions-per-quiz", type=int, default=5, help="Questions par quiz (4 options chacune)")
+    parser.add_argument("--courses-per-student", type=float, default=4, help="Inscriptions moyennes par étudiant")
+    parser.add_argument("--interactions-per-student", type=float, default=40, help="Interactions moyennes par étudiant")
+    parser.add_argument("--discussions", type=int, default=None, help="Nombre de discussions (défaut : une par cours)")
+    parser.add_argument("--messages-per-discussion", type=float, default=30, help="Messages moyens par discussion")
+    parser.add_argument("--seed", type=int, default=42, help="Graine du générateur aléatoire")
+    parser.add_argument("--reference-date", type=datetime.fromisoformat, default=None,
+                        help="Date de référence des horodatages (AAAA-MM-JJ, défaut : aujourd'hui à minuit)")
+    parser.add_argument("--password", default="password123", help="Mot de passe de tous les comptes générés")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="Lignes par INSERT multi-lignes")
+    parser.add_argument("--database-url", help="Base cible (défaut : SQLALCHEMY_DATABASE_URI)")
+    args = parser.parse_args()
+
+    if args.scale:
+        args.students, args.teachers, args.courses = SCALES[args.scale]
+    if args.discussions is None:
+        args.discussions = args.courses
+    if args.reference_date is None:
+        args.reference_date = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    from app.db.session import create_db_engine
+
+    engine = create_db_engine(args.database_url)
+    print(f"Génération vers {engine.url.render_as_string(hide_password=True)} (graine {args.seed})")
+    start = time.perf_counter()
+    counts = seed(engine, args)
+    elapsed = time.perf_counter() - start
+    print(json.dumps(counts, indent=2))
+    print(f"{sum(counts.values()):,} lignes insérées en {elapsed:.1f} s")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
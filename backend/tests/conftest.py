@@ -0,0 +1,92 @@
+"""
+Configuration commune des tests : base SQLite temporaire et comptes de test.
+
+La base doit être configurée avant l'import de l'application (le moteur est
+créé à l'import de app.db.session et le schéma par app.main).
+"""
+import itertools
+import os
+import sys
+import tempfile
+
+import httpx
+import pytest
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_DB_DIR = tempfile.mkdtemp(prefix="tests_")
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(_DB_DIR, 'tests.db')}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from app.core.passwords import hash_password  # noqa: E402
+from app.core.principal_cache import principal_cache  # noqa: E402
+from app.core.token_versions import token_versions  # noqa: E402
+from app.db.instrumentation import clear_query_budgets  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import User  # noqa: E402
+
+PASSWORD = "mot-de-passe-de-test"
+
+_user_numbers = itertools.count(1)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client():
+    # Sans les événements de démarrage : les tâches de fond (rafraîchissement des
+    # versions de jetons, écriture des interactions) ne tournent pas, les tests
+    # pilotent l'état
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://tests") as client:
+        yield client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_user(db):
+    """Crée un compte actif (`role` : etudiant, enseignant ou admin) ; mot de passe PASSWORD."""
+    def _make_user(role: str = "etudiant") -> User:
+        number = next(_user_numbers)
+        user = User(
+            username=f"{role}{number}", email=f"{role}{number}@tests.example.com",
+            password_hash=hash_password(PASSWORD), first_name="Test", last_name=f"Numéro {number}",
+            role=role, is_active=True,
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+    return _make_user
+
+
+@pytest.fixture
+def login(client):
+    """Connecte un compte par la route de connexion ; retourne les en-têtes d'authentification."""
+    async def _login(user: User) -> dict:
+        response = await client.post("/api/v1/auth/token", data={"username": user.username, "password": PASSWORD})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return _login
+
+
+@pytest.fixture(autouse=True)
+def reset_auth_state():
+    """Table des versions de jetons à jour et caches vides, comme un worker qui vient de démarrer."""
+    principal_cache.clear()
+    token_versions.refresh(engine, full=True)
+    yield
+    clear_query_budgets()
@@ -0,0 +1,43 @@
+"""
+Budgets de requêtes SQL (app/db/instrumentation.py) : détection des N+1.
+
+`set_query_budget` fixe le nombre maximal de requêtes SQL d'une route (clé
+« MÉTHODE chemin déclaré ») ; `query_budget` vérifie un bloc de code. Un
+dépassement lève QueryBudgetExceeded.
+"""
+import pytest
+
+from app.core.token_versions import token_versions
+from app.db.instrumentation import QueryBudgetExceeded, query_budget, set_query_budget
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_route_budget(client, make_user, login, monkeypatch):
+    headers = await login(make_user())
+    set_query_budget("GET /api/v1/users/me", 1)
+
+    # Authentification par les informations du jeton, puis une lecture du profil
+    response = await client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 200
+    assert 'desc="1 queries"' in response.headers["server-timing"]
+
+    # Table des versions périmée : l'authentification relit l'utilisateur, soit
+    # une requête SQL de plus que le budget
+    monkeypatch.setattr(token_versions, "is_fresh", lambda: False)
+    with pytest.raises(QueryBudgetExceeded, match="GET /api/v1/users/me"):
+        await client.get("/api/v1/users/me", headers=headers)
+
+
+def test_block_budget(db, make_user):
+    user = make_user()
+
+    with query_budget(1) as stats:
+        UserService.get_user(db, user.id)
+    assert stats.count == 1
+
+    with pytest.raises(QueryBudgetExceeded):
+        with query_budget(1):
+            for _ in range(2):
+                UserService.get_user(db, user.id)
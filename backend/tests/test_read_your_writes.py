@@ -0,0 +1,77 @@
+"""
+Lecture de ses propres écritures avec une réplique en retard : deux fichiers
+SQLite, la réplique étant une copie de la base principale figée avant
+l'écriture. Après une écriture, les lectures du même utilisateur doivent être
+servies par la base principale, y compris par un autre worker.
+"""
+import os
+import sqlite3
+import time
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.db.routing import LAST_WRITE_COOKIE, cookie_requires_primary, last_write_cookie, read_your_writes
+from app.db.session import create_async_db_engine, create_db_engine, engine
+from app.models.models import Course, CourseStatus
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def lagging_replica(monkeypatch, tmp_path):
+    """Copie la base principale dans une réplique qui ne recevra plus les écritures suivantes."""
+    engines = []
+
+    def _snapshot():
+        replica_path = os.path.join(tmp_path, "replica.db")
+        with sqlite3.connect(engine.url.database) as source, sqlite3.connect(replica_path) as target:
+            source.backup(target)
+        replica_engine = create_db_engine(f"sqlite:///{replica_path}")
+        async_replica_engine = create_async_db_engine(f"sqlite:///{replica_path}")
+        engines.append((replica_engine, async_replica_engine))
+        monkeypatch.setattr(database, "replica_engine", replica_engine)
+        monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(bind=replica_engine))
+        monkeypatch.setattr(database, "async_replica_engine", async_replica_engine)
+        monkeypatch.setattr(database, "AsyncReadSessionLocal", async_sessionmaker(bind=async_replica_engine))
+
+    yield _snapshot
+    for replica_engine, async_replica_engine in engines:
+        replica_engine.dispose()
+        async_replica_engine.sync_engine.dispose()
+
+
+async def test_write_then_read_served_by_primary(client, db, make_user, login, lagging_replica):
+    student = make_user()
+    headers = await login(student)
+    course = Course(title="Cours répliqué", slug=f"cours-replique-{student.id}", status=CourseStatus.published,
+                    instructor_id=make_user("enseignant").id)
+    db.add(course)
+    db.commit()
+    lagging_replica()
+
+    response = await client.post(f"/api/v1/student/enroll/{course.id}", headers=headers)
+    assert response.status_code == 200, response.text
+    assert LAST_WRITE_COOKIE in response.cookies
+
+    # Lecture traitée par un autre worker : il n'a pas vu l'écriture, seul le cookie l'indique
+    read_your_writes.clear()
+    response = await client.get("/api/v1/student/stats", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["coursesEnrolled"] == 1
+
+    # Sans le cookie, la lecture part sur la réplique, qui n'a pas l'inscription
+    client.cookies.clear()
+    response = await client.get("/api/v1/student/stats", headers=headers)
+    assert response.json()["coursesEnrolled"] == 0
+
+
+def test_last_write_cookie_checks():
+    cookie = last_write_cookie("42", time.time())
+    assert cookie_requires_primary(cookie, "42")
+    # Autre utilisateur, signature falsifiée, écriture hors de la fenêtre
+    assert not cookie_requires_primary(cookie, "43")
+    assert not cookie_requires_primary(cookie[:-1] + ("0" if cookie[-1] != "0" else "1"), "42")
+    assert not cookie_requires_primary(last_write_cookie("42", time.time() - 3600), "42")
@@ -0,0 +1,71 @@
+"""
+Révocation des jetons : un compte désactivé par un administrateur ne doit
+plus être accepté avec un jeton émis avant la désactivation.
+
+Deux chemins d'authentification (voir `auth_service.get_principal`) :
+
+- jeton porteur des informations de l'utilisateur et table des versions à
+  jour : aucune lecture en base, la version du jeton est comparée à la table ;
+- table des versions périmée : l'utilisateur est lu en base puis gardé dans
+  le cache des principaux.
+"""
+import pytest
+
+from app.core.principal_cache import principal_cache, token_key
+from app.core.token_versions import token_versions
+from app.db.session import engine
+
+pytestmark = pytest.mark.anyio
+
+
+async def deactivate(client, admin_headers, user):
+    response = await client.patch(f"/api/v1/users/{user.id}/status", json={"active": False}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["is_active"] is False
+
+
+async def test_deactivated_user_rejected_on_claims_path(client, make_user, login):
+    admin_headers = await login(make_user("admin"))
+    student = make_user()
+    headers = await login(student)
+
+    assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 200
+    # Authentifié par les informations du jeton : rien en cache
+    assert principal_cache.get(token_key(headers["Authorization"].split()[1])) is None
+
+    await deactivate(client, admin_headers, student)
+
+    response = await client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Jeton révoqué, veuillez vous reconnecter"
+
+
+async def test_deactivation_reaches_other_workers_on_refresh(client, make_user, login):
+    admin_headers = await login(make_user("admin"))
+    student = make_user()
+    headers = await login(student)
+
+    await deactivate(client, admin_headers, student)
+    # Un autre worker n'a pas encore vu la révocation : sa table donne l'ancienne
+    # version, jusqu'au prochain rafraîchissement incrémental
+    token_versions.set_version(student.id, 0)
+    token_versions.refresh(engine)
+
+    assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 401
+
+
+async def test_deactivated_user_rejected_on_cached_principal_path(client, make_user, login, monkeypatch):
+    admin_headers = await login(make_user("admin"))
+    student = make_user()
+    headers = await login(student)
+    # Table des versions périmée : l'authentification relit l'utilisateur en base
+    monkeypatch.setattr(token_versions, "is_fresh", lambda: False)
+
+    assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 200
+    assert principal_cache.get(token_key(headers["Authorization"].split()[1])) is not None
+
+    await deactivate(client, admin_headers, student)
+
+    response = await client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Jeton révoqué, veuillez vous reconnecter"
@@ -28,6 +28,21 @@ class InteractionService {
     }
   }
 
+  // Envoie en une requête les interactions accumulées (voir /interactions/track/batch)
+  async trackInteractionsBatch(events: Array<TrackInteractionParams & { timestamp?: Date }>) {
+    try {
+      return await apiService.post('/interactions/track/batch', events.map((event) => ({
+        entity_type: event.entityType,
+        entity_id: event.entityId,
+        interaction_type: event.interactionType,
+        metadata: event.metadata,
+        client_timestamp: (event.timestamp || new Date()).toISOString()
+      })));
+    } catch (error) {
+      console.error('Error tracking interactions batch:', error);
+    }
+  }
+
   async trackPageView(params: PageViewParams) {
     return this.trackInteraction({
       entityType: 'page',